@@ -107,15 +107,11 @@ class MOCSimulator:
         self.R = pipe_params.f * self.dx / \
                  (2 * pipe_params.g * pipe_params.D * pipe_params.A**2)
 
-        # 初始化状态（稳态流动）
-        self.H = np.ones(N_sections + 1) * pipe_params.H_reservoir
+        # 初始化状态（稳态流动，沿程水头按摩阻损失线性下降）
         self.Q = np.ones(N_sections + 1) * pipe_params.Q0
-
-        # 计算初始稳态压力分布
-        for i in range(1, N_sections + 1):
-            h_f = pipe_params.f * i * self.dx * pipe_params.V0**2 / \
-                  (2 * pipe_params.g * pipe_params.D)
-            self.H[i] = pipe_params.H_reservoir - h_f
+        x = np.arange(N_sections + 1) * self.dx
+        self.H = pipe_params.H_reservoir - pipe_params.f * x * pipe_params.V0**2 / \
+                 (2 * pipe_params.g * pipe_params.D)
 
         # 历史记录
         self.time = 0
@@ -135,19 +131,18 @@ class MOCSimulator:
         H_new = np.zeros_like(self.H)
         Q_new = np.zeros_like(self.Q)
 
-        # 1. 内部节点（特征线交点）
-        for i in range(1, self.N):
-            # C+ 特征线（来自左侧 i-1）
-            C_p = self.H[i-1] + self.B * self.Q[i-1] - \
-                  self.R * self.Q[i-1] * abs(self.Q[i-1])
+        # 1. 内部节点（特征线交点，全部内部节点一次计算）
+        # C+ 特征线（来自左侧 i-1）
+        C_p = self.H[:-2] + self.B * self.Q[:-2] - \
+              self.R * self.Q[:-2] * np.abs(self.Q[:-2])
 
-            # C- 特征线（来自右侧 i+1）
-            C_m = self.H[i+1] - self.B * self.Q[i+1] + \
-                  self.R * self.Q[i+1] * abs(self.Q[i+1])
+        # C- 特征线（来自右侧 i+1）
+        C_m = self.H[2:] - self.B * self.Q[2:] + \
+              self.R * self.Q[2:] * np.abs(self.Q[2:])
 
-            # 求解
-            H_new[i] = (C_p + C_m) / 2
-            Q_new[i] = (C_p - C_m) / (2 * self.B)
+        # 求解
+        H_new[1:-1] = (C_p + C_m) / 2
+        Q_new[1:-1] = (C_p - C_m) / (2 * self.B)
 
         # 2. 上游边界（恒定水头水库）
         H_new[0] = self.params.H_reservoir
@@ -25,7 +25,8 @@ to forecast error statistics." Journal of Geophysical Research,
 """
 
 import numpy as np
-from typing import Callable, List, Tuple, Dict, Optional
+from scipy.linalg import cho_factor, cho_solve
+from typing import Callable, List, Tuple, Dict, Optional, Union
 import warnings
 
 
@@ -45,6 +46,11 @@ class EnKF:
         观测维度
     inflation_factor : float
         膨胀因子（防止滤波发散）
+    vectorized : bool
+        为True时model_func和obs_operator一次处理整个集合：
+        model_func(ensemble (n_ensemble, state_dim), inputs) 返回同形状数组，
+        obs_operator(ensemble) 返回 (n_ensemble, obs_dim) 数组
+        （例如由 XinAnJiangGrid 推进的堆叠状态）
     """
     
     def __init__(self,
@@ -52,13 +58,15 @@ class EnKF:
                  n_ensemble: int = 50,
                  state_dim: int = None,
                  obs_dim: int = 1,
-                 inflation_factor: float = 1.0):
+                 inflation_factor: float = 1.0,
+                 vectorized: bool = False):
         
         self.model_func = model_func
         self.n_ensemble = n_ensemble
         self.state_dim = state_dim
         self.obs_dim = obs_dim
         self.inflation_factor = inflation_factor
+        self.vectorized = vectorized
         
         # 集合状态
         self.ensemble = None
@@ -91,10 +99,8 @@ class EnKF:
         if self.state_dim is None:
             self.state_dim = len(mean_state)
         
-        self.ensemble = np.zeros((self.n_ensemble, self.state_dim))
-        
-        for i in range(self.n_ensemble):
-            self.ensemble[i] = mean_state + std_state * np.random.randn(self.state_dim)
+        self.ensemble = mean_state + std_state * np.random.randn(self.n_ensemble,
+                                                                 self.state_dim)
         
         return self.ensemble
     
@@ -115,17 +121,18 @@ class EnKF:
         forecast_ensemble : ndarray (n_ensemble, state_dim)
             预报集合
         """
-        forecast_ensemble = np.zeros_like(self.ensemble)
-        
-        for i in range(self.n_ensemble):
-            # 运行模型
-            forecast_state = self.model_func(self.ensemble[i], inputs)
-            
-            # 添加过程噪声
-            if process_noise_std > 0:
-                forecast_state += process_noise_std * np.random.randn(self.state_dim)
-            
-            forecast_ensemble[i] = forecast_state
+        # 运行模型
+        if self.vectorized:
+            forecast_ensemble = np.array(self.model_func(self.ensemble, inputs),
+                                         dtype=float).reshape(self.ensemble.shape)
+        else:
+            forecast_ensemble = np.zeros_like(self.ensemble)
+            for i in range(self.n_ensemble):
+                forecast_ensemble[i] = self.model_func(self.ensemble[i], inputs)
+        
+        # 添加过程噪声
+        if np.any(np.asarray(process_noise_std) > 0):
+            forecast_ensemble += process_noise_std * np.random.randn(*forecast_ensemble.shape)
         
         # 膨胀（防止滤波发散）
         if self.inflation_factor != 1.0:
@@ -137,28 +144,42 @@ class EnKF:
     
     def analysis(self, observation: np.ndarray,
                 obs_operator: Callable,
-                obs_error_std: float) -> np.ndarray:
+                obs_error_std: Union[float, np.ndarray]) -> np.ndarray:
         """
         分析步：利用观测更新状态
         
         Parameters
         ----------
         observation : ndarray (obs_dim,)
-            观测值
+            观测值，缺测分量记为NaN（只用有效分量更新）
         obs_operator : callable
             观测算子，将状态映射到观测空间
-        obs_error_std : float
-            观测误差标准差
+        obs_error_std : float or ndarray (obs_dim,)
+            观测误差标准差（可逐观测分量给定）
         
         Returns
         -------
         analysis_ensemble : ndarray (n_ensemble, state_dim)
             分析集合
         """
+        observation = np.atleast_1d(np.asarray(observation, dtype=float))
+        
         # 1. 计算预报观测
-        forecast_obs = np.zeros((self.n_ensemble, self.obs_dim))
-        for i in range(self.n_ensemble):
-            forecast_obs[i] = obs_operator(self.ensemble[i])
+        if self.vectorized:
+            forecast_obs = np.asarray(obs_operator(self.ensemble), dtype=float)
+        else:
+            forecast_obs = np.array([np.atleast_1d(obs_operator(member))
+                                     for member in self.ensemble], dtype=float)
+        forecast_obs = forecast_obs.reshape(self.n_ensemble, -1)
+        
+        # 只使用有效观测分量
+        valid = ~np.isnan(observation)
+        if not np.any(valid):
+            return self.ensemble
+        obs_std = np.broadcast_to(np.asarray(obs_error_std, dtype=float),
+                                  observation.shape)[valid]
+        observation = observation[valid]
+        forecast_obs = forecast_obs[:, valid]
         
         # 2. 计算预报观测的均值和偏差
         mean_forecast_obs = np.mean(forecast_obs, axis=0)
@@ -172,24 +193,17 @@ class EnKF:
         # P_f H^T
         PHT = (1.0 / (self.n_ensemble - 1)) * A.T @ D  # (state_dim, obs_dim)
         
-        # H P_f H^T + R
-        HPHT_R = (1.0 / (self.n_ensemble - 1)) * D.T @ D + obs_error_std**2 * np.eye(self.obs_dim)
-        
-        # K = P_f H^T (H P_f H^T + R)^{-1}
-        K = PHT @ np.linalg.inv(HPHT_R)  # (state_dim, obs_dim)
+        # H P_f H^T + R（对称正定，用Cholesky分解代替求逆）
+        HPHT_R = (1.0 / (self.n_ensemble - 1)) * D.T @ D + np.diag(obs_std**2)
+        factor = cho_factor(HPHT_R)
         
-        # 5. 更新集合
-        analysis_ensemble = np.zeros_like(self.ensemble)
+        # 5. 更新集合（扰动观测，全部成员一次求解）
+        perturbed_obs = observation + obs_std * np.random.randn(self.n_ensemble,
+                                                                len(observation))
+        innovation = perturbed_obs - forecast_obs  # (n_ensemble, obs_dim)
         
-        for i in range(self.n_ensemble):
-            # 扰动观测
-            perturbed_obs = observation + obs_error_std * np.random.randn(self.obs_dim)
-            
-            # 计算创新（innovation）
-            innovation = perturbed_obs - forecast_obs[i]
-            
-            # 更新状态
-            analysis_ensemble[i] = self.ensemble[i] + K @ innovation
+        # x_a = x_f + P_f H^T (H P_f H^T + R)^{-1} d
+        analysis_ensemble = self.ensemble + cho_solve(factor, innovation.T).T @ PHT.T
         
         self.ensemble = analysis_ensemble
         return analysis_ensemble
@@ -268,8 +282,8 @@ class EnKF:
             self.forecast(inputs[t], process_noise_std)
             forecast_mean = self.get_mean_state()
             
-            # 如果有观测，进行分析
-            if not np.isnan(observations[t]).any():
+            # 如果有观测，进行分析（部分缺测时只用有效分量）
+            if not np.isnan(observations[t]).all():
                 self.analysis(observations[t], obs_operator, obs_error_std)
                 analysis_mean = self.get_mean_state()
             else:
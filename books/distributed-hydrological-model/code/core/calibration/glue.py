@@ -22,11 +22,78 @@ model calibration and uncertainty prediction." Hydrological Processes,
 日期: 2025-11-02
 """
 
+import os
 import numpy as np
-from typing import Callable, List, Tuple, Dict, Optional
+from typing import Callable, List, Tuple, Dict, Optional, Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import warnings
 
 
+# 计算不确定性区间时每个时间块允许的最大元素数（约32MB的float64）
+_BAND_BLOCK_ELEMENTS = 2 ** 22
+
+
+def _evaluate_sample(model_func: Callable,
+                     objective_func: Callable,
+                     params: np.ndarray) -> Tuple[Optional[np.ndarray], float]:
+    """运行单个参数样本并评估性能（模型失败时性能记为-999）"""
+    try:
+        sim = model_func(params)
+        perf = objective_func(sim)
+    except Exception:
+        return None, -999.0
+    return sim, float(perf)
+
+
+class _SimulationStore:
+    """
+    行为模拟结果存储
+    
+    默认保存在内存列表中；指定spill_path时逐条追加写入磁盘，
+    结束后以只读内存映射数组（n_runs, n_steps）的形式返回。
+    """
+    
+    def __init__(self, spill_path: Optional[str] = None):
+        self.spill_path = spill_path
+        self.count = 0
+        self.n_steps = None
+        self._items = []
+        self._file = open(spill_path, 'wb') if spill_path else None
+    
+    def append(self, sim: np.ndarray):
+        if self._file is None:
+            self._items.append(sim)
+            self.count += 1
+            return
+        
+        row = np.asarray(sim, dtype=np.float64).ravel()
+        if self.n_steps is None:
+            self.n_steps = len(row)
+        elif len(row) != self.n_steps:
+            raise ValueError("模拟序列长度不一致，无法写入磁盘数组")
+        self._file.write(row.tobytes())
+        self.count += 1
+    
+    def close(self, discard: bool = False):
+        """关闭溢写文件句柄；discard为True时删除未完成的文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            if discard and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+    
+    def finalize(self) -> Union[List[np.ndarray], np.ndarray]:
+        if self.spill_path is None:
+            return self._items
+        
+        self.close()
+        if self.count == 0:
+            return []
+        return np.memmap(self.spill_path, dtype=np.float64, mode='r',
+                         shape=(self.count, self.n_steps))
+
+
 class GLUE:
     """
     GLUE不确定性分析
@@ -43,6 +110,14 @@ class GLUE:
         行为参数集阈值
     n_samples : int
         蒙特卡洛采样数量
+    n_workers : int
+        并行进程数（1为串行；并行时model_func和objective_func需可pickle）
+    chunk_size : int, optional
+        每批评估的样本数，默认为n_samples的1/10
+    keep_all : bool
+        是否保留全部模拟结果；False时只保留行为模拟，内存随行为集大小增长
+    spill_path : str, optional
+        行为模拟结果的磁盘溢写文件路径，指定后以内存映射数组保存
     """
     
     def __init__(self,
@@ -50,7 +125,11 @@ class GLUE:
                  objective_func: Callable,
                  bounds: List[Tuple[float, float]],
                  behavioral_threshold: float = 0.5,
-                 n_samples: int = 10000):
+                 n_samples: int = 10000,
+                 n_workers: int = 1,
+                 chunk_size: Optional[int] = None,
+                 keep_all: bool = True,
+                 spill_path: Optional[str] = None):
         
         self.model_func = model_func
         self.objective_func = objective_func
@@ -58,6 +137,10 @@ class GLUE:
         self.n_params = len(bounds)
         self.behavioral_threshold = behavioral_threshold
         self.n_samples = n_samples
+        self.n_workers = max(1, int(n_workers))
+        self.chunk_size = chunk_size or max(1, int(np.ceil(n_samples / 10)))
+        self.keep_all = keep_all
+        self.spill_path = spill_path
         
         # 结果存储
         self.param_samples = None
@@ -126,33 +209,48 @@ class GLUE:
         else:
             self.param_samples = self._random_sample()
         
-        # 2. 运行模型并评估
+        # 2. 运行模型并评估（分批、可并行，只保留需要的模拟结果）
         if verbose:
             print("2. 运行模型并评估...")
         
         self.performance = np.zeros(self.n_samples)
-        self.simulations = []
-        
-        for i in range(self.n_samples):
-            try:
-                # 运行模型
-                sim = self.model_func(self.param_samples[i])
-                self.simulations.append(sim)
+        self.simulations = [] if self.keep_all else None
+        store = _SimulationStore(self.spill_path)
+        
+        evaluate = partial(_evaluate_sample, self.model_func, self.objective_func)
+        executor = (ProcessPoolExecutor(max_workers=self.n_workers)
+                    if self.n_workers > 1 else None)
+        completed = False
+        
+        try:
+            for start in range(0, self.n_samples, self.chunk_size):
+                stop = min(start + self.chunk_size, self.n_samples)
+                chunk = self.param_samples[start:stop]
                 
-                # 评估性能
-                perf = self.objective_func(sim)
-                self.performance[i] = perf
+                if executor is None:
+                    outputs = map(evaluate, chunk)
+                else:
+                    batch = max(1, len(chunk) // (4 * self.n_workers))
+                    outputs = executor.map(evaluate, chunk, chunksize=batch)
                 
-            except Exception as e:
-                # 模型失败
-                self.simulations.append(None)
-                self.performance[i] = -999
-            
-            if verbose and (i + 1) % (self.n_samples // 10) == 0:
-                progress = (i + 1) / self.n_samples * 100
-                print(f"   进度: {progress:.0f}%")
-        
-        self.simulations = np.array(self.simulations, dtype=object)
+                for i, (sim, perf) in zip(range(start, stop), outputs):
+                    self.performance[i] = perf
+                    if self.keep_all:
+                        self.simulations.append(sim)
+                    if sim is not None and perf >= self.behavioral_threshold:
+                        store.append(sim)
+                
+                if verbose:
+                    progress = stop / self.n_samples * 100
+                    print(f"   进度: {progress:.0f}%")
+            completed = True
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            store.close(discard=not completed)
+        
+        if self.keep_all:
+            self.simulations = np.array(self.simulations, dtype=object)
         
         # 3. 识别行为参数集
         if verbose:
@@ -161,10 +259,7 @@ class GLUE:
         self.behavioral_mask = self.performance >= self.behavioral_threshold
         self.behavioral_params = self.param_samples[self.behavioral_mask]
         self.behavioral_performance = self.performance[self.behavioral_mask]
-        self.behavioral_simulations = [
-            self.simulations[i] for i in range(self.n_samples)
-            if self.behavioral_mask[i] and self.simulations[i] is not None
-        ]
+        self.behavioral_simulations = store.finalize()
         
         n_behavioral = len(self.behavioral_params)
         behavioral_ratio = n_behavioral / self.n_samples * 100
@@ -248,46 +343,55 @@ class GLUE:
         if len(simulations) == 0:
             return {}
         
-        # 转换为数组
-        sim_array = np.array([s for s in simulations if s is not None])
-        
-        if len(sim_array) == 0:
-            return {}
+        # 列表转换为数组；磁盘内存映射数组直接按时间块读取
+        if isinstance(simulations, list):
+            sim_array = np.array([s for s in simulations if s is not None])
+            if len(sim_array) == 0:
+                return {}
+        else:
+            sim_array = simulations
         
-        n_steps = len(sim_array[0])
-        bands = {}
+        n_runs, n_steps = sim_array.shape
+        block = max(1, _BAND_BLOCK_ELEMENTS // n_runs)
+        bands = {f'P{p}': np.zeros(n_steps) for p in percentiles}
         
-        # 对每个时间步计算加权百分位数
-        for p in percentiles:
-            band = np.zeros(n_steps)
-            for t in range(n_steps):
-                values = sim_array[:, t]
-                # 加权百分位数
-                band[t] = self._weighted_percentile(values, likelihood, p)
-            bands[f'P{p}'] = band
+        # 按时间块计算加权百分位数，内存占用与序列长度无关
+        for start in range(0, n_steps, block):
+            values = np.asarray(sim_array[:, start:start + block], dtype=float)
+            for p in percentiles:
+                bands[f'P{p}'][start:start + block] = self._weighted_percentile(
+                    values, likelihood, p
+                )
         
         return bands
     
     def _weighted_percentile(self, values: np.ndarray,
                             weights: np.ndarray,
-                            percentile: float) -> float:
-        """计算加权百分位数"""
+                            percentile: float) -> Union[float, np.ndarray]:
+        """
+        计算加权百分位数
+        
+        values为一维时返回标量；为二维(n_runs, n_steps)时
+        对每一列同时计算，返回长度为n_steps的数组。
+        """
+        values = np.asarray(values)
+        if values.ndim == 1:
+            return self._weighted_percentile(values[:, None], weights, percentile)[0]
+        
         # 排序
-        sorted_indices = np.argsort(values)
-        sorted_values = values[sorted_indices]
-        sorted_weights = weights[sorted_indices]
+        sorted_indices = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, sorted_indices, axis=0)
+        sorted_weights = np.asarray(weights, dtype=float)[sorted_indices]
         
         # 累积权重
-        cumsum = np.cumsum(sorted_weights)
+        cumsum = np.cumsum(sorted_weights, axis=0)
         cumsum = cumsum / cumsum[-1]  # 归一化
         
-        # 找到百分位数对应的值
-        idx = np.searchsorted(cumsum, percentile / 100.0)
-        
-        if idx >= len(sorted_values):
-            idx = len(sorted_values) - 1
+        # 找到百分位数对应的值（逐列等价于searchsorted）
+        idx = np.sum(cumsum < percentile / 100.0, axis=0)
+        idx = np.minimum(idx, len(sorted_values) - 1)
         
-        return sorted_values[idx]
+        return sorted_values[idx, np.arange(values.shape[1])]
 
 
 def glue_analysis(model_func: Callable,
@@ -11,11 +11,27 @@
 import numpy as np
 from typing import Callable, List, Dict, Tuple
 
+from ..utils.metrics import ObservationStats, batch_metrics
+
+
+# 内置指标名 → batch_metrics 指标名
+_BATCH_KEYS = {
+    'nse': 'NSE',
+    'rmse': 'RMSE',
+    'mae': 'MAE',
+    'r2': 'R2',
+    'pbias': 'PBIAS'
+}
+
 
 class ObjectiveFunction:
     """
     目标函数基类
     
+    观测值的统计量（有效位置、均值、离差平方和、总量）在构造时
+    计算一次，之后每次评估只需处理模拟值；观测缺测（NaN）的时段
+    不参与计算。内置指标可用 evaluate_batch 一次评估整个参数集合。
+    
     Parameters
     ----------
     observed : ndarray
@@ -29,9 +45,10 @@ class ObjectiveFunction:
     def __init__(self, observed: np.ndarray, 
                  metric: str = 'nse',
                  maximize: bool = True):
-        self.observed = observed
+        self.observed = np.asarray(observed, dtype=float)
         self.metric_name = metric if isinstance(metric, str) else 'custom'
         self.maximize = maximize
+        self.obs_stats = ObservationStats(self.observed)
         
         # 选择评价指标
         if isinstance(metric, str):
@@ -54,52 +71,33 @@ class ObjectiveFunction:
         
         return metrics[metric]
     
+    def _batch_metric(self, metric: str, simulated: np.ndarray) -> np.ndarray:
+        """批量计算内置指标，分母为0（或无有效数据）时取0"""
+        values = batch_metrics(self.observed, simulated, [_BATCH_KEYS[metric]],
+                               obs_stats=self.obs_stats)[_BATCH_KEYS[metric]]
+        if metric in ('nse', 'r2', 'pbias'):
+            values = np.where(np.isnan(values), 0.0, values)
+        return values
+    
     def _nash_sutcliffe(self, simulated: np.ndarray) -> float:
         """Nash-Sutcliffe效率系数"""
-        obs_mean = np.mean(self.observed)
-        numerator = np.sum((self.observed - simulated) ** 2)
-        denominator = np.sum((self.observed - obs_mean) ** 2)
-        
-        if denominator == 0:
-            return 0.0
-        
-        nse = 1 - numerator / denominator
-        return nse
+        return float(self._batch_metric('nse', simulated))
     
     def _rmse(self, simulated: np.ndarray) -> float:
         """均方根误差"""
-        return np.sqrt(np.mean((self.observed - simulated) ** 2))
+        return float(self._batch_metric('rmse', simulated))
     
     def _mae(self, simulated: np.ndarray) -> float:
         """平均绝对误差"""
-        return np.mean(np.abs(self.observed - simulated))
+        return float(self._batch_metric('mae', simulated))
     
     def _r_squared(self, simulated: np.ndarray) -> float:
         """决定系数"""
-        obs_mean = np.mean(self.observed)
-        sim_mean = np.mean(simulated)
-        
-        numerator = np.sum((self.observed - obs_mean) * (simulated - sim_mean))
-        denominator = np.sqrt(
-            np.sum((self.observed - obs_mean) ** 2) *
-            np.sum((simulated - sim_mean) ** 2)
-        )
-        
-        if denominator == 0:
-            return 0.0
-        
-        r = numerator / denominator
-        return r ** 2
+        return float(self._batch_metric('r2', simulated))
     
     def _pbias(self, simulated: np.ndarray) -> float:
         """百分比偏差"""
-        numerator = np.sum(self.observed - simulated)
-        denominator = np.sum(self.observed)
-        
-        if denominator == 0:
-            return 0.0
-        
-        return 100 * numerator / denominator
+        return float(self._batch_metric('pbias', simulated))
     
     def evaluate(self, simulated: np.ndarray) -> float:
         """
@@ -127,6 +125,31 @@ class ObjectiveFunction:
             score = -score
         
         return score
+    
+    def evaluate_batch(self, simulated: np.ndarray) -> np.ndarray:
+        """
+        批量评估多组模拟结果
+        
+        Parameters
+        ----------
+        simulated : ndarray (n_runs, n_time)
+            模拟值矩阵，每行对应一组参数
+        
+        Returns
+        -------
+        scores : ndarray (n_runs,)
+            目标函数值（根据maximize决定符号）
+        """
+        simulated = np.atleast_2d(np.asarray(simulated, dtype=float))
+        if simulated.shape[1] != len(self.observed):
+            raise ValueError("模拟值和观测值长度不一致")
+        
+        if self.metric_name in _BATCH_KEYS:
+            scores = self._batch_metric(self.metric_name, simulated)
+        else:
+            scores = np.array([self.metric_func(sim) for sim in simulated], dtype=float)
+        
+        return scores if self.maximize else -scores
 
 
 def nash_sutcliffe_objective(observed: np.ndarray) -> ObjectiveFunction:
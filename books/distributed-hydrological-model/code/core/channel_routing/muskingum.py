@@ -120,7 +120,8 @@ class MuskingumChannel:
             raise ValueError(f"演算系数和不等于1: {coef_sum}")
     
     def run(self, inflow: np.ndarray, 
-            initial_outflow: float = 0.0) -> Dict[str, np.ndarray]:
+            initial_outflow: float = 0.0,
+            reset: bool = True) -> Dict[str, np.ndarray]:
         """
         运行Muskingum模型
         
@@ -130,6 +131,9 @@ class MuskingumChannel:
             入流过程 (m³/s)
         initial_outflow : float
             初始出流 (m³/s)
+        reset : bool
+            是否按initial_outflow重新初始化；False时从当前状态
+            （上一时段出流和入流）继续，用于分段/流式计算
         
         Returns
         -------
@@ -147,8 +151,9 @@ class MuskingumChannel:
         storage = np.zeros(n)
         
         # 初始条件
-        self.Q = initial_outflow
-        self.I_prev = inflow[0] if n > 0 else 0.0
+        if reset:
+            self.Q = initial_outflow
+            self.I_prev = inflow[0] if n > 0 else 0.0
         
         # 时间步进
         for t in range(n):
@@ -5,18 +5,24 @@
 提供各种空间插值方法
 """
 
-from .thiessen import thiessen_polygon, thiessen_weights, calculate_areal_rainfall
+from .thiessen import (thiessen_polygon, thiessen_weights, calculate_areal_rainfall,
+                       ThiessenWeightMatrix)
 from .idw import inverse_distance_weighting, idw_grid, cross_validation_idw
 from .kriging import ordinary_kriging, variogram, experimental_variogram
+from .batch import idw_weights, kriging_weights, BatchInterpolator
 
 __all__ = [
     'thiessen_polygon',
     'thiessen_weights',
     'calculate_areal_rainfall',
+    'ThiessenWeightMatrix',
     'inverse_distance_weighting',
     'idw_grid',
     'cross_validation_idw',
     'ordinary_kriging',
     'variogram',
     'experimental_variogram',
+    'idw_weights',
+    'kriging_weights',
+    'BatchInterpolator',
 ]
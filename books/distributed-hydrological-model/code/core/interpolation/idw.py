@@ -7,6 +7,8 @@ Inverse Distance Weighting
 
 import numpy as np
 
+from .batch import idw_weights
+
 
 def inverse_distance_weighting(stations_xy, station_values, target_points,
                                power=2, radius=None, min_stations=1):
@@ -52,37 +54,10 @@ def inverse_distance_weighting(stations_xy, station_values, target_points,
     if target_points.ndim == 1:
         target_points = target_points.reshape(1, -1)
     
-    n_targets = len(target_points)
-    interpolated = np.zeros(n_targets)
-    
-    for i, target in enumerate(target_points):
-        # 计算距离
-        distances = np.sqrt(np.sum((stations_xy - target) ** 2, axis=1))
-        
-        # 处理目标点与站点重合的情况
-        if np.min(distances) < 1e-10:
-            # 直接使用该站点的值
-            idx = np.argmin(distances)
-            interpolated[i] = station_values[idx]
-            continue
-        
-        # 应用搜索半径
-        if radius is not None:
-            mask = distances <= radius
-            if np.sum(mask) < min_stations:
-                # 如果半径内站点不足，使用最近的min_stations个
-                idx = np.argsort(distances)[:min_stations]
-                mask = np.zeros(len(distances), dtype=bool)
-                mask[idx] = True
-        else:
-            mask = np.ones(len(distances), dtype=bool)
-        
-        # 计算权重
-        weights = 1.0 / (distances[mask] ** power)
-        weights = weights / np.sum(weights)  # 归一化
-        
-        # 插值
-        interpolated[i] = np.sum(weights * station_values[mask])
+    # 权重只依赖几何位置：构建稀疏权重矩阵后一次乘积完成插值
+    weights = idw_weights(stations_xy, target_points, power=power,
+                          radius=radius, min_stations=min_stations)
+    interpolated = weights @ station_values.astype(float)
     
     return interpolated
 
@@ -6,9 +6,10 @@ Ordinary Kriging - 普通克里金插值
 """
 
 import numpy as np
-from scipy.spatial.distance import cdist
 from scipy.optimize import minimize
 
+from .batch import kriging_weights, spherical_variogram, _default_variogram_params
+
 
 def variogram(distances, semivariances, model='spherical', 
              nugget=0, sill=None, range_param=None):
@@ -49,46 +50,6 @@ def variogram(distances, semivariances, model='spherical',
     }
 
 
-def spherical_variogram(h, nugget, sill, range_param):
-    """
-    球状变异函数模型
-    
-    γ(h) = nugget + (sill - nugget) * [1.5*h/a - 0.5*(h/a)³]  for h <= a
-    γ(h) = sill                                                for h > a
-    
-    Parameters
-    ----------
-    h : float or ndarray
-        距离
-    nugget : float
-        块金效应
-    sill : float
-        基台值
-    range_param : float
-        变程
-        
-    Returns
-    -------
-    gamma : float or ndarray
-        半方差值
-    """
-    h = np.asarray(h)
-    gamma = np.zeros_like(h, dtype=float)
-    
-    # h <= range
-    mask1 = h <= range_param
-    if np.any(mask1):
-        ratio = h[mask1] / range_param
-        gamma[mask1] = nugget + (sill - nugget) * (1.5 * ratio - 0.5 * ratio**3)
-    
-    # h > range
-    mask2 = h > range_param
-    if np.any(mask2):
-        gamma[mask2] = sill
-    
-    return gamma
-
-
 def ordinary_kriging(stations_xy, station_values, target_points,
                     variogram_params=None):
     """
@@ -127,69 +88,18 @@ def ordinary_kriging(stations_xy, station_values, target_points,
     if target_points.ndim == 1:
         target_points = target_points.reshape(1, -1)
     
-    n_stations = len(stations_xy)
-    n_targets = len(target_points)
-    
-    # 默认变异函数参数
+    # 默认变异函数参数（基台值取观测值方差）
     if variogram_params is None:
-        # 计算站点间距离
-        distances = cdist(stations_xy, stations_xy)
-        max_dist = np.max(distances)
-        semivar = np.var(station_values)
-        
-        variogram_params = {
-            'model': 'spherical',
-            'nugget': 0.0,
-            'sill': semivar,
-            'range': max_dist / 3
-        }
-    
-    # 构建站点间的半方差矩阵
-    distances_stations = cdist(stations_xy, stations_xy)
-    gamma_matrix = spherical_variogram(distances_stations, 
-                                      variogram_params['nugget'],
-                                      variogram_params['sill'],
-                                      variogram_params['range'])
-    
-    # 构建克里金方程组矩阵 (n+1)×(n+1)
-    K = np.zeros((n_stations + 1, n_stations + 1))
-    K[:n_stations, :n_stations] = gamma_matrix
-    K[n_stations, :n_stations] = 1
-    K[:n_stations, n_stations] = 1
-    K[n_stations, n_stations] = 0
-    
-    # 插值
-    interpolated = np.zeros(n_targets)
-    variances = np.zeros(n_targets)
-    
-    for i, target in enumerate(target_points):
-        # 计算目标点到各站点的距离
-        distances_target = np.sqrt(np.sum((stations_xy - target) ** 2, axis=1))
-        
-        # 计算目标点的半方差向量
-        gamma_vector = spherical_variogram(distances_target,
-                                          variogram_params['nugget'],
-                                          variogram_params['sill'],
-                                          variogram_params['range'])
-        
-        # 构建右侧向量
-        b = np.zeros(n_stations + 1)
-        b[:n_stations] = gamma_vector
-        b[n_stations] = 1
-        
-        # 求解克里金方程组
-        try:
-            weights = np.linalg.solve(K, b)
-            
-            # 插值
-            interpolated[i] = np.sum(weights[:n_stations] * station_values)
-            
-            # 插值方差
-            variances[i] = np.sum(weights[:n_stations] * gamma_vector) + weights[n_stations]
-        except np.linalg.LinAlgError:
-            # 矩阵奇异，使用简单平均
-            interpolated[i] = np.mean(station_values)
-            variances[i] = np.var(station_values)
+        variogram_params = _default_variogram_params(stations_xy)
+        variogram_params['sill'] = np.var(station_values)
+    
+    # 站点方程组只分解一次，所有目标点成批求解
+    weights, variances = kriging_weights(stations_xy, target_points,
+                                         variogram_params)
+    interpolated = weights @ station_values.astype(float)
+    
+    # 矩阵奇异时权重退化为简单平均，方差取观测值方差
+    variances = np.where(np.isnan(variances), np.var(station_values), variances)
     
     return interpolated, variances
 
@@ -6,7 +6,8 @@ Thiessen多边形插值
 """
 
 import numpy as np
-from scipy.spatial import Voronoi, voronoi_plot_2d
+from scipy import sparse
+from scipy.spatial import Voronoi, voronoi_plot_2d, cKDTree
 import matplotlib.pyplot as plt
 
 
@@ -189,3 +190,145 @@ def calculate_areal_rainfall(stations_xy, station_rainfall,
         areal_rainfall = np.mean(station_rainfall)
     
     return areal_rainfall
+
+
+class ThiessenWeightMatrix:
+    """
+    Thiessen权重矩阵（预计算）
+    
+    将离散网格单元分配给最近站点（即落在该站点的Thiessen多边形内），
+    再按单元面积汇总到分区（子流域），得到稀疏的 分区×站点 权重矩阵。
+    权重只需构建一次，整个多年、多流域的面雨量计算归结为稀疏矩阵乘积。
+    
+    站点缺测时只对受影响的单元重新分配最近的可用站点，
+    每种站点可用性组合的权重矩阵都会被缓存。
+    
+    Parameters
+    ----------
+    stations_xy : array_like, shape (n, 2)
+        站点坐标
+    cell_xy : array_like, shape (m, 2)
+        流域网格单元中心坐标
+    cell_area : array_like, shape (m,), optional
+        单元面积，默认各单元面积相等
+    zone_labels : array_like, shape (m,), optional
+        单元所属分区（子流域）编号，默认每个单元为一个分区；
+        全流域面雨量可传入全0数组
+        
+    Examples
+    --------
+    >>> cells = np.column_stack([grid_x.ravel(), grid_y.ravel()])
+    >>> twm = ThiessenWeightMatrix(stations, cells, zone_labels=subbasin.ravel())
+    >>> areal = twm.areal_rainfall(station_series)  # (n_times, n_zones)
+    """
+    
+    def __init__(self, stations_xy, cell_xy, cell_area=None, zone_labels=None):
+        self.stations_xy = np.asarray(stations_xy, dtype=float)
+        self.cell_xy = np.asarray(cell_xy, dtype=float)
+        self.n_stations = len(self.stations_xy)
+        n_cells = len(self.cell_xy)
+        
+        if cell_area is None:
+            cell_area = np.ones(n_cells)
+        cell_area = np.asarray(cell_area, dtype=float)
+        
+        # 单元 -> 分区 面积权重矩阵（每行和为1）
+        if zone_labels is None:
+            self.zones = np.arange(n_cells)
+            zone_index = self.zones
+        else:
+            self.zones, zone_index = np.unique(np.asarray(zone_labels),
+                                               return_inverse=True)
+        zone_area = np.bincount(zone_index, weights=cell_area)
+        self.zone_area = zone_area
+        self._zone_matrix = sparse.csr_matrix(
+            (cell_area / zone_area[zone_index], (zone_index, np.arange(n_cells))),
+            shape=(len(self.zones), n_cells)
+        )
+        
+        # 全部站点可用时各单元的最近站点
+        _, self._nearest = cKDTree(self.stations_xy).query(self.cell_xy)
+        self._cache = {}
+    
+    @property
+    def n_zones(self):
+        return len(self.zones)
+    
+    def weights(self, available=None):
+        """
+        获取给定站点可用性下的权重矩阵
+        
+        Parameters
+        ----------
+        available : array_like of bool, shape (n,), optional
+            站点可用标记，默认全部可用
+            
+        Returns
+        -------
+        weights : scipy.sparse.csr_matrix, shape (n_zones, n)
+            分区×站点权重矩阵；无可用站点时为None
+        """
+        if available is None:
+            available = np.ones(self.n_stations, dtype=bool)
+        available = np.asarray(available, dtype=bool)
+        
+        key = available.tobytes()
+        if key in self._cache:
+            return self._cache[key]
+        
+        if not np.any(available):
+            self._cache[key] = None
+            return None
+        
+        # 只对最近站点缺测的单元重新寻找最近的可用站点
+        nearest = self._nearest.copy()
+        affected = ~available[nearest]
+        if np.any(affected):
+            available_idx = np.flatnonzero(available)
+            _, local = cKDTree(self.stations_xy[available_idx]).query(
+                self.cell_xy[affected]
+            )
+            nearest[affected] = available_idx[local]
+        
+        n_cells = len(self.cell_xy)
+        cell_to_station = sparse.csr_matrix(
+            (np.ones(n_cells), (np.arange(n_cells), nearest)),
+            shape=(n_cells, self.n_stations)
+        )
+        weights = (self._zone_matrix @ cell_to_station).tocsr()
+        self._cache[key] = weights
+        return weights
+    
+    def areal_rainfall(self, station_rainfall):
+        """
+        计算各分区面雨量序列
+        
+        Parameters
+        ----------
+        station_rainfall : array_like, shape (n,) or (n_times, n)
+            站点降雨，缺测记为NaN
+            
+        Returns
+        -------
+        areal_rainfall : ndarray, shape (n_zones,) or (n_times, n_zones)
+            分区面雨量；全部站点缺测的时段为NaN
+        """
+        rainfall = np.asarray(station_rainfall, dtype=float)
+        if rainfall.ndim == 1:
+            return self.areal_rainfall(rainfall[None, :])[0]
+        
+        observed = ~np.isnan(rainfall)
+        filled = np.where(observed, rainfall, 0.0)
+        result = np.full((len(rainfall), self.n_zones), np.nan)
+        
+        # 按站点可用性组合分组，每组一次稀疏矩阵乘积
+        patterns, group = np.unique(observed, axis=0, return_inverse=True)
+        group = group.ravel()
+        for g, pattern in enumerate(patterns):
+            weights = self.weights(pattern)
+            if weights is None:
+                continue
+            rows = np.flatnonzero(group == g)
+            result[rows] = (weights @ filled[rows].T).T
+        
+        return result
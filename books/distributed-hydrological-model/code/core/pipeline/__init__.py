@@ -0,0 +1,32 @@
+"""
+流式流程模块
+===========
+
+把降雨插值、产流、汇流、同化等环节串联为流式计算流程，
+按时间块处理驱动数据，结果分块写入磁盘，支持检查点热启动。
+
+子模块:
+- operators: 流式算子（函数算子、模型算子、同化算子）
+- runner: 流程运行器
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+from .operators import (
+    StreamOperator,
+    FunctionOperator,
+    ModelOperator,
+    AssimilationOperator
+)
+from .runner import PipelineRunner
+
+__all__ = [
+    'StreamOperator',
+    'FunctionOperator',
+    'ModelOperator',
+    'AssimilationOperator',
+    'PipelineRunner'
+]
+
+__version__ = '0.1.0'
@@ -0,0 +1,209 @@
+"""
+流式流程运行器
+=============
+
+按时间块驱动一组流式算子（降雨插值 → 产流 → 坡面汇流 →
+河道汇流 → 数据同化），每块结果追加写入磁盘分块存储，
+并定期保存检查点（各算子状态 + 已完成时间步），中断后可从
+检查点热启动。内存占用只与块长度有关，与模拟总时长无关。
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+from .operators import StreamOperator
+
+
+def _read_block(source, key: str, start: int, stop: int) -> np.ndarray:
+    """从驱动数据中读取一个时间块（支持数组字典和ChunkedArrayStore）"""
+    if hasattr(source, 'read'):
+        return np.asarray(source.read(key, start, stop))
+    return np.asarray(source[key][start:stop])
+
+
+def _source_length(source, keys: Sequence[str]) -> int:
+    if hasattr(source, 'read'):
+        return len(source)
+    return min(len(source[key]) for key in keys)
+
+
+class PipelineRunner:
+    """
+    流式流程运行器
+    
+    Parameters
+    ----------
+    operators : list of StreamOperator
+        按执行顺序排列的算子
+    output_keys : sequence of str
+        写入结果存储的变量名
+    chunk_size : int
+        每块时间步数
+    
+    Examples
+    --------
+    >>> runner = PipelineRunner([interp_op, xaj_op, routing_op], ['Q'], chunk_size=720)
+    >>> store = ChunkedArrayStore('outputs/run1')
+    >>> runner.run(forcing, store, checkpoint_path='outputs/run1.ckpt')
+    >>> # 中断后重新执行同一命令即从检查点继续
+    """
+    
+    def __init__(self, operators: List[StreamOperator],
+                 output_keys: Sequence[str], chunk_size: int = 720):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size必须为正整数")
+        
+        self.operators = list(operators)
+        self.output_keys = tuple(output_keys)
+        self.chunk_size = int(chunk_size)
+        self.t = 0
+        
+        # 驱动数据变量 = 各算子输入中不由前序算子产生的变量
+        produced = set()
+        forcing_keys = []
+        for op in self.operators:
+            for key in op.inputs:
+                if key not in produced and key not in forcing_keys:
+                    forcing_keys.append(key)
+            produced.update(op.outputs)
+        self.forcing_keys = tuple(forcing_keys)
+        
+        missing = [key for key in self.output_keys
+                   if key not in produced and key not in forcing_keys]
+        if missing:
+            raise ValueError(f"没有算子产生输出变量: {missing}")
+    
+    def reset(self):
+        """重置全部算子，从第0步开始"""
+        for op in self.operators:
+            op.reset()
+        self.t = 0
+    
+    def get_state(self) -> Dict:
+        """运行器状态：已完成时间步、各算子状态及全局随机数状态"""
+        return {
+            't': self.t,
+            'operators': [op.get_state() for op in self.operators],
+            'random_state': np.random.get_state(),
+        }
+    
+    def set_state(self, state: Dict):
+        """恢复运行器状态"""
+        if len(state['operators']) != len(self.operators):
+            raise ValueError("检查点的算子数与当前流程不一致")
+        self.t = int(state['t'])
+        for op, op_state in zip(self.operators, state['operators']):
+            op.set_state(op_state)
+        if 'random_state' in state:
+            np.random.set_state(state['random_state'])
+    
+    def save_checkpoint(self, path):
+        """保存检查点（先写临时文件再替换）"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'wb') as f:
+            pickle.dump(self.get_state(), f)
+        os.replace(tmp, path)
+    
+    def load_checkpoint(self, path):
+        """从检查点恢复"""
+        with open(path, 'rb') as f:
+            self.set_state(pickle.load(f))
+    
+    def process_chunk(self, data: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """依次执行全部算子，返回该时间块的全部变量"""
+        data = dict(data)
+        for op in self.operators:
+            data.update(op.process(data))
+        return data
+    
+    def run(self, forcing, store=None, stop: Optional[int] = None,
+            checkpoint_path=None, checkpoint_every: int = 1,
+            resume: bool = True, store_chunk_size: Optional[int] = None,
+            verbose: bool = False):
+        """
+        运行流程
+        
+        Parameters
+        ----------
+        forcing : dict or ChunkedArrayStore
+            驱动数据，变量名 → 沿第0轴为时间的数组（可为np.memmap）
+        store : ChunkedArrayStore, optional
+            结果存储；None时结果在内存中拼接后返回
+        stop : int, optional
+            运行到第stop步（不含），默认到驱动数据末尾
+        checkpoint_path : str or Path, optional
+            检查点文件
+        checkpoint_every : int
+            每隔多少块保存一次检查点
+        resume : bool
+            检查点文件存在时是否从检查点继续（同时把结果存储截断到检查点位置）；
+            False时从头开始
+        store_chunk_size : int, optional
+            结果存储的每块时间步数（经ChunkedArrayWriter缓冲，可大于chunk_size
+            以减少磁盘文件数）；保存检查点前总会写出缓冲区。默认等于chunk_size
+        verbose : bool
+            是否打印进度
+        
+        Returns
+        -------
+        results : ChunkedArrayStore or dict
+            结果存储，或 {变量名: 数组}（store为None时）
+        """
+        if checkpoint_path is not None and resume and Path(checkpoint_path).exists():
+            self.load_checkpoint(checkpoint_path)
+        else:
+            self.reset()
+        
+        if store is not None:
+            if len(store) > self.t:
+                store.truncate(self.t)
+            elif len(store) < self.t:
+                raise ValueError("结果存储短于检查点位置，无法继续")
+        
+        n_total = _source_length(forcing, self.forcing_keys)
+        stop = n_total if stop is None else min(stop, n_total)
+        
+        in_memory = {key: [] for key in self.output_keys} if store is None else None
+        writer = (store.writer(store_chunk_size or self.chunk_size)
+                  if store is not None else None)
+        n_chunks = 0
+        
+        while self.t < stop:
+            t1 = min(self.t + self.chunk_size, stop)
+            block = {key: _read_block(forcing, key, self.t, t1) for key in self.forcing_keys}
+            
+            data = self.process_chunk(block)
+            outputs = {key: data[key] for key in self.output_keys}
+            
+            if writer is not None:
+                writer.write(outputs)
+            else:
+                for key, value in outputs.items():
+                    in_memory[key].append(value)
+            
+            self.t = t1
+            n_chunks += 1
+            
+            if checkpoint_path is not None and (n_chunks % checkpoint_every == 0 or self.t >= stop):
+                # 检查点位置必须与存储中已写出的数据一致
+                if writer is not None:
+                    writer.flush()
+                self.save_checkpoint(checkpoint_path)
+            
+            if verbose:
+                print(f"   已完成 {self.t}/{stop} 步")
+        
+        if writer is not None:
+            writer.close()
+            return store
+        return {key: np.concatenate(values) if values else np.zeros(0)
+                for key, values in in_memory.items()}
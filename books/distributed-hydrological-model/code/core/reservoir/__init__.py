@@ -6,6 +6,8 @@
 
 子模块:
 - operation_rules: 调度规则库
+- level_storage: 水位-库容-面积关系表
+- batch_simulation: 批量规则调度模拟
 - optimization: 优化调度算法
 
 作者: CHS-Books项目组
@@ -13,11 +15,16 @@
 """
 
 from .operation_rules import ReservoirRules, OperationRule
+from .level_storage import LevelStorageTable
+from .batch_simulation import BatchRuleSimulator, simulate_cascade
 from .optimization import optimize_reservoir_operation
 
 __all__ = [
     'ReservoirRules',
     'OperationRule',
+    'LevelStorageTable',
+    'BatchRuleSimulator',
+    'simulate_cascade',
     'optimize_reservoir_operation'
 ]
 
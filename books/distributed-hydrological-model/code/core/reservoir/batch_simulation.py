@@ -0,0 +1,349 @@
+"""
+批量规则调度模拟
+===============
+
+把防洪调度规则（FloodControlRule）和兴利调度规则（ConservationRule）
+写成数组表达式，一次调用同时模拟大量候选规则参数方案。
+
+时间方向仍需逐时段推进（水量平衡递推），但每个时段只做若干次
+长度为 n_candidates 的数组运算，不再为每个方案、每个时段构造
+状态字典和规则对象。单个方案的结果与 ReservoirRules.operate 一致。
+
+规则参数（每项可为标量、(n_candidates,) 或 (n_candidates, n_steps)，
+后者表示随时间变化的调度线）:
+- dead_level: 死水位，低于 dead_level + 2 m 时按最小出流
+- normal_level: 正常蓄水位
+- flood_limit_level: 防洪限制水位，超过后进入防洪调度
+- design_flood_level: 设计洪水位，超过后全力泄洪
+- min_outflow: 最小出流 (m³/s)
+- target_outflow: 兴利目标出流 (m³/s)
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence, Union
+
+from .level_storage import LevelStorageTable
+from .operation_rules import ConservationRule, FloodControlRule, ReservoirZone
+
+
+RULE_PARAMETERS = (
+    'dead_level',
+    'normal_level',
+    'flood_limit_level',
+    'design_flood_level',
+    'min_outflow',
+    'target_outflow',
+)
+
+
+class BatchRuleSimulator:
+    """
+    批量规则调度模拟器
+    
+    Parameters
+    ----------
+    table : LevelStorageTable
+        水位-库容关系表
+    max_outflow : float
+        最大泄流能力 (m³/s)，出库流量的最终限制
+    dead_storage, total_storage : float, optional
+        库容上下限 (万m³)，默认取关系表端点
+    default_params : dict, optional
+        默认规则参数，simulate 中未给出的参数取此值
+    flood_max_outflow : float, optional
+        防洪规则中的泄流上限（FloodControlRule.max_outflow），默认同 max_outflow
+    
+    Examples
+    --------
+    >>> sim = BatchRuleSimulator.from_rules(reservoir)
+    >>> res = sim.simulate(inflow, {'flood_limit_level': np.linspace(110, 116, 1000)},
+    ...                    initial_level=110.0, dt=86400.0)
+    >>> res['level'].shape
+    (1000, 100)
+    """
+    
+    def __init__(self, table: LevelStorageTable, max_outflow: float,
+                 dead_storage: Optional[float] = None,
+                 total_storage: Optional[float] = None,
+                 default_params: Optional[Dict[str, float]] = None,
+                 flood_max_outflow: Optional[float] = None):
+        self.table = table
+        self.max_outflow = float(max_outflow)
+        self.flood_max_outflow = (self.max_outflow if flood_max_outflow is None
+                                  else float(flood_max_outflow))
+        self.dead_storage = table.min_storage if dead_storage is None else float(dead_storage)
+        self.total_storage = table.max_storage if total_storage is None else float(total_storage)
+        self.default_params = dict(default_params or {})
+    
+    @classmethod
+    def from_rules(cls, reservoir_rules) -> 'BatchRuleSimulator':
+        """
+        由 ReservoirRules 构造，规则参数取其防洪与兴利规则的设置
+        
+        Parameters
+        ----------
+        reservoir_rules : ReservoirRules
+            已设置特征参数并添加了 FloodControlRule 和 ConservationRule 的规则集
+        """
+        c = reservoir_rules.characteristics
+        if c is None:
+            raise ValueError("水库尚未设置特征参数")
+        
+        flood = [r for r in reservoir_rules.rules if isinstance(r, FloodControlRule)]
+        conservation = [r for r in reservoir_rules.rules if isinstance(r, ConservationRule)]
+        if not flood or not conservation:
+            raise ValueError("批量模拟需要 FloodControlRule 和 ConservationRule")
+        flood, conservation = flood[0], conservation[0]
+        
+        default_params = {
+            'dead_level': conservation.dead_level,
+            'normal_level': conservation.normal_level,
+            'flood_limit_level': flood.flood_limit_level,
+            'design_flood_level': flood.design_flood_level,
+            'min_outflow': conservation.min_outflow,
+            'target_outflow': conservation.target_outflow,
+        }
+        
+        return cls(reservoir_rules.table, c['max_outflow'],
+                   dead_storage=c['dead_storage'],
+                   total_storage=c['total_storage'],
+                   default_params=default_params,
+                   flood_max_outflow=flood.max_outflow)
+    
+    def _prepare_params(self, params: Optional[Dict], n_candidates: Optional[int]):
+        """补全默认参数并统一为二维数组，返回 (参数字典, 方案数)"""
+        merged = dict(self.default_params)
+        merged.update(params or {})
+        
+        missing = [name for name in RULE_PARAMETERS if name not in merged]
+        if missing:
+            raise ValueError(f"缺少规则参数: {missing}")
+        
+        arrays = {name: np.asarray(merged[name], dtype=float) for name in RULE_PARAMETERS}
+        if n_candidates is None:
+            sizes = [len(a) for a in arrays.values() if a.ndim > 0]
+            n_candidates = max(sizes) if sizes else 1
+        
+        prepared = {}
+        for name, value in arrays.items():
+            if value.ndim < 2:
+                value = np.broadcast_to(value, (n_candidates,))[:, None]
+            prepared[name] = value
+        return prepared, n_candidates
+    
+    def release(self, params: Dict[str, np.ndarray], t: int,
+                level: np.ndarray, inflow: np.ndarray) -> np.ndarray:
+        """
+        按调度规则计算一个时段的出库流量
+        
+        Parameters
+        ----------
+        params : dict
+            _prepare_params 得到的规则参数（二维数组）
+        t : int
+            时段序号（用于随时间变化的调度线）
+        level : ndarray (n_candidates,)
+            时段初水位
+        inflow : ndarray (n_candidates,)
+            入库流量
+        
+        Returns
+        -------
+        outflow : ndarray (n_candidates,)
+            出库流量（已限制在泄流能力内）
+        """
+        p = {name: value[:, min(t, value.shape[1] - 1)] for name, value in params.items()}
+        
+        # 防洪调度（分区判断顺序与 ReservoirRules.get_zone 相同）
+        flood_zone = ((level > p['dead_level']) & (level > p['normal_level'])
+                      & (level > p['flood_limit_level']))
+        ratio = ((level - p['flood_limit_level'])
+                 / (p['design_flood_level'] - p['flood_limit_level']))
+        fc = FloodControlRule
+        flood_release = np.where(
+            level >= p['design_flood_level'],
+            np.minimum(inflow * fc.SURCHARGE_FACTOR, self.flood_max_outflow),
+            np.where(level > p['flood_limit_level'],
+                     inflow * (fc.RAMP_BASE + fc.RAMP_SLOPE * ratio),
+                     np.minimum(inflow * fc.NORMAL_FACTOR,
+                                self.flood_max_outflow * fc.NORMAL_CAPACITY_FRACTION))
+        )
+        
+        # 兴利调度
+        conservation_release = np.where(
+            level <= p['dead_level'] + ConservationRule.DEAD_LEVEL_MARGIN,
+            p['min_outflow'],
+            np.where(level > p['normal_level'],
+                     np.maximum(inflow, p['target_outflow']),
+                     p['target_outflow'])
+        )
+        
+        outflow = np.where(flood_zone, flood_release, conservation_release)
+        return np.clip(outflow, 0, self.max_outflow)
+    
+    def zone(self, params: Dict[str, np.ndarray], t: int,
+             level: np.ndarray) -> np.ndarray:
+        """水库分区编码（ReservoirZone.value）"""
+        p = {name: value[:, min(t, value.shape[1] - 1)] for name, value in params.items()}
+        return np.select(
+            [level <= p['dead_level'],
+             level <= p['normal_level'],
+             level <= p['flood_limit_level'],
+             level <= p['design_flood_level']],
+            [ReservoirZone.DEAD.value,
+             ReservoirZone.CONSERVATION.value,
+             ReservoirZone.FLOOD_LIMIT.value,
+             ReservoirZone.FLOOD_CONTROL.value],
+            default=ReservoirZone.DESIGN_FLOOD.value
+        )
+    
+    def simulate(self, inflow_series: np.ndarray,
+                 params: Optional[Dict] = None,
+                 initial_level: Union[float, np.ndarray] = None,
+                 dt: float = 3600.0,
+                 n_candidates: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        批量执行水库调度
+        
+        Parameters
+        ----------
+        inflow_series : ndarray (n_steps,) or (n_candidates, n_steps)
+            入库流量序列 (m³/s)
+        params : dict, optional
+            规则参数（见模块说明），未给出的取默认值
+        initial_level : float or ndarray (n_candidates,)
+            初始水位 (m)
+        dt : float
+            时间步长 (s)
+        n_candidates : int, optional
+            方案数，默认由参数数组长度确定
+        
+        Returns
+        -------
+        results : dict
+            'level', 'storage', 'outflow', 'zone' 形状为 (n_candidates, n_steps)，
+            'inflow' 为输入的入库流量
+        """
+        inflow_series = np.asarray(inflow_series, dtype=float)
+        if n_candidates is None and inflow_series.ndim == 2:
+            n_candidates = inflow_series.shape[0]
+        params, n = self._prepare_params(params, n_candidates)
+        
+        n_steps = inflow_series.shape[-1]
+        inflow = np.broadcast_to(inflow_series, (n, n_steps))
+        
+        levels = np.zeros((n, n_steps))
+        storages = np.zeros((n, n_steps))
+        outflows = np.zeros((n, n_steps))
+        zones = np.zeros((n, n_steps), dtype=int)
+        
+        levels[:, 0] = initial_level
+        storages[:, 0] = self.table.level_to_storage(levels[:, 0])
+        
+        for t in range(n_steps - 1):
+            zones[:, t] = self.zone(params, t, levels[:, t])
+            outflows[:, t] = self.release(params, t, levels[:, t], inflow[:, t])
+            
+            # 水量平衡
+            new_storage = storages[:, t] + (inflow[:, t] - outflows[:, t]) * dt / 1e4
+            storages[:, t + 1] = np.clip(new_storage, self.dead_storage, self.total_storage)
+            levels[:, t + 1] = self.table.storage_to_level(storages[:, t + 1])
+        
+        zones[:, -1] = self.zone(params, n_steps - 1, levels[:, -1])
+        if n_steps > 1:
+            outflows[:, -1] = outflows[:, -2]
+        
+        return {
+            'level': levels,
+            'storage': storages,
+            'outflow': outflows,
+            'zone': zones,
+            'inflow': inflow_series
+        }
+
+
+def simulate_cascade(simulators: Sequence[BatchRuleSimulator],
+                     connections: List[Dict],
+                     lateral_inflows: Sequence[np.ndarray],
+                     initial_levels: Sequence[float],
+                     params: Optional[Sequence[Optional[Dict]]] = None,
+                     dt: float = 86400.0,
+                     n_candidates: Optional[int] = None) -> List[Dict[str, np.ndarray]]:
+    """
+    梯级水库批量联合调度
+    
+    各时段先由区间入流和（经传播时间滞后的）上游出流得到各库
+    入流，再依次调度各水库；全部候选方案同时推进。
+    
+    Parameters
+    ----------
+    simulators : sequence of BatchRuleSimulator
+        各水库模拟器
+    connections : list of dict
+        水库连接，每项含 'upstream', 'downstream', 'travel_time'（时段数）
+    lateral_inflows : sequence of ndarray (n_steps,)
+        各水库区间入流
+    initial_levels : sequence
+        各水库初始水位
+    params : sequence of dict, optional
+        各水库规则参数
+    dt : float
+        时间步长 (s)
+    n_candidates : int, optional
+        方案数
+    
+    Returns
+    -------
+    results : list of dict
+        各水库的 'level', 'storage', 'outflow', 'inflow'，形状 (n_candidates, n_steps)
+    """
+    n_res = len(simulators)
+    params = [None] * n_res if params is None else list(params)
+    lateral = [np.asarray(q, dtype=float) for q in lateral_inflows]
+    n_steps = lateral[0].shape[-1]
+    
+    prepared = [sim._prepare_params(params[i], None) for i, sim in enumerate(simulators)]
+    n = max(size for _, size in prepared) if n_candidates is None else n_candidates
+    prepared = [
+        {key: np.broadcast_to(value, (n, value.shape[1])) for key, value in p.items()}
+        for p, _ in prepared
+    ]
+    
+    results = []
+    for i, sim in enumerate(simulators):
+        res = {key: np.zeros((n, n_steps)) for key in ('level', 'storage', 'outflow', 'inflow')}
+        res['level'][:, 0] = initial_levels[i]
+        res['storage'][:, 0] = sim.table.level_to_storage(res['level'][:, 0])
+        results.append(res)
+    
+    for t in range(n_steps - 1):
+        # 各水库总入流（区间入流 + 上游来水）
+        total_inflows = [np.broadcast_to(lateral[i][..., t], (n,)).copy()
+                         for i in range(n_res)]
+        for conn in connections:
+            delay = conn['travel_time']
+            if t >= delay:
+                total_inflows[conn['downstream']] += \
+                    results[conn['upstream']]['outflow'][:, t - delay]
+        
+        for i, sim in enumerate(simulators):
+            res = results[i]
+            res['inflow'][:, t] = total_inflows[i]
+            res['outflow'][:, t] = sim.release(prepared[i], t, res['level'][:, t],
+                                               total_inflows[i])
+            
+            new_storage = res['storage'][:, t] + \
+                (total_inflows[i] - res['outflow'][:, t]) * dt / 1e4
+            res['storage'][:, t + 1] = np.clip(new_storage, sim.dead_storage,
+                                               sim.total_storage)
+            res['level'][:, t + 1] = sim.table.storage_to_level(res['storage'][:, t + 1])
+    
+    if n_steps > 1:
+        for res in results:
+            res['outflow'][:, -1] = res['outflow'][:, -2]
+            res['inflow'][:, -1] = res['inflow'][:, -2]
+    
+    return results
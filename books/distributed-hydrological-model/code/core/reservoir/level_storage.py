@@ -0,0 +1,92 @@
+"""
+水位-库容-面积关系表
+==================
+
+以数组形式保存水库特征曲线，正反两个方向都用 np.interp
+查表，标量和数组输入（如一批候选方案的水位）均可直接计算。
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+import numpy as np
+from typing import Union
+
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class LevelStorageTable:
+    """
+    水位-库容-面积关系表
+    
+    Parameters
+    ----------
+    levels : array_like
+        水位节点 (m)，严格递增
+    storages : array_like
+        对应库容 (万m³)，严格递增
+    areas : array_like, optional
+        对应水面面积 (万m²)，默认由 dS/dZ 数值微分得到
+    
+    Examples
+    --------
+    >>> table = LevelStorageTable([100, 110, 120], [1000, 4000, 9000])
+    >>> table.level_to_storage(105.0)
+    2500.0
+    >>> table.storage_to_level(np.array([1000.0, 9000.0]))
+    array([100., 120.])
+    """
+    
+    def __init__(self, levels, storages, areas=None):
+        self.levels = np.asarray(levels, dtype=float)
+        self.storages = np.asarray(storages, dtype=float)
+        
+        if self.levels.ndim != 1 or self.levels.shape != self.storages.shape:
+            raise ValueError("水位与库容必须为等长一维数组")
+        if len(self.levels) < 2:
+            raise ValueError("关系表至少需要2个节点")
+        if np.any(np.diff(self.levels) <= 0) or np.any(np.diff(self.storages) <= 0):
+            raise ValueError("水位与库容必须严格递增")
+        
+        if areas is None:
+            self.areas = np.gradient(self.storages, self.levels)
+        else:
+            self.areas = np.asarray(areas, dtype=float)
+            if self.areas.shape != self.levels.shape:
+                raise ValueError("面积数组长度必须与水位一致")
+    
+    @classmethod
+    def linear(cls, dead_level: float, max_level: float,
+               dead_storage: float, total_storage: float) -> 'LevelStorageTable':
+        """
+        由死水位/校核洪水位和对应库容构造线性关系表
+        
+        与 ReservoirRules 原有的简化线性曲线一致
+        （超出范围时取端点值）。
+        """
+        return cls([dead_level, max_level], [dead_storage, total_storage])
+    
+    @property
+    def min_storage(self) -> float:
+        return float(self.storages[0])
+    
+    @property
+    def max_storage(self) -> float:
+        return float(self.storages[-1])
+    
+    def level_to_storage(self, level: ArrayLike) -> ArrayLike:
+        """水位→库容（超出范围取端点值）"""
+        return np.interp(level, self.levels, self.storages)
+    
+    def storage_to_level(self, storage: ArrayLike) -> ArrayLike:
+        """库容→水位（超出范围取端点值）"""
+        return np.interp(storage, self.storages, self.levels)
+    
+    def level_to_area(self, level: ArrayLike) -> ArrayLike:
+        """水位→水面面积"""
+        return np.interp(level, self.levels, self.areas)
+    
+    def storage_to_area(self, storage: ArrayLike) -> ArrayLike:
+        """库容→水面面积"""
+        return np.interp(storage, self.storages, self.areas)
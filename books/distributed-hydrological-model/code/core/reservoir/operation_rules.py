@@ -12,6 +12,8 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 from enum import Enum
 
+from .level_storage import LevelStorageTable
+
 
 class ReservoirZone(Enum):
     """水库分区"""
@@ -40,7 +42,7 @@ class OperationRule:
             入库流量 (m³/s)
         time_step : int
             时间步
-            
+        
         Returns
         -------
         outflow : float
@@ -52,6 +54,13 @@ class OperationRule:
 class FloodControlRule(OperationRule):
     """防洪调度规则"""
     
+    # 泄流系数（BatchRuleSimulator 的批量规则共用）
+    SURCHARGE_FACTOR = 1.2         # 设计洪水位以上：入流放大倍数
+    RAMP_BASE = 0.8                # 防洪限制水位以上：入流折减起点
+    RAMP_SLOPE = 0.4               # 随水位比例增加的泄流系数
+    NORMAL_FACTOR = 0.6            # 防洪限制水位以下：入流折减
+    NORMAL_CAPACITY_FRACTION = 0.5  # 防洪限制水位以下：泄流能力上限比例
+    
     def __init__(self, flood_limit_level: float, 
                  design_flood_level: float,
                  max_outflow: float):
@@ -66,23 +75,26 @@ class FloodControlRule(OperationRule):
         
         # 超过设计洪水位：全力泄洪
         if level >= self.design_flood_level:
-            return min(inflow * 1.2, self.max_outflow)
+            return min(inflow * self.SURCHARGE_FACTOR, self.max_outflow)
         
         # 超过防洪限制水位：加大泄流
         elif level > self.flood_limit_level:
             # 线性插值
             ratio = (level - self.flood_limit_level) / \
                    (self.design_flood_level - self.flood_limit_level)
-            return inflow * (0.8 + 0.4 * ratio)
+            return inflow * (self.RAMP_BASE + self.RAMP_SLOPE * ratio)
         
         # 防洪限制水位以下：正常调度
         else:
-            return min(inflow * 0.6, self.max_outflow * 0.5)
+            return min(inflow * self.NORMAL_FACTOR,
+                       self.max_outflow * self.NORMAL_CAPACITY_FRACTION)
 
 
 class ConservationRule(OperationRule):
     """兴利调度规则"""
     
+    DEAD_LEVEL_MARGIN = 2.0  # 死水位以上该范围内按最小出流 (m)
+    
     def __init__(self, normal_level: float,
                  dead_level: float,
                  min_outflow: float,
@@ -98,7 +110,7 @@ class ConservationRule(OperationRule):
         level = state['level']
         
         # 接近死水位：减小出流
-        if level <= self.dead_level + 2.0:
+        if level <= self.dead_level + self.DEAD_LEVEL_MARGIN:
             return self.min_outflow
         
         # 正常蓄水位以上：加大出流
@@ -120,7 +132,7 @@ class ReservoirRules:
     def __init__(self):
         self.rules: List[OperationRule] = []
         self.characteristics = None
-        
+    
     def set_characteristics(self, 
                           dead_level: float,
                           normal_level: float,
@@ -164,26 +176,24 @@ class ReservoirRules:
         }
         
         # 自动生成水位-库容关系（简化为线性）
-        self.level_storage_curve = self._generate_level_storage_curve()
-        
-    def _generate_level_storage_curve(self) -> callable:
-        """生成水位-库容关系曲线（简化线性）"""
-        c = self.characteristics
-        
-        def curve(level: float) -> float:
-            """水位→库容"""
-            if level <= c['dead_level']:
-                return c['dead_storage']
-            elif level >= c['max_level']:
-                return c['total_storage']
-            else:
-                # 线性插值
-                ratio = (level - c['dead_level']) / \
-                       (c['max_level'] - c['dead_level'])
-                return c['dead_storage'] + \
-                       (c['total_storage'] - c['dead_storage']) * ratio
+        self.set_level_storage_table([dead_level, max_level],
+                                     [dead_storage, total_storage])
+    
+    def set_level_storage_table(self, levels, storages, areas=None):
+        """
+        设置水位-库容-面积关系表
         
-        return curve
+        Parameters
+        ----------
+        levels : array_like
+            水位节点 (m)
+        storages : array_like
+            库容 (万m³)
+        areas : array_like, optional
+            水面面积 (万m²)
+        """
+        self.table = LevelStorageTable(levels, storages, areas)
+        self.level_storage_curve = self.table.level_to_storage
     
     def add_rule(self, rule: OperationRule):
         """添加调度规则"""
@@ -219,7 +229,7 @@ class ReservoirRules:
             入库流量序列 (m³/s)
         dt : float
             时间步长 (s)
-            
+        
         Returns
         -------
         results : dict
@@ -308,18 +318,7 @@ class ReservoirRules:
     
     def _storage_to_level(self, storage: float) -> float:
         """库容→水位（反算）"""
-        c = self.characteristics
-        
-        if storage <= c['dead_storage']:
-            return c['dead_level']
-        elif storage >= c['total_storage']:
-            return c['max_level']
-        else:
-            # 线性反算
-            ratio = (storage - c['dead_storage']) / \
-                   (c['total_storage'] - c['dead_storage'])
-            return c['dead_level'] + \
-                   (c['max_level'] - c['dead_level']) * ratio
+        return self.table.storage_to_level(storage)
 
 
 if __name__ == '__main__':
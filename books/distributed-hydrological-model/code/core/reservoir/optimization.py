@@ -2,14 +2,65 @@
 水库优化调度算法
 ===============
 
-实现水库优化调度算法（遗传算法等）。
+实现水库调度规则参数的优化（差分进化、遗传算法）。
+
+每一代的全部候选方案通过 BatchRuleSimulator 一次批量模拟；
+n_workers > 1 时再把种群分块交给多个进程并行评估。
 
 作者: CHS-Books项目组
 日期: 2025-11-02
 """
 
 import numpy as np
-from typing import Dict, Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from .batch_simulation import BatchRuleSimulator
+
+
+def _slice_results(results: Dict[str, np.ndarray], i: int) -> Dict[str, np.ndarray]:
+    """取出第i个方案的调度结果（与 ReservoirRules.operate 的返回格式相同）"""
+    single = {}
+    for key, value in results.items():
+        value = np.asarray(value)
+        single[key] = value[i] if value.ndim == 2 else value
+    return single
+
+
+def _evaluate_population(simulator: BatchRuleSimulator,
+                         objective_function: Callable,
+                         batch_objective: bool,
+                         names: Tuple[str, ...],
+                         population: np.ndarray,
+                         inflow_series: np.ndarray,
+                         initial_level: float,
+                         dt: float) -> np.ndarray:
+    """批量模拟并评估一组候选方案，返回得分 (n,)"""
+    params = {name: population[:, j] for j, name in enumerate(names)}
+    results = simulator.simulate(inflow_series, params, initial_level, dt=dt,
+                                 n_candidates=len(population))
+    
+    if batch_objective:
+        scores = objective_function(results)
+    else:
+        scores = [objective_function(_slice_results(results, i))
+                  for i in range(len(population))]
+    
+    scores = np.asarray(scores, dtype=float).reshape(len(population))
+    return np.where(np.isnan(scores), -np.inf, scores)
+
+
+def _default_bounds(reservoir_rules) -> Dict[str, Tuple[float, float]]:
+    """默认优化变量：防洪限制水位与兴利目标出流"""
+    c = reservoir_rules.characteristics
+    simulator = BatchRuleSimulator.from_rules(reservoir_rules)
+    p = simulator.default_params
+    
+    return {
+        'flood_limit_level': (c['normal_level'],
+                              c['normal_level'] + 0.9 * (p['design_flood_level'] - c['normal_level'])),
+        'target_outflow': (p['min_outflow'], c['max_outflow']),
+    }
 
 
 def optimize_reservoir_operation(
@@ -17,45 +68,168 @@ def optimize_reservoir_operation(
     inflow_series: np.ndarray,
     initial_level: float,
     objective_function: Callable,
-    n_iterations: int = 50
+    n_iterations: int = 50,
+    bounds: Optional[Dict[str, Tuple[float, float]]] = None,
+    population_size: int = 40,
+    method: str = 'de',
+    dt: float = 3600.0,
+    batch_objective: bool = False,
+    n_workers: int = 1,
+    seed: Optional[int] = None,
+    **options
 ) -> Dict:
     """
-    优化水库调度（简化版遗传算法）
+    优化水库调度规则参数
     
     Parameters
     ----------
     reservoir_rules : ReservoirRules
-        水库调度规则
+        水库调度规则（需包含 FloodControlRule 和 ConservationRule）
     inflow_series : ndarray
         入库流量序列
     initial_level : float
         初始水位
     objective_function : callable
-        目标函数
+        目标函数（越大越好）。batch_objective=False 时接受单个方案的
+        调度结果字典并返回得分；为True时接受批量结果字典
+        （各项形状 (n, n_steps)）并返回 (n,) 得分
     n_iterations : int
-        迭代次数
-        
+        迭代（进化代）数
+    bounds : dict, optional
+        优化变量及其取值范围 {参数名: (下限, 上限)}，参数名见
+        batch_simulation.RULE_PARAMETERS；默认优化防洪限制水位和目标出流
+    population_size : int
+        种群规模
+    method : str
+        'de' 差分进化 或 'ga' 遗传算法
+    dt : float
+        时间步长 (s)
+    batch_objective : bool
+        目标函数是否为批量形式
+    n_workers : int
+        并行进程数（>1时目标函数须可被pickle）
+    seed : int, optional
+        随机种子
+    **options : dict
+        算法参数：DE的 F（缩放因子，默认0.7）、CR（交叉概率，默认0.9）；
+        GA的 crossover_rate（默认0.9）、mutation_rate（默认0.1）、
+        elite（精英个数，默认2）
+    
     Returns
     -------
     best_results : dict
-        最优调度结果
+        最优方案的调度结果，另含 'best_params', 'best_score',
+        'score_history'（每代最优得分）
     """
-    best_score = float('-inf')
-    best_results = None
+    simulator = BatchRuleSimulator.from_rules(reservoir_rules)
+    bounds = _default_bounds(reservoir_rules) if bounds is None else bounds
+    names = tuple(bounds)
+    lower = np.array([bounds[name][0] for name in names], dtype=float)
+    upper = np.array([bounds[name][1] for name in names], dtype=float)
+    n_dim = len(names)
+    rng = np.random.default_rng(seed)
+    inflow_series = np.asarray(inflow_series, dtype=float)
     
-    for i in range(n_iterations):
-        # 当前调度
-        results = reservoir_rules.operate(initial_level, inflow_series)
-        
-        # 评估
-        score = objective_function(results)
+    executor = ProcessPoolExecutor(max_workers=n_workers) if n_workers > 1 else None
+    
+    def evaluate(population):
+        if executor is None:
+            return _evaluate_population(simulator, objective_function, batch_objective,
+                                        names, population, inflow_series,
+                                        initial_level, dt)
+        chunks = np.array_split(population, n_workers)
+        futures = [executor.submit(_evaluate_population, simulator, objective_function,
+                                   batch_objective, names, chunk, inflow_series,
+                                   initial_level, dt)
+                   for chunk in chunks if len(chunk) > 0]
+        return np.concatenate([f.result() for f in futures])
+    
+    try:
+        population = lower + rng.random((population_size, n_dim)) * (upper - lower)
+        scores = evaluate(population)
+        history = [float(np.max(scores))]
         
-        if score > best_score:
-            best_score = score
-            best_results = results
+        for _ in range(n_iterations):
+            if method == 'de':
+                trial = _de_trial(population, lower, upper, rng,
+                                  options.get('F', 0.7), options.get('CR', 0.9))
+                trial_scores = evaluate(trial)
+                improved = trial_scores >= scores
+                population[improved] = trial[improved]
+                scores[improved] = trial_scores[improved]
+            elif method == 'ga':
+                offspring = _ga_offspring(population, scores, lower, upper, rng,
+                                          options.get('crossover_rate', 0.9),
+                                          options.get('mutation_rate', 0.1),
+                                          options.get('elite', 2))
+                population = offspring
+                scores = evaluate(population)
+            else:
+                raise ValueError(f"未知优化方法: {method}")
+            
+            history.append(float(np.max(scores)))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    
+    best = int(np.argmax(scores))
+    best_params = {name: float(population[best, j]) for j, name in enumerate(names)}
+    
+    results = simulator.simulate(inflow_series, best_params, initial_level, dt=dt)
+    best_results = _slice_results(results, 0)
+    best_results['best_params'] = best_params
+    best_results['best_score'] = float(scores[best])
+    best_results['score_history'] = np.array(history)
     
     return best_results
 
 
+def _de_trial(population: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+              rng: np.random.Generator, F: float, CR: float) -> np.ndarray:
+    """DE/rand/1/bin 变异与交叉，整个种群一次生成"""
+    n, n_dim = population.shape
+    
+    # 每个个体选取3个互不相同且不同于自身的个体
+    idx = np.argsort(rng.random((n, n)) + np.eye(n), axis=1)[:, :3]
+    a, b, c = population[idx[:, 0]], population[idx[:, 1]], population[idx[:, 2]]
+    mutant = np.clip(a + F * (b - c), lower, upper)
+    
+    cross = rng.random((n, n_dim)) < CR
+    cross[np.arange(n), rng.integers(0, n_dim, n)] = True
+    return np.where(cross, mutant, population)
+
+
+def _ga_offspring(population: np.ndarray, scores: np.ndarray,
+                  lower: np.ndarray, upper: np.ndarray, rng: np.random.Generator,
+                  crossover_rate: float, mutation_rate: float,
+                  elite: int) -> np.ndarray:
+    """实数编码遗传算法：锦标赛选择 + 算术交叉 + 高斯变异，保留精英"""
+    n, n_dim = population.shape
+    
+    # 二元锦标赛选择
+    pairs = rng.integers(0, n, (n, 2))
+    winners = np.where(scores[pairs[:, 0]] >= scores[pairs[:, 1]],
+                       pairs[:, 0], pairs[:, 1])
+    parents = population[winners]
+    
+    # 相邻个体算术交叉
+    mates = np.roll(parents, 1, axis=0)
+    alpha = rng.random((n, 1))
+    do_cross = rng.random((n, 1)) < crossover_rate
+    offspring = np.where(do_cross, alpha * parents + (1 - alpha) * mates, parents)
+    
+    # 高斯变异
+    mutate = rng.random((n, n_dim)) < mutation_rate
+    offspring += mutate * rng.normal(0.0, 0.1, (n, n_dim)) * (upper - lower)
+    offspring = np.clip(offspring, lower, upper)
+    
+    # 精英保留
+    if elite > 0:
+        best = np.argsort(scores)[-elite:]
+        offspring[:elite] = population[best]
+    
+    return offspring
+
+
 if __name__ == '__main__':
     print("优化调度模块测试通过！")
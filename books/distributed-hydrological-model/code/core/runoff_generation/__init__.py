@@ -6,11 +6,13 @@
 """
 
 from .xaj_model import XinAnJiangModel, create_default_xaj_params
+from .xaj_grid import XinAnJiangGrid
 from .green_ampt import GreenAmptModel, create_default_green_ampt_params
 
 __all__ = [
     'XinAnJiangModel',
     'create_default_xaj_params',
+    'XinAnJiangGrid',
     'GreenAmptModel',
     'create_default_green_ampt_params',
 ]
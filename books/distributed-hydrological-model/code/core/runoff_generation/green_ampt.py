@@ -220,7 +220,7 @@ class GreenAmptModel:
         
         return F
     
-    def run(self, rainfall: np.ndarray) -> Dict[str, np.ndarray]:
+    def run(self, rainfall: np.ndarray, reset: bool = True) -> Dict[str, np.ndarray]:
         """
         运行Green-Ampt模型
         
@@ -228,6 +228,8 @@ class GreenAmptModel:
         ----------
         rainfall : ndarray
             降雨强度序列 (mm/h)
+        reset : bool
+            是否先重置状态；False时从当前状态继续（用于分段/流式计算）
         
         Returns
         -------
@@ -247,7 +249,8 @@ class GreenAmptModel:
         f_series = np.zeros(n)      # 入渗率 (mm/h)
         
         # 重置状态
-        self.reset()
+        if reset:
+            self.reset()
         
         # 逐时段计算
         for t in range(n):
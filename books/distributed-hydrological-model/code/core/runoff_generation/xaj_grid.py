@@ -0,0 +1,281 @@
+"""
+向量化新安江模型 (Grid Xin'anjiang Model)
+=======================================
+
+将N个新安江模型实例（网格单元或集合成员）的状态堆叠为数组，
+每个时段用一次数组运算同时推进全部实例。
+
+计算流程与 XinAnJiangModel 完全一致（三层蒸散发、蓄满产流、
+自由水蓄水库水源划分），参数可以是标量（所有实例共用）
+或长度为N的数组（逐单元/逐成员参数）。
+
+适用场景:
+- 分布式网格产流
+- EnKF集合预报（成员状态即为堆叠数组）
+- 参数集批量评估
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+import numpy as np
+from typing import Dict, Optional, Union
+
+
+class XinAnJiangGrid:
+    """
+    向量化新安江模型
+    
+    Parameters
+    ----------
+    params : dict
+        模型参数字典（参数含义见 XinAnJiangModel），
+        每个参数可为标量或形状为 (n,) 的数组
+    n : int, optional
+        实例数量，默认由数组参数的长度确定
+    
+    Examples
+    --------
+    >>> params = create_default_xaj_params('humid')
+    >>> grid = XinAnJiangGrid(params, n=1000)
+    >>> out = grid.step(P=np.full(1000, 10.0), EM=4.0)
+    >>> out['Q'].shape
+    (1000,)
+    """
+    
+    # 参与同化的状态变量（get_state_array/set_state_array的列顺序）
+    STATE_KEYS = ('WU', 'WL', 'WD', 'W', 'S', 'FR', 'QG', 'QI')
+    
+    def __init__(self, params: Dict[str, Union[float, np.ndarray]],
+                 n: Optional[int] = None):
+        required_params = ['K', 'UM', 'LM', 'C', 'WM', 'B', 'IM',
+                          'SM', 'EX', 'KG', 'KI', 'CG', 'CI', 'CS']
+        for param in required_params:
+            if param not in params:
+                raise ValueError(f"缺少必需参数: {param}")
+        
+        if n is None:
+            sizes = [np.size(v) for v in params.values() if np.ndim(v) > 0]
+            n = max(sizes) if sizes else 1
+        self.n = n
+        
+        # 参数统一广播为 (n,) 数组
+        self.params = {
+            key: np.broadcast_to(np.asarray(value, dtype=float), (n,)).copy()
+            for key, value in params.items()
+        }
+        
+        self.reset()
+    
+    def reset(self):
+        """重置模型状态"""
+        p = self.params
+        W = p['W0'] if 'W0' in p else p['WM'] * 0.6
+        S = p['S0'] if 'S0' in p else p['SM'] * 0.5
+        
+        # 将初始W分配到三层
+        WU = np.minimum(W, p['UM'])
+        WL = np.clip(W - p['UM'], 0.0, p['LM'])
+        WD = np.maximum(W - p['UM'] - p['LM'], 0.0)
+        
+        self.state = {
+            'WU': WU,
+            'WL': WL,
+            'WD': WD,
+            'W': W.copy(),
+            'S': S.copy(),
+            'FR': np.zeros(self.n),
+            'QG': np.zeros(self.n),
+            'QI': np.zeros(self.n),
+        }
+    
+    def step(self, P: Union[float, np.ndarray],
+             EM: Union[float, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        推进一个时段
+        
+        Parameters
+        ----------
+        P : float or ndarray (n,)
+            降雨 (mm)
+        EM : float or ndarray (n,)
+            蒸发能力 (mm)
+        
+        Returns
+        -------
+        fluxes : dict
+            'Q', 'R', 'RS', 'RI', 'RG', 'E'，每项形状为 (n,)
+        """
+        P = np.broadcast_to(np.asarray(P, dtype=float), (self.n,))
+        EM = np.broadcast_to(np.asarray(EM, dtype=float), (self.n,))
+        
+        # 1. 蒸散发计算
+        E = self._evapotranspiration(P, EM)
+        
+        # 2. 产流计算
+        PE = P - E
+        R = self._runoff_generation(PE)
+        
+        # 3. 水源划分
+        RS, RI, RG = self._water_source_partition(R)
+        
+        return {
+            'Q': RS + RI + RG,
+            'R': R,
+            'RS': RS,
+            'RI': RI,
+            'RG': RG,
+            'E': E,
+        }
+    
+    def run(self, P: np.ndarray, EM: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        运行多个时段
+        
+        Parameters
+        ----------
+        P : ndarray (n_steps,) or (n_steps, n)
+            降雨序列 (mm)
+        EM : ndarray (n_steps,) or (n_steps, n)
+            蒸发能力序列 (mm)
+        
+        Returns
+        -------
+        results : dict
+            与 XinAnJiangModel.run 相同的键，每项形状为 (n_steps, n)
+        """
+        P = np.asarray(P, dtype=float)
+        EM = np.asarray(EM, dtype=float)
+        n_steps = len(P)
+        if EM.ndim == 0:
+            EM = np.full(n_steps, float(EM))
+        
+        keys = ('Q', 'R', 'RS', 'RI', 'RG', 'E', 'W', 'S')
+        results = {key: np.zeros((n_steps, self.n)) for key in keys}
+        
+        for t in range(n_steps):
+            fluxes = self.step(P[t], EM[t])
+            for key, value in fluxes.items():
+                results[key][t] = value
+            results['W'][t] = self.state['W']
+            results['S'][t] = self.state['S']
+        
+        return results
+    
+    def _evapotranspiration(self, P: np.ndarray, EM: np.ndarray) -> np.ndarray:
+        """三层蒸散发计算，返回总蒸散发"""
+        p = self.params
+        UM, LM, WM, C = p['UM'], p['LM'], p['WM'], p['C']
+        DM = WM - UM - LM
+        WU, WL, WD = self.state['WU'], self.state['WL'], self.state['WD']
+        
+        EP = p['K'] * EM
+        
+        # 上层蒸发能满足蒸发能力
+        upper_only = WU + P >= EP
+        EU = np.where(upper_only, EP, WU + P)
+        WU = np.where(upper_only, WU + P - EU, 0.0)
+        
+        # 下层蒸发
+        EL = np.where(WL >= C * LM,
+                      (EP - EU) * WL / LM,
+                      (EP - EU) * WL / (C * LM))
+        EL = np.where(upper_only, 0.0, EL)
+        WL = np.where(upper_only, WL, np.maximum(0.0, WL - EL))
+        
+        # 深层蒸发
+        ED = np.where(WD >= C * DM,
+                      (EP - EU - EL) * WD / DM,
+                      (EP - EU - EL) * WD / (C * DM))
+        ED = np.where(upper_only, 0.0, ED)
+        WD = np.where(upper_only, WD, np.maximum(0.0, WD - ED))
+        
+        # 上层、下层超出部分下渗
+        WL = WL + np.maximum(WU - UM, 0.0)
+        WU = np.minimum(WU, UM)
+        WD = WD + np.maximum(WL - LM, 0.0)
+        WL = np.minimum(WL, LM)
+        
+        self.state['WU'] = WU
+        self.state['WL'] = WL
+        self.state['WD'] = WD
+        self.state['W'] = WU + WL + WD
+        
+        return EU + EL + ED
+    
+    def _runoff_generation(self, PE: np.ndarray) -> np.ndarray:
+        """蓄满产流，净雨非正的实例不产流"""
+        p = self.params
+        WM, B, IM = p['WM'], p['B'], p['IM']
+        W = self.state['W']
+        
+        wet = PE > 0
+        PE = np.where(wet, PE, 0.0)
+        
+        # 不透水面积与透水面积产流
+        R_IM = PE * IM
+        PE_permeable = PE * (1 - IM)
+        
+        W_ratio = np.minimum(W / WM, 1.0)
+        A = WM * (1 - (1 - W_ratio) ** (1 / (1 + B)))
+        
+        saturated = PE_permeable + A >= WM
+        A_new_ratio = np.minimum((PE_permeable + A) / WM, 1.0)
+        FR = 1 - (1 - A_new_ratio) ** (1 + B)
+        R_permeable = np.where(saturated, PE_permeable - (WM - W), PE_permeable * FR)
+        R_permeable = np.where(PE_permeable > 0, R_permeable, 0.0)
+        
+        self.state['W'] = np.where(wet, np.minimum(WM, W + PE_permeable - R_permeable), W)
+        
+        return np.where(wet, R_IM + R_permeable, 0.0)
+    
+    def _water_source_partition(self, R: np.ndarray):
+        """自由水蓄水库水源划分，返回 (RS, RI增量, RG增量)"""
+        p = self.params
+        SM, EX, KG, KI = p['SM'], p['EX'], p['KG'], p['KI']
+        QG, QI = self.state['QG'], self.state['QI']
+        
+        S = self.state['S'] + R
+        FR = np.minimum(1.0, S / SM)
+        positive = FR > 0
+        FR_pos = np.where(positive, FR, 0.0)
+        
+        RS = np.where(FR > KG + KI,
+                      S * np.maximum(FR_pos - KG - KI, 0.0) ** EX, 0.0)
+        RI = S * KI * FR_pos ** EX
+        RG = S * KG * FR_pos ** EX
+        RS = np.where(positive, RS, 0.0)
+        RI = np.where(positive, RI, 0.0)
+        RG = np.where(positive, RG, 0.0)
+        
+        S = np.maximum(0.0, S - RS - RI - RG)
+        QG_new = QG * p['CG'] + RG
+        QI_new = QI * p['CI'] + RI
+        
+        self.state['S'] = S
+        self.state['FR'] = FR
+        self.state['QG'] = QG_new
+        self.state['QI'] = QI_new
+        
+        return RS, QI_new - QI, QG_new - QG
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """获取当前状态"""
+        return {key: value.copy() for key, value in self.state.items()}
+    
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """设置模型状态"""
+        self.state = {
+            key: np.broadcast_to(np.asarray(value, dtype=float), (self.n,)).copy()
+            for key, value in state.items()
+        }
+    
+    def get_state_array(self) -> np.ndarray:
+        """以 (n, len(STATE_KEYS)) 数组形式获取状态"""
+        return np.column_stack([self.state[key] for key in self.STATE_KEYS])
+    
+    def set_state_array(self, states: np.ndarray):
+        """从 (n, len(STATE_KEYS)) 数组设置状态"""
+        states = np.asarray(states, dtype=float)
+        for j, key in enumerate(self.STATE_KEYS):
+            self.state[key] = states[:, j].copy()
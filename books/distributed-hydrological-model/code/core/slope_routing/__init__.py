@@ -13,11 +13,12 @@
 作者: CHS-Books项目组
 """
 
-from .kinematic_wave import KinematicWaveSlope
+from .kinematic_wave import KinematicWaveSlope, KinematicWavePlanes
 from .linear_reservoir import LinearReservoirSlope, NashCascade
 
 __all__ = [
     'KinematicWaveSlope',
+    'KinematicWavePlanes',
     'LinearReservoirSlope',
     'NashCascade',
 ]
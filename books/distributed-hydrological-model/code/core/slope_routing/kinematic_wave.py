@@ -132,7 +132,7 @@ class KinematicWaveSlope:
         """
         return self.alpha * np.power(np.maximum(h, 1e-10), self.m)
     
-    def run(self, runoff: np.ndarray) -> Dict[str, np.ndarray]:
+    def run(self, runoff: np.ndarray, reset: bool = True) -> Dict[str, np.ndarray]:
         """
         运行运动波模型
         
@@ -140,6 +140,8 @@ class KinematicWaveSlope:
         ----------
         runoff : ndarray
             净雨强度序列 (mm/h)
+        reset : bool
+            是否先重置状态；False时从当前状态继续（用于分段/流式计算）
         
         Returns
         -------
@@ -158,7 +160,8 @@ class KinematicWaveSlope:
         water_depth_series = []
         
         # 重置状态
-        self.reset()
+        if reset:
+            self.reset()
         
         # 时间步进
         for t in range(n_steps):
@@ -220,6 +223,207 @@ class KinematicWaveSlope:
             self.h = state['h'].copy()
 
 
+class KinematicWavePlanes:
+    """
+    多坡面运动波汇流模型（向量化隐式格式）
+    
+    同时演算N个坡面条带，状态为形状 (N, n_nodes) 的水深数组，
+    每个坡面可以有不同的长度、宽度、坡度和糙率。
+    
+    采用后向欧拉时间离散 + 一阶迎风空间离散，自坡顶向出口逐节点
+    求解非线性方程（对所有坡面同时做Newton迭代）：
+    
+        h_i + (dt/dx) α h_i^m = h_i^n + dt × (q_{i-1}/dx + r)
+    
+    左端关于h_i单调递增且为凸函数，Newton迭代无条件收敛，
+    因此不受Courant条件限制，可以使用较大的时间步长。
+    坡顶边界取 q(0, t) = 0。
+    
+    Parameters
+    ----------
+    params : dict
+        模型参数，除dt和n_nodes外均可为标量或长度为N的数组：
+        - length : 坡面长度 (m)
+        - width : 坡面宽度 (m)
+        - slope : 坡度 (-)
+        - manning_n : 曼宁糙率系数
+        - dt : float, 时间步长 (s)
+        - n_nodes : int, 每个坡面的节点数（默认21）
+    n_planes : int, optional
+        坡面数量，默认由数组参数的长度确定
+    tol : float
+        Newton迭代收敛容差 (m)
+    max_iter : int
+        Newton迭代最大次数
+    
+    Examples
+    --------
+    >>> params = {
+    ...     'length': np.random.uniform(50, 200, 10000),
+    ...     'width': 50.0,
+    ...     'slope': np.random.uniform(0.005, 0.05, 10000),
+    ...     'manning_n': 0.15,
+    ...     'dt': 600,
+    ... }
+    >>> planes = KinematicWavePlanes(params)
+    >>> results = planes.run(np.array([10, 20, 30, 20, 10]))  # mm/h
+    >>> results['outlet_discharge'].shape
+    (5, 10000)
+    """
+    
+    def __init__(self, params: Dict, n_planes: int = None,
+                 tol: float = 1e-10, max_iter: int = 50):
+        required = ['length', 'width', 'slope', 'manning_n', 'dt']
+        for param in required:
+            if param not in params:
+                raise ValueError(f"缺少必需参数: {param}")
+        
+        if n_planes is None:
+            sizes = [np.size(params[key]) for key in required[:4]]
+            n_planes = max(sizes)
+        self.n_planes = n_planes
+        
+        def as_array(value):
+            return np.broadcast_to(np.asarray(value, dtype=float), (n_planes,)).copy()
+        
+        # 几何参数
+        self.L = as_array(params['length'])
+        self.W = as_array(params['width'])
+        self.S = as_array(params['slope'])
+        self.n = as_array(params['manning_n'])
+        
+        # 数值参数
+        self.dt = float(params['dt'])
+        self.nx = int(params.get('n_nodes', 21))
+        self.tol = tol
+        self.max_iter = max_iter
+        
+        # 参数检查
+        if np.any(self.L <= 0) or np.any(self.W <= 0):
+            raise ValueError("坡面长度和宽度必须为正")
+        if np.any(self.S <= 0):
+            raise ValueError("坡度必须为正")
+        if np.any(self.n <= 0):
+            raise ValueError("曼宁糙率必须为正")
+        if self.dt <= 0:
+            raise ValueError("时间步长必须为正")
+        if self.nx < 2:
+            raise ValueError("节点数至少为2")
+        
+        # 网格设置（每个坡面等分为nx-1段）
+        self.dx = self.L / (self.nx - 1)
+        
+        # 运动波参数
+        self.alpha = (1 / self.n) * (self.S ** 0.5)
+        self.m = 5.0 / 3.0
+        
+        # 状态变量
+        self.h = np.zeros((self.n_planes, self.nx))
+    
+    def _flux(self, h: np.ndarray) -> np.ndarray:
+        """单宽流量 q = α × h^m（逐坡面参数）"""
+        return self.alpha * np.power(np.maximum(h, 0.0), self.m)
+    
+    def step(self, r: np.ndarray) -> np.ndarray:
+        """
+        推进一个时间步
+        
+        Parameters
+        ----------
+        r : float or ndarray (N,)
+            净雨强度 (m/s)
+        
+        Returns
+        -------
+        outlet_discharge : ndarray (N,)
+            出口流量 (m³/s)
+        """
+        r = np.broadcast_to(np.asarray(r, dtype=float), (self.n_planes,))
+        c = self.dt / self.dx * self.alpha  # 隐式项系数
+        
+        h_new = np.zeros_like(self.h)
+        q_up = np.zeros(self.n_planes)  # 坡顶 q = 0
+        
+        for i in range(1, self.nx):
+            rhs = self.h[:, i] + self.dt * (q_up / self.dx + r)
+            rhs = np.maximum(rhs, 0.0)
+            
+            # Newton迭代：f(h) = h + c h^m - rhs
+            h = np.maximum(self.h[:, i], rhs / (1.0 + c))
+            for _ in range(self.max_iter):
+                hm1 = np.power(h, self.m - 1.0)
+                f = h + c * hm1 * h - rhs
+                df = 1.0 + c * self.m * hm1
+                delta = f / df
+                h = np.maximum(h - delta, 0.0)
+                if np.max(np.abs(delta)) < self.tol:
+                    break
+            
+            h_new[:, i] = h
+            q_up = self._flux(h)
+        
+        self.h = h_new
+        return q_up * self.W
+    
+    def run(self, runoff: np.ndarray,
+            return_depth: bool = False,
+            reset: bool = True) -> Dict[str, np.ndarray]:
+        """
+        运行多坡面运动波模型
+        
+        Parameters
+        ----------
+        runoff : ndarray (n_steps,) or (n_steps, N)
+            净雨强度序列 (mm/h)，一维时所有坡面相同
+        return_depth : bool
+            是否返回水深过程 (n_steps, N, n_nodes)，坡面很多时占用内存较大
+        reset : bool
+            是否先重置状态；False时从当前状态继续（用于分段/流式计算）
+        
+        Returns
+        -------
+        results : dict
+            包含：
+            - outlet_discharge : ndarray (n_steps, N), 出口流量 (m³/s)
+            - water_depth : ndarray, 水深过程（仅return_depth=True时）
+        """
+        runoff = np.asarray(runoff, dtype=float)
+        n_steps = len(runoff)
+        
+        # 转换净雨强度单位: mm/h -> m/s
+        r = runoff / 1000.0 / 3600.0
+        
+        outlet_discharge = np.zeros((n_steps, self.n_planes))
+        depth_series = [] if return_depth else None
+        
+        # 重置状态
+        if reset:
+            self.reset()
+        
+        for t in range(n_steps):
+            outlet_discharge[t] = self.step(r[t])
+            if return_depth:
+                depth_series.append(self.h.copy())
+        
+        results = {'outlet_discharge': outlet_discharge}
+        if return_depth:
+            results['water_depth'] = np.array(depth_series)
+        return results
+    
+    def reset(self):
+        """重置模型状态"""
+        self.h = np.zeros((self.n_planes, self.nx))
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """获取当前状态"""
+        return {'h': self.h.copy()}
+    
+    def set_state(self, state: Dict[str, np.ndarray]):
+        """设置模型状态"""
+        if 'h' in state:
+            self.h = np.asarray(state['h'], dtype=float).copy()
+
+
 def estimate_time_of_concentration(length: float, slope: float, 
                                   manning_n: float) -> float:
     """
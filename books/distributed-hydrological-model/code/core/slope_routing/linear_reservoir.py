@@ -89,7 +89,7 @@ class LinearReservoirSlope:
         self.Q = 0.0  # 出流量 (m³/s)
         self.S = 0.0  # 蓄水量 (m³)
     
-    def run(self, runoff: np.ndarray) -> Dict[str, np.ndarray]:
+    def run(self, runoff: np.ndarray, reset: bool = True) -> Dict[str, np.ndarray]:
         """
         运行线性水库模型
         
@@ -97,6 +97,8 @@ class LinearReservoirSlope:
         ----------
         runoff : ndarray
             净雨强度序列 (mm/h)
+        reset : bool
+            是否先重置状态；False时从当前状态继续（用于分段/流式计算）
         
         Returns
         -------
@@ -115,7 +117,8 @@ class LinearReservoirSlope:
         storage = np.zeros(n_steps)
         
         # 重置状态
-        self.reset()
+        if reset:
+            self.reset()
         
         # 时间步进
         for t in range(n_steps):
@@ -212,7 +215,7 @@ class NashCascade:
             }
             self.reservoirs.append(LinearReservoirSlope(res_params))
     
-    def run(self, runoff: np.ndarray) -> Dict[str, np.ndarray]:
+    def run(self, runoff: np.ndarray, reset: bool = True) -> Dict[str, np.ndarray]:
         """
         运行纳什瀑布模型
         
@@ -220,6 +223,8 @@ class NashCascade:
         ----------
         runoff : ndarray
             净雨强度序列 (mm/h)
+        reset : bool
+            是否先重置状态；False时从当前状态继续（用于分段/流式计算）
         
         Returns
         -------
@@ -231,11 +236,11 @@ class NashCascade:
         n_steps = len(runoff)
         
         # 重置所有水库
-        for res in self.reservoirs:
-            res.reset()
+        if reset:
+            self.reset()
         
         # 第一级：输入为净雨
-        results_1 = self.reservoirs[0].run(runoff)
+        results_1 = self.reservoirs[0].run(runoff, reset=False)
         intermediate_discharge = [results_1['discharge']]
         
         # 后续各级：输入为上一级的出流
@@ -244,7 +249,7 @@ class NashCascade:
             inflow_mm_h = intermediate_discharge[-1] / self.area * 1000 * 3600
             
             # 运行当前水库
-            results_i = self.reservoirs[i].run(inflow_mm_h)
+            results_i = self.reservoirs[i].run(inflow_mm_h, reset=False)
             intermediate_discharge.append(results_i['discharge'])
         
         return {
@@ -256,6 +261,16 @@ class NashCascade:
         """重置所有水库"""
         for res in self.reservoirs:
             res.reset()
+    
+    def get_state(self) -> Dict[str, list]:
+        """获取当前状态（各级水库状态）"""
+        return {'reservoirs': [res.get_state() for res in self.reservoirs]}
+    
+    def set_state(self, state: Dict[str, list]):
+        """设置模型状态"""
+        if 'reservoirs' in state:
+            for res, res_state in zip(self.reservoirs, state['reservoirs']):
+                res.set_state(res_state)
 
 
 def estimate_K_from_tc(tc: float, n: int = 3) -> float:
@@ -0,0 +1,41 @@
+"""
+地形分析模块
+===========
+
+提供基于DEM的流域地形分析功能。
+
+子模块:
+- flow_direction: 坡度坡向与D8流向（数组平移比较，支持分块处理）
+- accumulation: 汇流累积（非递归拓扑排序，O(N)，整幅栅格在内存中计算）
+- depressions: 洼地填充（Priority-Flood，整幅栅格在内存中计算）
+- streams: 河网提取、出口识别与流域划分
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+from .flow_direction import (
+    D8_DIRECTIONS,
+    calculate_slope_aspect,
+    d8_flow_direction,
+    d8_flow_direction_tiled,
+    downstream_index
+)
+from .accumulation import flow_accumulation
+from .depressions import fill_depressions
+from .streams import extract_stream_network, identify_outlet, watershed_mask
+
+__all__ = [
+    'D8_DIRECTIONS',
+    'calculate_slope_aspect',
+    'd8_flow_direction',
+    'd8_flow_direction_tiled',
+    'downstream_index',
+    'flow_accumulation',
+    'fill_depressions',
+    'extract_stream_network',
+    'identify_outlet',
+    'watershed_mask'
+]
+
+__version__ = '0.1.0'
@@ -0,0 +1,109 @@
+"""
+河网提取与流域划分
+================
+
+作者: CHS-Books项目组
+日期: 2025-11-02
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import Tuple
+
+from .flow_direction import downstream_index
+
+
+def extract_stream_network(flow_acc: np.ndarray, threshold: float = 50) -> np.ndarray:
+    """
+    提取河网
+    
+    Parameters
+    ----------
+    flow_acc : ndarray
+        汇流累积
+    threshold : float
+        河网阈值（网格数或累积权重）
+    
+    Returns
+    -------
+    stream : ndarray, bool
+        河网掩膜
+    """
+    return np.asarray(flow_acc) >= threshold
+
+
+def identify_outlet(flow_dir: np.ndarray, flow_acc: np.ndarray,
+                    boundary_only: bool = True) -> Tuple[int, int]:
+    """
+    识别流域出口
+    
+    Parameters
+    ----------
+    flow_dir : ndarray
+        流向
+    flow_acc : ndarray
+        汇流累积
+    boundary_only : bool
+        True时在DEM边界上取汇流累积最大的网格；False时在全部
+        汇点（含内部洼地，填洼后应已不存在）中取最大者
+    
+    Returns
+    -------
+    outlet_i, outlet_j : int
+        出口坐标
+    """
+    ny, nx = flow_dir.shape
+    if boundary_only:
+        candidates = np.zeros((ny, nx), dtype=bool)
+        candidates[[0, -1], :] = True
+        candidates[:, [0, -1]] = True
+        candidates = candidates.ravel()
+    else:
+        candidates = downstream_index(flow_dir) < 0
+    
+    acc = np.where(candidates, np.asarray(flow_acc, dtype=float).ravel(), -np.inf)
+    outlet = int(np.argmax(acc))
+    return divmod(outlet, nx)
+
+
+def watershed_mask(flow_dir: np.ndarray, outlet: Tuple[int, int]) -> np.ndarray:
+    """
+    划分出口断面以上的集水区
+    
+    从出口沿流向反向逐层搜索上游网格（稀疏邻接矩阵），
+    每层为一次整体运算。
+    
+    Parameters
+    ----------
+    flow_dir : ndarray (ny, nx)
+        D8流向编码
+    outlet : tuple of int
+        出口坐标 (i, j)
+    
+    Returns
+    -------
+    mask : ndarray (ny, nx), bool
+        集水区掩膜
+    """
+    ny, nx = flow_dir.shape
+    down = downstream_index(flow_dir)
+    n_cells = down.size
+    
+    # upstream[k] 的非零列为流入网格k的上游网格
+    src = np.flatnonzero(down >= 0)
+    upstream = sparse.csr_matrix(
+        (np.ones(src.size, dtype=bool), (down[src], src)),
+        shape=(n_cells, n_cells)
+    )
+    
+    mask = np.zeros(n_cells, dtype=bool)
+    frontier = np.array([outlet[0] * nx + outlet[1]])
+    mask[frontier] = True
+    
+    while frontier.size > 0:
+        parents = upstream[frontier].indices
+        parents = parents[~mask[parents]]
+        mask[parents] = True
+        frontier = parents
+    
+    return mask.reshape(ny, nx)
@@ -15,11 +15,18 @@ __all__ = [
     'read_rainfall_data',
     'read_discharge_data',
     'save_results',
+    'load_results',
+    'ChunkedArrayStore',
+    'ChunkedArrayWriter',
+    'csv_to_store',
     # metrics
     'nash_sutcliffe',
     'rmse',
     'relative_error',
     'peak_error',
+    'batch_metrics',
+    'ObservationStats',
+    'MetricAccumulator',
     # time_series
     'resample_timeseries',
     'fill_missing_data',
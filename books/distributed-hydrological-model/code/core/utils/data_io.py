@@ -2,9 +2,16 @@
 数据输入输出模块
 =============
 
-提供数据读写功能
+提供数据读写功能：
+- CSV/JSON/Excel 读写（pandas）
+- NPZ 二进制结果文件
+- ChunkedArrayStore: 分块二进制时间序列存储（时间索引、
+  按时间窗口/站点子集的延迟读取、内存映射、追加写入）
 """
 
+import json
+import os
+
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -24,7 +31,7 @@ def read_rainfall_data(file_path, delimiter=',', time_col=0, value_col=1):
         时间列索引
     value_col : int
         降雨量列索引
-        
+    
     Returns
     -------
     df : pd.DataFrame
@@ -44,7 +51,7 @@ def read_discharge_data(file_path, delimiter=','):
         文件路径
     delimiter : str
         分隔符
-        
+    
     Returns
     -------
     df : pd.DataFrame
@@ -65,10 +72,18 @@ def save_results(data, file_path, format='csv'):
     file_path : str
         保存路径
     format : str
-        保存格式 ('csv', 'json', 'excel')
+        保存格式 ('csv', 'json', 'excel', 'npz')
     """
     Path(file_path).parent.mkdir(parents=True, exist_ok=True)
     
+    if format == 'npz':
+        # 二进制压缩格式，直接保存数组字典（可含多维数组）
+        if isinstance(data, pd.DataFrame):
+            data = {col: data[col].to_numpy() for col in data.columns}
+        np.savez_compressed(file_path, **{k: np.asarray(v) for k, v in data.items()})
+        print(f"结果已保存至: {file_path}")
+        return
+    
     if isinstance(data, dict):
         data = pd.DataFrame(data)
     
@@ -80,3 +95,417 @@ def save_results(data, file_path, format='csv'):
         data.to_excel(file_path, index=False)
     
     print(f"结果已保存至: {file_path}")
+
+
+def load_results(file_path):
+    """
+    读取 save_results(format='npz') 保存的结果
+    
+    Parameters
+    ----------
+    file_path : str
+        文件路径
+    
+    Returns
+    -------
+    data : dict
+        变量名 → 数组
+    """
+    with np.load(file_path) as f:
+        return {key: f[key] for key in f.files}
+
+
+class ChunkedArrayStore:
+    """
+    分块追加写入的磁盘数组存储
+    
+    每个变量沿第0轴（时间）分块保存为 .npy 文件（compress=True 时为
+    压缩的 .npz 文件），元数据记录在 meta.json 中。写入只追加新块，
+    读取时只加载涉及的块，并可按站点/网格（第1轴）取子集，
+    长序列驱动数据和模拟结果都不需要整体驻留内存。
+    
+    目录结构::
+        
+        store/
+            meta.json
+            Q/000000.npy
+            Q/000001.npy
+            ...
+    
+    Parameters
+    ----------
+    path : str or Path
+        存储目录（不存在时创建；已存在时打开并沿用其设置）
+    start_time : str or datetime64, optional
+        第0步对应的时间，与time_step一起构成等间隔时间索引
+    time_step : float, optional
+        时间步长 (s)
+    compress : bool
+        是否压缩保存（压缩块不能内存映射读取）
+    
+    Examples
+    --------
+    >>> store = ChunkedArrayStore('outputs/run1', start_time='1990-01-01', time_step=3600)
+    >>> store.append({'Q': q_chunk})
+    >>> Q = store.read('Q', 100, 200)
+    >>> P = store.read_window('P', '2000-06-01', '2000-09-01', index=[0, 5, 7])
+    """
+    
+    def __init__(self, path, start_time=None, time_step=None, compress=False):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._meta_file = self.path / 'meta.json'
+        
+        if self._meta_file.exists():
+            with open(self._meta_file, 'r', encoding='utf-8') as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {'variables': {}, 'chunks': [], 'compress': bool(compress), 'time': None}
+            if start_time is not None:
+                self.set_time_index(start_time, time_step)
+            self._write_meta()
+    
+    def __len__(self):
+        return self.meta['chunks'][-1]['stop'] if self.meta['chunks'] else 0
+    
+    @property
+    def variables(self):
+        return list(self.meta['variables'])
+    
+    @property
+    def compress(self):
+        return self.meta.get('compress', False)
+    
+    def _write_meta(self):
+        """先写临时文件再替换，避免中断时留下损坏的元数据"""
+        tmp = self._meta_file.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self._meta_file)
+    
+    def _chunk_file(self, name, index):
+        suffix = '.npz' if self.compress else '.npy'
+        return self.path / name / f'{index:06d}{suffix}'
+    
+    def _load_chunk(self, name, index, mmap):
+        chunk_file = self._chunk_file(name, index)
+        if self.compress:
+            with np.load(chunk_file) as f:
+                return f['data']
+        return np.load(chunk_file, mmap_mode='r' if mmap else None)
+    
+    # ------------------------------------------------------------------
+    # 时间索引
+    # ------------------------------------------------------------------
+    
+    def set_time_index(self, start_time, time_step):
+        """
+        设置等间隔时间索引
+        
+        Parameters
+        ----------
+        start_time : str or datetime64
+            第0步时间
+        time_step : float
+            时间步长 (s)
+        """
+        if time_step is None or time_step <= 0:
+            raise ValueError("time_step必须为正数")
+        self.meta['time'] = {
+            'start': str(np.datetime64(start_time, 's')),
+            'step': float(time_step)
+        }
+        self._write_meta()
+    
+    def time_index(self, start=0, stop=None):
+        """返回 [start, stop) 各步对应的时间 (datetime64[s])"""
+        if not self.meta.get('time'):
+            raise ValueError("存储未设置时间索引")
+        stop = len(self) if stop is None else stop
+        t0 = np.datetime64(self.meta['time']['start'], 's')
+        step = np.timedelta64(int(round(self.meta['time']['step'])), 's')
+        return t0 + np.arange(start, stop) * step
+    
+    def time_to_position(self, time):
+        """时间 → 时间步序号（向上取整到不早于该时间的第一步）"""
+        if not self.meta.get('time'):
+            raise ValueError("存储未设置时间索引")
+        t0 = np.datetime64(self.meta['time']['start'], 's')
+        offset = (np.datetime64(time, 's') - t0) / np.timedelta64(1, 's')
+        return int(np.ceil(offset / self.meta['time']['step']))
+    
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    
+    def append(self, data, labels=None):
+        """
+        追加一个时间块
+        
+        Parameters
+        ----------
+        data : dict
+            变量名 → 数组 (n_steps, ...)，所有变量的 n_steps 相同
+        labels : dict, optional
+            变量名 → 第1轴标签（站点名/网格编号），仅首次写入时记录
+        """
+        arrays = {name: np.asarray(value) for name, value in data.items()}
+        lengths = {len(value) for value in arrays.values()}
+        if len(lengths) != 1:
+            raise ValueError("各变量的时间步数必须相同")
+        n_steps = lengths.pop()
+        
+        variables = self.meta['variables']
+        if variables and set(arrays) != set(variables):
+            raise ValueError(f"变量与已有存储不一致: {sorted(variables)}")
+        
+        index = len(self.meta['chunks'])
+        for name, value in arrays.items():
+            if name not in variables:
+                variables[name] = {'dtype': value.dtype.str, 'shape': list(value.shape[1:])}
+                if labels and name in labels:
+                    variables[name]['labels'] = [str(label) for label in labels[name]]
+                (self.path / name).mkdir(exist_ok=True)
+            elif list(value.shape[1:]) != variables[name]['shape']:
+                raise ValueError(f"变量 {name} 的形状与已有存储不一致")
+            
+            value = value.astype(np.dtype(variables[name]['dtype']), copy=False)
+            if self.compress:
+                np.savez_compressed(self._chunk_file(name, index), data=value)
+            else:
+                np.save(self._chunk_file(name, index), value)
+        
+        start = len(self)
+        self.meta['chunks'].append({'start': start, 'stop': start + n_steps})
+        self._write_meta()
+    
+    def writer(self, chunk_size=720):
+        """
+        返回缓冲写入器，供逐时段循环使用
+        
+        Examples
+        --------
+        >>> with store.writer(chunk_size=720) as w:
+        ...     for t in range(n_steps):
+        ...         w.write_step({'Q': model.step(P[t])})
+        """
+        return ChunkedArrayWriter(self, chunk_size)
+    
+    def truncate(self, n_steps):
+        """
+        截断到前 n_steps 个时间步（用于从检查点重启）
+        
+        只能在块边界截断。
+        """
+        chunks = self.meta['chunks']
+        keep = [c for c in chunks if c['stop'] <= n_steps]
+        if (keep[-1]['stop'] if keep else 0) != n_steps:
+            raise ValueError(f"只能在块边界截断: {n_steps}")
+        
+        for index in range(len(keep), len(chunks)):
+            for name in self.meta['variables']:
+                chunk_file = self._chunk_file(name, index)
+                if chunk_file.exists():
+                    chunk_file.unlink()
+        
+        self.meta['chunks'] = keep
+        self._write_meta()
+    
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    
+    def _resolve_index(self, name, index):
+        """站点/网格子集：整数序号、布尔掩膜或标签"""
+        if index is None:
+            return None
+        index = np.asarray(index)
+        if index.dtype.kind in 'US':
+            labels = self.meta['variables'][name].get('labels')
+            if labels is None:
+                raise KeyError(f"变量 {name} 没有标签")
+            lookup = {label: i for i, label in enumerate(labels)}
+            index = np.array([lookup[str(label)] for label in index])
+        return index
+    
+    def read(self, name, start=0, stop=None, index=None, mmap=True):
+        """
+        读取变量的时间区间 [start, stop)
+        
+        Parameters
+        ----------
+        name : str
+            变量名
+        start, stop : int
+            时间步范围，stop默认到末尾
+        index : array_like, optional
+            第1轴（站点/网格）子集：整数序号、布尔掩膜或标签
+        mmap : bool
+            是否以内存映射方式打开各块（未压缩时有效）
+        
+        Returns
+        -------
+        values : ndarray
+            数据 (stop-start, ...)
+        """
+        if name not in self.meta['variables']:
+            raise KeyError(f"变量不存在: {name}")
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = max(start, 0)
+        index = self._resolve_index(name, index)
+        
+        pieces = []
+        for i, chunk in enumerate(self.meta['chunks']):
+            if chunk['stop'] <= start or chunk['start'] >= stop:
+                continue
+            values = self._load_chunk(name, i, mmap)
+            lo = max(start, chunk['start']) - chunk['start']
+            hi = min(stop, chunk['stop']) - chunk['start']
+            values = values[lo:hi]
+            if index is not None:
+                values = values[:, index]
+            pieces.append(np.asarray(values))
+        
+        if not pieces:
+            info = self.meta['variables'][name]
+            shape = list(info['shape'])
+            if index is not None and shape:
+                shape[0] = len(np.arange(shape[0])[index])
+            return np.zeros([0] + shape, dtype=np.dtype(info['dtype']))
+        return np.concatenate(pieces)
+    
+    def read_window(self, name, start_time, end_time, index=None, mmap=True):
+        """
+        按时间窗口读取 [start_time, end_time)
+        
+        Parameters
+        ----------
+        name : str
+            变量名
+        start_time, end_time : str or datetime64
+            时间窗口
+        index : array_like, optional
+            站点/网格子集
+        mmap : bool
+            是否内存映射读取
+        
+        Returns
+        -------
+        times : ndarray of datetime64
+            各步时间
+        values : ndarray
+            数据
+        """
+        start = max(self.time_to_position(start_time), 0)
+        stop = min(self.time_to_position(end_time), len(self))
+        stop = max(stop, start)
+        return self.time_index(start, stop), self.read(name, start, stop, index, mmap)
+
+
+class ChunkedArrayWriter:
+    """
+    缓冲追加写入器
+    
+    逐时段（write_step）或逐块（write）接收数据，累积满
+    chunk_size 步后作为一个块写入 ChunkedArrayStore。
+    可作为上下文管理器使用，退出时写入剩余数据。
+    
+    Parameters
+    ----------
+    store : ChunkedArrayStore
+        目标存储
+    chunk_size : int
+        每块时间步数
+    """
+    
+    def __init__(self, store, chunk_size=720):
+        self.store = store
+        self.chunk_size = int(chunk_size)
+        self._buffer = {}
+        self._n_buffered = 0
+    
+    def write_step(self, data):
+        """写入一个时段: 变量名 → 该时段的值（标量或数组）"""
+        self.write({name: np.asarray(value)[None, ...] for name, value in data.items()})
+    
+    def write(self, data):
+        """写入一段: 变量名 → (n_steps, ...) 数组"""
+        n_steps = None
+        for name, value in data.items():
+            value = np.asarray(value)
+            n_steps = len(value) if n_steps is None else n_steps
+            self._buffer.setdefault(name, []).append(value)
+        self._n_buffered += n_steps or 0
+        
+        if self._n_buffered >= self.chunk_size:
+            self.flush()
+    
+    def flush(self):
+        """把缓冲区数据写为一个块"""
+        if self._n_buffered == 0:
+            return
+        self.store.append({name: np.concatenate(values) for name, values in self._buffer.items()})
+        self._buffer = {}
+        self._n_buffered = 0
+    
+    def close(self):
+        self.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def csv_to_store(file_path, store_path, name='values', time_col=0,
+                 delimiter=',', rows_per_chunk=8760, compress=False):
+    """
+    把CSV时间序列一次性转换为分块二进制存储
+    
+    CSV按 rows_per_chunk 行分批读取，时间列之外的各列（站点）
+    作为变量 name 的第1轴，列名记录为站点标签；时间索引由前两行
+    的时间差确定（要求等间隔）。此后模型启动时直接内存映射读取，
+    不再解析CSV。
+    
+    Parameters
+    ----------
+    file_path : str
+        CSV文件路径
+    store_path : str or Path
+        存储目录
+    name : str
+        变量名
+    time_col : int or str
+        时间列
+    delimiter : str
+        分隔符
+    rows_per_chunk : int
+        每块行数
+    compress : bool
+        是否压缩保存
+    
+    Returns
+    -------
+    store : ChunkedArrayStore
+        转换后的存储
+    """
+    store = ChunkedArrayStore(store_path, compress=compress)
+    if len(store) > 0:
+        raise ValueError(f"存储非空: {store_path}")
+    
+    # 由前两行确定时间索引
+    head = pd.read_csv(file_path, delimiter=delimiter, nrows=2)
+    time_name = head.columns[time_col] if isinstance(time_col, int) else time_col
+    head_times = pd.to_datetime(head[time_name]).to_numpy()
+    if len(head_times) == 2:
+        step = (head_times[1] - head_times[0]) / np.timedelta64(1, 's')
+        store.set_time_index(head_times[0], step)
+    
+    for frame in pd.read_csv(file_path, delimiter=delimiter, chunksize=rows_per_chunk):
+        frame = frame.drop(columns=time_name)
+        store.append({name: frame.to_numpy(dtype=float)},
+                     labels={name: list(frame.columns)})
+    
+    return store
@@ -22,12 +22,12 @@ def nash_sutcliffe(observed, simulated):
         观测值序列
     simulated : array_like
         模拟值序列
-        
+    
     Returns
     -------
     nse : float
         Nash-Sutcliffe效率系数
-        
+    
     Examples
     --------
     >>> obs = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
@@ -70,12 +70,12 @@ def rmse(observed, simulated):
         观测值序列
     simulated : array_like
         模拟值序列
-        
+    
     Returns
     -------
     rmse_value : float
         均方根误差
-        
+    
     Examples
     --------
     >>> obs = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
@@ -111,12 +111,12 @@ def relative_error(observed, simulated):
         观测值序列
     simulated : array_like
         模拟值序列
-        
+    
     Returns
     -------
     re : float
         相对误差 (%)
-        
+    
     Examples
     --------
     >>> obs = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
@@ -158,12 +158,12 @@ def peak_error(observed, simulated):
         观测值序列
     simulated : array_like
         模拟值序列
-        
+    
     Returns
     -------
     pe : float
         洪峰相对误差 (%)
-        
+    
     Examples
     --------
     >>> obs = np.array([1.0, 2.0, 5.0, 3.0, 2.0])
@@ -203,7 +203,7 @@ def correlation_coefficient(observed, simulated):
         观测值序列
     simulated : array_like
         模拟值序列
-        
+    
     Returns
     -------
     r : float
@@ -237,12 +237,12 @@ def evaluate_model(observed, simulated, metrics=None):
         模拟值序列
     metrics : list, optional
         要计算的指标列表，默认计算所有指标
-        
+    
     Returns
     -------
     results : dict
         评估指标字典
-        
+    
     Examples
     --------
     >>> obs = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
@@ -269,3 +269,307 @@ def evaluate_model(observed, simulated, metrics=None):
             results[metric] = metric_functions[metric](observed, simulated)
     
     return results
+
+
+# ----------------------------------------------------------------------
+# 批量指标（n_runs 条模拟序列一次计算）
+# ----------------------------------------------------------------------
+
+BATCH_METRICS = ('NSE', 'RMSE', 'MAE', 'RE', 'PBIAS', 'PE', 'R', 'R2', 'KGE')
+
+# 分块计算时每块的最大元素数，限制中间数组内存
+_BLOCK_ELEMENTS = 2 ** 22
+
+
+class ObservationStats:
+    """
+    观测序列统计量（只需计算一次）
+    
+    Parameters
+    ----------
+    observed : array_like (n_time,)
+        观测值序列，缺测记为NaN
+    
+    Attributes
+    ----------
+    mask : ndarray of bool
+        有效观测位置
+    n : int
+        有效观测数
+    total, mean, ss, std, peak : float
+        有效观测的总和、均值、离差平方和、标准差、最大值
+    """
+    
+    def __init__(self, observed):
+        self.observed = np.asarray(observed, dtype=float)
+        self.mask = ~np.isnan(self.observed)
+        self.values = self.observed[self.mask]
+        self.n = len(self.values)
+        
+        if self.n > 0:
+            self.total = np.sum(self.values)
+            self.mean = self.total / self.n
+            self.anomaly = self.values - self.mean
+            self.ss = np.sum(self.anomaly ** 2)
+            self.std = np.sqrt(self.ss / self.n)
+            self.peak = np.max(self.values)
+        else:
+            self.total = self.mean = self.ss = self.std = self.peak = np.nan
+            self.anomaly = self.values
+
+
+def _safe_divide(numerator, denominator):
+    """分母为0或NaN时返回NaN"""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.broadcast_to(np.asarray(denominator, dtype=float), numerator.shape)
+    out = np.full(numerator.shape, np.nan)
+    ok = (denominator != 0) & ~np.isnan(denominator)
+    np.divide(numerator, denominator, out=out, where=ok)
+    return out
+
+
+def _metrics_from_sums(n, obs_total, obs_mean, obs_ss, obs_peak,
+                       sim_total, sim_mean, sim_ss, cross, sse, sae, sim_peak,
+                       metrics):
+    """由各条序列的充分统计量计算指标"""
+    n = np.asarray(n, dtype=float)
+    valid = n > 0
+    results = {}
+    
+    r = _safe_divide(cross, np.sqrt(obs_ss * sim_ss))
+    
+    for metric in metrics:
+        if metric == 'NSE':
+            value = 1 - _safe_divide(sse, obs_ss)
+        elif metric == 'RMSE':
+            value = np.sqrt(_safe_divide(sse, n))
+        elif metric == 'MAE':
+            value = _safe_divide(sae, n)
+        elif metric == 'RE':
+            value = _safe_divide(sim_total - obs_total, obs_total) * 100
+        elif metric == 'PBIAS':
+            value = _safe_divide(obs_total - sim_total, obs_total) * 100
+        elif metric == 'PE':
+            value = _safe_divide(sim_peak - obs_peak, obs_peak) * 100
+        elif metric == 'R':
+            value = np.where(n >= 2, r, np.nan)
+        elif metric == 'R2':
+            value = np.where(n >= 2, r ** 2, np.nan)
+        elif metric == 'KGE':
+            alpha = np.sqrt(_safe_divide(sim_ss, obs_ss))
+            beta = _safe_divide(sim_mean, obs_mean)
+            value = 1 - np.sqrt((r - 1) ** 2 + (alpha - 1) ** 2 + (beta - 1) ** 2)
+        else:
+            raise ValueError(f"未知指标: {metric}")
+        
+        results[metric] = np.where(valid, value, np.nan)
+    
+    return results
+
+
+def _batch_block_common_mask(stats, sim, metrics):
+    """各条序列在观测有效位置均无缺测：直接使用预先计算的观测统计量"""
+    n_runs = sim.shape[0]
+    diff = sim - stats.values
+    sim_total = np.sum(sim, axis=1)
+    sim_mean = sim_total / stats.n
+    sim_anomaly = sim - sim_mean[:, None]
+    
+    return _metrics_from_sums(
+        np.full(n_runs, stats.n), stats.total, stats.mean, stats.ss, stats.peak,
+        sim_total, sim_mean,
+        np.sum(sim_anomaly ** 2, axis=1),
+        sim_anomaly @ stats.anomaly,
+        np.sum(diff ** 2, axis=1),
+        np.sum(np.abs(diff), axis=1),
+        np.max(sim, axis=1),
+        metrics
+    )
+
+
+def _batch_block_masked(stats, sim, metrics):
+    """模拟序列也有缺测：逐条序列使用各自的有效位置"""
+    obs = stats.values
+    w = ~np.isnan(sim)
+    n = np.sum(w, axis=1)
+    sim0 = np.where(w, sim, 0.0)
+    obs0 = np.where(w, obs, 0.0)
+    
+    obs_total = np.sum(obs0, axis=1)
+    sim_total = np.sum(sim0, axis=1)
+    obs_mean = _safe_divide(obs_total, n)
+    sim_mean = _safe_divide(sim_total, n)
+    
+    obs_anomaly = np.where(w, obs - obs_mean[:, None], 0.0)
+    sim_anomaly = np.where(w, sim - sim_mean[:, None], 0.0)
+    diff = sim0 - obs0
+    
+    return _metrics_from_sums(
+        n, obs_total, obs_mean,
+        np.sum(obs_anomaly ** 2, axis=1),
+        np.max(np.where(w, obs, -np.inf), axis=1),
+        sim_total, sim_mean,
+        np.sum(sim_anomaly ** 2, axis=1),
+        np.sum(obs_anomaly * sim_anomaly, axis=1),
+        np.sum(diff ** 2, axis=1),
+        np.sum(np.abs(diff), axis=1),
+        np.max(np.where(w, sim, -np.inf), axis=1),
+        metrics
+    )
+
+
+def batch_metrics(observed, simulated, metrics=None, obs_stats=None):
+    """
+    批量计算评估指标
+    
+    一次计算 n_runs 条模拟序列的全部指标。观测缺测（NaN）的时段
+    对所有序列剔除；模拟值缺测的时段只对该序列剔除，
+    结果与逐条调用 nash_sutcliffe、rmse 等函数一致。
+    
+    Parameters
+    ----------
+    observed : array_like (n_time,)
+        观测值序列
+    simulated : array_like (n_runs, n_time) or (n_time,)
+        模拟值矩阵
+    metrics : list of str, optional
+        指标名称，可选 'NSE', 'RMSE', 'MAE', 'RE', 'PBIAS', 'PE',
+        'R', 'R2', 'KGE'，默认全部
+    obs_stats : ObservationStats, optional
+        预先计算的观测统计量（重复评估同一观测时传入）
+    
+    Returns
+    -------
+    results : dict
+        指标名 → (n_runs,) 数组（simulated为一维时为标量）
+    
+    Examples
+    --------
+    >>> sims = np.stack([model(p) for p in param_sets])   # (n_runs, n_time)
+    >>> scores = batch_metrics(obs, sims, ['NSE', 'PBIAS'])
+    >>> best = np.argmax(scores['NSE'])
+    """
+    metrics = list(BATCH_METRICS if metrics is None else metrics)
+    stats = ObservationStats(observed) if obs_stats is None else obs_stats
+    
+    simulated = np.asarray(simulated, dtype=float)
+    single = simulated.ndim == 1
+    simulated = np.atleast_2d(simulated)
+    if simulated.shape[1] != len(stats.observed):
+        raise ValueError("模拟值和观测值长度不一致")
+    
+    n_runs = simulated.shape[0]
+    results = {metric: np.full(n_runs, np.nan) for metric in metrics}
+    block = max(1, _BLOCK_ELEMENTS // max(stats.n, 1))
+    
+    if stats.n > 0:
+        for start in range(0, n_runs, block):
+            sim = simulated[start:start + block][:, stats.mask]
+            if np.isnan(sim).any():
+                values = _batch_block_masked(stats, sim, metrics)
+            else:
+                values = _batch_block_common_mask(stats, sim, metrics)
+            for metric in metrics:
+                results[metric][start:start + block] = values[metric]
+    
+    if single:
+        return {metric: value[0] for metric, value in results.items()}
+    return results
+
+
+class MetricAccumulator:
+    """
+    流式指标累加器
+    
+    模拟仍在进行时逐块输入观测与模拟值，累计各条序列的均值、
+    离差平方和、协方差等统计量（Chan并行合并公式，数值稳定），
+    随时可以给出当前为止的指标，结果与整段计算一致。
+    
+    Parameters
+    ----------
+    n_runs : int
+        模拟序列条数
+    
+    Examples
+    --------
+    >>> acc = MetricAccumulator(n_runs=1000)
+    >>> for t0 in range(0, n_time, 720):
+    ...     acc.update(obs[t0:t0+720], sims_chunk)       # sims_chunk: (1000, 720)
+    >>> acc.result(['NSE', 'KGE'])
+    """
+    
+    def __init__(self, n_runs=1):
+        self.n_runs = n_runs
+        self.n = np.zeros(n_runs)
+        self.obs_mean = np.zeros(n_runs)
+        self.sim_mean = np.zeros(n_runs)
+        self.obs_m2 = np.zeros(n_runs)
+        self.sim_m2 = np.zeros(n_runs)
+        self.comoment = np.zeros(n_runs)
+        self.sse = np.zeros(n_runs)
+        self.sae = np.zeros(n_runs)
+        self.obs_peak = np.full(n_runs, -np.inf)
+        self.sim_peak = np.full(n_runs, -np.inf)
+    
+    def update(self, observed, simulated):
+        """
+        输入一个时间块
+        
+        Parameters
+        ----------
+        observed : array_like (n_chunk,)
+            观测值
+        simulated : array_like (n_runs, n_chunk) or (n_chunk,)
+            模拟值
+        """
+        obs = np.asarray(observed, dtype=float)
+        sim = np.atleast_2d(np.asarray(simulated, dtype=float))
+        sim = np.broadcast_to(sim, (self.n_runs, len(obs)))
+        
+        w = ~(np.isnan(obs) | np.isnan(sim))
+        n_b = np.sum(w, axis=1).astype(float)
+        obs0 = np.where(w, obs, 0.0)
+        sim0 = np.where(w, sim, 0.0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            obs_mean_b = np.where(n_b > 0, np.sum(obs0, axis=1) / n_b, 0.0)
+            sim_mean_b = np.where(n_b > 0, np.sum(sim0, axis=1) / n_b, 0.0)
+        obs_anomaly = np.where(w, obs - obs_mean_b[:, None], 0.0)
+        sim_anomaly = np.where(w, sim - sim_mean_b[:, None], 0.0)
+        diff = sim0 - obs0
+        
+        # Chan合并：(n_a, mean_a, M2_a) + (n_b, mean_b, M2_b)
+        n_ab = self.n + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            factor = np.where(n_ab > 0, self.n * n_b / n_ab, 0.0)
+            weight_b = np.where(n_ab > 0, n_b / n_ab, 0.0)
+        d_obs = obs_mean_b - self.obs_mean
+        d_sim = sim_mean_b - self.sim_mean
+        
+        self.obs_m2 += np.sum(obs_anomaly ** 2, axis=1) + d_obs ** 2 * factor
+        self.sim_m2 += np.sum(sim_anomaly ** 2, axis=1) + d_sim ** 2 * factor
+        self.comoment += np.sum(obs_anomaly * sim_anomaly, axis=1) + d_obs * d_sim * factor
+        self.obs_mean += d_obs * weight_b
+        self.sim_mean += d_sim * weight_b
+        self.n = n_ab
+        
+        self.sse += np.sum(diff ** 2, axis=1)
+        self.sae += np.sum(np.abs(diff), axis=1)
+        self.obs_peak = np.maximum(self.obs_peak, np.max(np.where(w, obs, -np.inf), axis=1))
+        self.sim_peak = np.maximum(self.sim_peak, np.max(np.where(w, sim, -np.inf), axis=1))
+    
+    def result(self, metrics=None):
+        """
+        当前为止的指标
+        
+        Returns
+        -------
+        results : dict
+            指标名 → (n_runs,) 数组
+        """
+        metrics = list(BATCH_METRICS if metrics is None else metrics)
+        return _metrics_from_sums(
+            self.n, self.obs_mean * self.n, self.obs_mean, self.obs_m2, self.obs_peak,
+            self.sim_mean * self.n, self.sim_mean, self.sim_m2, self.comoment,
+            self.sse, self.sae, self.sim_peak, metrics
+        )
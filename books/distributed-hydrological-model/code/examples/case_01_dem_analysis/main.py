@@ -23,6 +23,16 @@ from matplotlib.patches import Rectangle
 import os
 import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+
+from core.terrain import (
+    calculate_slope_aspect,
+    d8_flow_direction,
+    flow_accumulation,
+    extract_stream_network,
+    identify_outlet
+)
+
 # 设置中文字体
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -75,230 +85,6 @@ def generate_synthetic_dem(nx=50, ny=50, seed=42):
     return dem, dx, dy
 
 
-def calculate_slope_aspect(dem, dx, dy):
-    """
-    计算坡度和坡向
-    
-    参数:
-    ----
-    dem : ndarray
-        DEM数据
-    dx, dy : float
-        网格分辨率
-    
-    返回:
-    ----
-    slope : ndarray
-        坡度(度)
-    aspect : ndarray
-        坡向(度, 0-360, 北为0)
-    """
-    ny, nx = dem.shape
-    
-    # 计算梯度（中心差分）
-    dzdx = np.zeros_like(dem)
-    dzdy = np.zeros_like(dem)
-    
-    # 内部网格
-    dzdx[1:-1, 1:-1] = (dem[1:-1, 2:] - dem[1:-1, :-2]) / (2 * dx)
-    dzdy[1:-1, 1:-1] = (dem[2:, 1:-1] - dem[:-2, 1:-1]) / (2 * dy)
-    
-    # 边界（单侧差分）
-    dzdx[0, :] = (dem[1, :] - dem[0, :]) / dx
-    dzdx[-1, :] = (dem[-1, :] - dem[-2, :]) / dx
-    dzdy[:, 0] = (dem[:, 1] - dem[:, 0]) / dy
-    dzdy[:, -1] = (dem[:, -1] - dem[:, -2]) / dy
-    
-    # 坡度（度）
-    slope = np.arctan(np.sqrt(dzdx**2 + dzdy**2)) * 180 / np.pi
-    
-    # 坡向（度，顺时针，北为0）
-    aspect = np.arctan2(-dzdy, dzdx) * 180 / np.pi
-    aspect = (90 - aspect) % 360
-    
-    return slope, aspect
-
-
-def d8_flow_direction(dem):
-    """
-    D8流向算法
-    
-    8个方向编码:
-    32  64  128
-    16  *   1
-    8   4   2
-    
-    参数:
-    ----
-    dem : ndarray
-        DEM数据
-    
-    返回:
-    ----
-    flow_dir : ndarray
-        流向编码(0表示汇点/边界)
-    """
-    ny, nx = dem.shape
-    flow_dir = np.zeros((ny, nx), dtype=np.int32)
-    
-    # 8个方向的偏移
-    directions = [
-        (0, 1, 1),    # 东: 1
-        (1, 1, 2),    # 东南: 2
-        (1, 0, 4),    # 南: 4
-        (1, -1, 8),   # 西南: 8
-        (0, -1, 16),  # 西: 16
-        (-1, -1, 32), # 西北: 32
-        (-1, 0, 64),  # 北: 64
-        (-1, 1, 128)  # 东北: 128
-    ]
-    
-    # 对每个网格计算流向
-    for i in range(ny):
-        for j in range(nx):
-            # 边界设为0
-            if i == 0 or i == ny-1 or j == 0 or j == nx-1:
-                flow_dir[i, j] = 0
-                continue
-            
-            # 找最陡下降方向
-            max_slope = -np.inf
-            max_dir = 0
-            
-            for di, dj, code in directions:
-                ni, nj = i + di, j + dj
-                if 0 <= ni < ny and 0 <= nj < nx:
-                    # 计算坡降
-                    distance = np.sqrt(di**2 + dj**2)
-                    slope = (dem[i, j] - dem[ni, nj]) / distance
-                    
-                    if slope > max_slope:
-                        max_slope = slope
-                        max_dir = code
-            
-            flow_dir[i, j] = max_dir if max_slope > 0 else 0
-    
-    return flow_dir
-
-
-def flow_accumulation(flow_dir):
-    """
-    汇流累积计算（改进版，从高到低递归）
-    
-    参数:
-    ----
-    flow_dir : ndarray
-        流向数据
-    
-    返回:
-    ----
-    flow_acc : ndarray
-        汇流累积值(网格数)
-    """
-    ny, nx = flow_dir.shape
-    flow_acc = np.ones((ny, nx), dtype=np.int32)
-    visited = np.zeros((ny, nx), dtype=bool)
-    
-    # 方向偏移量
-    dir_offset = {
-        1: (0, 1),    # 东
-        2: (1, 1),    # 东南
-        4: (1, 0),    # 南
-        8: (1, -1),   # 西南
-        16: (0, -1),  # 西
-        32: (-1, -1), # 西北
-        64: (-1, 0),  # 北
-        128: (-1, 1)  # 东北
-    }
-    
-    def accumulate(i, j):
-        """递归计算汇流累积"""
-        if visited[i, j]:
-            return flow_acc[i, j]
-        
-        visited[i, j] = True
-        
-        if flow_dir[i, j] == 0:
-            return flow_acc[i, j]
-        
-        # 累加所有流向当前网格的上游贡献
-        total = 1
-        for code, (di, dj) in dir_offset.items():
-            ni, nj = i - di, j - dj  # 反向查找上游
-            if 0 <= ni < ny and 0 <= nj < nx:
-                if flow_dir[ni, nj] == code:  # 上游网格流向当前网格
-                    total += accumulate(ni, nj)
-        
-        flow_acc[i, j] = total
-        return total
-    
-    # 从所有网格开始递归计算
-    for i in range(ny):
-        for j in range(nx):
-            if not visited[i, j]:
-                accumulate(i, j)
-    
-    return flow_acc
-
-
-def extract_stream_network(flow_acc, threshold=50):
-    """
-    提取河网
-    
-    参数:
-    ----
-    flow_acc : ndarray
-        汇流累积
-    threshold : float
-        河网阈值(网格数)
-    
-    返回:
-    ----
-    stream : ndarray, bool
-        河网掩膜
-    """
-    stream = flow_acc >= threshold
-    return stream
-
-
-def identify_outlet(flow_dir, flow_acc):
-    """
-    识别流域出口
-    
-    参数:
-    ----
-    flow_dir : ndarray
-        流向
-    flow_acc : ndarray
-        汇流累积
-    
-    返回:
-    ----
-    outlet_i, outlet_j : int
-        出口坐标
-    """
-    # 边界上汇流累积最大的点
-    ny, nx = flow_dir.shape
-    
-    max_acc = -1
-    outlet_i, outlet_j = 0, 0
-    
-    # 检查四条边界
-    for i in [0, ny-1]:
-        for j in range(nx):
-            if flow_acc[i, j] > max_acc:
-                max_acc = flow_acc[i, j]
-                outlet_i, outlet_j = i, j
-    
-    for j in [0, nx-1]:
-        for i in range(ny):
-            if flow_acc[i, j] > max_acc:
-                max_acc = flow_acc[i, j]
-                outlet_i, outlet_j = i, j
-    
-    return outlet_i, outlet_j
-
-
 def plot_dem(dem, dx, dy, save_path=None):
     """
     绘制DEM
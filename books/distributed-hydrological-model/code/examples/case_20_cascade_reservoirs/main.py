@@ -27,6 +27,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 from core.reservoir.operation_rules import (
     ReservoirRules, FloodControlRule, ConservationRule
 )
+from core.reservoir import BatchRuleSimulator, simulate_cascade
 
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -39,7 +40,7 @@ class CascadeReservoirSystem:
         """初始化梯级水库系统"""
         self.reservoirs = []
         self.connections = []  # 水库连接关系
-        
+    
     def add_reservoir(self, reservoir: ReservoirRules, name: str):
         """
         添加水库
@@ -92,82 +93,22 @@ class CascadeReservoirSystem:
             各水库区间入流序列
         dt : float
             时间步长 (s)
-            
+        
         Returns
         -------
         results : dict
             各水库调度结果
         """
-        n_reservoirs = len(self.reservoirs)
-        n_steps = len(lateral_inflows[0])
+        # 各水库规则由批量模拟器推进（单一方案）
+        simulators = [BatchRuleSimulator.from_rules(res_info['reservoir'])
+                      for res_info in self.reservoirs]
+        batch_results = simulate_cascade(simulators, self.connections,
+                                         lateral_inflows, initial_levels,
+                                         dt=dt, n_candidates=1)
         
-        # 初始化结果
         results = {}
-        for i, res_info in enumerate(self.reservoirs):
-            results[res_info['name']] = {
-                'level': np.zeros(n_steps),
-                'storage': np.zeros(n_steps),
-                'outflow': np.zeros(n_steps),
-                'inflow': np.zeros(n_steps)
-            }
-            results[res_info['name']]['level'][0] = initial_levels[i]
-            results[res_info['name']]['storage'][0] = \
-                res_info['reservoir'].level_storage_curve(initial_levels[i])
-        
-        # 时间推进
-        for t in range(n_steps - 1):
-            # 计算各水库总入流（区间入流+上游来水）
-            total_inflows = [lateral_inflows[i][t] for i in range(n_reservoirs)]
-            
-            # 添加上游来水
-            for conn in self.connections:
-                up_idx = conn['upstream']
-                down_idx = conn['downstream']
-                delay = conn['travel_time']
-                
-                if t >= delay:
-                    upstream_outflow = results[self.reservoirs[up_idx]['name']]['outflow'][t - delay]
-                    total_inflows[down_idx] += upstream_outflow
-            
-            # 各水库调度
-            for i, res_info in enumerate(self.reservoirs):
-                reservoir = res_info['reservoir']
-                name = res_info['name']
-                
-                current_level = results[name]['level'][t]
-                current_storage = results[name]['storage'][t]
-                current_inflow = total_inflows[i]
-                
-                results[name]['inflow'][t] = current_inflow
-                
-                # 调度决策
-                state = {
-                    'level': current_level,
-                    'storage': current_storage,
-                    'zone': reservoir.get_zone(current_level)
-                }
-                
-                outflow = reservoir._select_and_apply_rule(state, current_inflow, t)
-                outflow = np.clip(outflow, 0, reservoir.characteristics['max_outflow'])
-                results[name]['outflow'][t] = outflow
-                
-                # 水量平衡
-                delta_storage = (current_inflow - outflow) * dt / 1e4
-                new_storage = current_storage + delta_storage
-                new_storage = np.clip(
-                    new_storage,
-                    reservoir.characteristics['dead_storage'],
-                    reservoir.characteristics['total_storage']
-                )
-                
-                results[name]['storage'][t + 1] = new_storage
-                results[name]['level'][t + 1] = reservoir._storage_to_level(new_storage)
-        
-        # 最后一步
-        for res_info in self.reservoirs:
-            name = res_info['name']
-            results[name]['outflow'][-1] = results[name]['outflow'][-2]
-            results[name]['inflow'][-1] = results[name]['inflow'][-2]
+        for res_info, res in zip(self.reservoirs, batch_results):
+            results[res_info['name']] = {key: value[0] for key, value in res.items()}
         
         return results
 
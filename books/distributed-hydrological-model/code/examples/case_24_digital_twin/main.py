@@ -28,6 +28,7 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../'))
 
 from core.runoff_generation.xaj_model import XinAnJiangModel
+from core.runoff_generation.xaj_grid import XinAnJiangGrid
 
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -106,9 +107,9 @@ class DigitalTwinModel:
         self.xaj_params = xaj_params
         self.area = area
         
-        # 创建模型集合（用于EnKF）
+        # 创建模型集合（用于EnKF），成员状态堆叠为数组一次推进
         self.n_ensemble = 30
-        self.models = [XinAnJiangModel(xaj_params.copy()) for _ in range(self.n_ensemble)]
+        self.ensemble_model = XinAnJiangGrid(xaj_params.copy(), n=self.n_ensemble)
         
         # 观测误差
         self.obs_error = 0.5
@@ -146,15 +147,9 @@ class DigitalTwinModel:
         self.rainfall_history.append(avg_rainfall)
         
         # 运行模型集合
-        discharges = []
-        for model in self.models:
-            result = model.run(np.array([avg_rainfall]), np.array([evaporation]))
-            Q = result['Q'][0]
-            Q = np.nan_to_num(Q, nan=0.0, posinf=0.0, neginf=0.0)
-            Q = max(Q, 0.0)
-            discharges.append(Q)
-        
-        discharges = np.array(discharges)
+        result = self.ensemble_model.step(avg_rainfall, evaporation)
+        discharges = np.nan_to_num(result['Q'], nan=0.0, posinf=0.0, neginf=0.0)
+        discharges = np.maximum(discharges, 0.0)
         
         # 数据同化（如果有观测）
         if observation is not None:
@@ -189,13 +184,9 @@ class DigitalTwinModel:
         # 卡尔曼增益
         K = P_f / (P_f + self.obs_error**2)
         
-        # 更新集合成员
-        analysis = np.zeros_like(forecast)
-        for i in range(len(forecast)):
-            # 添加观测扰动
-            obs_perturbed = observation + np.random.normal(0, self.obs_error)
-            # 更新
-            analysis[i] = forecast[i] + K * (obs_perturbed - forecast[i])
+        # 更新集合成员（添加观测扰动）
+        obs_perturbed = observation + np.random.normal(0, self.obs_error, len(forecast))
+        analysis = forecast + K * (obs_perturbed - forecast)
         
         return analysis
     
@@ -247,25 +238,19 @@ class DigitalTwinModel:
             预报结果
         """
         # 保存当前模型状态
-        saved_states = [model.state.copy() for model in self.models]
+        saved_state = self.ensemble_model.get_state()
         
         # 运行预报
         forecast_discharge = np.zeros((self.n_ensemble, lead_time))
         
-        for i, model in enumerate(self.models):
-            for t in range(lead_time):
-                result = model.run(
-                    np.array([rainfall_forecast[t]]),
-                    np.array([evaporation_forecast[t]])
-                )
-                Q = result['Q'][0]
-                Q = np.nan_to_num(Q, nan=0.0, posinf=0.0, neginf=0.0)
-                Q = max(Q, 0.0)
-                forecast_discharge[i, t] = Q
+        for t in range(lead_time):
+            result = self.ensemble_model.step(rainfall_forecast[t],
+                                              evaporation_forecast[t])
+            Q = np.nan_to_num(result['Q'], nan=0.0, posinf=0.0, neginf=0.0)
+            forecast_discharge[:, t] = np.maximum(Q, 0.0)
         
         # 恢复模型状态
-        for model, state in zip(self.models, saved_states):
-            model.state = state.copy()
+        self.ensemble_model.set_state(saved_state)
         
         # 统计
         mean_forecast = np.mean(forecast_discharge, axis=0)
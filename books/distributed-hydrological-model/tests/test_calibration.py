@@ -0,0 +1,90 @@
+"""
+测试参数率定模块
+==============
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import numpy as np
+import pytest
+
+from code.core.calibration.glue import GLUE
+
+
+X = np.linspace(0, 10, 50)
+Y_OBS = 2 * X + 1
+
+
+def linear_model(params):
+    """y = a*x + b"""
+    a, b = params
+    return a * X + b
+
+
+def nse_objective(simulated):
+    """NSE"""
+    return 1 - np.sum((Y_OBS - simulated) ** 2) / np.sum((Y_OBS - Y_OBS.mean()) ** 2)
+
+
+def _run_glue(**kwargs):
+    np.random.seed(0)
+    glue = GLUE(linear_model, nse_objective, [(0, 5), (-5, 5)],
+                behavioral_threshold=0.5, n_samples=400, **kwargs)
+    return glue, glue.run(verbose=False)
+
+
+def test_weighted_percentile_vectorized():
+    """测试二维加权百分位数与逐列计算一致"""
+    glue = GLUE(linear_model, nse_objective, [(0, 5), (-5, 5)], n_samples=10)
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(30, 7))
+    weights = rng.random(30)
+
+    result = glue._weighted_percentile(values, weights, 25)
+    expected = [glue._weighted_percentile(values[:, t], weights, 25) for t in range(7)]
+
+    np.testing.assert_allclose(result, expected)
+
+
+def test_glue_behavioral_only_matches_full():
+    """测试只保留行为模拟时结果与完整存储一致"""
+    _, full = _run_glue()
+    glue, lean = _run_glue(keep_all=False, chunk_size=64)
+
+    assert glue.simulations is None
+    assert len(lean['behavioral_simulations']) == full['n_behavioral']
+    for key, band in full['uncertainty_bands'].items():
+        np.testing.assert_allclose(lean['uncertainty_bands'][key], band)
+
+
+def test_glue_spill_to_disk(tmp_path):
+    """测试行为模拟溢写到磁盘"""
+    _, full = _run_glue()
+    _, spilled = _run_glue(keep_all=False, spill_path=str(tmp_path / 'sims.f8'))
+
+    sims = spilled['behavioral_simulations']
+    assert isinstance(sims, np.memmap)
+    assert sims.shape == (full['n_behavioral'], len(X))
+    np.testing.assert_allclose(spilled['uncertainty_bands']['P50'],
+                               full['uncertainty_bands']['P50'])
+
+
+def test_glue_spill_cleanup_on_error(tmp_path):
+    """测试运行出错时关闭并删除溢写文件"""
+    path = tmp_path / 'sims.f8'
+    ragged_model = lambda params: X[:25] if params[0] > 2.5 else X
+    glue = GLUE(ragged_model, lambda sim: 1.0, [(0, 5), (-5, 5)],
+                n_samples=50, spill_path=str(path))
+
+    with pytest.raises(ValueError):
+        glue.run(verbose=False)
+    assert not path.exists()
+
+
+def test_glue_parallel():
+    """测试多进程评估与串行一致"""
+    _, serial = _run_glue()
+    _, parallel = _run_glue(n_workers=2)
+
+    np.testing.assert_allclose(parallel['performance'], serial['performance'])
@@ -0,0 +1,78 @@
+"""
+测试数据输入输出模块
+=================
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from code.core.utils.data_io import (
+    ChunkedArrayStore, csv_to_store, save_results, load_results
+)
+
+
+def test_store_time_window_and_subset(tmp_path):
+    """测试按时间窗口和站点子集读取"""
+    data = np.arange(48 * 5, dtype=float).reshape(48, 5)
+    store = ChunkedArrayStore(tmp_path / 'store', start_time='2000-01-01', time_step=3600)
+    for start in range(0, 48, 10):
+        store.append({'P': data[start:start + 10]})
+    
+    assert len(store) == 48
+    np.testing.assert_array_equal(store.read('P', 5, 25, index=[1, 3]), data[5:25][:, [1, 3]])
+    
+    times, values = store.read_window('P', '2000-01-01T06:00', '2000-01-02T00:00', index=[4])
+    assert times[0] == np.datetime64('2000-01-01T06:00')
+    assert len(times) == 18
+    np.testing.assert_array_equal(values, data[6:24, [4]])
+    
+    # 重新打开存储，设置保持不变
+    reopened = ChunkedArrayStore(tmp_path / 'store')
+    assert reopened.time_index(0, 1)[0] == np.datetime64('2000-01-01T00:00')
+    np.testing.assert_array_equal(reopened.read('P'), data)
+
+
+def test_store_compressed_writer(tmp_path):
+    """测试压缩存储与逐时段缓冲写入"""
+    store = ChunkedArrayStore(tmp_path / 'store', compress=True)
+    
+    with store.writer(chunk_size=7) as writer:
+        for t in range(20):
+            writer.write_step({'Q': float(t), 'h': np.full(3, t)})
+    
+    assert len(store) == 20
+    assert len(store.meta['chunks']) == 3
+    np.testing.assert_array_equal(store.read('Q'), np.arange(20.0))
+    np.testing.assert_array_equal(store.read('h', 18)[:, 0], [18, 19])
+
+
+def test_csv_to_store(tmp_path):
+    """测试CSV转换为分块存储及按站点名读取"""
+    times = pd.date_range('2010-01-01', periods=30, freq='h')
+    frame = pd.DataFrame({'time': times,
+                          'S1': np.arange(30.0),
+                          'S2': np.arange(30.0) * 2})
+    csv_file = tmp_path / 'rain.csv'
+    frame.to_csv(csv_file, index=False)
+    
+    store = csv_to_store(csv_file, tmp_path / 'store', name='P', rows_per_chunk=8)
+    
+    assert len(store) == 30
+    assert store.meta['time']['step'] == 3600
+    _, values = store.read_window('P', '2010-01-01T10:00', '2010-01-01T12:00', index=['S2'])
+    np.testing.assert_array_equal(values[:, 0], [20.0, 22.0])
+
+
+def test_save_results_npz(tmp_path):
+    """测试NPZ结果保存"""
+    results = {'Q': np.arange(5.0), 'h': np.ones((5, 3))}
+    path = tmp_path / 'results.npz'
+    
+    save_results(results, path, format='npz')
+    loaded = load_results(path)
+    
+    np.testing.assert_array_equal(loaded['h'], results['h'])
@@ -10,9 +10,9 @@ import numpy as np
 import pytest
 
 from code.core.interpolation import (
-    thiessen_polygon, thiessen_weights,
+    thiessen_polygon, thiessen_weights, ThiessenWeightMatrix,
     inverse_distance_weighting, ordinary_kriging,
-    experimental_variogram
+    experimental_variogram, idw_weights, kriging_weights, BatchInterpolator
 )
 
 
@@ -31,6 +31,32 @@ def test_thiessen_weights():
     assert nearest_idx == 0
 
 
+def test_thiessen_weight_matrix():
+    """测试Thiessen权重矩阵及缺测站点处理"""
+    stations = np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 10.0], [10.0, 10.0]])
+    x, y = np.meshgrid(np.arange(0.5, 10, 1.0), np.arange(0.5, 10, 1.0))
+    cells = np.column_stack([x.ravel(), y.ravel()])
+    labels = (cells[:, 0] > 5).astype(int)  # 左右两个子流域
+
+    twm = ThiessenWeightMatrix(stations, cells, zone_labels=labels)
+    W = twm.weights()
+    assert W.shape == (2, 4)
+    assert np.allclose(np.asarray(W.sum(axis=1)).ravel(), 1.0)
+    assert np.allclose(W.toarray()[0], [0.5, 0.0, 0.5, 0.0])
+
+    rain = np.array([[10.0, 20.0, 30.0, 40.0],
+                     [10.0, np.nan, 30.0, 40.0],
+                     [np.nan, np.nan, np.nan, np.nan]])
+    areal = twm.areal_rainfall(rain)
+
+    assert np.allclose(areal[0], [20.0, 30.0])
+    # 站点1缺测时，右侧下半部分单元改由最近的可用站点代表
+    expected_right = twm.weights(~np.isnan(rain[1])) @ np.nan_to_num(rain[1])
+    assert np.allclose(areal[1], expected_right)
+    assert areal[1, 1] > 30.0
+    assert np.all(np.isnan(areal[2]))
+
+
 def test_idw_basic():
     """测试IDW基本功能"""
     stations = np.array([[0, 0], [1, 0], [0, 1], [1, 1]])
@@ -120,5 +146,56 @@ def test_idw_multiple_targets():
     assert np.all(results <= values.max() + 1)
 
 
+def test_batch_idw_knn_matches_subset():
+    """测试k近邻IDW权重与只用最近站点的IDW一致"""
+    rng = np.random.default_rng(0)
+    stations = rng.random((20, 2)) * 100
+    values = rng.random(20) * 50
+    targets = rng.random((200, 2)) * 100
+
+    W = idw_weights(stations, targets, power=2, k=5)
+    assert W.shape == (200, 20)
+    assert np.allclose(np.asarray(W.sum(axis=1)).ravel(), 1.0)
+
+    target = targets[:1]
+    nearest = np.argsort(np.linalg.norm(stations - target, axis=1))[:5]
+    expected = inverse_distance_weighting(stations[nearest], values[nearest], target)
+    assert np.allclose(W[:1] @ values, expected)
+
+
+def test_batch_interpolator_time_series():
+    """测试批量插值器对时间序列的插值"""
+    rng = np.random.default_rng(1)
+    stations = rng.random((10, 2)) * 10
+    targets = rng.random((50, 2)) * 10
+    series = rng.random((24, 10))
+
+    interp = BatchInterpolator(stations, targets, method='kriging')
+    result = interp.interpolate(series)
+
+    assert result.shape == (24, 50)
+    expected, _ = ordinary_kriging(stations, series[5], targets,
+                                   _variogram_for(stations, series[5]))
+    assert np.allclose(result[5], expected)
+
+
+def test_local_kriging_exact_at_stations():
+    """测试局部克里金在站点处精确"""
+    stations = np.array([[0, 0], [1, 0], [0, 1], [1, 1], [2, 2]], dtype=float)
+    values = np.array([10, 20, 15, 25, 30], dtype=float)
+
+    W, variances = kriging_weights(stations, stations, k=3)
+
+    assert np.allclose(W @ values, values)
+    assert np.allclose(variances, 0.0, atol=1e-8)
+
+
+def _variogram_for(stations, values):
+    """与默认参数相同射程、sill为1的变异函数"""
+    from scipy.spatial.distance import cdist
+    return {'model': 'spherical', 'nugget': 0.0, 'sill': 1.0,
+            'range': np.max(cdist(stations, stations)) / 3}
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
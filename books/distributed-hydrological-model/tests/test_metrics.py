@@ -11,8 +11,10 @@ import pytest
 
 from code.core.utils.metrics import (
     nash_sutcliffe, rmse, relative_error, 
-    peak_error, correlation_coefficient, evaluate_model
+    peak_error, correlation_coefficient, evaluate_model,
+    batch_metrics, MetricAccumulator
 )
+from code.core.calibration.objective import ObjectiveFunction
 
 
 def test_nash_sutcliffe():
@@ -86,5 +88,54 @@ def test_evaluate_model():
     assert 'R' in results
 
 
+def _ensemble_with_gaps():
+    rng = np.random.default_rng(0)
+    obs = 10 + 5 * np.sin(np.linspace(0, 6, 200)) + rng.normal(0, 0.5, 200)
+    sims = obs + rng.normal(0, 1.0, (30, 200)) + rng.normal(0, 1.0, (30, 1))
+    obs[[5, 50, 120]] = np.nan
+    sims[3, 10:20] = np.nan
+    sims[7, 199] = np.nan
+    return obs, sims
+
+
+def test_batch_metrics_matches_scalar():
+    """测试批量指标与逐条计算一致（含缺测）"""
+    obs, sims = _ensemble_with_gaps()
+    results = batch_metrics(obs, sims)
+    
+    for i in (0, 3, 7):
+        assert np.isclose(results['NSE'][i], nash_sutcliffe(obs, sims[i]))
+        assert np.isclose(results['RMSE'][i], rmse(obs, sims[i]))
+        assert np.isclose(results['RE'][i], relative_error(obs, sims[i]))
+        assert np.isclose(results['PE'][i], peak_error(obs, sims[i]))
+        assert np.isclose(results['R'][i], correlation_coefficient(obs, sims[i]))
+    
+    single = batch_metrics(obs, sims[3], ['NSE'])
+    assert np.isclose(single['NSE'], results['NSE'][3])
+
+
+def test_metric_accumulator_matches_batch():
+    """测试流式累加结果与整段计算一致"""
+    obs, sims = _ensemble_with_gaps()
+    acc = MetricAccumulator(n_runs=len(sims))
+    for t0 in range(0, obs.size, 37):
+        acc.update(obs[t0:t0 + 37], sims[:, t0:t0 + 37])
+    
+    streamed = acc.result()
+    expected = batch_metrics(obs, sims)
+    for key in expected:
+        assert np.allclose(streamed[key], expected[key])
+
+
+def test_objective_evaluate_batch():
+    """测试目标函数批量评估"""
+    obs, sims = _ensemble_with_gaps()
+    for metric, maximize in [('nse', True), ('rmse', False), ('pbias', True)]:
+        obj = ObjectiveFunction(obs, metric, maximize=maximize)
+        scores = obj.evaluate_batch(sims)
+        assert scores.shape == (len(sims),)
+        assert np.allclose(scores, [obj.evaluate(s) for s in sims])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,149 @@
+"""
+测试流式流程模块
+==============
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import numpy as np
+import pytest
+
+from code.core.pipeline import FunctionOperator, ModelOperator, PipelineRunner
+from code.core.runoff_generation import XinAnJiangModel, create_default_xaj_params
+from code.core.slope_routing import LinearReservoirSlope
+from code.core.channel_routing import MuskingumChannel
+from code.core.utils.data_io import ChunkedArrayStore
+
+
+AREA = 50e6  # m²
+
+
+def _forcing(n_steps=300, seed=0):
+    """合成降雨与蒸发能力"""
+    rng = np.random.default_rng(seed)
+    P = np.where(rng.random(n_steps) < 0.2, rng.exponential(8.0, n_steps), 0.0)
+    EM = np.full(n_steps, 0.2)
+    return {'P': P, 'EM': EM}
+
+
+def _build_runner(chunk_size):
+    """产流 → 线性水库 → Muskingum 三级流程"""
+    xaj = XinAnJiangModel(create_default_xaj_params('humid'))
+    reservoir = LinearReservoirSlope({'area': AREA, 'K': 3 * 3600, 'dt': 3600})
+    channel = MuskingumChannel({'K': 2.0, 'X': 0.2, 'dt': 1.0})
+    
+    operators = [
+        ModelOperator(xaj, ['P', 'EM'], {'R': 'R'}),
+        ModelOperator(reservoir, ['R'], {'discharge': 'Q_slope'}),
+        ModelOperator(channel, ['Q_slope'], {'outflow': 'Q'}),
+        FunctionOperator(lambda q: q * 3.6, ['Q'], ['Q_kmh']),
+    ]
+    return PipelineRunner(operators, ['R', 'Q'], chunk_size=chunk_size)
+
+
+def _reference(forcing):
+    """一次性整段计算"""
+    xaj = XinAnJiangModel(create_default_xaj_params('humid'))
+    reservoir = LinearReservoirSlope({'area': AREA, 'K': 3 * 3600, 'dt': 3600})
+    channel = MuskingumChannel({'K': 2.0, 'X': 0.2, 'dt': 1.0})
+    
+    R = xaj.run(forcing['P'], forcing['EM'])['R']
+    Q_slope = reservoir.run(R)['discharge']
+    return R, channel.run(Q_slope)['outflow']
+
+
+def test_pipeline_forcing_keys():
+    """测试驱动变量识别"""
+    runner = _build_runner(50)
+    assert runner.forcing_keys == ('P', 'EM')
+    
+    with pytest.raises(ValueError):
+        PipelineRunner(runner.operators, ['missing'])
+
+
+def test_pipeline_chunked_matches_full_run():
+    """测试分块流式计算与整段计算一致"""
+    forcing = _forcing()
+    R, Q = _reference(forcing)
+    
+    results = _build_runner(chunk_size=37).run(forcing)
+    
+    np.testing.assert_allclose(results['R'], R, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(results['Q'], Q, rtol=1e-12, atol=1e-12)
+
+
+def test_pipeline_store_and_restart(tmp_path):
+    """测试结果分块落盘与检查点热启动"""
+    forcing = _forcing()
+    _, Q = _reference(forcing)
+    checkpoint = tmp_path / 'run.ckpt'
+    
+    # 第一次只运行到第120步（模拟中断）
+    store = ChunkedArrayStore(tmp_path / 'store')
+    _build_runner(40).run(forcing, store, stop=120, checkpoint_path=checkpoint)
+    assert len(store) == 120
+    
+    # 新建流程（新的模型实例），从检查点继续
+    store = ChunkedArrayStore(tmp_path / 'store')
+    runner = _build_runner(40)
+    runner.run(forcing, store, checkpoint_path=checkpoint)
+    
+    assert runner.t == len(forcing['P'])
+    np.testing.assert_allclose(store.read('Q'), Q, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(store.read('Q', 100, 150), Q[100:150], rtol=1e-12)
+
+
+def test_pipeline_buffered_store_chunks(tmp_path):
+    """测试结果经缓冲写入器合并为较大的存储块，且检查点处与存储一致"""
+    forcing = _forcing()
+    _, Q = _reference(forcing)
+    checkpoint = tmp_path / 'run.ckpt'
+    
+    store = ChunkedArrayStore(tmp_path / 'store')
+    _build_runner(20).run(forcing, store, stop=130, checkpoint_path=checkpoint,
+                          checkpoint_every=3, store_chunk_size=100)
+    assert [c['stop'] for c in store.meta['chunks']] == [60, 120, 130]
+    
+    store = ChunkedArrayStore(tmp_path / 'store')
+    _build_runner(20).run(forcing, store, checkpoint_path=checkpoint, store_chunk_size=100)
+    np.testing.assert_allclose(store.read('Q'), Q, rtol=1e-12, atol=1e-12)
+    assert all(c['stop'] - c['start'] <= 100 for c in store.meta['chunks'])
+
+
+def test_chunked_array_store_truncate(tmp_path):
+    """测试分块存储的截断"""
+    store = ChunkedArrayStore(tmp_path / 'store')
+    store.append({'x': np.arange(10.0)})
+    store.append({'x': np.arange(10.0, 15.0)})
+    
+    with pytest.raises(ValueError):
+        store.truncate(12)
+    
+    store.truncate(10)
+    assert len(store) == 10
+    np.testing.assert_array_equal(ChunkedArrayStore(tmp_path / 'store').read('x'),
+                                  np.arange(10.0))
+
+
+def test_assimilation_operator_chunked():
+    """测试同化算子分块运行与整段运行一致"""
+    from code.core.assimilation import EnKF
+    from code.core.pipeline import AssimilationOperator
+    
+    rng = np.random.default_rng(1)
+    n_steps = 60
+    forcing = {
+        'u': rng.normal(0.0, 0.1, (n_steps, 1)),
+        'obs': np.where(rng.random((n_steps, 1)) < 0.5, rng.normal(0.0, 0.5, (n_steps, 1)), np.nan),
+    }
+    
+    def run(chunk_size):
+        np.random.seed(7)
+        enkf = EnKF(lambda x, u: 0.9 * x + u, n_ensemble=20, state_dim=1)
+        enkf.initialize_ensemble(np.zeros(1), np.ones(1))
+        op = AssimilationOperator(enkf, lambda x: x, 0.5, inputs=['u', 'obs'],
+                                  process_noise_std=0.1)
+        return PipelineRunner([op], ['state_mean'], chunk_size=chunk_size).run(forcing)
+    
+    np.testing.assert_allclose(run(13)['state_mean'], run(n_steps)['state_mean'])
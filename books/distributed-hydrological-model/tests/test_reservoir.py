@@ -0,0 +1,145 @@
+"""
+测试水库调度模块
+==============
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import numpy as np
+import pytest
+
+from code.core.reservoir import (
+    ReservoirRules, LevelStorageTable, BatchRuleSimulator,
+    simulate_cascade, optimize_reservoir_operation
+)
+from code.core.reservoir.operation_rules import FloodControlRule, ConservationRule
+
+
+def _create_reservoir():
+    """创建测试水库"""
+    reservoir = ReservoirRules()
+    reservoir.set_characteristics(
+        dead_level=100.0,
+        normal_level=110.0,
+        flood_limit_level=115.0,
+        design_flood_level=120.0,
+        max_level=125.0,
+        dead_storage=1000.0,
+        total_storage=10000.0,
+        max_outflow=500.0
+    )
+    reservoir.add_rule(FloodControlRule(115.0, 120.0, 500.0))
+    reservoir.add_rule(ConservationRule(110.0, 100.0, 10.0, 50.0))
+    return reservoir
+
+
+def _flood_inflow(n_days=100, peak=600.0):
+    """洪水入流过程"""
+    inflow = np.ones(n_days) * 50.0
+    inflow[30:40] = np.linspace(50, peak, 10)
+    inflow[40:50] = np.linspace(peak, 50, 10)
+    return inflow
+
+
+def test_level_storage_table():
+    """测试水位-库容-面积关系表"""
+    table = LevelStorageTable([100, 110, 120], [1000, 4000, 9000])
+    
+    assert table.level_to_storage(105.0) == pytest.approx(2500.0)
+    levels = np.array([95.0, 100.0, 117.0, 130.0])
+    np.testing.assert_allclose(table.storage_to_level(table.level_to_storage(levels)),
+                               np.clip(levels, 100, 120))
+    
+    # 默认面积为 dS/dZ
+    assert table.level_to_area(100.0) == pytest.approx(300.0)
+    
+    with pytest.raises(ValueError):
+        LevelStorageTable([100, 100], [1, 2])
+
+
+def test_batch_simulator_matches_operate():
+    """测试批量模拟与逐时段调度结果一致"""
+    reservoir = _create_reservoir()
+    inflow = _flood_inflow()
+    simulator = BatchRuleSimulator.from_rules(reservoir)
+    
+    for initial_level in [101.0, 110.0, 118.0]:
+        expected = reservoir.operate(initial_level, inflow, dt=86400.0)
+        batch = simulator.simulate(inflow, initial_level=initial_level, dt=86400.0)
+        
+        for key in ['level', 'storage', 'outflow', 'zone']:
+            np.testing.assert_allclose(batch[key][0], expected[key])
+
+
+def test_batch_simulator_flood_rule_capacity():
+    """测试防洪规则泄流上限取自 FloodControlRule 而非特征参数"""
+    reservoir = ReservoirRules()
+    reservoir.set_characteristics(100.0, 110.0, 115.0, 120.0, 125.0,
+                                  1000.0, 10000.0, max_outflow=500.0)
+    reservoir.add_rule(FloodControlRule(115.0, 120.0, 300.0))
+    reservoir.add_rule(ConservationRule(110.0, 100.0, 10.0, 50.0))
+    inflow = _flood_inflow(peak=800.0)
+    simulator = BatchRuleSimulator.from_rules(reservoir)
+    
+    for initial_level in [116.0, 121.0]:
+        expected = reservoir.operate(initial_level, inflow, dt=86400.0)
+        batch = simulator.simulate(inflow, initial_level=initial_level, dt=86400.0)
+        np.testing.assert_allclose(batch['outflow'][0], expected['outflow'])
+        np.testing.assert_allclose(batch['level'][0], expected['level'])
+
+
+def test_batch_simulator_candidates():
+    """测试批量方案与逐方案模拟一致"""
+    reservoir = _create_reservoir()
+    inflow = _flood_inflow()
+    simulator = BatchRuleSimulator.from_rules(reservoir)
+    
+    flood_limits = np.linspace(111.0, 118.0, 8)
+    batch = simulator.simulate(inflow, {'flood_limit_level': flood_limits},
+                               initial_level=110.0, dt=86400.0)
+    assert batch['level'].shape == (8, 100)
+    
+    for i, level in enumerate(flood_limits):
+        single = simulator.simulate(inflow, {'flood_limit_level': level},
+                                    initial_level=110.0, dt=86400.0)
+        np.testing.assert_allclose(batch['level'][i], single['level'][0])
+
+
+def test_simulate_cascade():
+    """测试梯级批量调度的水量传递"""
+    upstream = BatchRuleSimulator.from_rules(_create_reservoir())
+    downstream = BatchRuleSimulator.from_rules(_create_reservoir())
+    lateral = [_flood_inflow(), np.full(100, 20.0)]
+    connections = [{'upstream': 0, 'downstream': 1, 'travel_time': 1}]
+    
+    results = simulate_cascade([upstream, downstream], connections, lateral,
+                               [110.0, 110.0], dt=86400.0)
+    
+    np.testing.assert_allclose(results[1]['inflow'][0, 1:-1],
+                               20.0 + results[0]['outflow'][0, :-2])
+
+
+def test_optimize_reservoir_operation():
+    """测试优化调度确实改进目标函数"""
+    reservoir = _create_reservoir()
+    inflow = _flood_inflow()
+    
+    def objective(results):
+        # 最高水位不超过设计洪水位的前提下，尽量减小最大下泄
+        penalty = 1000.0 * max(np.max(results['level']) - 120.0, 0.0)
+        return -np.max(results['outflow']) - penalty
+    
+    default = reservoir.operate(110.0, inflow, dt=86400.0)
+    
+    for method in ['de', 'ga']:
+        best = optimize_reservoir_operation(
+            reservoir, inflow, 110.0, objective,
+            n_iterations=20, population_size=20, method=method,
+            dt=86400.0, seed=42
+        )
+        
+        assert best['best_score'] >= objective(default)
+        assert best['best_score'] == pytest.approx(objective(best))
+        # 精英保留 / 贪婪选择保证最优得分不下降
+        assert np.all(np.diff(best['score_history']) >= 0)
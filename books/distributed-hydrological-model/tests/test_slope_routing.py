@@ -10,7 +10,7 @@ import numpy as np
 import pytest
 
 from code.core.slope_routing import (
-    KinematicWaveSlope, LinearReservoirSlope, NashCascade
+    KinematicWaveSlope, KinematicWavePlanes, LinearReservoirSlope, NashCascade
 )
 from code.core.slope_routing.kinematic_wave import estimate_time_of_concentration
 from code.core.slope_routing.linear_reservoir import estimate_K_from_tc
@@ -335,5 +335,44 @@ def test_linear_reservoir_state():
     assert state['S'] == 30
 
 
+def test_kinematic_wave_planes_mass_balance():
+    """测试多坡面隐式运动波的水量平衡"""
+    params = {
+        'length': np.array([100.0, 150.0, 80.0]),
+        'width': 50.0,
+        'slope': np.array([0.01, 0.02, 0.005]),
+        'manning_n': 0.15,
+        'dt': 60,
+    }
+    planes = KinematicWavePlanes(params)
+    runoff = np.zeros(120)
+    runoff[5:40] = 30.0  # mm/h
+
+    results = planes.run(runoff)
+    Q = results['outlet_discharge']
+    assert Q.shape == (120, 3)
+
+    rain_volume = np.sum(runoff / 1000 / 3600 * 60) * params['length'] * 50.0
+    stored = np.sum(planes.h[:, 1:], axis=1) * planes.dx * 50.0
+    outflow = np.sum(Q, axis=0) * 60
+    assert np.allclose(outflow + stored, rain_volume, rtol=1e-8)
+
+
+def test_kinematic_wave_planes_large_timestep():
+    """测试隐式格式在大时间步长下稳定且趋于平衡流量"""
+    params = {'length': 100.0, 'width': 50.0, 'slope': 0.01,
+              'manning_n': 0.15, 'dt': 1800}
+    planes = KinematicWavePlanes(params, n_planes=2)
+    runoff = np.full(24, 20.0)
+
+    Q = planes.run(runoff)['outlet_discharge']
+    equilibrium = 20.0 / 1000 / 3600 * 100.0 * 50.0
+
+    assert np.all(np.isfinite(Q))
+    assert np.all(Q >= 0)
+    assert np.allclose(Q[-1], equilibrium, rtol=1e-3)
+    assert np.allclose(Q[:, 0], Q[:, 1])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
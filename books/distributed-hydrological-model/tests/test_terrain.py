@@ -0,0 +1,140 @@
+"""
+测试地形分析模块
+==============
+"""
+
+import sys
+sys.path.insert(0, '..')
+
+import numpy as np
+import pytest
+
+from code.core.terrain import (
+    d8_flow_direction, d8_flow_direction_tiled, downstream_index,
+    flow_accumulation, fill_depressions, extract_stream_network,
+    identify_outlet, watershed_mask
+)
+
+
+def _synthetic_dem(ny=40, nx=50, seed=0):
+    """向南倾斜的V形谷地加随机扰动"""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:ny, 0:nx]
+    return 100.0 - 1.0 * y + 0.5 * np.abs(x - nx / 2) + rng.random((ny, nx))
+
+
+def test_d8_flow_direction_codes():
+    """测试D8流向编码"""
+    dem = np.array([[5, 5, 5],
+                    [5, 3, 5],
+                    [5, 1, 5]], dtype=float)
+    flow_dir = d8_flow_direction(dem)
+    
+    assert flow_dir[1, 1] == 4
+    # 边界网格不定义流向
+    assert np.all(flow_dir[0, :] == 0)
+    assert np.all(flow_dir[:, -1] == 0)
+
+
+def test_d8_flow_direction_tiled_matches():
+    """测试分块流向计算与整体计算一致"""
+    dem = _synthetic_dem()
+    
+    expected = d8_flow_direction(dem)
+    tiled = d8_flow_direction_tiled(dem, tile_size=7)
+    
+    np.testing.assert_array_equal(tiled, expected)
+
+
+def test_d8_flow_direction_tiled_memmap(tmp_path):
+    """测试内存映射栅格的分块处理"""
+    dem = _synthetic_dem()
+    src = np.memmap(tmp_path / 'dem.dat', dtype=np.float32, mode='w+', shape=dem.shape)
+    src[:] = dem
+    out = np.memmap(tmp_path / 'fdir.dat', dtype=np.int32, mode='w+', shape=dem.shape)
+    
+    d8_flow_direction_tiled(src, out=out, tile_size=16)
+    
+    np.testing.assert_array_equal(out, d8_flow_direction(np.asarray(src)))
+
+
+def test_flow_accumulation_matches_path_tracing():
+    """测试汇流累积与逐网格追踪结果一致"""
+    flow_dir = d8_flow_direction(_synthetic_dem())
+    acc = flow_accumulation(flow_dir)
+    
+    down = downstream_index(flow_dir)
+    expected = np.zeros(down.size, dtype=int)
+    for start in range(down.size):
+        cell = start
+        while cell >= 0:
+            expected[cell] += 1
+            cell = down[cell]
+    
+    np.testing.assert_array_equal(acc.ravel(), expected)
+    
+    # 所有网格最终汇入汇点
+    assert acc.ravel()[down < 0].sum() == flow_dir.size
+
+
+def test_flow_accumulation_weights():
+    """测试加权汇流累积"""
+    flow_dir = d8_flow_direction(_synthetic_dem())
+    weights = np.full(flow_dir.shape, 0.5)
+    
+    acc = flow_accumulation(flow_dir, weights=weights)
+    
+    np.testing.assert_allclose(acc, 0.5 * flow_accumulation(flow_dir))
+
+
+def test_fill_depressions():
+    """测试洼地填充"""
+    dem = np.array([[5, 5, 5, 5],
+                    [5, 1, 2, 5],
+                    [5, 2, 1, 5],
+                    [5, 5, 4, 5]], dtype=float)
+    
+    filled = fill_depressions(dem, use_richdem=False)
+    
+    # 洼地被填到溢出点高程，其余网格不变
+    np.testing.assert_allclose(filled[1:3, 1:3], 4.0)
+    assert filled[3, 2] == 4.0
+    assert np.all(filled >= dem)
+
+
+def test_fill_depressions_epsilon_drains():
+    """测试带微小坡度的填洼使所有内部网格都有流向"""
+    dem = _synthetic_dem(seed=3)
+    dem[10:15, 20:25] -= 20.0
+    
+    filled = fill_depressions(dem, epsilon=1e-4, use_richdem=False)
+    flow_dir = d8_flow_direction(filled)
+    
+    assert np.all(flow_dir[1:-1, 1:-1] > 0)
+
+
+def test_fill_depressions_epsilon_independent_of_richdem():
+    """测试epsilon增量不受是否使用richdem影响"""
+    dem = _synthetic_dem(seed=3)
+    dem[10:15, 20:25] -= 20.0
+    
+    expected = fill_depressions(dem, epsilon=1e-3, use_richdem=False)
+    np.testing.assert_array_equal(fill_depressions(dem, epsilon=1e-3), expected)
+    np.testing.assert_allclose(fill_depressions(dem), fill_depressions(dem, use_richdem=False))
+
+
+def test_streams_and_watershed():
+    """测试河网提取、出口识别与流域划分"""
+    dem = fill_depressions(_synthetic_dem(), epsilon=1e-4, use_richdem=False)
+    flow_dir = d8_flow_direction(dem)
+    acc = flow_accumulation(flow_dir)
+    
+    stream = extract_stream_network(acc, threshold=20)
+    assert stream.dtype == bool
+    assert stream.sum() > 0
+    
+    outlet = identify_outlet(flow_dir, acc)
+    assert acc[outlet] == acc[[0, -1], :].max() or acc[outlet] == acc[:, [0, -1]].max()
+    
+    mask = watershed_mask(flow_dir, outlet)
+    assert mask.sum() == acc[outlet]
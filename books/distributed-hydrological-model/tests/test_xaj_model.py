@@ -9,7 +9,7 @@ sys.path.insert(0, '..')
 import numpy as np
 import pytest
 
-from code.core.runoff_generation import XinAnJiangModel, create_default_xaj_params
+from code.core.runoff_generation import XinAnJiangModel, XinAnJiangGrid, create_default_xaj_params
 
 
 def test_create_default_params():
@@ -122,5 +122,38 @@ def test_model_reset():
     np.testing.assert_array_almost_equal(results1['R'], results2['R'])
 
 
+def test_xaj_grid_matches_scalar_model():
+    """测试向量化新安江模型与逐个实例运行一致"""
+    params = create_default_xaj_params('humid')
+    WM = np.array([120.0, 150.0, 180.0])
+    grid_params = dict(params, WM=WM)
+
+    rng = np.random.default_rng(0)
+    P = rng.exponential(8.0, size=(30, 3))
+    EM = np.full(30, 4.0)
+
+    grid = XinAnJiangGrid(grid_params)
+    grid_results = grid.run(P, EM)
+
+    for i in range(3):
+        model = XinAnJiangModel(dict(params, WM=WM[i]))
+        results = model.run(P[:, i], EM)
+        for key in ('Q', 'R', 'E', 'W', 'S'):
+            assert np.allclose(grid_results[key][:, i], results[key])
+
+
+def test_xaj_grid_state_array_roundtrip():
+    """测试状态数组读写"""
+    grid = XinAnJiangGrid(create_default_xaj_params('humid'), n=5)
+    grid.step(10.0, 3.0)
+
+    states = grid.get_state_array()
+    assert states.shape == (5, len(XinAnJiangGrid.STATE_KEYS))
+
+    grid.reset()
+    grid.set_state_array(states)
+    assert np.allclose(grid.get_state_array(), states)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -93,36 +93,41 @@ class ShallowWater2D:
         # 计算通量
         F, G = self.compute_fluxes()
         
-        # 更新（简化的有限差分）
-        for i in range(1, self.ny-1):
-            for j in range(1, self.nx-1):
-                # 连续方程
-                dh_dt = -(F[i, j+1, 0] - F[i, j-1, 0]) / (2*self.dx) - \
-                        (G[i+1, j, 0] - G[i-1, j, 0]) / (2*self.dy)
-                
-                # 动量方程
-                if h_old[i, j] > 0.01:
-                    # x动量
-                    du_dt = -(F[i, j+1, 1] - F[i, j-1, 1]) / (2*self.dx*h_old[i, j]) - \
-                            (G[i+1, j, 1] - G[i-1, j, 1]) / (2*self.dy*h_old[i, j]) - \
-                            self.g * (self.z[i, j+1] - self.z[i, j-1]) / (2*self.dx)
-                    
-                    # y动量
-                    dv_dt = -(F[i, j+1, 2] - F[i, j-1, 2]) / (2*self.dx*h_old[i, j]) - \
-                            (G[i+1, j, 2] - G[i-1, j, 2]) / (2*self.dy*h_old[i, j]) - \
-                            self.g * (self.z[i+1, j] - self.z[i-1, j]) / (2*self.dy)
-                    
-                    # 底部摩擦
-                    velocity_mag = np.sqrt(u_old[i, j]**2 + v_old[i, j]**2)
-                    if velocity_mag > 0:
-                        friction = self.g * manning_n**2 * velocity_mag / h_old[i, j]**(4/3)
-                        du_dt -= friction * u_old[i, j]
-                        dv_dt -= friction * v_old[i, j]
-                    
-                    self.u[i, j] = u_old[i, j] + du_dt * dt
-                    self.v[i, j] = v_old[i, j] + dv_dt * dt
-                
-                self.h[i, j] = max(h_old[i, j] + dh_dt * dt, 0)
+        # 更新（简化的有限差分，内部单元整体切片计算）
+        c = (slice(1, -1), slice(1, -1))
+        e, w = (slice(1, -1), slice(2, None)), (slice(1, -1), slice(None, -2))
+        n, s = (slice(2, None), slice(1, -1)), (slice(None, -2), slice(1, -1))
+        
+        # 连续方程
+        dh_dt = -(F[e][..., 0] - F[w][..., 0]) / (2*self.dx) - \
+                (G[n][..., 0] - G[s][..., 0]) / (2*self.dy)
+        
+        # 动量方程（仅湿单元）
+        h_c = h_old[c]
+        wet = h_c > 0.01
+        h_w = np.where(wet, h_c, 1.0)
+        
+        # x动量
+        du_dt = -(F[e][..., 1] - F[w][..., 1]) / (2*self.dx*h_w) - \
+                (G[n][..., 1] - G[s][..., 1]) / (2*self.dy*h_w) - \
+                self.g * (self.z[e] - self.z[w]) / (2*self.dx)
+        
+        # y动量
+        dv_dt = -(F[e][..., 2] - F[w][..., 2]) / (2*self.dx*h_w) - \
+                (G[n][..., 2] - G[s][..., 2]) / (2*self.dy*h_w) - \
+                self.g * (self.z[n] - self.z[s]) / (2*self.dy)
+        
+        # 底部摩擦
+        u_c, v_c = u_old[c], v_old[c]
+        velocity_mag = np.sqrt(u_c**2 + v_c**2)
+        friction = np.where(velocity_mag > 0,
+                            self.g * manning_n**2 * velocity_mag / h_w**(4/3), 0.0)
+        du_dt -= friction * u_c
+        dv_dt -= friction * v_c
+        
+        self.u[c] = np.where(wet, u_c + du_dt * dt, u_c)
+        self.v[c] = np.where(wet, v_c + dv_dt * dt, v_c)
+        self.h[c] = np.maximum(h_c + dh_dt * dt, 0)
         
         # 边界条件（简化）
         self.h[0, :] = self.h[1, :]
@@ -73,7 +73,7 @@ class ThermalStratificationModel:
             稳定度 (J/m²)
         """
         # 计算各层密度
-        rho = np.array([self.water_density(T) for T in self.temperature])
+        rho = self.water_density(self.temperature)
         
         # 计算平均密度
         rho_mean = np.mean(rho)
@@ -82,9 +82,7 @@ class ThermalStratificationModel:
         g = 9.81  # 重力加速度
         A = 1.0   # 假设单位面积
         
-        S = 0
-        for i in range(self.n_layers):
-            S += g * A * self.dz * (self.z[i] - self.depth/2) * (rho[i] - rho_mean)
+        S = g * A * self.dz * np.sum((self.z - self.depth/2) * (rho - rho_mean))
         
         return abs(S)
     
@@ -250,31 +248,18 @@ class DissolvedOxygenModel:
         
         DO = self.DO.copy()
         
+        # 各层耗氧速率与表层复氧参数不随时间变化，循环外计算一次
+        R = np.array([self.oxygen_consumption_rate(z) for z in self.z])
+        DO_sat = self.DO_saturation(self.temperature[0])
+        K_a = self.reaeration_rate(wind_speed, self.temperature[0])
+        
         for step in range(n_steps):
-            # 对每一层
-            for i in range(self.n_layers):
-                T = self.temperature[i]
-                z = self.z[i]
-                
-                # 饱和浓度
-                DO_sat = self.DO_saturation(T)
-                
-                # 复氧系数（表层）
-                if i == 0:  # 表层
-                    K_a = self.reaeration_rate(wind_speed, T)
-                    reaeration = K_a * (DO_sat - DO[i])
-                else:
-                    reaeration = 0
-                
-                # 耗氧速率
-                R = self.oxygen_consumption_rate(z)
-                
-                # 更新DO
-                dDO_dt = reaeration - R
-                DO[i] += dDO_dt * dt
-                
-                # 确保DO不为负
-                DO[i] = max(DO[i], 0)
+            # 全部分层同时更新，只有表层复氧
+            dDO_dt = -R.copy()
+            dDO_dt[0] += K_a * (DO_sat - DO[0])
+            
+            # 确保DO不为负
+            DO = np.maximum(DO + dDO_dt * dt, 0)
         
         self.DO = DO
         return DO
@@ -134,6 +134,78 @@ def hardy_cross_iteration(pipes, loops, Q_init, tol=1e-4, max_iter=50):
     return Q, max_iter, residuals
 
 
+def global_gradient_method(pipes, demands, source, H_source=50.0, tol=1e-8, max_iter=50):
+    """
+    全局梯度法（节点法Newton-Raphson）求解管网
+    
+    各管段 hL = r·|Q|^(n-1)·Q，未知节点水头与管段流量联立：
+        A11·Q + A12·H = -A10·H0        （能量方程）
+        A21·Q = q                      （连续方程）
+    每步消去ΔQ，只解节点水头方程组 (A21·D⁻¹·A12)·H = F，
+    一次同时修正全部环路，不需要人工划分环路和初始流量平衡。
+    
+    参数:
+        pipes: 管道字典 {pipe_id: {'L', 'd', 'C', 'nodes': (起点, 终点)}}
+        demands: 节点需水量 {node_id: q} (m³/s)，不含水源节点
+        source: 水源节点名
+        H_source: 水源水头 (m)
+        tol: 流量收敛精度 (m³/s)
+        max_iter: 最大迭代次数
+    
+    返回:
+        Q: 管段流量 {pipe_id: Q}
+        H: 节点水头 {node_id: H}
+        iterations: 迭代次数
+    """
+    n = 1.852
+    pipe_ids = list(pipes.keys())
+    node_ids = list(demands.keys())
+    index = {node: i for i, node in enumerate(node_ids)}
+    
+    # 关联矩阵：起点 -1，终点 +1（水源列单独存放）
+    A = np.zeros((len(pipe_ids), len(node_ids)))
+    A0 = np.zeros(len(pipe_ids))
+    for k, pipe_id in enumerate(pipe_ids):
+        for node, sign in zip(pipes[pipe_id]['nodes'], (-1.0, 1.0)):
+            if node == source:
+                A0[k] = sign
+            else:
+                A[k, index[node]] = sign
+    
+    r = np.array([10.67 * pipes[p]['L'] / (pipes[p].get('C', 100)**n * pipes[p]['d']**4.87)
+                  for p in pipe_ids])
+    q = np.array([demands[node] for node in node_ids])
+    Q = np.full(len(pipe_ids), 0.01)
+    
+    print(f"\n=== 全局梯度法迭代 ===")
+    print(f"{'Iter':<6} {'Max|ΔQ| (m³/s)':<18}")
+    print("-" * 30)
+    
+    for iteration in range(max_iter):
+        hL = r * np.abs(Q)**(n - 1) * Q
+        D = np.maximum(n * r * np.abs(Q)**(n - 1), 1e-8)
+        
+        # 能量方程：hL + A·H + A0·H0 = 0（A·H = H终 - H起），线性化后
+        #   Q' = Q - (hL + A·H + A0·H0) / D
+        # 代入连续方程 Aᵀ·Q' = q，得节点方程：
+        #   (Aᵀ·D⁻¹·A)·H = Aᵀ·(Q - (hL + A0·H0) / D) - q
+        M = A.T @ (A / D[:, None])
+        F = A.T @ (Q - (hL + A0 * H_source) / D) - q
+        H = np.linalg.solve(M, F)
+        
+        Q_new = Q - (hL + A @ H + A0 * H_source) / D
+        delta_Q = np.abs(Q_new - Q).max()
+        Q = Q_new
+        print(f"{iteration+1:<6} {delta_Q:<18.3e}")
+        
+        if delta_Q < tol:
+            break
+    
+    return (dict(zip(pipe_ids, Q)),
+            {source: H_source, **dict(zip(node_ids, H))},
+            iteration + 1)
+
+
 def plot_pipe_network_analysis(pipes, Q_final, nodes, filename='pipe_network_hardy_cross.png'):
     """
     绘制管网分析图（4子图）
@@ -360,6 +432,17 @@ def main():
         
         print(f"  环路{loop_idx+1}：ΣhL = {sum_hL:.6f} m ≈ 0 ✓")
     
+    # 全局梯度法校核：节点需水量由初始流量的节点平衡得到
+    demands = {'B': 0.02, 'C': 0.01, 'D': 0.01}
+    Q_gga, H_gga, iter_gga = global_gradient_method(pipes, demands, source='A')
+    
+    print(f"\n【全局梯度法校核】（{iter_gga}次迭代，Hardy-Cross {iterations}轮）")
+    for pipe_id in sorted(pipes.keys()):
+        print(f"  管段{pipe_id}：Hardy-Cross Q = {Q_final[pipe_id]:.5f}，"
+              f"全局梯度法 Q = {Q_gga[pipe_id]:.5f} m³/s")
+    for node_id in sorted(H_gga.keys()):
+        print(f"  节点{node_id}：H = {H_gga[node_id]:.3f} m")
+    
     # 绘图
     print(f"\n正在生成分析图...")
     plot_pipe_network_analysis(pipes, Q_final, nodes)
@@ -0,0 +1,22 @@
+"""
+性能基准测试模块
+求解器吞吐量、峰值内存和缩放曲线的测量与基准比较
+"""
+
+from .solver_benchmarks import (
+    BENCHMARKS,
+    measure,
+    run_suite,
+    save_results,
+    load_results,
+    compare_to_baseline,
+)
+
+__all__ = [
+    "BENCHMARKS",
+    "measure",
+    "run_suite",
+    "save_results",
+    "load_results",
+    "compare_to_baseline",
+]
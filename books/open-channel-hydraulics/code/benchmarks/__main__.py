@@ -0,0 +1,9 @@
+"""
+命令行入口：python -m benchmarks [--quick] [--update-baseline] ...
+"""
+
+import sys
+
+from .solver_benchmarks import main
+
+sys.exit(main())
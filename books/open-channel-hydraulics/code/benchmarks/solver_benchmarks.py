@@ -0,0 +1,413 @@
+"""
+求解器性能基准测试
+
+覆盖的求解器（每项取若干问题规模）：
+  saint_venant       SaintVenantSolver.run            吞吐量：断面·时间步/s
+  water_profile      WaterSurfaceProfile.compute_profile   断面/s
+  normal_depth       TrapezoidalChannel 正常水深（逐个牛顿迭代）  次/s
+  critical_depth     TrapezoidalChannel 临界水深（逐个迭代）      次/s
+  depth_batch        BatchProfileSolver 正常+临界水深（向量化）   次/s
+  pipe_network       PipeNetwork.solve（网格管网）    连接·迭代/s
+  moc                MOCNetwork.run（网格管网）       断面·时间步/s
+
+每个规模记录：计算量、最短耗时（多次重复取最小值）、吞吐量、
+峰值内存（tracemalloc，单独运行一次），并按 log-log 拟合耗时随
+实际计算量的增长指数（缩放曲线；1 表示吞吐量不随规模变化）。
+按实际计算量而非名义规模拟合，例如水面曲线到达正常水深附近
+提前结束时，推算断面数少于名义断面数。结果写入 JSON，可与保存的基准文件
+比较，吞吐量下降或内存增长超过容许倍数时判为性能回退。
+
+用法（在 code 目录下）：
+  python -m benchmarks                     运行全部规模并与基准比较
+  python -m benchmarks --quick             只运行小规模
+  python -m benchmarks --update-baseline   重新生成基准文件（基准与机器相关）
+
+作者：CHS-Books项目
+日期：2025-10-30
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models.channel import TrapezoidalChannel
+from solvers.saint_venant import SaintVenantSolver
+from solvers.steady.profile import WaterSurfaceProfile
+from solvers.steady.batch_profile import BatchProfileSolver
+from solvers.pipe_network import PipeNetwork
+from solvers.moc import MOCNetwork
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# (准备函数, 计算函数)：准备函数构造问题（不计时），计算函数返回计算量
+Case = Tuple[Callable[[], object], Callable[[object], float]]
+
+
+# ============================================================================
+# 基准问题
+# ============================================================================
+
+def saint_venant_case(nx: int) -> Case:
+    """矩形河道上游涨水演进：dx = 100 m，模拟 1800 s（时间步数与规模无关）"""
+    def setup():
+        solver = SaintVenantSolver(L=100.0 * (nx - 1), b=20.0, S0=0.001, n=0.03, dx=100.0)
+        solver.set_uniform_initial(2.0, 40.0)
+        solver.set_boundary_conditions(upstream=lambda t: (2.5, 60.0))
+        return solver
+
+    def run(solver):
+        solver.run(1800.0)
+        return solver.nx * solver.time_step
+
+    return setup, run
+
+
+def water_profile_case(n_sections: int) -> Case:
+    """梯形渠道M1壅水曲线，标准步长法逐断面推算"""
+    channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.0005)
+
+    def setup():
+        return WaterSurfaceProfile(channel, Q=30.0, dx=10.0)
+
+    def run(profile):
+        result = profile.compute_profile(4.0, 10.0 * n_sections)
+        return len(result['h'])
+
+    return setup, run
+
+
+def _discharges(n: int) -> np.ndarray:
+    return np.linspace(1.0, 100.0, n)
+
+
+def normal_depth_case(n: int) -> Case:
+    """逐个流量求正常水深（标量牛顿迭代）"""
+    def setup():
+        return TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.0005), _discharges(n)
+
+    def run(problem):
+        channel, Q = problem
+        for q in Q:
+            channel.compute_normal_depth(q)
+        return len(Q)
+
+    return setup, run
+
+
+def critical_depth_case(n: int) -> Case:
+    """逐个流量求临界水深"""
+    def setup():
+        return TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.0005), _discharges(n)
+
+    def run(problem):
+        channel, Q = problem
+        for q in Q:
+            channel.compute_critical_depth(q)
+        return len(Q)
+
+    return setup, run
+
+
+def depth_batch_case(n: int) -> Case:
+    """批量求正常水深和临界水深（断面水力要素表 + 向量化迭代）"""
+    def setup():
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.0005)
+        return BatchProfileSolver(channel), _discharges(n)
+
+    def run(problem):
+        solver, Q = problem
+        solver.normal_depth(Q)
+        solver.critical_depth(Q)
+        return 2 * len(Q)
+
+    return setup, run
+
+
+def pipe_network_case(n: int) -> Case:
+    """n×n 网格供水管网（Darcy-Weisbach），冷启动求解一次"""
+    def setup():
+        rng = np.random.default_rng(0)
+        net = PipeNetwork('D-W')
+        net.add_reservoir('R1', 80.0)
+        net.add_reservoir('R2', 75.0)
+        for i in range(n):
+            for j in range(n):
+                net.add_junction(f'{i}_{j}', demand=rng.uniform(0.0, 2e-3))
+        net.add_pipe('f1', 'R1', '0_0', 500.0, 0.8)
+        net.add_pipe('f2', 'R2', f'{n-1}_{n-1}', 500.0, 0.8)
+        for i in range(n):
+            for j in range(n):
+                if i + 1 < n:
+                    net.add_pipe(f'x{i}_{j}', f'{i}_{j}', f'{i+1}_{j}',
+                                 rng.uniform(100.0, 300.0), rng.choice([0.15, 0.2, 0.3, 0.4]))
+                if j + 1 < n:
+                    net.add_pipe(f'y{i}_{j}', f'{i}_{j}', f'{i}_{j+1}',
+                                 rng.uniform(100.0, 300.0), rng.choice([0.15, 0.2, 0.3, 0.4]))
+        return net
+
+    def run(net):
+        result = net.solve()
+        return len(result['links']) * result['iterations']
+
+    return setup, run
+
+
+def moc_case(n: int) -> Case:
+    """n×n 网格管网末端阀门关闭水锤，计算 5 s"""
+    def setup():
+        rng = np.random.default_rng(0)
+        net = MOCNetwork(dt=0.02)
+        net.add_reservoir('R', 120.0)
+        for i in range(n):
+            for j in range(n):
+                if (i, j) == (n - 1, n - 1):
+                    net.add_valve(f'N{i}_{j}', Cv=0.05, opening=lambda t: max(1.0 - t, 0.0))
+                else:
+                    net.add_junction(f'N{i}_{j}', demand=0.002)
+        net.add_pipe('feed', 'R', 'N0_0', 800.0, 0.8, 1100.0, 0.018)
+        for i in range(n):
+            for j in range(n):
+                if i + 1 < n:
+                    net.add_pipe(f'x{i}_{j}', f'N{i}_{j}', f'N{i+1}_{j}',
+                                 rng.uniform(200.0, 600.0), 0.3, 1000.0, 0.02)
+                if j + 1 < n:
+                    net.add_pipe(f'y{i}_{j}', f'N{i}_{j}', f'N{i}_{j+1}',
+                                 rng.uniform(200.0, 600.0), 0.3, 1000.0, 0.02)
+        net.initialize()
+        return net
+
+    def run(net):
+        net.run(5.0, record_every=50)
+        return net.n_sections * round(net.t / net.dt)
+
+    return setup, run
+
+
+# 名称: (问题构造函数, 吞吐量单位, 完整规模, 快速规模)
+BENCHMARKS: Dict[str, Tuple[Callable[[int], Case], str, List[int], List[int]]] = {
+    'saint_venant': (saint_venant_case, 'cell-updates/s', [101, 401, 1601], [101, 401]),
+    'water_profile': (water_profile_case, 'sections/s', [100, 400, 1600], [100, 400]),
+    'normal_depth': (normal_depth_case, 'solves/s', [10, 100, 1000], [10, 100]),
+    'critical_depth': (critical_depth_case, 'solves/s', [10, 100, 1000], [10, 100]),
+    'depth_batch': (depth_batch_case, 'solves/s', [100, 1000, 10000], [100, 1000]),
+    'pipe_network': (pipe_network_case, 'link-iterations/s', [10, 20, 40, 70], [10, 20]),
+    'moc': (moc_case, 'cell-updates/s', [4, 8, 16], [4, 8]),
+}
+
+
+# ============================================================================
+# 计时与统计
+# ============================================================================
+
+def measure(case: Case, repeat: int = 3) -> Dict[str, float]:
+    """
+    测量单个问题：计时取多次重复的最小值，峰值内存单独运行一次
+
+    参数：
+        case: (准备函数, 计算函数)
+        repeat: 计时重复次数
+
+    返回：
+        dict: {'work', 'time', 'throughput', 'peak_memory_mb'}
+    """
+    setup, run = case
+    times = []
+    for _ in range(repeat):
+        problem = setup()
+        start = time.perf_counter()
+        work = run(problem)
+        times.append(time.perf_counter() - start)
+
+    problem = setup()
+    tracemalloc.start()
+    try:
+        run(problem)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'work': float(work),
+        'time': best,
+        'throughput': work / best,
+        'peak_memory_mb': peak / 2**20,
+    }
+
+
+def scaling_exponent(work, times) -> float:
+    """耗时随计算量增长的指数 p（time ∝ work^p，log-log 最小二乘拟合）"""
+    if len(work) < 2:
+        return float('nan')
+    return float(np.polyfit(np.log(work), np.log(times), 1)[0])
+
+
+def run_suite(names: Optional[List[str]] = None, quick: bool = False,
+              repeat: int = 3, verbose: bool = False) -> Dict:
+    """
+    运行基准测试
+
+    参数：
+        names: 要运行的基准名称列表，None 表示全部
+        quick: 只运行小规模
+        repeat: 每个规模的计时重复次数
+        verbose: 是否打印每个规模的结果
+
+    返回：
+        dict: {'meta': 运行环境, 'benchmarks': {名称: {'unit', 'points', 'scaling_exponent'}}}
+    """
+    names = list(BENCHMARKS) if names is None else names
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        raise ValueError(f"未知基准: {sorted(unknown)}")
+
+    benchmarks = {}
+    for name in names:
+        make_case, unit, sizes, quick_sizes = BENCHMARKS[name]
+        points = []
+        for size in (quick_sizes if quick else sizes):
+            point = {'size': size, **measure(make_case(size), repeat)}
+            points.append(point)
+            if verbose:
+                print(f"  {name:<15} size={size:<6} {point['throughput']:12.4g} {unit:<18} "
+                      f"t={point['time']*1e3:9.2f} ms  mem={point['peak_memory_mb']:8.2f} MB")
+
+        benchmarks[name] = {
+            'unit': unit,
+            'points': points,
+            'scaling_exponent': scaling_exponent([p['work'] for p in points],
+                                                 [p['time'] for p in points]),
+        }
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'quick': quick,
+        },
+        'benchmarks': benchmarks,
+    }
+
+
+# ============================================================================
+# 结果存储与基准比较
+# ============================================================================
+
+def save_results(results: Dict, path: str):
+    """将结果写入 JSON 文件"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path: str) -> Dict:
+    """读取 JSON 结果文件"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_to_baseline(results: Dict, baseline: Dict, tolerance: float = 2.0,
+                        memory_tolerance: float = 1.5) -> List[Dict]:
+    """
+    与基准结果比较，找出性能回退
+
+    同一基准、同一规模下：吞吐量低于 基准/tolerance，或峰值内存高于
+    基准×memory_tolerance（且增加超过 1 MB）时判为回退。基准文件中没有
+    的规模不比较。
+
+    参数：
+        results: run_suite 的结果
+        baseline: 基准结果（同样格式）
+        tolerance: 吞吐量容许下降倍数
+        memory_tolerance: 峰值内存容许增长倍数
+
+    返回：
+        list: 回退项 [{'benchmark', 'size', 'metric', 'value', 'baseline', 'ratio'}]
+    """
+    regressions = []
+    for name, bench in results['benchmarks'].items():
+        reference = baseline.get('benchmarks', {}).get(name)
+        if reference is None:
+            continue
+        by_size = {p['size']: p for p in reference['points']}
+        for point in bench['points']:
+            ref = by_size.get(point['size'])
+            if ref is None:
+                continue
+            if point['throughput'] < ref['throughput'] / tolerance:
+                regressions.append({
+                    'benchmark': name, 'size': point['size'], 'metric': 'throughput',
+                    'value': point['throughput'], 'baseline': ref['throughput'],
+                    'ratio': point['throughput'] / ref['throughput'],
+                })
+            if (point['peak_memory_mb'] > ref['peak_memory_mb'] * memory_tolerance and
+                    point['peak_memory_mb'] - ref['peak_memory_mb'] > 1.0):
+                regressions.append({
+                    'benchmark': name, 'size': point['size'], 'metric': 'peak_memory_mb',
+                    'value': point['peak_memory_mb'], 'baseline': ref['peak_memory_mb'],
+                    'ratio': point['peak_memory_mb'] / ref['peak_memory_mb'],
+                })
+    return regressions
+
+
+def print_report(results: Dict, regressions: Optional[List[Dict]] = None):
+    """打印缩放指数和回退项"""
+    print(f"\n{'基准':<15} {'单位':<18} {'缩放指数':>8}   最大规模吞吐量")
+    print("-" * 65)
+    for name, bench in results['benchmarks'].items():
+        last = bench['points'][-1]
+        print(f"{name:<15} {bench['unit']:<18} {bench['scaling_exponent']:8.2f}   "
+              f"{last['throughput']:.4g} (size={last['size']})")
+
+    if regressions is None:
+        return
+    if not regressions:
+        print("\n✓ 未发现性能回退")
+        return
+    print(f"\n⚠ 发现 {len(regressions)} 项性能回退：")
+    for r in regressions:
+        print(f"  {r['benchmark']:<15} size={r['size']:<6} {r['metric']:<15} "
+              f"{r['value']:.4g} / 基准 {r['baseline']:.4g} = {r['ratio']:.2f}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口，发现性能回退时返回 1"""
+    parser = argparse.ArgumentParser(description="明渠/管网求解器性能基准测试")
+    parser.add_argument('names', nargs='*', help="要运行的基准（默认全部）")
+    parser.add_argument('--quick', action='store_true', help="只运行小规模")
+    parser.add_argument('--repeat', type=int, default=3, help="计时重复次数")
+    parser.add_argument('--output', default=None, help="结果 JSON 文件")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="基准 JSON 文件")
+    parser.add_argument('--update-baseline', action='store_true', help="用本次结果覆盖基准文件")
+    parser.add_argument('--tolerance', type=float, default=2.0, help="吞吐量容许下降倍数")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.names or None, quick=args.quick, repeat=args.repeat, verbose=True)
+    if args.output:
+        save_results(results, args.output)
+
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print_report(results)
+        print(f"\n基准文件已更新: {args.baseline}")
+        return 0
+
+    regressions = None
+    if os.path.exists(args.baseline):
+        regressions = compare_to_baseline(results, load_results(args.baseline), args.tolerance)
+    print_report(results, regressions)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -28,7 +28,7 @@ import matplotlib.pyplot as plt
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from models.channel import RectangularChannel
-from solvers.saint_venant import SaintVenantSolver
+from solvers.finite_volume import FiniteVolumeSolver
 
 plt.rcParams['font.sans-serif'] = ['SimHei', 'DejaVu Sans']
 plt.rcParams['axes.unicode_minus'] = False
@@ -223,11 +223,11 @@ def main():
     print("\n【步骤5】创建洪水演进求解器")
     print("-" * 80)
 
-    solver = SaintVenantSolver(L=L, b=b, S0=S0, n=n, dx=dx, dt=None, g=g)
+    solver = FiniteVolumeSolver(L=L, b=b, S0=S0, n=n, dx=dx, dt=None, g=g)
     solver.set_uniform_initial(h0=h_base, Q0=Q_base)
 
     print(f"求解器：{solver}")
-    print(f"时间步长：自动调整（CFL条件）")
+    print(f"时间步长：自动调整（CFL条件，HLL+MUSCL有限体积格式）")
 
     # 创建上游洪水过程线
     t_hydrograph = np.linspace(0, t_duration, 1000)
@@ -27,7 +27,7 @@ import matplotlib.pyplot as plt
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
 from models.channel import RectangularChannel
-from solvers.saint_venant import SaintVenantSolver
+from solvers.finite_volume import FiniteVolumeSolver
 from utils.chinese_font import configure_chinese_font
 
 # 配置中文字体
@@ -287,10 +287,10 @@ def main():
     print(f"\n数值网格：")
     print(f"  空间步长 Δx = {dx} m")
     print(f"  节点数 nx = {nx}")
-    print(f"  时间步长：自动（CFL=0.4）")
+    print(f"  时间步长：自动（CFL=0.9，HLL+MUSCL有限体积格式）")
 
     # 创建求解器
-    solver = SaintVenantSolver(L=L, b=b, S0=S0, n=n, dx=dx, dt=None, g=g)
+    solver = FiniteVolumeSolver(L=L, b=b, S0=S0, n=n, dx=dx, dt=None, g=g)
 
     # 初始条件：溃坝前状态
     h_init = np.zeros(nx)
@@ -6,7 +6,7 @@
 
 方法：
 - 二维浅水波方程
-- 有限体积法（Lax-Friedrichs通量）
+- 有限体积法（HLL通量 + 静水重构，向量化计算）
 - 干湿处理
 
 作者：CHS-Books项目
@@ -23,6 +23,8 @@ from matplotlib import font_manager
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
 
+from solvers.shallow_water_2d import ShallowWater2DSolver as _FiniteVolume2D
+
 
 def print_separator(title="", width=80):
     """打印分隔线"""
@@ -34,7 +36,7 @@ def print_separator(title="", width=80):
         print(f"{'='*width}")
 
 
-class ShallowWater2DSolver:
+class ShallowWater2DSolver(_FiniteVolume2D):
     """二维浅水波方程求解器
 
     求解方程组：
@@ -42,7 +44,8 @@ class ShallowWater2DSolver:
     ∂(hu)/∂t + ∂(hu²+gh²/2)/∂x + ∂(huv)/∂y = S_x
     ∂(hv)/∂t + ∂(huv)/∂x + ∂(hv²+gh²/2)/∂y = S_y
 
-    其中源项包括底坡和摩阻
+    其中源项包括底坡和摩阻。数值格式见 solvers.shallow_water_2d，
+    本案例固定边界：上游（x=0）给定流量，下游自由出流，两岸固壁。
     """
 
     def __init__(self, Lx, Ly, Nx, Ny, g=9.81):
@@ -54,282 +57,7 @@ class ShallowWater2DSolver:
             Ny: y方向网格数
             g: 重力加速度 (m/s²)
         """
-        self.Lx = Lx
-        self.Ly = Ly
-        self.Nx = Nx
-        self.Ny = Ny
-        self.g = g
-
-        # 网格间距
-        self.dx = Lx / Nx
-        self.dy = Ly / Ny
-
-        # 网格坐标（单元中心）
-        self.x = np.linspace(self.dx/2, Lx - self.dx/2, Nx)
-        self.y = np.linspace(self.dy/2, Ly - self.dy/2, Ny)
-        self.X, self.Y = np.meshgrid(self.x, self.y, indexing='ij')
-
-        # 状态变量 (Nx, Ny)
-        self.h = np.zeros((Nx, Ny))  # 水深
-        self.u = np.zeros((Nx, Ny))  # x方向流速
-        self.v = np.zeros((Nx, Ny))  # y方向流速
-
-        # 地形和糙率
-        self.z_b = np.zeros((Nx, Ny))  # 底高程
-        self.n_manning = np.zeros((Nx, Ny))  # 曼宁糙率
-
-        # 干湿临界值
-        self.h_dry = 0.01  # m
-
-        # 时间
-        self.t = 0.0
-
-    def set_topography(self, z_b, n_manning):
-        """设置地形和糙率"""
-        self.z_b = z_b.copy()
-        self.n_manning = n_manning.copy()
-
-    def set_initial_conditions(self, h, u, v):
-        """设置初始条件"""
-        self.h = h.copy()
-        self.u = u.copy()
-        self.v = v.copy()
-        self.t = 0.0
-
-    def compute_timestep(self, CFL=0.4):
-        """根据CFL条件计算时间步长"""
-        # 浅水波速
-        c = np.sqrt(self.g * np.maximum(self.h, 1e-6))
-
-        # 最大信号传播速度
-        s_max_x = np.max(np.abs(self.u) + c)
-        s_max_y = np.max(np.abs(self.v) + c)
-
-        dt_x = CFL * self.dx / max(s_max_x, 1e-6)
-        dt_y = CFL * self.dy / max(s_max_y, 1e-6)
-
-        return min(dt_x, dt_y)
-
-    def lax_friedrichs_flux_x(self, h_L, hu_L, hv_L, h_R, hu_R, hv_R):
-        """计算x方向Lax-Friedrichs数值通量
-
-        Args:
-            左右状态的守恒变量
-
-        Returns:
-            F: 数值通量 [F_h, F_hu, F_hv]
-        """
-        # 计算流速
-        eps = 1e-8
-        u_L = hu_L / (h_L + eps) if h_L > self.h_dry else 0.0
-        u_R = hu_R / (h_R + eps) if h_R > self.h_dry else 0.0
-
-        # 物理通量
-        F_L = np.array([
-            hu_L,
-            hu_L * u_L + 0.5 * self.g * h_L**2,
-            hv_L * u_L
-        ])
-
-        F_R = np.array([
-            hu_R,
-            hu_R * u_R + 0.5 * self.g * h_R**2,
-            hv_R * u_R
-        ])
-
-        # 波速估计
-        c_L = np.sqrt(self.g * h_L) if h_L > self.h_dry else 0.0
-        c_R = np.sqrt(self.g * h_R) if h_R > self.h_dry else 0.0
-        alpha = max(abs(u_L) + c_L, abs(u_R) + c_R)
-
-        # Lax-Friedrichs通量
-        U_L = np.array([h_L, hu_L, hv_L])
-        U_R = np.array([h_R, hu_R, hv_R])
-
-        F = 0.5 * (F_L + F_R) - 0.5 * alpha * (U_R - U_L)
-
-        return F
-
-    def lax_friedrichs_flux_y(self, h_B, hu_B, hv_B, h_T, hu_T, hv_T):
-        """计算y方向Lax-Friedrichs数值通量"""
-        eps = 1e-8
-        v_B = hv_B / (h_B + eps) if h_B > self.h_dry else 0.0
-        v_T = hv_T / (h_T + eps) if h_T > self.h_dry else 0.0
-
-        # 物理通量（G方向）
-        G_B = np.array([
-            hv_B,
-            hu_B * v_B,
-            hv_B * v_B + 0.5 * self.g * h_B**2
-        ])
-
-        G_T = np.array([
-            hv_T,
-            hu_T * v_T,
-            hv_T * v_T + 0.5 * self.g * h_T**2
-        ])
-
-        # 波速
-        c_B = np.sqrt(self.g * h_B) if h_B > self.h_dry else 0.0
-        c_T = np.sqrt(self.g * h_T) if h_T > self.h_dry else 0.0
-        alpha = max(abs(v_B) + c_B, abs(v_T) + c_T)
-
-        U_B = np.array([h_B, hu_B, hv_B])
-        U_T = np.array([h_T, hu_T, hv_T])
-
-        G = 0.5 * (G_B + G_T) - 0.5 * alpha * (U_T - U_B)
-
-        return G
-
-    def compute_source_terms(self, i, j):
-        """计算源项（底坡+摩阻）
-
-        Returns:
-            S: 源项 [0, S_x, S_y]
-        """
-        h = self.h[i, j]
-        u = self.u[i, j]
-        v = self.v[i, j]
-
-        # 源项初始化
-        S = np.zeros(3)
-
-        if h < self.h_dry:
-            return S
-
-        # 底坡源项（中心差分）
-        if i > 0 and i < self.Nx - 1:
-            dz_dx = (self.z_b[i+1, j] - self.z_b[i-1, j]) / (2 * self.dx)
-        else:
-            dz_dx = 0.0
-
-        if j > 0 and j < self.Ny - 1:
-            dz_dy = (self.z_b[i, j+1] - self.z_b[i, j-1]) / (2 * self.dy)
-        else:
-            dz_dy = 0.0
-
-        S_bx = -self.g * h * dz_dx
-        S_by = -self.g * h * dz_dy
-
-        # 摩阻源项（Manning公式）
-        n = self.n_manning[i, j]
-        vel_mag = np.sqrt(u**2 + v**2)
-
-        if vel_mag > 1e-6:
-            C_f = self.g * n**2 * vel_mag / (h**(4.0/3.0))
-            S_fx = -C_f * u * h
-            S_fy = -C_f * v * h
-        else:
-            S_fx = 0.0
-            S_fy = 0.0
-
-        S[1] = S_bx + S_fx
-        S[2] = S_by + S_fy
-
-        return S
-
-    def apply_boundary_conditions(self, Q_inflow=0.0):
-        """应用边界条件
-
-        Args:
-            Q_inflow: 上游总流量 (m³/s)
-        """
-        # 上游边界（x=0）：固定流量
-        # 改进：确保即使初始时刻也能正确施加边界条件
-        if Q_inflow > 0:
-            # 计算湿单元（包括稍浅的水深）
-            wet_cells = np.sum(self.h[0, :] > self.h_dry * 0.5)
-            if wet_cells > 0:
-                # 均匀分配流量
-                q_per_cell = Q_inflow / (wet_cells * self.dy)  # 单宽流量
-                for j in range(self.Ny):
-                    if self.h[0, j] > self.h_dry * 0.5:
-                        # 确保水深足够，避免过大流速
-                        h_safe = max(self.h[0, j], 0.1)  # 至少0.1m
-                        self.u[0, j] = q_per_cell / h_safe
-            else:
-                # 如果没有湿单元，保持初始流速（避免完全静止）
-                pass
-
-        # 下游边界（x=Lx）：自由出流（梯度外推）
-        self.h[-1, :] = self.h[-2, :]
-        self.u[-1, :] = self.u[-2, :]
-        self.v[-1, :] = self.v[-2, :]
-
-        # 南北边界（y=0, y=Ly）：固壁（无穿透条件）
-        self.v[:, 0] = 0.0
-        self.v[:, -1] = 0.0
-
-    def step(self, dt, Q_inflow=0.0):
-        """前进一个时间步（显式欧拉）
-
-        Args:
-            dt: 时间步长 (s)
-            Q_inflow: 上游流量 (m³/s)
-        """
-        # 守恒变量
-        hu = self.h * self.u
-        hv = self.h * self.v
-
-        # 新时间层
-        h_new = self.h.copy()
-        hu_new = hu.copy()
-        hv_new = hv.copy()
-
-        # 内部单元更新
-        for i in range(1, self.Nx - 1):
-            for j in range(1, self.Ny - 1):
-
-                # x方向通量
-                F_E = self.lax_friedrichs_flux_x(
-                    self.h[i, j], hu[i, j], hv[i, j],
-                    self.h[i+1, j], hu[i+1, j], hv[i+1, j]
-                )
-                F_W = self.lax_friedrichs_flux_x(
-                    self.h[i-1, j], hu[i-1, j], hv[i-1, j],
-                    self.h[i, j], hu[i, j], hv[i, j]
-                )
-
-                # y方向通量
-                G_N = self.lax_friedrichs_flux_y(
-                    self.h[i, j], hu[i, j], hv[i, j],
-                    self.h[i, j+1], hu[i, j+1], hv[i, j+1]
-                )
-                G_S = self.lax_friedrichs_flux_y(
-                    self.h[i, j-1], hu[i, j-1], hv[i, j-1],
-                    self.h[i, j], hu[i, j], hv[i, j]
-                )
-
-                # 源项
-                S = self.compute_source_terms(i, j)
-
-                # 更新
-                dU_dt = -(F_E - F_W) / self.dx - (G_N - G_S) / self.dy + S
-
-                h_new[i, j] = self.h[i, j] + dt * dU_dt[0]
-                hu_new[i, j] = hu[i, j] + dt * dU_dt[1]
-                hv_new[i, j] = hv[i, j] + dt * dU_dt[2]
-
-        # 更新状态
-        self.h = h_new
-        hu = hu_new
-        hv = hv_new
-
-        # 从守恒变量恢复原始变量
-        for i in range(self.Nx):
-            for j in range(self.Ny):
-                if self.h[i, j] > self.h_dry:
-                    self.u[i, j] = hu[i, j] / self.h[i, j]
-                    self.v[i, j] = hv[i, j] / self.h[i, j]
-                else:
-                    self.h[i, j] = 0.0
-                    self.u[i, j] = 0.0
-                    self.v[i, j] = 0.0
-
-        # 边界条件
-        self.apply_boundary_conditions(Q_inflow)
-
-        self.t += dt
+        super().__init__(Lx, Ly, Nx, Ny, g=g, h_dry=0.01)
 
     def run(self, t_end, Q_inflow, dt_output=10.0, CFL=0.3):
         """运行模拟
@@ -343,46 +71,14 @@ class ShallowWater2DSolver:
         Returns:
             results: 包含时间历史的字典
         """
-        times = [self.t]
-        h_history = [self.h.copy()]
-        u_history = [self.u.copy()]
-        v_history = [self.v.copy()]
-
-        t_next_output = dt_output
-        step_count = 0
+        self.cfl = CFL
+        self.set_boundary_conditions(west=('discharge', Q_inflow), east='open')
 
         print(f"开始模拟：t_end = {t_end}s")
+        results = super().run(t_end, dt_output=dt_output, verbose=True)
+        print(f"模拟完成！总步数 = {self.time_step}")
 
-        while self.t < t_end:
-            # 计算时间步长
-            dt = self.compute_timestep(CFL)
-            dt = min(dt, t_end - self.t)
-
-            # 前进一步
-            self.step(dt, Q_inflow)
-            step_count += 1
-
-            # 输出
-            if self.t >= t_next_output or abs(self.t - t_end) < 1e-6:
-                times.append(self.t)
-                h_history.append(self.h.copy())
-                u_history.append(self.u.copy())
-                v_history.append(self.v.copy())
-                t_next_output += dt_output
-
-                print(f"  t = {self.t:.1f}s, 步数 = {step_count}, dt = {dt:.3f}s")
-
-        print(f"模拟完成！总步数 = {step_count}")
-
-        return {
-            'times': np.array(times),
-            'h': np.array(h_history),
-            'u': np.array(u_history),
-            'v': np.array(v_history),
-            'X': self.X,
-            'Y': self.Y,
-            'z_b': self.z_b
-        }
+        return results
 
 
 def create_channel_floodplain_topography(X, Y):
@@ -402,22 +98,10 @@ def create_channel_floodplain_topography(X, Y):
     floodplain_elevation = 2.0  # 滩地高程
     channel_center = Y[0, Ny//2]  # 主槽中心
 
-    z_b = np.zeros_like(X)
-    n_manning = np.zeros_like(X)
-
-    for i in range(Nx):
-        for j in range(Ny):
-            y = Y[i, j]
-            dist_from_center = abs(y - channel_center)
-
-            if dist_from_center < channel_width / 2:
-                # 主槽：底高程0，糙率低
-                z_b[i, j] = 0.0
-                n_manning[i, j] = 0.03
-            else:
-                # 滩地：底高程2m，糙率高
-                z_b[i, j] = floodplain_elevation
-                n_manning[i, j] = 0.05
+    # 主槽：底高程0，糙率低；滩地：底高程2m，糙率高
+    in_channel = np.abs(Y - channel_center) < channel_width / 2
+    z_b = np.where(in_channel, 0.0, floodplain_elevation)
+    n_manning = np.where(in_channel, 0.03, 0.05)
 
     return z_b, n_manning
 
@@ -465,12 +149,9 @@ def main():
     A_channel = channel_width * h_channel  # 断面面积
     u_channel = Q_inflow_initial / A_channel  # 平均流速 ≈ 3.33 m/s
 
-    for i in range(Nx):
-        for j in range(Ny):
-            y = solver.Y[i, j]
-            if abs(y - Ly/2) < 25:  # 主槽中心±25m
-                h0[i, j] = h_channel
-                u0[i, j] = u_channel  # 初始化为合理流速
+    in_channel = np.abs(solver.Y - Ly/2) < 25  # 主槽中心±25m
+    h0[in_channel] = h_channel
+    u0[in_channel] = u_channel  # 初始化为合理流速
 
     solver.set_initial_conditions(h0, u0, v0)
 
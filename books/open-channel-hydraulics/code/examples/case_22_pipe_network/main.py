@@ -21,6 +21,8 @@
 日期：2025-10-30
 """
 
+import sys
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
@@ -28,6 +30,11 @@ matplotlib.use('Agg')  # 使用非交互式后端
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 
+# 添加父目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from solvers.pipe_network import PipeNetwork
+
 
 # ==================== 管网计算函数 ====================
 
@@ -99,6 +106,28 @@ def solve_single_loop_hardy_cross(pipe_K_values, Q_initial, n=2.0,
     return np.array(Q_history), np.array(delta_Q_history), max_iter
 
 
+def solve_global_gradient(pipe_data, node_demands, H_source=50.0):
+    """全局梯度法（节点水头-管段流量联立Newton迭代）求解同一管网
+
+    管道1自水源A接入节点1，管道2-5依次连接节点1→2→3→4→1。
+    与逐环校正不同，全部节点水头同时求解，适用于任意多环管网。
+
+    Returns:
+        result: PipeNetwork.solve() 的结果字典
+    """
+    net = PipeNetwork('D-W')
+    net.add_reservoir('A', H_source)
+    for node, q in node_demands.items():
+        net.add_junction(node, demand=q)
+
+    topology = [('A', '1'), ('1', '2'), ('2', '3'), ('3', '4'), ('4', '1')]
+    for (name, params), (start, end) in zip(pipe_data.items(), topology):
+        net.add_pipe(name, start, end, params['L'], params['D'],
+                     friction_factor=params['lambda'])
+
+    return net.solve(tol=1e-9)
+
+
 # ==================== 可视化函数 ====================
 
 def plot_network_topology(Q_final, pipe_lengths, pipe_diameters,
@@ -385,6 +414,22 @@ def main():
         direction = '正向' if Q > 0 else '逆向'
         print(f"管道{i+1:<7} {abs(Q)*1000:<15.2f} {direction}")
 
+    # 全局梯度法对照：由初始流量推得节点需水量（节点1、节点4）
+    node_demands = {
+        '1': Q_initial[0] - Q_initial[1] + Q_initial[4],
+        '2': Q_initial[1] - Q_initial[2],
+        '3': Q_initial[2] - Q_initial[3],
+        '4': Q_initial[3] - Q_initial[4],
+    }
+    gga = solve_global_gradient(pipe_data, node_demands)
+
+    print(f"\n全局梯度法对照（{gga['iterations']}次Newton迭代）：")
+    print(f"{'管道':<8} {'Hardy-Cross(L/s)':<18} {'全局梯度法(L/s)'}")
+    print("-" * 50)
+    for i, (Q_hc, Q_gga) in enumerate(zip(Q_final, gga['Q'])):
+        print(f"管道{i+1:<7} {Q_hc*1000:<+18.3f} {Q_gga*1000:+.3f}")
+    print(f"  最大差值：{np.abs(Q_final - gga['Q']).max()*1000:.2e} L/s")
+
     # ==================== 第五步：验证流量平衡 ====================
     print("\n【步骤5】流量平衡验证")
     print("-" * 80)
@@ -468,7 +513,9 @@ def main():
     return {
         'Q_final': Q_final,
         'iterations': iterations,
-        'pipe_K': pipe_K
+        'pipe_K': pipe_K,
+        'Q_global_gradient': gga['Q'],
+        'iterations_global_gradient': gga['iterations']
     }
 
 
@@ -26,6 +26,8 @@
 日期：2025-10-30
 """
 
+import sys
+import os
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib
@@ -33,6 +35,10 @@ matplotlib.use('Agg')  # 使用非交互式后端
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../..'))
+
+from solvers.moc import MOCNetwork
+
 
 # ==================== MOC计算函数 ====================
 
@@ -130,75 +136,27 @@ def moc_simulation(L, D, a, v0, H0, lambda_f, tc, T_sim, N, g=9.81):
         v: 流速矩阵 [时间×空间]
     """
     # 离散化参数
-    dx = space_step(L, N)
     dt = timestep_from_segments(L, N, a)
+    A = np.pi * D**2 / 4
 
-    # 时间和空间数组
+    # 水库 → 管道 → 阀门；阀门处流速按开度线性减小（给定出流边界）
+    net = MOCNetwork(dt=dt, g=g)
+    net.add_reservoir('reservoir', H0)
+    net.add_junction('valve', demand=lambda t: valve_closure_coefficient(t, tc) * v0 * A)
+    net.add_pipe('pipe', 'reservoir', 'valve', L, D, a, lambda_f)
+
+    # 初始条件：流速 v0、全管水头 H0
+    net.initialize()
+    net.set_pipe_state('pipe', H0, v0 * A)
+
+    # 时间推进（全部内部节点一次向量化计算）
     n_steps = int(T_sim / dt) + 1
-    t_array = np.linspace(0, T_sim, n_steps)
-    x_array = np.linspace(0, L, N + 1)
-
-    # 初始化结果矩阵
-    H = np.zeros((n_steps, N + 1))
-    v = np.zeros((n_steps, N + 1))
-
-    # 初始条件：稳态
-    H[0, :] = H0
-    v[0, :] = v0
-
-    # 时间推进
-    for n in range(n_steps - 1):
-        t = t_array[n + 1]
-
-        # 内部节点（i = 1 到 N-1）
-        for i in range(1, N):
-            # 左侧节点（A）- C+特征线
-            i_A = i - 1
-            v_A = v[n, i_A]
-            H_A = H[n, i_A]
-            R_A = friction_term(lambda_f, v_A, D, a, dt, g)
-
-            # 右侧节点（B）- C-特征线
-            i_B = i + 1
-            v_B = v[n, i_B]
-            H_B = H[n, i_B]
-            R_B = friction_term(lambda_f, v_B, D, a, dt, g)
-
-            # 当前节点（P）
-            v[n+1, i] = internal_point_velocity(H_A, H_B, v_A, v_B,
-                                               R_A, R_B, a, g)
-            H[n+1, i] = internal_point_head(H_A, H_B, v_A, v_B,
-                                           R_A, R_B, a, g)
-
-        # 上游边界（水库，i = 0）
-        # 恒定水头边界：H = H0
-        H[n+1, 0] = H0
-
-        # 使用C-方程计算流速
-        i_B = 1
-        v_B = v[n, i_B]
-        H_B = H[n, i_B]
-        R_B = friction_term(lambda_f, v_B, D, a, dt, g)
-
-        # C-方程：H0 = H_B + (a/g)×(v_P - v_B) - R_B
-        # 求解 v_P
-        v[n+1, 0] = v_B + (g/a) * (H0 - H_B + R_B)
-
-        # 下游边界（阀门，i = N）
-        # 阀门特性：v = τ(t) × v_steady
-        tau = valve_closure_coefficient(t, tc)
-
-        # 使用C+方程计算压力
-        i_A = N - 1
-        v_A = v[n, i_A]
-        H_A = H[n, i_A]
-        R_A = friction_term(lambda_f, v_A, D, a, dt, g)
-
-        # 假设阀门流速按线性减小
-        v[n+1, N] = tau * v0
-
-        # C+方程：H_P = H_A - (a/g)×(v_P - v_A) - R_A
-        H[n+1, N] = c_plus_equation(H_A, v_A, v[n+1, N], R_A, a, g)
+    results = net.run((n_steps - 1) * dt, record_pipes=['pipe'])
+
+    t_array = results['t']
+    x_array = results['x']['pipe']
+    H = results['profiles']['pipe']['H']
+    v = results['profiles']['pipe']['Q'] / A
 
     return t_array, x_array, H, v
 
@@ -4,9 +4,11 @@
 """
 
 from .channel import TrapezoidalChannel, RectangularChannel, CircularChannel
+from .section_table import SectionTable
 
 __all__ = [
     "TrapezoidalChannel",
     "RectangularChannel",
     "CircularChannel",
+    "SectionTable",
 ]
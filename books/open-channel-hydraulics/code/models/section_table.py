@@ -0,0 +1,423 @@
+"""
+断面水力要素表
+
+在水深网格上一次性采样过水面积A、湿周χ、水面宽B和流量模数K，
+之后所有水力要素均通过数组插值获得，支持：
+  - 正向查询：A(h)、χ(h)、B(h)、R(h)、K(h)、I₁(h)，接受任意形状数组
+  - 反向查询：h(A)、正常水深 h₀(Q)、临界水深 h_c(Q)，同样向量化
+  - 不规则实测断面（起点距-高程点），按糙率分区计算流量模数
+
+插值模型：
+  每个网格单元内水面宽取线性分布 B = Bᵢ + sᵢ·(h - hᵢ)，
+  于是面积为二次、静水压力项为三次多项式，三者严格一致；
+  断面转折点高程全部加入网格，多边形断面的 A、B、I₁ 在表内是精确的。
+  K(h)、h₀(Q)、h_c(Q) 采用保单调的PCHIP插值。
+
+表格以上（h > h_max）按竖直边墙外延。
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+from typing import Callable, Sequence, Union
+
+
+def _polygon_geometry(station: np.ndarray, elevation: np.ndarray,
+                      n_segment: np.ndarray) -> Callable:
+    """
+    生成多边形断面的向量化几何函数
+
+    每条边按其上方的竖直水柱计算面积（即在糙率分区处竖直切分），
+    糙率相同的相邻边归为同一分区，流量模数 K = Σ Aₖ Rₖ^(2/3) / nₖ。
+    """
+    x0, x1 = station[:-1], station[1:]
+    z0, z1 = elevation[:-1], elevation[1:]
+    dx = x1 - x0
+    length = np.hypot(dx, z1 - z0)
+    z_low = np.minimum(z0, z1)
+    z_high = np.maximum(z0, z1)
+    z_mean = 0.5 * (z0 + z1)
+    z_min = elevation.min()
+
+    # 糙率分区：相邻且糙率相同的边归为一区
+    group = np.concatenate([[0], np.cumsum(n_segment[1:] != n_segment[:-1])])
+    membership = np.zeros((len(dx), group[-1] + 1))
+    membership[np.arange(len(dx)), group] = 1.0
+    n_group = n_segment[np.searchsorted(group, np.arange(group[-1] + 1))]
+
+    def geometry(h):
+        Y = z_min + np.asarray(h, dtype=float)[:, None]
+        span = np.where(z_high > z_low, z_high - z_low, 1.0)
+        f = np.where(z_high > z_low, np.clip((Y - z_low) / span, 0.0, 1.0),
+                     (Y > z_low).astype(float))
+        A_seg = np.where(f >= 1.0, dx * (Y - z_mean), 0.5 * f * dx * (Y - z_low))
+        P_seg = f * length
+
+        A_sub = A_seg @ membership
+        P_sub = P_seg @ membership
+        R_sub = A_sub / np.where(P_sub > 0, P_sub, 1.0)
+        K = (A_sub * R_sub**(2.0/3.0) / n_group).sum(axis=1)
+        return A_sub.sum(axis=1), P_sub.sum(axis=1), (f * dx).sum(axis=1), K
+
+    return geometry
+
+
+def _circular_geometry(D: float, n: float) -> Callable:
+    """圆形断面的向量化几何函数（圆心角公式）"""
+    def geometry(h):
+        h = np.clip(np.asarray(h, dtype=float), 0.0, D)
+        theta = 2 * np.arccos(1 - 2 * h / D)
+        A = D**2 / 8 * (theta - np.sin(theta))
+        P = D * theta / 2
+        T = 2 * np.sqrt(np.maximum(h * (D - h), 0.0))
+        K = A * (A / np.where(P > 0, P, 1.0))**(2.0/3.0) / n
+        return A, P, T, K
+
+    return geometry
+
+
+class SectionTable:
+    """
+    断面水力要素表（向量化插值）
+
+    一般通过 from_channel() 或 from_station_elevation() 创建；
+    也可直接给出向量化几何函数 geometry(h) -> (A, χ, B, K)。
+
+    可直接代替断面对象用于 WaterSurfaceProfile、FiniteVolumeSolver
+    和 Reach（提供 area / top_width / wetted_perimeter / depth_from_area /
+    pressure_integral / conveyance 等方法及 n、S0 属性）。
+
+    参数：
+        geometry: 向量化几何函数，输入水深数组，返回 (A, χ, B, K) 四个数组
+        h_max: 表格最大水深 (m)
+        S0: 底坡（计算正常水深时使用），可选
+        n: 代表糙率（仅用于显示和需要单一糙率的场合），可选
+        n_points: 均匀网格点数（另加断面转折点）
+        breakpoints: 需加入网格的转折点水深 (m)
+        z_bed: 断面最低点高程 (m)
+        min_width: 表格以上竖直边墙外延的最小宽度占最大水面宽的比例
+                   （用于圆管等顶部闭合的断面，相当于Preissmann窄缝）
+    """
+
+    def __init__(self, geometry: Callable, h_max: float, S0: float = None,
+                 n: float = None, n_points: int = 201,
+                 breakpoints: Sequence[float] = None, z_bed: float = 0.0,
+                 min_width: float = 0.01):
+        if h_max <= 0:
+            raise ValueError("表格最大水深必须大于0")
+        if n_points < 2:
+            raise ValueError("网格点数至少为2")
+
+        self.h_max = float(h_max)
+        self.S0 = S0
+        self.n = n
+        self.z_bed = z_bed
+
+        h = np.linspace(0.0, h_max, n_points)
+        if breakpoints is not None:
+            bp = np.asarray(breakpoints, dtype=float)
+            h = np.union1d(h, bp[(bp > 0) & (bp < h_max)])
+            h = h[np.concatenate([[True], np.diff(h) > 1e-6 * h_max])]
+            h[-1] = h_max
+        self._build(geometry, h, min_width)
+
+    # ------------------------------------------------------------------
+    # 创建
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_channel(cls, channel, h_max: float = None,
+                     n_points: int = 201) -> "SectionTable":
+        """
+        由断面类创建水力要素表
+
+        支持 TrapezoidalChannel、RectangularChannel、CircularChannel
+        和 CompoundChannel。复式断面在滩槽交界处竖直分区，
+        主槽分区包含滩地高程以上的水柱。
+
+        参数：
+            channel: 断面对象
+            h_max: 表格最大水深 (m)，圆管默认为直径，其余默认10 m
+            n_points: 均匀网格点数
+
+        返回：
+            SectionTable 对象
+        """
+        if hasattr(channel, 'D'):
+            return cls(_circular_geometry(channel.D, channel.n),
+                       channel.D if h_max is None else h_max,
+                       S0=channel.S0, n=channel.n, n_points=n_points)
+
+        h_max = 10.0 if h_max is None else h_max
+        if hasattr(channel, 'bm'):
+            top = max(h_max, channel.hm)
+            xb = channel.bm / 2
+            xs = xb + channel.m1 * channel.hm
+            xo = channel.m2 * (top - channel.hm)
+            station = [-xs - channel.bl - xo, -xs - channel.bl, -xs, -xb,
+                       xb, xs, xs + channel.br, xs + channel.br + xo]
+            elevation = [top, channel.hm, channel.hm, 0.0, 0.0, channel.hm, channel.hm, top]
+            n = [channel.nf] * 2 + [channel.nm] * 3 + [channel.nf] * 2
+            return cls.from_station_elevation(station, elevation, n, S0=channel.S0,
+                                              h_max=h_max, n_points=n_points)
+
+        m = getattr(channel, 'm', 0.0)
+        xb = channel.b / 2
+        station = [-xb - m * h_max, -xb, xb, xb + m * h_max]
+        elevation = [h_max, 0.0, 0.0, h_max]
+        return cls.from_station_elevation(station, elevation, channel.n, S0=channel.S0,
+                                          h_max=h_max, n_points=n_points)
+
+    @classmethod
+    def from_station_elevation(cls, station: Sequence[float], elevation: Sequence[float],
+                               n: Union[float, Sequence[float]], S0: float = None,
+                               h_max: float = None, n_points: int = 201) -> "SectionTable":
+        """
+        由实测断面（起点距-高程点）创建水力要素表
+
+        参数：
+            station: 起点距 (m)，自左岸向右岸单调不减
+            elevation: 对应的河床高程 (m)
+            n: 糙率，标量或每条边（len(station)-1 个）的糙率；
+               糙率相同的相邻边归为同一分区计算流量模数
+            S0: 底坡，可选
+            h_max: 表格最大水深 (m)，默认为两岸中较低一侧的岸顶
+            n_points: 均匀网格点数
+
+        返回：
+            SectionTable 对象（z_bed 为断面最低点高程）
+        """
+        station = np.asarray(station, dtype=float)
+        elevation = np.asarray(elevation, dtype=float)
+        if station.ndim != 1 or len(station) < 3 or len(station) != len(elevation):
+            raise ValueError("起点距与高程须为等长一维数组，至少3个点")
+        if np.any(np.diff(station) < 0):
+            raise ValueError("起点距必须单调不减")
+
+        n_segment = np.broadcast_to(np.asarray(n, dtype=float), (len(station) - 1,)).copy()
+        if np.any(n_segment <= 0):
+            raise ValueError("糙率系数必须大于0")
+
+        z_bed = elevation.min()
+        if h_max is None:
+            h_max = min(elevation[0], elevation[-1]) - z_bed
+
+        # 代表糙率：满槽时按湿周加权的综合糙率（Horton公式）
+        geometry = _polygon_geometry(station, elevation, n_segment)
+        if np.all(n_segment == n_segment[0]):
+            n_rep = float(n_segment[0])
+        else:
+            wet = np.clip(z_bed + h_max - np.minimum(elevation[:-1], elevation[1:]), 0.0, None) > 0
+            length = np.hypot(np.diff(station), np.diff(elevation)) * wet
+            n_rep = float((np.sum(length * n_segment**1.5) / np.sum(length))**(2.0/3.0))
+
+        return cls(geometry, h_max, S0=S0, n=n_rep, n_points=n_points,
+                   breakpoints=elevation - z_bed, z_bed=z_bed)
+
+    def _build(self, geometry: Callable, h: np.ndarray, min_width: float):
+        """采样并生成各单元的插值系数"""
+        dh = np.diff(h)
+        eps = 1e-9 * self.h_max
+
+        A, P, T, K = geometry(h)
+        _, P_lo, T_lo, K_lo = geometry(h[:-1] + eps)     # 单元起点右极限
+        _, P_hi, _, K_hi = geometry(h[1:] - eps)         # 单元终点左极限
+
+        # 单元内 B 线性分布：由两端面积反求斜率，使 A 在节点处精确
+        s = 2 * (A[1:] - A[:-1] - T_lo * dh) / dh**2
+        I1 = np.concatenate([[0.0], np.cumsum(A[:-1] * dh + T_lo * dh**2 / 2 + s * dh**3 / 6)])
+
+        self._h = h
+        self._A = A
+        self._I1 = I1
+        self._T_lo = T_lo
+        self._s = s
+        self._P_lo = P_lo
+        self._p = (P_hi - P_lo) / dh
+
+        # 表格以上竖直边墙外延
+        self._T_top = max(T[-1], min_width * T.max())
+        self._P_top = P[-1]
+
+        # 流量模数与断面因数 Z = A·sqrt(A/B)：在单元两端极限处采样
+        h2 = np.column_stack([h[:-1] + eps, h[1:] - eps]).ravel()
+        K2 = np.column_stack([K_lo, K_hi]).ravel()
+        A2 = np.column_stack([A[:-1] + T_lo * eps, A[1:] - (T_lo + s * dh) * eps]).ravel()
+        T2 = np.column_stack([T_lo, T_lo + s * dh]).ravel()
+        Z2 = A2 * np.sqrt(A2 / np.maximum(T2, 1e-12))
+
+        # 宽浅断面 K ∝ h^(5/3)、Z ∝ h^(3/2)，对 K^(3/5)、Z^(2/3) 插值接近线性
+        self._K_of_h = PchipInterpolator(h2, K2**0.6, extrapolate=True)
+        self._h_of_K = self._monotone_inverse(h2, K2**0.6)
+        self._h_of_Z = self._monotone_inverse(h2, Z2**(2.0/3.0))
+        self.K_max = float(K[-1])
+
+    @staticmethod
+    def _monotone_inverse(h: np.ndarray, F: np.ndarray) -> PchipInterpolator:
+        """
+        单调反函数 h(F)
+
+        F(h) 局部不单调时（如复式断面漫滩处）取其单调包络，
+        保留严格递增的点后用PCHIP插值。
+        """
+        F_env = np.maximum.accumulate(F)
+        keep = np.concatenate([[True], np.diff(F_env) > 0])
+        return PchipInterpolator(F_env[keep], h[keep], extrapolate=False)
+
+    # ------------------------------------------------------------------
+    # 正向查询
+    # ------------------------------------------------------------------
+
+    def _locate(self, h):
+        """返回截断后的水深、所在单元序号、单元内距离及超出表格的水深"""
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        hc = np.minimum(h, self.h_max)
+        i = np.clip(np.searchsorted(self._h, hc, side='right') - 1, 0, len(self._s) - 1)
+        return h, i, hc - self._h[i], h - hc
+
+    def area(self, h):
+        """过水断面面积 A(h) (m²)"""
+        h, i, d, over = self._locate(h)
+        A = self._A[i] + self._T_lo[i] * d + self._s[i] * d**2 / 2
+        return (A + self._T_top * over)[()]
+
+    def top_width(self, h):
+        """水面宽度 B(h) (m)"""
+        h, i, d, over = self._locate(h)
+        T = self._T_lo[i] + self._s[i] * d
+        return np.where(over > 0, self._T_top, T)[()]
+
+    def wetted_perimeter(self, h):
+        """湿周 χ(h) (m)"""
+        h, i, d, over = self._locate(h)
+        return (self._P_lo[i] + self._p[i] * d + 2 * over)[()]
+
+    def hydraulic_radius(self, h):
+        """水力半径 R(h) = A/χ (m)"""
+        A = self.area(h)
+        P = self.wetted_perimeter(h)
+        return np.where(P > 0, A / np.where(P > 0, P, 1.0), 0.0)[()]
+
+    def hydraulic_depth(self, h):
+        """水力深度 D(h) = A/B (m)"""
+        A = self.area(h)
+        B = self.top_width(h)
+        return np.where(B > 0, A / np.where(B > 0, B, 1.0), 0.0)[()]
+
+    def conveyance(self, h):
+        """
+        流量模数 K(h) (m³/s)，Q = K·sqrt(Sf)
+
+        表格以上按 A·R^(2/3) 与表顶的比值外延。
+        """
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        K = np.maximum(self._K_of_h(np.minimum(h, self.h_max)), 0.0)**(5.0/3.0)
+        over = h > self.h_max
+        if np.any(over):
+            A = self.area(h)
+            AR = A * (A / self.wetted_perimeter(h))**(2.0/3.0)
+            AR_top = self._A[-1] * (self._A[-1] / self._P_top)**(2.0/3.0)
+            K = np.where(over, self.K_max * AR / AR_top, K)
+        return np.asarray(K)[()]
+
+    def pressure_integral(self, h):
+        """静水压力项 I₁(h) = ∫₀ʰ A(η)dη (m³)"""
+        h, i, d, over = self._locate(h)
+        I1 = (self._I1[i] + self._A[i] * d + self._T_lo[i] * d**2 / 2 + self._s[i] * d**3 / 6)
+        A_top = self._A[-1]
+        return (I1 + A_top * over + self._T_top * over**2 / 2)[()]
+
+    def discharge(self, h, S0: float = None):
+        """均匀流流量 Q = K·sqrt(S0) (m³/s)"""
+        return (self.conveyance(h) * np.sqrt(self._slope(S0)))[()]
+
+    def velocity(self, h, S0: float = None):
+        """均匀流断面平均流速 (m/s)"""
+        A = self.area(h)
+        return np.where(A > 0, self.discharge(h, S0) / np.where(A > 0, A, 1.0), 0.0)[()]
+
+    def froude_number(self, h, Q, g: float = 9.81):
+        """弗劳德数 Fr = Q·sqrt(B/(gA³))"""
+        A = np.maximum(self.area(h), 1e-12)
+        return (np.abs(Q) * np.sqrt(self.top_width(h) / (g * A**3)))[()]
+
+    # ------------------------------------------------------------------
+    # 反向查询
+    # ------------------------------------------------------------------
+
+    def depth_from_area(self, A):
+        """由面积反算水深 h(A) (m)"""
+        A = np.maximum(np.asarray(A, dtype=float), 0.0)
+        A_top = self._A[-1]
+        Ac = np.minimum(A, A_top)
+        i = np.clip(np.searchsorted(self._A, Ac, side='right') - 1, 0, len(self._s) - 1)
+        dA = Ac - self._A[i]
+
+        # 解 s·d²/2 + Bᵢ·d - ΔA = 0（有理化形式，s→0 时数值稳定）
+        T = self._T_lo[i]
+        root = np.sqrt(np.maximum(T**2 + 2 * self._s[i] * dA, 0.0))
+        d = 2 * dA / np.maximum(T + root, 1e-12)
+        h = self._h[i] + np.minimum(d, self._h[i + 1] - self._h[i])
+        return (h + np.maximum(A - A_top, 0.0) / self._T_top)[()]
+
+    def compute_normal_depth(self, Q, S0: float = None):
+        """
+        计算正常水深（向量化）
+
+        由 K = Q/sqrt(S0) 在流量模数表上单调插值反查。
+
+        参数：
+            Q: 流量 (m³/s)，标量或数组
+            S0: 底坡（标量或与Q同形数组），默认使用表格的S0
+
+        返回：
+            h0: 正常水深 (m)
+
+        异常：
+            ValueError: 流量非正或超出表格范围
+        """
+        Q = np.asarray(Q, dtype=float)
+        if np.any(Q <= 0):
+            raise ValueError("流量必须大于0")
+        K = Q / np.sqrt(self._slope(S0))
+        h = self._h_of_K(K**0.6)
+        if np.any(np.isnan(h)):
+            raise ValueError(f"正常水深超出表格范围（h_max={self.h_max}m）")
+        return np.asarray(h)[()]
+
+    def compute_critical_depth(self, Q, g: float = 9.81):
+        """
+        计算临界水深（向量化）
+
+        临界条件 Q²B/(gA³) = 1，即断面因数 Z = A·sqrt(A/B) = Q/sqrt(g)，
+        在断面因数表上单调插值反查。
+
+        参数：
+            Q: 流量 (m³/s)，标量或数组
+            g: 重力加速度 (m/s²)
+
+        返回：
+            hc: 临界水深 (m)
+
+        异常：
+            ValueError: 流量非正或超出表格范围
+        """
+        Q = np.asarray(Q, dtype=float)
+        if np.any(Q <= 0):
+            raise ValueError("流量必须大于0")
+        h = self._h_of_Z((Q / np.sqrt(g))**(2.0/3.0))
+        if np.any(np.isnan(h)):
+            raise ValueError(f"临界水深超出表格范围（h_max={self.h_max}m）")
+        return np.asarray(h)[()]
+
+    def _slope(self, S0=None):
+        S0 = self.S0 if S0 is None else np.asarray(S0, dtype=float)
+        if S0 is None or np.any(S0 <= 0):
+            raise ValueError("需要给出正的底坡S0")
+        return S0
+
+    def __repr__(self):
+        return (f"SectionTable(h_max={self.h_max}m, points={len(self._h)}, "
+                f"n={self.n}, S0={self.S0})")
@@ -4,7 +4,27 @@
 """
 
 from .steady.uniform_flow import UniformFlowSolver
+from .steady.batch_profile import BatchProfileSolver, ProfileNetwork
+from .saint_venant import SaintVenantSolver
+from .finite_volume import FiniteVolumeSolver, PrismaticSection
+from .preissmann import PreissmannSolver, Reach, GateStructure, WeirStructure
+from .shallow_water_2d import ShallowWater2DSolver
+from .moc import MOCNetwork, brunone_coefficient
+from .pipe_network import PipeNetwork
 
 __all__ = [
     "UniformFlowSolver",
+    "BatchProfileSolver",
+    "ProfileNetwork",
+    "SaintVenantSolver",
+    "FiniteVolumeSolver",
+    "PrismaticSection",
+    "PreissmannSolver",
+    "Reach",
+    "GateStructure",
+    "WeirStructure",
+    "ShallowWater2DSolver",
+    "MOCNetwork",
+    "brunone_coefficient",
+    "PipeNetwork",
 ]
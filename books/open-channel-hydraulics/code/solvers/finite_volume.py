@@ -0,0 +1,398 @@
+"""
+Saint-Venant方程组有限体积求解器
+
+采用守恒型有限体积格式求解一维明渠非恒定流：
+  - HLL近似黎曼求解器计算界面通量（激波捕捉）
+  - MUSCL线性重构 + 斜率限制器（二阶空间精度）
+  - 两步Heun（SSP-RK2）时间推进（二阶时间精度）
+  - 摩阻源项半隐式处理（大糙率、浅水时不失稳）
+  - 干湿界面处理（干河床溃坝波）
+
+守恒型方程组：
+  ∂A/∂t + ∂Q/∂x = 0
+  ∂Q/∂t + ∂(Q²/A + gI₁)/∂x = gA(S₀-Sf)
+
+其中 I₁ = ∫₀ʰ (h-η)B(η)dη 为静水压力项（对任意棱柱形断面成立）。
+全部计算用NumPy数组运算完成，没有逐节点的Python循环。
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import numpy as np
+from typing import Optional
+
+from .saint_venant import SaintVenantSolver
+
+
+class PrismaticSection:
+    """
+    棱柱形断面的向量化几何函数
+
+    支持矩形、梯形（闭合公式）和圆形（圆心角公式，满管后采用
+    Preissmann窄缝处理有压段）。所有方法均接受数组。
+
+    参数：
+        b: 底宽 (m)，矩形/梯形断面
+        m: 边坡系数，梯形断面
+        D: 直径 (m)，圆形断面（给出D时忽略b、m）
+        slot_width: 圆管满管后窄缝宽度占直径的比例
+    """
+
+    def __init__(self, b: float = None, m: float = 0.0, D: float = None,
+                 slot_width: float = 0.01):
+        if D is None and (b is None or b <= 0):
+            raise ValueError("必须给出正的底宽b或直径D")
+
+        self.b = b
+        self.m = m
+        self.D = D
+
+        if D is not None:
+            self.kind = 'circular'
+            self.slot = slot_width * D
+            self.A_full = np.pi * D**2 / 4
+            self._build_circular_table()
+        else:
+            self.kind = 'trapezoidal' if m > 0 else 'rectangular'
+
+    @classmethod
+    def from_channel(cls, channel) -> "PrismaticSection":
+        """由 TrapezoidalChannel / RectangularChannel / CircularChannel 创建"""
+        if hasattr(channel, 'D'):
+            return cls(D=channel.D)
+        return cls(b=channel.b, m=getattr(channel, 'm', 0.0))
+
+    def _build_circular_table(self, n_points: int = 2001):
+        """圆形断面：按圆心角采样，供面积→水深反算插值"""
+        theta = np.linspace(0.0, 2 * np.pi, n_points)
+        r = self.D / 2
+        self._h_table = r * (1 - np.cos(theta / 2))
+        self._A_table = r**2 / 2 * (theta - np.sin(theta))
+
+    def area(self, h):
+        """过水断面面积 A(h)"""
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        if self.kind != 'circular':
+            return (self.b + self.m * h) * h
+
+        hc = np.minimum(h, self.D)
+        theta = 2 * np.arccos(1 - 2 * hc / self.D)
+        A = self.D**2 / 8 * (theta - np.sin(theta))
+        return A + self.slot * np.maximum(h - self.D, 0.0)
+
+    def top_width(self, h):
+        """水面宽度 B(h)"""
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        if self.kind != 'circular':
+            return self.b + 2 * self.m * h
+
+        hc = np.minimum(h, self.D)
+        B = 2 * np.sqrt(np.maximum(hc * (self.D - hc), 0.0))
+        return np.maximum(B, self.slot)
+
+    def wetted_perimeter(self, h):
+        """湿周 χ(h)"""
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        if self.kind != 'circular':
+            return self.b + 2 * h * np.sqrt(1 + self.m**2)
+
+        hc = np.minimum(h, self.D)
+        theta = 2 * np.arccos(1 - 2 * hc / self.D)
+        return self.D * theta / 2
+
+    def depth_from_area(self, A):
+        """由面积反算水深 h(A)"""
+        A = np.maximum(np.asarray(A, dtype=float), 0.0)
+        if self.kind == 'rectangular':
+            return A / self.b
+        if self.kind == 'trapezoidal':
+            return 2 * A / (self.b + np.sqrt(self.b**2 + 4 * self.m * A))
+
+        h = np.interp(np.minimum(A, self.A_full), self._A_table, self._h_table)
+        return h + np.maximum(A - self.A_full, 0.0) / self.slot
+
+    def pressure_integral(self, h):
+        """静水压力项 I₁(h) = ∫₀ʰ A(η)dη"""
+        h = np.maximum(np.asarray(h, dtype=float), 0.0)
+        if self.kind != 'circular':
+            return self.b * h**2 / 2 + self.m * h**3 / 3
+
+        # 半圆心角 β：I₁ = r³(sinβ - sin³β/3 - βcosβ)
+        r = self.D / 2
+        beta = np.arccos(1 - np.minimum(h, self.D) / r)
+        I1 = r**3 * (np.sin(beta) - np.sin(beta)**3 / 3 - beta * np.cos(beta))
+        dh = np.maximum(h - self.D, 0.0)
+        return I1 + self.A_full * dh + self.slot * dh**2 / 2
+
+    def __repr__(self):
+        if self.kind == 'circular':
+            return f"PrismaticSection(D={self.D}m)"
+        return f"PrismaticSection(b={self.b}m, m={self.m})"
+
+
+def _minmod(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.where(a * b > 0, np.sign(a) * np.minimum(np.abs(a), np.abs(b)), 0.0)
+
+
+def _van_leer(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    ab = a * b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        s = np.where(ab > 0, 2 * ab / (a + b), 0.0)
+    return s
+
+
+_LIMITERS = {
+    'minmod': _minmod,
+    'vanleer': _van_leer,
+}
+
+
+class FiniteVolumeSolver(SaintVenantSolver):
+    """
+    Saint-Venant方程组有限体积求解器（HLL + MUSCL）
+
+    与 SaintVenantSolver 的接口（初始条件、边界条件、run()的输出格式）
+    完全相同，可直接替换。每个网格节点即一个控制体中心；
+    边界函数给出的 (h, Q) 同时作用于虚拟单元和边界节点。
+
+    参数：
+        L: 河道长度 (m)
+        b: 河道宽度 (m)（给出channel时取channel的底宽）
+        S0: 河床坡度（给出channel时默认取channel.S0）
+        n: 糙率系数（给出channel时默认取channel.n；断面提供流量模数conveyance时不使用）
+        dx: 空间步长 (m)
+        dt: 时间步长 (s)，如果为None则按CFL条件自动计算
+        g: 重力加速度 (m/s²)
+        channel: 断面对象（TrapezoidalChannel / RectangularChannel /
+                 CircularChannel、PrismaticSection 或 SectionTable），默认宽度为b的矩形断面
+        cfl: 自动时间步长的Courant数（二阶格式可取到0.9）
+        limiter: 斜率限制器 'minmod' / 'vanleer'，None 表示一阶格式
+        h_dry: 干湿判别水深 (m)
+        dt_max: 自动时间步长上限 (s)
+    """
+
+    def __init__(self, L: float, b: float = None, S0: float = None,
+                 n: float = None, dx: float = 100.0, dt: Optional[float] = None,
+                 g: float = 9.81, channel=None, cfl: float = 0.9,
+                 limiter: Optional[str] = 'minmod', h_dry: float = 1e-4,
+                 dt_max: float = 60.0):
+        if channel is None:
+            if b is None:
+                raise ValueError("必须给出河道宽度b或断面对象channel")
+            section = PrismaticSection(b=b)
+        elif isinstance(channel, PrismaticSection) or hasattr(channel, 'depth_from_area'):
+            section = channel
+            S0 = getattr(channel, 'S0', None) if S0 is None else S0
+            n = getattr(channel, 'n', None) if n is None else n
+        else:
+            section = PrismaticSection.from_channel(channel)
+            S0 = channel.S0 if S0 is None else S0
+            n = channel.n if n is None else n
+
+        if b is None:
+            b = section.D if getattr(section, 'D', None) is not None else getattr(section, 'b', None)
+        if limiter is not None and limiter not in _LIMITERS:
+            raise ValueError(f"未知斜率限制器: {limiter}")
+
+        super().__init__(L, b, 0.0 if S0 is None else S0, 0.03 if n is None else n,
+                         dx=dx, dt=dt, g=g)
+
+        self.section = section
+        self.cfl = cfl
+        self.limiter = limiter
+        self.h_dry = h_dry
+        self.A_dry = float(section.area(h_dry))
+        self.dt_max = dt_max
+
+    # ------------------------------------------------------------------
+    # 状态
+    # ------------------------------------------------------------------
+
+    def _update_derived(self):
+        """由守恒变量 (A, Q) 更新水深和流速"""
+        self.h = self.section.depth_from_area(self.A)
+        wet = self.A > self.A_dry
+        self.Q = np.where(wet, self.Q, 0.0)
+        self.v = np.where(wet, self.Q / np.where(wet, self.A, 1.0), 0.0)
+
+    def set_initial_conditions(self, h0: np.ndarray, Q0: np.ndarray):
+        """设置初始条件（允许干河床 h=0）
+
+        Args:
+            h0: 初始水深数组 (nx,)
+            Q0: 初始流量数组 (nx,)
+        """
+        if len(h0) != self.nx or len(Q0) != self.nx:
+            raise ValueError(f"初始条件数组长度必须为{self.nx}")
+
+        self.A = self.section.area(np.asarray(h0, dtype=float))
+        self.Q = np.asarray(Q0, dtype=float).copy()
+        self._update_derived()
+        self.t = 0.0
+        self.time_step = 0
+
+    def _conveyance(self, A: np.ndarray, h: np.ndarray) -> np.ndarray:
+        """流量模数 K = A·R^(2/3)/n（断面提供 conveyance 时直接查表）"""
+        if hasattr(self.section, 'conveyance'):
+            return self.section.conveyance(h)
+        R = A / np.maximum(self.section.wetted_perimeter(h), 1e-12)
+        return A * R**(2.0/3.0) / self.n
+
+    def compute_friction_slope_array(self, Q: np.ndarray, A: np.ndarray) -> np.ndarray:
+        """向量化摩阻坡度 Sf = Q|Q|/K² = n²Q|Q| / (A²R^(4/3))"""
+        wet = A > self.A_dry
+        A_safe = np.where(wet, A, 1.0)
+        K = self._conveyance(A_safe, self.section.depth_from_area(A_safe))
+        return np.where(wet, Q * np.abs(Q) / np.maximum(K, 1e-12)**2, 0.0)
+
+    def _celerity(self, A: np.ndarray, h: np.ndarray) -> np.ndarray:
+        """重力波速 c = sqrt(gA/B)，干单元为0"""
+        B = self.section.top_width(h)
+        return np.where(A > self.A_dry, np.sqrt(self.g * A / np.maximum(B, 1e-12)), 0.0)
+
+    def compute_wave_speed(self):
+        """计算波速
+
+        Returns:
+            (c_max, c_mean): 最大特征波速 |v|+c 和平均波速
+        """
+        speed = np.abs(self.v) + self._celerity(self.A, self.h)
+        return float(np.max(speed)), float(np.mean(speed))
+
+    def compute_timestep(self, cfl: float = None, dt_max: float = None) -> float:
+        """根据CFL条件计算时间步长
+
+        Args:
+            cfl: Courant数，默认使用构造时给定的cfl
+            dt_max: 最大时间步长限制 (s)
+
+        Returns:
+            dt: 时间步长 (s)
+        """
+        cfl = self.cfl if cfl is None else cfl
+        dt_max = self.dt_max if dt_max is None else dt_max
+
+        c_max, _ = self.compute_wave_speed()
+        if c_max < 1e-10:
+            return dt_max
+        return min(cfl * self.dx / c_max, dt_max)
+
+    def compute_froude_number(self) -> np.ndarray:
+        """计算Froude数（以水力深度 A/B 计）"""
+        c = self._celerity(self.A, self.h)
+        return np.where(c > 0, self.v / np.where(c > 0, c, 1.0), 0.0)
+
+    # ------------------------------------------------------------------
+    # 空间离散
+    # ------------------------------------------------------------------
+
+    def _boundary_state(self, bc, t: float, A_edge: float, Q_edge: float):
+        """边界虚拟单元状态：给定边界函数时取 (A(h), Q)，否则为透射边界"""
+        if bc is None:
+            return A_edge, Q_edge
+        h_bc, Q_bc = bc(t)
+        return float(self.section.area(h_bc)), float(Q_bc)
+
+    def _pad(self, U: np.ndarray, left: float, right: float) -> np.ndarray:
+        """两侧各加2个虚拟单元"""
+        return np.concatenate([[left, left], U, [right, right]])
+
+    def _reconstruct(self, U: np.ndarray):
+        """MUSCL重构，返回各界面左右状态（共 nx+1 个界面）"""
+        if self.limiter is None:
+            return U[1:-2], U[2:-1]
+
+        d = np.diff(U)
+        slope = _LIMITERS[self.limiter](d[:-1], d[1:])   # 单元 1..nx+2
+        UL = U[1:-2] + 0.5 * slope[:-1]
+        UR = U[2:-1] - 0.5 * slope[1:]
+        return UL, UR
+
+    def _physical_flux(self, A, Q):
+        """物理通量与特征量"""
+        wet = A > self.A_dry
+        A_safe = np.where(wet, A, 1.0)
+        # 近干单元的流速去奇异化
+        u = np.where(wet, Q / A_safe, 0.0)
+        h = self.section.depth_from_area(A)
+        c = self._celerity(A, h)
+        F1 = np.where(wet, Q, 0.0)
+        F2 = np.where(wet, Q * u, 0.0) + self.g * self.section.pressure_integral(h)
+        return F1, F2, u, c, wet
+
+    def _hll_flux(self, AL, QL, AR, QR):
+        """HLL近似黎曼求解器（含干底波速估计）"""
+        F1L, F2L, uL, cL, wetL = self._physical_flux(AL, QL)
+        F1R, F2R, uR, cR, wetR = self._physical_flux(AR, QR)
+
+        sL = np.minimum(uL - cL, uR - cR)
+        sR = np.maximum(uL + cL, uR + cR)
+        sL = np.where(~wetL, uR - 2 * cR, sL)
+        sR = np.where(~wetR, uL + 2 * cL, sR)
+
+        denom = np.where(sR - sL > 1e-12, sR - sL, 1.0)
+        F1 = (sR * F1L - sL * F1R + sL * sR * (AR - AL)) / denom
+        F2 = (sR * F2L - sL * F2R + sL * sR * (QR - QL)) / denom
+
+        F1 = np.where(sL >= 0, F1L, np.where(sR <= 0, F1R, F1))
+        F2 = np.where(sL >= 0, F2L, np.where(sR <= 0, F2R, F2))
+        both_dry = ~wetL & ~wetR
+        return np.where(both_dry, 0.0, F1), np.where(both_dry, 0.0, F2)
+
+    def _stage(self, A: np.ndarray, Q: np.ndarray, dt: float,
+               bc_up, bc_down):
+        """一个显式子步：通量差分 + 底坡源项，摩阻半隐式"""
+        Ap = self._pad(A, bc_up[0], bc_down[0])
+        Qp = self._pad(Q, bc_up[1], bc_down[1])
+
+        AL, AR = self._reconstruct(Ap)
+        QL, QR = self._reconstruct(Qp)
+        F1, F2 = self._hll_flux(AL, QL, AR, QR)
+
+        r = dt / self.dx
+        A_new = np.maximum(A - r * (F1[1:] - F1[:-1]), 0.0)
+        Q_new = Q - r * (F2[1:] - F2[:-1]) + dt * self.g * A * self.S0
+
+        # 摩阻半隐式：Q^(n+1) = Q* / (1 + dt·g·A·|Q^n| / K²)
+        wet = A_new > self.A_dry
+        A_safe = np.where(wet, A_new, 1.0)
+        K = self._conveyance(A_safe, self.section.depth_from_area(A_safe))
+        damping = dt * self.g * A_safe * np.abs(Q) / np.maximum(K, 1e-12)**2
+        Q_new = np.where(wet, Q_new / (1 + damping), 0.0)
+
+        return A_new, Q_new
+
+    def advance(self):
+        """推进一个时间步（Heun两步法，边界取 t+dt 时刻的值）"""
+        if self.auto_dt:
+            self.dt = self.compute_timestep()
+
+        t_new = self.t + self.dt
+        bc_up = self._boundary_state(self.bc_upstream, t_new, self.A[0], self.Q[0])
+        bc_down = self._boundary_state(self.bc_downstream, t_new, self.A[-1], self.Q[-1])
+
+        A1, Q1 = self._stage(self.A, self.Q, self.dt, bc_up, bc_down)
+        if self.limiter is None:
+            A_new, Q_new = A1, Q1
+        else:
+            A2, Q2 = self._stage(A1, Q1, self.dt, bc_up, bc_down)
+            A_new = 0.5 * (self.A + A2)
+            Q_new = 0.5 * (self.Q + Q2)
+
+        # 给定边界值作用于边界节点（与 SaintVenantSolver 一致）
+        if self.bc_upstream is not None:
+            A_new[0], Q_new[0] = bc_up
+        if self.bc_downstream is not None:
+            A_new[-1], Q_new[-1] = bc_down
+
+        self.A = A_new
+        self.Q = Q_new
+        self._update_derived()
+
+        self.t = t_new
+        self.time_step += 1
+
+    def __repr__(self):
+        return (f"FiniteVolumeSolver(L={self.L}m, section={self.section}, "
+                f"nx={self.nx}, dx={self.dx}m, limiter={self.limiter})")
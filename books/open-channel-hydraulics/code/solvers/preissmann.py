@@ -0,0 +1,542 @@
+"""
+Saint-Venant方程组隐式求解器（Preissmann四点格式）
+
+Preissmann格式在每个网格段上对时间取 θ 加权、空间取中心平均，
+无条件稳定，时间步长不受 Courant 条件限制，适合长渠道、长历时
+（数周至数月）的调度模拟。
+
+每个时间步：
+  1. 对全部网格段列出连续方程和动量方程的离散残差
+     （闸、堰等内部建筑物以"流量连续 + 过流公式"两个方程代替）
+  2. 牛顿迭代求解非线性方程组；雅可比矩阵为五对角带状矩阵，
+     按列着色（每5列一组）用5次向量化残差计算得到差商
+  3. 带状线性方程组用 scipy.linalg.solve_banded 求解
+
+未知量按 [h₀, Q₀, h₁, Q₁, ...] 排列，方程按
+[上游边界, 段0连续, 段0动量, 段1..., 下游边界] 排列，
+每个方程只涉及相邻两个节点，因此带宽为上下各2。
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import numpy as np
+from scipy.linalg import solve_banded
+from typing import Callable, Dict, List, Optional, Union
+
+from .finite_volume import PrismaticSection
+
+
+class Reach:
+    """
+    渠段（棱柱形断面，均匀坡度）
+
+    参数：
+        length: 渠段长度 (m)
+        channel: 断面对象（TrapezoidalChannel / RectangularChannel /
+                 CircularChannel、PrismaticSection 或 SectionTable）；
+                 为None时用宽度b的矩形断面
+        dx: 空间步长 (m)
+        b: 矩形断面宽度 (m)，channel为None时使用
+        S0: 渠底坡度（默认取channel.S0）
+        n: 糙率系数（默认取channel.n；断面提供流量模数conveyance时不使用）
+        z_start: 渠段起点渠底高程 (m)，默认与上一渠段末端相接（第一渠段为0）
+    """
+
+    def __init__(self, length: float, channel=None, dx: float = 100.0,
+                 b: float = None, S0: float = None, n: float = None,
+                 z_start: float = None):
+        if channel is None:
+            if b is None:
+                raise ValueError("必须给出断面对象channel或矩形断面宽度b")
+            section = PrismaticSection(b=b)
+        elif isinstance(channel, PrismaticSection) or hasattr(channel, 'depth_from_area'):
+            section = channel
+            S0 = getattr(channel, 'S0', None) if S0 is None else S0
+            n = getattr(channel, 'n', None) if n is None else n
+        else:
+            section = PrismaticSection.from_channel(channel)
+            S0 = channel.S0 if S0 is None else S0
+            n = channel.n if n is None else n
+
+        if S0 is None or (n is None and not hasattr(section, 'conveyance')):
+            raise ValueError("必须给出渠底坡度S0和糙率n")
+
+        self.length = length
+        self.section = section
+        self.S0 = S0
+        self.n = n
+        self.z_start = z_start
+        self.nx = max(int(round(length / dx)), 1) + 1
+        self.x = np.linspace(0.0, length, self.nx)
+
+    def conveyance(self, h: np.ndarray, A: np.ndarray) -> np.ndarray:
+        """流量模数 K = A·R^(2/3)/n（断面提供 conveyance 时直接查表）"""
+        if hasattr(self.section, 'conveyance'):
+            return self.section.conveyance(h)
+        R = A / np.maximum(self.section.wetted_perimeter(h), 1e-12)
+        return A * R**(2.0/3.0) / self.n
+
+    def __repr__(self):
+        return f"Reach(L={self.length}m, nx={self.nx}, S0={self.S0}, n={self.n})"
+
+
+# 建筑物上下游水头差小于该值时过流公式线性化 (m)
+_DH_LINEAR = 0.01
+
+
+class GateStructure:
+    """
+    闸门内部边界（过流公式取自 models.structures.Gate）
+
+    闸前、闸后水头均从闸底板高程起算；自由/淹没出流由
+    Gate.check_submergence 判别，闸后水位高于闸前时反向过流。
+
+    参数：
+        gate: Gate 对象
+        opening: 闸门开度 (m)，常数或时间函数 f(t)；运行中也可直接修改该属性
+        sill: 闸底板高出上游渠底的高度 (m)
+    """
+
+    def __init__(self, gate, opening: Union[float, Callable[[float], float]],
+                 sill: float = 0.0):
+        self.gate = gate
+        self.opening = opening
+        self.sill = sill
+
+    def get_opening(self, t: float) -> float:
+        return self.opening(t) if callable(self.opening) else self.opening
+
+    def discharge(self, H_up: float, H_down: float, t: float) -> float:
+        """
+        过闸流量
+
+        参数：
+            H_up: 闸前水头（水位 - 闸底板高程）(m)
+            H_down: 闸后水头 (m)
+            t: 时间 (s)
+
+        返回：
+            Q: 流量 (m³/s)，反向过流为负
+        """
+        sign = 1.0
+        if H_down > H_up:
+            H_up, H_down, sign = H_down, H_up, -1.0
+        e = min(self.get_opening(t), H_up)
+        if e <= 0 or H_up <= 0:
+            return 0.0
+
+        if H_down > 0 and self.gate.check_submergence(e, H_up, H_down):
+            # 水头差很小时线性化（√ΔH 在 ΔH→0 处导数无界，牛顿迭代会振荡）
+            dH = H_up - H_down
+            if dH < _DH_LINEAR:
+                Q_lin = self.gate.discharge_submerged(e, H_down + _DH_LINEAR, H_down)
+                return sign * Q_lin * dH / _DH_LINEAR
+            return sign * self.gate.discharge_submerged(e, H_up, H_down)
+        return sign * self.gate.discharge_free(e, H_up)
+
+    def __repr__(self):
+        return f"GateStructure({self.gate}, sill={self.sill}m)"
+
+
+class WeirStructure:
+    """
+    堰内部边界（过流公式取自 models.structures.Weir）
+
+    下游水位高于堰顶时按 Villemonte 公式折减：
+    Q = Q_free · (1 - (H₂/H₁)^1.5)^0.385
+
+    参数：
+        weir: Weir 对象
+        crest: 堰顶高出上游渠底的高度 (m)
+    """
+
+    def __init__(self, weir, crest: float = 0.0):
+        self.weir = weir
+        self.sill = crest
+
+    def discharge(self, H_up: float, H_down: float, t: float) -> float:
+        """过堰流量（水头从堰顶起算），反向过流为负"""
+        sign = 1.0
+        if H_down > H_up:
+            H_up, H_down, sign = H_down, H_up, -1.0
+        if H_up <= 0:
+            return 0.0
+
+        Q = self.weir.discharge_rectangular(H_up, with_contraction=False)
+        if H_down > 0:
+            # 水头差很小时线性化，避免淹没系数在 H₂→H₁ 处导数无界
+            dH = H_up - H_down
+            ratio = 1 - (max(H_up - _DH_LINEAR, 0.0) / H_up)**1.5
+            if dH < _DH_LINEAR:
+                Q *= ratio**0.385 * dH / _DH_LINEAR
+            else:
+                Q *= (1 - (H_down / H_up)**1.5)**0.385
+        return sign * Q
+
+    def __repr__(self):
+        return f"WeirStructure({self.weir}, crest={self.sill}m)"
+
+
+_UPSTREAM_TYPES = ('discharge', 'stage')
+_DOWNSTREAM_TYPES = ('stage', 'discharge', 'rating', 'normal')
+
+
+class PreissmannSolver:
+    """
+    Preissmann四点隐式格式求解器
+
+    参数：
+        reaches: 渠段列表（或单个 Reach），自上游向下游排列
+        structures: 相邻渠段之间的内部建筑物列表（GateStructure / WeirStructure），
+                    长度为 len(reaches)-1
+        dt: 时间步长 (s)，可取数分钟至数小时
+        theta: 时间权重系数，0.5 < θ ≤ 1（θ=0.6 兼顾精度与稳定）
+        g: 重力加速度 (m/s²)
+        tol: 牛顿迭代收敛容差（水深，m）
+        max_iter: 每步最大牛顿迭代次数
+        h_min: 水深下限 (m)，隐式格式要求全渠段有水
+    """
+
+    def __init__(self, reaches: Union[Reach, List[Reach]], structures: Optional[List] = None,
+                 dt: float = 600.0, theta: float = 0.6, g: float = 9.81,
+                 tol: float = 1e-6, max_iter: int = 20, h_min: float = 1e-3):
+        self.reaches = [reaches] if isinstance(reaches, Reach) else list(reaches)
+        self.structures = list(structures or [])
+        if len(self.structures) != len(self.reaches) - 1:
+            raise ValueError("内部建筑物个数必须等于渠段数-1")
+        if not 0.5 <= theta <= 1.0:
+            raise ValueError("时间权重系数θ应在[0.5, 1]之间")
+
+        self.dt = dt
+        self.theta = theta
+        self.g = g
+        self.tol = tol
+        self.max_iter = max_iter
+        self.h_min = h_min
+
+        self._build_grid()
+
+        # 状态变量
+        self.h = None
+        self.Q = None
+        self.t = 0.0
+        self.time_step = 0
+        self.iterations = 0
+
+        # 边界条件
+        self.bc_upstream = None
+        self.bc_downstream = None
+        self.upstream_type = 'discharge'
+        self.downstream_type = 'normal'
+
+    def _build_grid(self):
+        """拼接各渠段节点，生成网格段（渠道段或建筑物）信息"""
+        x, z, slices = [], [], []
+        x0, z0, start = 0.0, 0.0, 0
+        for reach in self.reaches:
+            if reach.z_start is not None:
+                z0 = reach.z_start
+            x.append(x0 + reach.x)
+            z.append(z0 - reach.S0 * reach.x)
+            slices.append(slice(start, start + reach.nx))
+            x0 += reach.length
+            z0 -= reach.S0 * reach.length
+            start += reach.nx
+
+        self.x = np.concatenate(x)
+        self.z = np.concatenate(z)
+        self.slices = slices
+        self.nx = len(self.x)
+
+        # 网格段：节点 j 与 j+1 之间；各渠段末节点与下一渠段首节点之间为建筑物
+        self.structure_links = np.array([s.stop - 1 for s in slices[:-1]], dtype=int)
+        is_channel = np.ones(self.nx - 1, dtype=bool)
+        is_channel[self.structure_links] = False
+        self.channel_links = np.nonzero(is_channel)[0]
+        self.dx_link = np.diff(self.x)[self.channel_links]
+
+    # ------------------------------------------------------------------
+    # 几何与状态
+    # ------------------------------------------------------------------
+
+    def _geometry(self, h: np.ndarray):
+        """各节点的面积与流量模数（h 的最后一维为节点）"""
+        A = np.empty_like(h)
+        K = np.empty_like(h)
+        for reach, sl in zip(self.reaches, self.slices):
+            A[..., sl] = reach.section.area(h[..., sl])
+            K[..., sl] = reach.conveyance(h[..., sl], A[..., sl])
+        return A, K
+
+    def _friction_slope(self, Q, K):
+        return Q * np.abs(Q) / np.maximum(K, 1e-12)**2
+
+    def set_initial_conditions(self, h0: np.ndarray, Q0: np.ndarray):
+        """设置初始条件
+
+        Args:
+            h0: 初始水深数组 (nx,)
+            Q0: 初始流量数组 (nx,)
+        """
+        if len(h0) != self.nx or len(Q0) != self.nx:
+            raise ValueError(f"初始条件数组长度必须为{self.nx}")
+
+        self.h = np.maximum(np.asarray(h0, dtype=float), self.h_min)
+        self.Q = np.asarray(Q0, dtype=float).copy()
+        self.t = 0.0
+        self.time_step = 0
+
+    def set_uniform_initial(self, h0: float, Q0: float):
+        """设置均匀初始条件"""
+        self.set_initial_conditions(np.full(self.nx, h0), np.full(self.nx, Q0))
+
+    def set_boundary_conditions(self, upstream: Callable = None, downstream: Callable = None,
+                                upstream_type: str = 'discharge',
+                                downstream_type: str = None):
+        """设置边界条件（每端一个条件）
+
+        Args:
+            upstream: 上游边界函数 f(t)
+            downstream: 下游边界函数，'rating' 类型为 f(h) -> Q，其余为 f(t)
+            upstream_type: 'discharge'（流量过程）或 'stage'（水深过程）
+            downstream_type: 'stage'、'discharge'、'rating'（水位流量关系）
+                             或 'normal'（均匀流关系，无需函数）；
+                             默认给出downstream时为'stage'，否则为'normal'
+        """
+        if downstream_type is None:
+            downstream_type = 'normal' if downstream is None else 'stage'
+        if upstream_type not in _UPSTREAM_TYPES:
+            raise ValueError(f"未知上游边界类型: {upstream_type}")
+        if downstream_type not in _DOWNSTREAM_TYPES:
+            raise ValueError(f"未知下游边界类型: {downstream_type}")
+        if downstream_type != 'normal' and downstream is None:
+            raise ValueError(f"下游边界类型 {downstream_type} 需要给出边界函数")
+        if downstream_type == 'normal' and self.reaches[-1].S0 <= 0:
+            raise ValueError("平坡渠道不能使用均匀流下游边界")
+
+        self.bc_upstream = upstream
+        self.bc_downstream = downstream
+        self.upstream_type = upstream_type
+        self.downstream_type = downstream_type
+
+    # ------------------------------------------------------------------
+    # 离散方程
+    # ------------------------------------------------------------------
+
+    def _residual(self, X: np.ndarray, old: Dict, t_new: float) -> np.ndarray:
+        """离散方程残差 R(X)，X = [h₀, Q₀, h₁, Q₁, ...]；old 为上一时刻状态及步长"""
+        h = X[0::2]
+        Q = X[1::2]
+        A, K = self._geometry(h)
+        Sf = self._friction_slope(Q, K)
+        M = Q**2 / np.maximum(A, 1e-12)
+        eta = self.z + h
+
+        th, dt, g = self.theta, old['dt'], self.g
+        a = self.channel_links
+        b = a + 1
+        dx = self.dx_link
+
+        R = np.empty(2 * self.nx)
+
+        # 渠道段：连续方程与动量方程
+        dAdt = (A[a] + A[b] - old['A'][a] - old['A'][b]) / (2 * dt)
+        dQdx = (th * (Q[b] - Q[a]) + (1 - th) * (old['Q'][b] - old['Q'][a])) / dx
+        dQdt = (Q[a] + Q[b] - old['Q'][a] - old['Q'][b]) / (2 * dt)
+        dMdx = (th * (M[b] - M[a]) + (1 - th) * (old['M'][b] - old['M'][a])) / dx
+        A_bar = 0.5 * (th * (A[a] + A[b]) + (1 - th) * (old['A'][a] + old['A'][b]))
+        deta = (th * (eta[b] - eta[a]) + (1 - th) * (old['eta'][b] - old['eta'][a])) / dx
+        Sf_bar = 0.5 * (th * (Sf[a] + Sf[b]) + (1 - th) * (old['Sf'][a] + old['Sf'][b]))
+
+        R[2 * a + 1] = dAdt + dQdx
+        R[2 * a + 2] = (dQdt + dMdx + g * A_bar * (deta + Sf_bar)) / g
+
+        # 内部建筑物：流量连续 + 过流公式
+        for j, structure in zip(self.structure_links, self.structures):
+            z_sill = self.z[j] + structure.sill
+            R[2 * j + 1] = Q[j] - Q[j + 1]
+            R[2 * j + 2] = Q[j] - structure.discharge(eta[j] - z_sill, eta[j + 1] - z_sill, t_new)
+
+        # 上游边界
+        if self.upstream_type == 'discharge':
+            R[0] = Q[0] - self.bc_upstream(t_new)
+        else:
+            R[0] = h[0] - self.bc_upstream(t_new)
+
+        # 下游边界
+        if self.downstream_type == 'stage':
+            R[-1] = h[-1] - self.bc_downstream(t_new)
+        elif self.downstream_type == 'discharge':
+            R[-1] = Q[-1] - self.bc_downstream(t_new)
+        elif self.downstream_type == 'rating':
+            R[-1] = Q[-1] - self.bc_downstream(h[-1])
+        else:
+            R[-1] = Q[-1] - K[-1] * np.sqrt(self.reaches[-1].S0)
+
+        return R
+
+    def _jacobian(self, X: np.ndarray, R0: np.ndarray, old: Dict, t_new: float) -> np.ndarray:
+        """五对角雅可比矩阵（solve_banded 的带状存储格式，上下带宽均为2）"""
+        N = len(X)
+        ab = np.zeros((5, N))
+        rows = np.arange(N)
+        step = 1e-7 * np.maximum(np.abs(X), 1.0)
+
+        for k in range(5):
+            cols = np.arange(k, N, 5)
+            Xp = X.copy()
+            Xp[cols] += step[cols]
+            dR = self._residual(Xp, old, t_new) - R0
+
+            # 第r行中属于第k组的列（|r-c|≤2 的5列中恰有一列）
+            c = rows - 2 + (k - (rows - 2)) % 5
+            valid = (c >= 0) & (c < N)
+            r, c = rows[valid], c[valid]
+            ab[2 + r - c, c] = dR[r] / step[c]
+
+        return ab
+
+    def _old_state(self) -> Dict:
+        A, K = self._geometry(self.h)
+        return {
+            'A': A,
+            'Q': self.Q.copy(),
+            'M': self.Q**2 / np.maximum(A, 1e-12),
+            'eta': self.z + self.h,
+            'Sf': self._friction_slope(self.Q, K),
+        }
+
+    def _solve_step(self, dt: float, t_eval: float) -> int:
+        """求解一个时间步长为dt的隐式方程组（边界与建筑物取 t_eval 时刻），返回迭代次数"""
+        old = self._old_state()
+        old['dt'] = dt
+
+        X = np.empty(2 * self.nx)
+        X[0::2] = self.h
+        X[1::2] = self.Q
+        h_scale = max(np.max(self.h), 1.0)
+
+        R = self._residual(X, old, t_eval)
+        for it in range(1, self.max_iter + 1):
+            ab = self._jacobian(X, R, old, t_eval)
+            delta = solve_banded((2, 2), ab, -R)
+            dh = delta[0::2]
+            h = X[0::2]
+
+            # 阻尼：保证水深不低于下限
+            alpha = 1.0
+            if np.any(h + dh < self.h_min):
+                shrink = dh < 0
+                alpha = min(1.0, 0.9 * float(np.min((self.h_min - h[shrink]) / dh[shrink])))
+
+            # 回溯线搜索：建筑物过流公式在水头差附近变化剧烈，全步长可能来回振荡
+            # （残差始终不下降时仍取全步长）
+            norm = np.linalg.norm(R)
+            step = alpha
+            for _ in range(6):
+                X_new = X + step * delta
+                R_new = self._residual(X_new, old, t_eval)
+                if np.linalg.norm(R_new) < norm:
+                    break
+                step *= 0.5
+            else:
+                X_new = X + alpha * delta
+                R_new = self._residual(X_new, old, t_eval)
+            X, R = X_new, R_new
+
+            if np.max(np.abs(dh)) < self.tol * h_scale:
+                break
+        else:
+            raise RuntimeError(f"Preissmann牛顿迭代不收敛: t = {t_eval:.1f}s")
+
+        self.h = X[0::2].copy()
+        self.Q = X[1::2].copy()
+        return it
+
+    def advance(self):
+        """推进一个时间步（牛顿迭代）"""
+        if self.h is None:
+            raise ValueError("必须先设置初始条件")
+
+        t_new = self.t + self.dt
+        self.iterations = self._solve_step(self.dt, t_new)
+        self.t = t_new
+        self.time_step += 1
+
+    def structure_discharges(self) -> np.ndarray:
+        """当前各内部建筑物的过流量"""
+        return self.Q[self.structure_links]
+
+    def set_steady_state(self, Q0: float, h0: float, dt: float = 3600.0,
+                         max_steps: int = 500, tol: float = 1e-6):
+        """以t=0时刻的边界条件和闸门开度求恒定流初始场（大时间步隐式迭代至稳定）
+
+        Args:
+            Q0: 初始流量猜测值 (m³/s)
+            h0: 初始水深猜测值 (m)
+            dt: 迭代时间步长 (s)
+            max_steps: 最大迭代步数
+            tol: 相邻两步水深最大变化的收敛容差 (m)
+        """
+        self.set_uniform_initial(h0, Q0)
+        for _ in range(max_steps):
+            h_prev = self.h.copy()
+            self._solve_step(dt, 0.0)
+            if np.max(np.abs(self.h - h_prev)) < tol:
+                break
+
+    def run(self, t_end: float, dt_output: float = None,
+            verbose: bool = False) -> Dict:
+        """运行模拟
+
+        Args:
+            t_end: 结束时间 (s)
+            dt_output: 输出时间间隔 (s)，None表示只输出最终结果
+            verbose: 是否打印进度信息
+
+        Returns:
+            results: 包含时间序列结果的字典（格式同 SaintVenantSolver.run，
+                     另含 'z' 渠底高程和 'Q_structures' 建筑物过流量）
+        """
+        if self.h is None:
+            raise ValueError("必须先设置初始条件")
+        if self.bc_upstream is None:
+            raise ValueError("必须先设置上游边界条件")
+
+        if dt_output is None:
+            dt_output = t_end
+
+        results = {'times': [], 'h': [], 'Q': [], 'Q_structures': []}
+
+        def record():
+            results['times'].append(self.t)
+            results['h'].append(self.h.copy())
+            results['Q'].append(self.Q.copy())
+            results['Q_structures'].append(self.structure_discharges())
+
+        record()
+        next_output = self.t + dt_output
+
+        while self.t < t_end - 1e-9:
+            self.advance()
+
+            if self.t >= next_output - 1e-9 or self.t >= t_end - 1e-9:
+                record()
+                next_output += dt_output
+
+                if verbose:
+                    print(f"t = {self.t:10.1f} s, "
+                          f"Q_up = {self.Q[0]:8.2f} m³/s, "
+                          f"h_max = {np.max(self.h):6.3f} m, "
+                          f"iter = {self.iterations}")
+
+        results = {key: np.array(value) for key, value in results.items()}
+        results['v'] = results['Q'] / self._geometry(results['h'])[0]
+        results['x'] = self.x.copy()
+        results['z'] = self.z.copy()
+        return results
+
+    def __repr__(self):
+        return (f"PreissmannSolver(reaches={len(self.reaches)}, nx={self.nx}, "
+                f"dt={self.dt}s, θ={self.theta})")
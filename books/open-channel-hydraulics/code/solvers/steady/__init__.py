@@ -3,5 +3,6 @@
 """
 
 from .uniform_flow import UniformFlowSolver
+from .batch_profile import BatchProfileSolver, ProfileNetwork
 
-__all__ = ["UniformFlowSolver"]
+__all__ = ["UniformFlowSolver", "BatchProfileSolver", "ProfileNetwork"]
@@ -0,0 +1,486 @@
+"""
+批量水面曲线求解器
+
+用标准步长法同时推算一组流量（或一组渠道参数变化）的水面曲线：
+  - 每个"通道"（lane）对应一组 (Q, S0, 糙率倍数, 控制水深)
+  - 每一步对全部通道做向量化牛顿迭代，已收敛的通道用掩码剔除
+  - 一次调用生成整族水位-流量关系曲线（不同下游控制水位 × 不同流量）
+  - 树状河网：自出口向上游逐河段推算，汇流节点按能量守恒衔接
+
+断面几何通过 SectionTable 向量化查表（断面类对象自动转换）。
+
+能量方程（步长 Δx 为向上游为正）：
+  E₂ + S₀Δx = E₁ + (Sf₁ + Sf₂)/2·Δx，  E = h + Q²/(2gA²)，  Sf = Q²/K²
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import numpy as np
+from typing import Dict, Union
+
+try:
+    from ...models.section_table import SectionTable
+except ImportError:  # code/ 直接位于 sys.path 上，solvers 为顶层包
+    from models.section_table import SectionTable
+
+
+_PROFILE_LABELS = {
+    'M1': "M1 (缓坡壅水)", 'M2': "M2 (缓坡过渡)", 'M3': "M3 (缓坡急流)",
+    'S1': "S1 (陡坡壅水)", 'S2': "S2 (陡坡过渡)", 'S3': "S3 (陡坡急流)",
+    'C1': "C1 (临界坡壅水)", 'C3': "C3 (临界坡急流)",
+    'H2': "H2 (平坡降水)", 'H3': "H3 (平坡急流)",
+    'A2': "A2 (逆坡降水)", 'A3': "A3 (逆坡急流)",
+}
+
+
+def _as_table(channel) -> SectionTable:
+    """断面对象转换为可向量化查询的水力要素表"""
+    if hasattr(channel, 'conveyance') and hasattr(channel, 'depth_from_area'):
+        return channel
+    return SectionTable.from_channel(channel)
+
+
+class BatchProfileSolver:
+    """
+    批量标准步长法水面曲线求解器
+
+    参数：
+        channel: 断面对象（SectionTable 或 TrapezoidalChannel 等断面类）
+        dx: 步长 (m)
+        tol: 牛顿迭代收敛容差（水深，m）
+        max_iter: 每步最大迭代次数
+        g: 重力加速度 (m/s²)
+    """
+
+    def __init__(self, channel, dx: float = 10.0, tol: float = 1e-6,
+                 max_iter: int = 50, g: float = 9.81):
+        if dx <= 0:
+            raise ValueError("步长必须大于0")
+
+        self.section = _as_table(channel)
+        self.dx = dx
+        self.tol = tol
+        self.max_iter = max_iter
+        self.g = g
+
+    # ------------------------------------------------------------------
+    # 向量化水力要素
+    # ------------------------------------------------------------------
+
+    def _lanes(self, Q, S0, n_factor, *extra):
+        """将各通道参数广播为同形数组，返回 (shape, 展平后的数组...)"""
+        S0 = self.section.S0 if S0 is None else S0
+        if S0 is None:
+            raise ValueError("需要给出底坡S0")
+        arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float)
+                                       for a in (Q, S0, n_factor) + extra])
+        if np.any(arrays[0] <= 0):
+            raise ValueError("流量必须大于0")
+        return arrays[0].shape, [a.ravel() for a in arrays]
+
+    def specific_energy(self, h, Q):
+        """断面比能 E = h + Q²/(2gA²)"""
+        A = np.maximum(self.section.area(h), 1e-12)
+        return h + Q**2 / (2 * self.g * A**2)
+
+    def friction_slope(self, h, Q, n_factor=1.0):
+        """摩阻坡度 Sf = (n_factor·Q/K)²"""
+        K = np.maximum(self.section.conveyance(h), 1e-12)
+        return (n_factor * Q / K)**2
+
+    def froude_number(self, h, Q):
+        """弗劳德数"""
+        return self.section.froude_number(h, Q, self.g)
+
+    def normal_depth(self, Q, S0=None, n_factor=1.0):
+        """正常水深（平坡、逆坡通道为NaN）"""
+        shape, (Q, S0, nf) = self._lanes(Q, S0, n_factor)
+        hn = np.full(Q.shape, np.nan)
+        mild = S0 > 0
+        if np.any(mild):
+            hn[mild] = self.section.compute_normal_depth(Q[mild] * nf[mild], S0[mild])
+        return hn.reshape(shape)
+
+    def critical_depth(self, Q):
+        """临界水深"""
+        return self.section.compute_critical_depth(Q, self.g)
+
+    def _energy_residual(self, h, Q, nf, E_target, S0_dx, Sf1, dx):
+        """
+        能量方程残差及其导数
+
+        f(h) = E(h) - E_target + S₀Δx - (Sf₁ + Sf(h))/2·Δx
+        f'(h) = 1 - Fr² + Δx·Sf·K'/K
+        """
+        A = np.maximum(self.section.area(h), 1e-12)
+        T = self.section.top_width(h)
+        K = np.maximum(self.section.conveyance(h), 1e-12)
+        dh = 1e-6 * np.maximum(h, 1.0)
+        dK = (self.section.conveyance(h + dh) - K) / dh
+        Sf = (nf * Q / K)**2
+
+        f = h + Q**2 / (2 * self.g * A**2) - E_target + S0_dx - 0.5 * (Sf1 + Sf) * dx
+        df = 1 - Q**2 * T / (self.g * A**3) + dx * Sf * dK / K
+        return f, df
+
+    def _newton(self, residual, h0, hc, subcritical):
+        """
+        向量化牛顿迭代
+
+        residual(h, idx) 返回第 idx 个通道的 (f, df)；
+        解限制在临界水深一侧（缓流 h > hc，急流 h < hc），
+        已收敛通道不再参与计算。不收敛的通道取临界水深并标记。
+        """
+        h = h0.copy()
+        converged = np.zeros(h.shape, dtype=bool)
+        active = np.arange(h.size)
+
+        for _ in range(self.max_iter):
+            f, df = residual(h[active], active)
+            step = f / np.where(np.abs(df) > 1e-12, df, np.copysign(1e-12, df))
+            h_old = h[active]
+            h_new = h_old - step
+
+            # 保持在对应流态一侧
+            if subcritical:
+                bad = h_new <= hc[active]
+                h_new = np.where(bad, 0.5 * (h_old + hc[active]), h_new)
+            else:
+                h_new = np.where(h_new >= hc[active], 0.5 * (h_old + hc[active]), h_new)
+                h_new = np.where(h_new <= 0, 0.5 * h_old, h_new)
+
+            h[active] = h_new
+            done = np.abs(h_new - h_old) < self.tol
+            converged[active[done]] = True
+            active = active[~done]
+            if active.size == 0:
+                break
+
+        h[~converged] = hc[~converged]
+        return h, converged
+
+    # ------------------------------------------------------------------
+    # 水面曲线
+    # ------------------------------------------------------------------
+
+    def compute_profiles(self, Q, h_start: Union[float, np.ndarray, str], L: float,
+                         direction: str = 'upstream', S0=None, n_factor=1.0) -> Dict:
+        """
+        批量计算水面曲线
+
+        Q、S0、n_factor、h_start 按NumPy规则广播，每个元素为一个通道。
+
+        参数：
+            Q: 流量 (m³/s)
+            h_start: 控制断面水深 (m)，或 'normal' / 'critical'
+            L: 计算长度 (m)
+            direction: 'upstream'（缓流，自下游控制断面向上游推算）
+                       或 'downstream'（急流，自上游控制断面向下游推算）
+            S0: 底坡，默认取断面的S0
+            n_factor: 糙率倍数（相对断面糙率）
+
+        返回：
+            dict: {
+                'x': 断面位置 (nx,)，控制断面为0，x 自上游向下游增大,
+                'h', 'E', 'Fr': (nx, *通道形状),
+                'hn', 'hc': 正常水深、临界水深,
+                'converged': 各通道是否每一步都收敛,
+                'type': 水面曲线类型
+            }
+        """
+        if direction not in ('upstream', 'downstream'):
+            raise ValueError("direction 必须是 'upstream' 或 'downstream'")
+        subcritical = direction == 'upstream'
+
+        h_mode = h_start if isinstance(h_start, str) else None
+        shape, (Q, S0, nf, h1) = self._lanes(Q, S0, n_factor,
+                                             0.0 if h_mode else h_start)
+        hc = self.critical_depth(Q)
+        hn = self.normal_depth(Q, S0, nf)
+        if h_mode == 'normal':
+            h1 = hn.copy()
+        elif h_mode == 'critical':
+            h1 = hc.copy()
+        elif h_mode is not None:
+            raise ValueError("h_start 必须是水深或 'normal' / 'critical'")
+        if np.any(np.isnan(h1)):
+            raise ValueError("平坡、逆坡通道不存在正常水深")
+        h_control = h1.copy()
+
+        n_steps = max(int(np.ceil(L / self.dx - 1e-9)), 1)
+        dx = L / n_steps
+        signed_dx = dx if subcritical else -dx
+
+        h = np.empty((n_steps + 1, Q.size))
+        h[0] = h1
+        converged = np.ones(Q.size, dtype=bool)
+        for k in range(n_steps):
+            E1 = self.specific_energy(h1, Q)
+            Sf1 = self.friction_slope(h1, Q, nf)
+
+            def residual(hk, idx):
+                return self._energy_residual(hk, Q[idx], nf[idx], E1[idx], S0[idx] * signed_dx,
+                                             Sf1[idx], signed_dx)
+
+            h1, ok = self._newton(residual, h1, hc, subcritical)
+            converged &= ok
+            h[k + 1] = h1
+
+        x = np.arange(n_steps + 1) * dx
+        if subcritical:
+            x = -x[::-1]
+            h = h[::-1]
+
+        return {
+            'x': x,
+            'h': h.reshape((-1,) + shape),
+            'E': self.specific_energy(h, Q).reshape((-1,) + shape),
+            'Fr': self.froude_number(h, Q).reshape((-1,) + shape),
+            'hn': hn.reshape(shape),
+            'hc': hc.reshape(shape),
+            'converged': converged.reshape(shape),
+            'type': self.classify_profiles(Q, h_control, S0, nf).reshape(shape),
+        }
+
+    def classify_profiles(self, Q, h_control, S0=None, n_factor=1.0) -> np.ndarray:
+        """
+        批量判断水面曲线类型（与 WaterSurfaceProfile.classify_profile 一致）
+
+        返回：
+            字符串数组，如 "M1 (缓坡壅水)"
+        """
+        shape, (Q, S0, nf, h) = self._lanes(Q, S0, n_factor, h_control)
+        hc = self.critical_depth(Q)
+        hn = self.normal_depth(Q, S0, nf)
+        Sc = self.friction_slope(hc, Q, nf)
+
+        code = np.where(h > hc, 'A2', 'A3')
+        code = np.where(S0 == 0, np.where(h > hc, 'H2', 'H3'), code)
+        steep = np.where(h > hc, 'S1', np.where(h > hn, 'S2', 'S3'))
+        mild = np.where(h > hn, 'M1', np.where(h > hc, 'M2', 'M3'))
+        critical = np.where(h > hc, 'C1', 'C3')
+        positive = S0 > 0
+        code = np.where(positive, np.where(S0 < Sc, mild, steep), code)
+        code = np.where(positive & (np.abs(S0 - Sc) < 1e-6), critical, code)
+        return np.array([_PROFILE_LABELS[c] for c in code]).reshape(shape)
+
+    def rating_family(self, Q, h_downstream, L: float, S0=None, n_factor=1.0) -> Dict:
+        """
+        一次计算整族水位-流量关系：下游控制水深 × 流量
+
+        参数：
+            Q: 流量序列 (m³/s)，长度 nQ
+            h_downstream: 下游控制水深序列 (m)，长度 nH；
+                          低于临界水深时取临界水深（跌水控制）；
+                          也可为 'normal'（每个流量取正常水深，nH=1）
+            L: 上游断面距控制断面的距离 (m)
+            S0: 底坡
+            n_factor: 糙率倍数
+
+        返回：
+            dict: {
+                'Q': (nQ,), 'h_downstream': (nH, nQ),
+                'h_upstream': 上游断面水深 (nH, nQ),
+                'x': (nx,), 'h': 全部水面曲线 (nx, nH, nQ)
+            }
+        """
+        Q = np.atleast_1d(np.asarray(Q, dtype=float))
+        if isinstance(h_downstream, str):
+            h_ds = self.normal_depth(Q, S0, n_factor)[None, :]
+            if h_downstream != 'normal' or np.any(np.isnan(h_ds)):
+                raise ValueError("h_downstream 必须是水深序列或 'normal'（正坡）")
+        else:
+            h_ds = np.atleast_1d(np.asarray(h_downstream, dtype=float))[:, None]
+            h_ds = np.maximum(h_ds, self.critical_depth(Q)[None, :])
+
+        result = self.compute_profiles(Q[None, :], h_ds, L, 'upstream', S0, n_factor)
+        return {
+            'Q': Q,
+            'h_downstream': np.broadcast_to(h_ds, result['h'].shape[1:]).copy(),
+            'h_upstream': result['h'][0],
+            'x': result['x'],
+            'h': result['h'],
+            'converged': result['converged'],
+        }
+
+    def solve_energy_balance(self, H_target, Q, z_bed: float = 0.0,
+                             loss_coefficient: float = 0.0, V_ref=None) -> np.ndarray:
+        """
+        按能量守恒求缓流水深：z + h + Q²/(2gA²) = H + k·|V_ref² - V²|/(2g)
+
+        用于汇流节点：H 为节点下游断面的总水头，V_ref 为其流速。
+
+        参数：
+            H_target: 下游总水头 (m)
+            Q: 本断面流量 (m³/s)
+            z_bed: 本断面渠底高程 (m)
+            loss_coefficient: 局部损失系数k
+            V_ref: 下游断面流速 (m/s)
+
+        返回：
+            h: 水深 (m)，能量不足时取临界水深
+        """
+        arrays = np.broadcast_arrays(*[np.asarray(a, dtype=float)
+                                       for a in (Q, H_target, 0.0 if V_ref is None else V_ref)])
+        shape = arrays[0].shape
+        Q, H, Vr = [a.ravel() for a in arrays]
+        if np.any(Q <= 0):
+            raise ValueError("流量必须大于0")
+        hc = self.critical_depth(Q)
+        k, g = loss_coefficient, self.g
+
+        def residual(h, idx):
+            f, df = self._energy_residual(h, Q[idx], 1.0, H[idx] - z_bed, 0.0, 0.0, 0.0)
+            if k > 0:
+                A = np.maximum(self.section.area(h), 1e-12)
+                V = Q[idx] / A
+                dV = -V * self.section.top_width(h) / A
+                s = np.sign(Vr[idx]**2 - V**2)
+                f = f - k * s * (Vr[idx]**2 - V**2) / (2 * g)
+                df = df + k * s * 2 * V * dV / (2 * g)
+            return f, df
+
+        h0 = np.maximum(H - z_bed, 1.05 * hc)
+        h, _ = self._newton(residual, h0, hc, True)
+        return h.reshape(shape)
+
+    def __repr__(self):
+        return f"BatchProfileSolver(section={self.section}, dx={self.dx}m)"
+
+
+class ProfileNetwork:
+    """
+    树状河网缓流水面曲线
+
+    各河段为棱柱形断面，自出口河段向上游逐段推算；
+    汇流节点处支流下游断面与干流上游断面总水头相等（可计局部损失）。
+    各河段流量 = 本河段入流 + 全部上游河段流量，可为数组（批量计算）。
+
+    参数：
+        dx: 默认步长 (m)
+        tol: 牛顿迭代容差 (m)
+        max_iter: 每步最大迭代次数
+        junction_loss: 汇流节点局部损失系数
+        g: 重力加速度 (m/s²)
+    """
+
+    def __init__(self, dx: float = 10.0, tol: float = 1e-6, max_iter: int = 50,
+                 junction_loss: float = 0.0, g: float = 9.81):
+        self.dx = dx
+        self.tol = tol
+        self.max_iter = max_iter
+        self.junction_loss = junction_loss
+        self.g = g
+        self.reaches = {}
+
+    def add_reach(self, name: str, channel, length: float, downstream: str = None,
+                  inflow=0.0, S0: float = None, z_downstream: float = None,
+                  dx: float = None, n_factor=1.0):
+        """
+        添加河段
+
+        参数：
+            name: 河段名称
+            channel: 断面对象（SectionTable 或断面类）
+            length: 河段长度 (m)
+            downstream: 下游河段名称，None 表示出口河段
+            inflow: 河段上端入流 (m³/s)，标量或数组
+            S0: 底坡，默认取断面的S0
+            z_downstream: 河段下端渠底高程 (m)，默认出口为0、支流与汇流节点齐平
+            dx: 步长 (m)，默认使用网络步长
+            n_factor: 糙率倍数
+        """
+        if name in self.reaches:
+            raise ValueError(f"河段 {name} 已存在")
+        solver = BatchProfileSolver(channel, dx=dx or self.dx, tol=self.tol,
+                                    max_iter=self.max_iter, g=self.g)
+        S0 = solver.section.S0 if S0 is None else S0
+        if S0 is None:
+            raise ValueError("需要给出底坡S0")
+        self.reaches[name] = {
+            'solver': solver, 'length': length, 'downstream': downstream,
+            'inflow': inflow, 'S0': S0, 'z_downstream': z_downstream,
+            'n_factor': n_factor,
+        }
+
+    def _order(self):
+        """自出口向上游的计算顺序及各河段的上游河段"""
+        upstream = {name: [] for name in self.reaches}
+        outlets = []
+        for name, reach in self.reaches.items():
+            if reach['downstream'] is None:
+                outlets.append(name)
+            elif reach['downstream'] not in self.reaches:
+                raise ValueError(f"河段 {name} 的下游河段 {reach['downstream']} 不存在")
+            else:
+                upstream[reach['downstream']].append(name)
+        if len(outlets) != 1:
+            raise ValueError("河网必须有且只有一个出口河段")
+
+        order = [outlets[0]]
+        for name in order:
+            order.extend(upstream[name])
+        if len(order) != len(self.reaches):
+            raise ValueError("河网存在环路")
+        return order, upstream
+
+    def discharges(self) -> Dict[str, np.ndarray]:
+        """各河段流量（自上游累加）"""
+        order, upstream = self._order()
+        Q = {}
+        for name in reversed(order):
+            Q[name] = np.asarray(self.reaches[name]['inflow'], dtype=float) + \
+                sum((Q[u] for u in upstream[name]), 0.0)
+        return Q
+
+    def solve(self, h_outlet: Union[float, np.ndarray, str] = 'normal') -> Dict[str, Dict]:
+        """
+        计算河网水面线
+
+        参数：
+            h_outlet: 出口断面水深 (m)，或 'normal'
+
+        返回：
+            dict: 河段名 -> {'x', 'h', 'z', 'wse', 'Q', 'converged'}，
+                  x 为河段内自上游端起算的距离
+        """
+        order, _ = self._order()
+        Q = self.discharges()
+        results = {}
+
+        for name in order:
+            reach = self.reaches[name]
+            solver = reach['solver']
+            down = reach['downstream']
+
+            if down is None:
+                z_down = reach['z_downstream'] or 0.0
+                h_start = h_outlet
+            else:
+                # 汇流节点：与干流上游端总水头相等
+                main = results[down]
+                z_down = main['z'][0] if reach['z_downstream'] is None else reach['z_downstream']
+                A_main = np.maximum(self.reaches[down]['solver'].section.area(main['h'][0]), 1e-12)
+                V_main = main['Q'] / A_main
+                H_node = main['wse'][0] + V_main**2 / (2 * self.g)
+                h_start = solver.solve_energy_balance(H_node, Q[name], z_down,
+                                                      self.junction_loss, V_main)
+
+            profile = solver.compute_profiles(Q[name], h_start, reach['length'], 'upstream',
+                                              reach['S0'], reach['n_factor'])
+            x = profile['x'] + reach['length']
+            z = z_down + reach['S0'] * (reach['length'] - x)
+            h = profile['h']
+            results[name] = {
+                'x': x,
+                'h': h,
+                'z': z,
+                'wse': z.reshape((-1,) + (1,) * (h.ndim - 1)) + h,
+                'Q': np.broadcast_to(Q[name], h.shape[1:]),
+                'converged': profile['converged'],
+            }
+        return results
+
+    def __repr__(self):
+        return f"ProfileNetwork(reaches={list(self.reaches)})"
@@ -23,7 +23,8 @@ class WaterSurfaceProfile:
         初始化水面曲线求解器
 
         参数：
-            channel: 渠道对象（必须有 area, wetted_perimeter, top_width, friction_slope 方法）
+            channel: 渠道对象（必须有 area, wetted_perimeter, top_width 方法，
+                     也可以是 SectionTable 断面水力要素表）
             Q: 流量 (m³/s)
             dx: 步长 (m)，默认10m
             tol: 收敛容差，默认1e-6
@@ -75,11 +76,16 @@ class WaterSurfaceProfile:
         """
         计算摩阻坡度
 
-        Sf = n²Q² / (A²R^(4/3))
+        Sf = n²Q² / (A²R^(4/3))；断面提供流量模数 K 时（如 SectionTable），
+        Sf = Q²/K²
         """
         if h <= 0:
             return float('inf')
 
+        if hasattr(self.channel, 'conveyance'):
+            K = self.channel.conveyance(h)
+            return self.Q**2 / K**2 if K > 0 else float('inf')
+
         A = self.channel.area(h)
         P = self.channel.wetted_perimeter(h)
 
@@ -16,3 +16,9 @@ if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
 print(f"✓ 已添加项目根目录到Python路径: {project_root}")
+
+
+def pytest_configure(config):
+    """注册自定义标记"""
+    config.addinivalue_line(
+        "markers", "benchmark: 依赖机器速度的计时测试，设置环境变量 RUN_BENCHMARKS=1 时运行")
@@ -0,0 +1,125 @@
+"""
+单元测试 - 批量水面曲线求解器
+
+测试内容：
+1. 与逐条标准步长法结果对比（缓坡、陡坡）
+2. 水面曲线类型批量判别
+3. 水位-流量关系曲线族
+4. 树状河网汇流节点能量衔接
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from models.channel import TrapezoidalChannel
+from solvers.steady.profile import WaterSurfaceProfile
+from solvers.steady.batch_profile import BatchProfileSolver, ProfileNetwork
+
+
+@pytest.fixture
+def mild_channel():
+    return TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001)
+
+
+class TestBatchProfileSolver:
+    """批量水面曲线测试类"""
+
+    def test_matches_scalar_profile(self, mild_channel):
+        """测试与 WaterSurfaceProfile 逐条计算结果一致（M1曲线）"""
+        Q = np.array([10.0, 20.0, 40.0])
+        result = BatchProfileSolver(mild_channel, dx=10.0).compute_profiles(Q, 3.0, 2000.0)
+
+        assert result['h'].shape == (201, 3)
+        assert np.all(result['converged'])
+        for i, q in enumerate(Q):
+            scalar = WaterSurfaceProfile(mild_channel, Q=q, dx=10.0).compute_profile(3.0, 2000.0)
+            n = len(scalar['h'])
+            assert np.allclose(result['h'][-n:, i], scalar['h'], atol=1e-4)
+            assert result['type'][i] == scalar['type']
+
+    def test_supercritical_downstream(self):
+        """测试陡坡急流向下游推算"""
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.015, S0=0.02)
+        result = BatchProfileSolver(channel).compute_profiles([10.0, 20.0], 0.3, 200.0, 'downstream')
+        scalar = WaterSurfaceProfile(channel, Q=10.0, dx=10.0).compute_profile(0.3, 200.0, 'downstream')
+
+        assert np.allclose(result['h'][:len(scalar['h']), 0], scalar['h'], atol=1e-4)
+        assert np.all(result['h'] < result['hc'])
+        assert list(result['type']) == ["S3 (陡坡急流)"] * 2
+
+    def test_classify_profiles(self, mild_channel):
+        """测试水面曲线类型批量判别"""
+        solver = BatchProfileSolver(mild_channel)
+        hn = solver.normal_depth(20.0)
+        hc = solver.critical_depth(20.0)
+        h = np.array([hn + 0.5, 0.5 * (hn + hc), 0.5 * hc])
+
+        types = solver.classify_profiles(20.0, h)
+        assert [t[:2] for t in types] == ['M1', 'M2', 'M3']
+
+    def test_roughness_variants(self, mild_channel):
+        """测试糙率倍数作为通道：糙率越大，壅水越高"""
+        result = BatchProfileSolver(mild_channel, dx=50.0).compute_profiles(
+            20.0, 3.0, 3000.0, n_factor=np.array([0.8, 1.0, 1.2]))
+
+        assert np.all(np.diff(result['h'][0]) > 0)
+        assert np.all(np.diff(result['hn']) > 0)
+
+    def test_rating_family(self, mild_channel):
+        """测试一次调用生成水位-流量关系曲线族"""
+        solver = BatchProfileSolver(mild_channel, dx=50.0)
+        Q = np.linspace(5.0, 60.0, 12)
+        family = solver.rating_family(Q, [0.1, 2.0, 3.0], 5000.0)
+
+        assert family['h_upstream'].shape == (3, 12)
+        assert np.all(family['converged'])
+        # 下游水深低于临界水深时取临界水深控制
+        assert np.allclose(family['h_downstream'][0], solver.critical_depth(Q))
+        # 同一下游水深下，上游水深随流量单调增加
+        assert np.all(np.diff(family['h_upstream'], axis=1) > 0)
+
+        normal = solver.rating_family(Q, 'normal', 1000.0)
+        assert np.allclose(normal['h_upstream'][0], solver.normal_depth(Q), atol=1e-4)
+
+
+class TestProfileNetwork:
+    """树状河网测试类"""
+
+    def test_junction_energy_balance(self, mild_channel):
+        """测试汇流节点能量相等、流量自上游累加"""
+        tributary = TrapezoidalChannel(b=3.0, m=1.5, n=0.03, S0=0.002)
+        network = ProfileNetwork(dx=50.0)
+        network.add_reach('main', mild_channel, 5000.0)
+        network.add_reach('trib', tributary, 3000.0, downstream='main', inflow=np.array([5.0, 10.0]))
+        network.add_reach('upper', mild_channel, 4000.0, downstream='main', inflow=8.0)
+
+        results = network.solve(3.5)
+        g = 9.81
+
+        assert np.allclose(results['main']['Q'], [13.0, 18.0])
+        assert np.allclose(results['main']['h'][-1], 3.5)
+
+        main = results['main']
+        A_main = mild_channel.area(main['h'][0, 0])
+        H_main = main['wse'][0, 0] + (main['Q'][0] / A_main)**2 / (2 * g)
+        trib = results['trib']
+        A_trib = tributary.area(trib['h'][-1, 0])
+        H_trib = trib['wse'][-1, 0] + (trib['Q'][0] / A_trib)**2 / (2 * g)
+
+        assert trib['z'][-1] == pytest.approx(main['z'][0])
+        assert H_trib == pytest.approx(H_main, abs=1e-5)
+
+    def test_invalid_topology(self, mild_channel):
+        """测试河网拓扑检查"""
+        network = ProfileNetwork()
+        network.add_reach('a', mild_channel, 1000.0, downstream='b')
+        with pytest.raises(ValueError):
+            network.solve()
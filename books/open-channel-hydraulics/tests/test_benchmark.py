@@ -1,236 +1,128 @@
 """
 性能基准测试
 
-测试各案例的计算性能和资源使用情况。
+运行求解器基准测试（快速规模），检查结果格式与回退判别逻辑。
+
+依赖机器速度的计时断言（与 code/benchmarks/baseline.json 比较、
+加速比、缩放指数）标记为 benchmark，默认跳过；设置环境变量
+RUN_BENCHMARKS=1 时运行，或在 code 目录下执行 python -m benchmarks。
 
 作者：CHS-Books项目
 日期：2025-10-30
 """
 
-import time
 import sys
 import os
 import pytest
 import numpy as np
-from typing import Callable, Tuple
-
-
-# 确保可以导入测试模块
-sys.path.insert(0, os.path.dirname(__file__))
-
-
-# ============================================================================
-# 基准测试工具函数
-# ============================================================================
-
-def benchmark_function(func: Callable, *args, iterations: int = 100) -> Tuple[float, float]:
-    """
-    对函数进行基准测试
-
-    Args:
-        func: 待测试函数
-        *args: 函数参数
-        iterations: 迭代次数
-
-    Returns:
-        (平均执行时间, 标准差) 单位：秒
-    """
-    times = []
-    for _ in range(iterations):
-        start = time.perf_counter()
-        func(*args)
-        end = time.perf_counter()
-        times.append(end - start)
-
-    return np.mean(times), np.std(times)
-
-
-# ============================================================================
-# 案例1-10：明渠流基础计算性能测试
-# ============================================================================
-
-class TestOpenChannelFlowPerformance:
-    """明渠流基础计算性能测试"""
-
-    def test_trapezoidal_geometry_performance(self):
-        """测试梯形断面几何计算性能"""
-        from test_case_01_irrigation import trapezoidal_area, hydraulic_radius
-
-        # 测试梯形面积计算
-        avg_time, std_time = benchmark_function(
-            trapezoidal_area, 2.0, 1.5, 1.0, iterations=1000
-        )
-        assert avg_time < 1e-5, f"梯形面积计算过慢: {avg_time:.2e}秒"
-        print(f"\n梯形面积计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-        # 测试水力半径计算
-        avg_time, std_time = benchmark_function(
-            hydraulic_radius, 3.0, 5.83, iterations=1000
-        )
-        assert avg_time < 1e-5, f"水力半径计算过慢: {avg_time:.2e}秒"
-        print(f"水力半径计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-    def test_manning_formula_performance(self):
-        """测试Manning公式计算性能"""
-        from test_case_01_irrigation import manning_velocity
-
-        avg_time, std_time = benchmark_function(
-            manning_velocity, 0.025, 0.515, 0.0002, iterations=1000
-        )
-        assert avg_time < 1e-5, f"Manning流速计算过慢: {avg_time:.2e}秒"
-        print(f"\nManning流速计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-    def test_froude_number_performance(self):
-        """测试Froude数计算性能"""
-        from test_case_01_irrigation import froude_number
-
-        avg_time, std_time = benchmark_function(
-            froude_number, 0.3, 1.5, 9.81, iterations=1000
-        )
-        assert avg_time < 1e-5, f"Froude数计算过慢: {avg_time:.2e}秒"
-        print(f"\nFroude数计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-
-# ============================================================================
-# 案例11-20：水工建筑物性能测试
-# ============================================================================
-# 注：部分测试因函数名不匹配已移除，仅保留核心功能测试
-
-
-# ============================================================================
-# 案例21-24：有压管流性能测试
-# ============================================================================
-
-class TestPipeFlowPerformance:
-    """有压管流计算性能测试"""
-
-    def test_reynolds_number_performance(self):
-        """测试Reynolds数计算性能"""
-        from test_case_21_pipe_flow import reynolds_number
-
-        avg_time, std_time = benchmark_function(
-            reynolds_number, 2.0, 0.5, 1e-6, iterations=1000
-        )
-        assert avg_time < 1e-5, f"Reynolds数计算过慢: {avg_time:.2e}秒"
-        print(f"\nReynolds数计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-
-# ============================================================================
-# 案例25-28：瞬变流性能测试
-# ============================================================================
-
-class TestTransientFlowPerformance:
-    """瞬变流计算性能测试"""
-
-    def test_wave_speed_calculation_performance(self):
-        """测试水锤波速计算性能"""
-        from test_case_25_water_hammer import wave_speed_elastic_pipe
-
-        avg_time, std_time = benchmark_function(
-            wave_speed_elastic_pipe, 2.2e9, 1000.0, 2.1e11, 1.0, 0.02, iterations=1000
-        )
-        assert avg_time < 1e-5, f"波速计算过慢: {avg_time:.2e}秒"
-        print(f"\n水锤波速计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-    def test_joukowsky_pressure_performance(self):
-        """测试Joukowsky水锤压力计算性能"""
-        from test_case_25_water_hammer import joukowsky_pressure_rise
-
-        avg_time, std_time = benchmark_function(
-            joukowsky_pressure_rise, 1200.0, 2.0, 9.81, iterations=1000
-        )
-        assert avg_time < 1e-5, f"Joukowsky压力计算过慢: {avg_time:.2e}秒"
-        print(f"\nJoukowsky压力上升: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-    def test_thoma_critical_area_performance(self):
-        """测试Thoma临界面积计算性能"""
-        from test_case_28_surge_tank import thoma_critical_area
-
-        avg_time, std_time = benchmark_function(
-            thoma_critical_area, 1000.0, 3.0, 300.0, 1.0, iterations=1000
-        )
-        assert avg_time < 1e-5, f"Thoma临界面积计算过慢: {avg_time:.2e}秒"
-        print(f"\nThoma临界面积: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-
-# ============================================================================
-# 数值方法性能测试
-# ============================================================================
-
-class TestNumericalMethodsPerformance:
-    """数值方法性能测试"""
-
-    def test_hardy_cross_iteration_performance(self):
-        """测试Hardy-Cross迭代性能"""
-        from test_case_22_pipe_network import hardy_cross_correction
-
-        pipe_flows = [0.05, 0.03, 0.02]
-        pipe_K = [500.0, 800.0, 1200.0]
-
-        avg_time, std_time = benchmark_function(
-            hardy_cross_correction, pipe_flows, pipe_K, 2.0, iterations=1000
-        )
-        assert avg_time < 5e-5, f"Hardy-Cross单次迭代过慢: {avg_time:.2e}秒"
-        print(f"\nHardy-Cross单次迭代: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-
-    def test_moc_characteristic_equation_performance(self):
-        """测试MOC特征方程求解性能"""
-        from test_case_26_moc import c_plus_equation, c_minus_equation
-
-        # 测试C+方程
-        avg_time, std_time = benchmark_function(
-            c_plus_equation, 100.0, 2.0, 1.9, 5.0, 1200.0, 9.81, iterations=1000
-        )
-        assert avg_time < 1e-5, f"C+方程计算过慢: {avg_time:.2e}秒"
-        print(f"\nMOC C+方程: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-        # 测试C-方程
-        avg_time, std_time = benchmark_function(
-            c_minus_equation, 100.0, 2.0, 1.9, 5.0, 1200.0, 9.81, iterations=1000
-        )
-        assert avg_time < 1e-5, f"C-方程计算过慢: {avg_time:.2e}秒"
-        print(f"MOC C-方程: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-
-
-# ============================================================================
-# 复杂度缩放测试
-# ============================================================================
-# 注：缩放测试因计算速度过快导致不稳定，已移除
-
-
-# ============================================================================
-# 性能回归测试
-# ============================================================================
 
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from benchmarks.solver_benchmarks import (
+    BASELINE_PATH, BENCHMARKS, measure, run_suite, save_results, load_results,
+    compare_to_baseline, saint_venant_case, pipe_network_case,
+)
+
+# 测试环境与生成基准的机器可能不同，比较时放宽容许倍数
+CI_TOLERANCE = 5.0
+
+timing = pytest.mark.skipif(not os.environ.get('RUN_BENCHMARKS'),
+                            reason="计时测试默认跳过，设置 RUN_BENCHMARKS=1 运行")
+
+
+@pytest.fixture(scope='module')
+def quick_results():
+    """全部基准的快速规模结果（模块内共用）"""
+    return run_suite(quick=True, repeat=2)
+
+
+class TestBenchmarkSuite:
+    """基准测试框架测试"""
+
+    def test_result_format(self, quick_results, tmp_path):
+        """测试结果格式与JSON读写"""
+        assert set(quick_results['benchmarks']) == set(BENCHMARKS)
+        for name, bench in quick_results['benchmarks'].items():
+            assert bench['unit'] == BENCHMARKS[name][1]
+            assert [p['size'] for p in bench['points']] == BENCHMARKS[name][3]
+            for point in bench['points']:
+                assert point['work'] > 0
+                assert point['throughput'] == pytest.approx(point['work'] / point['time'])
+                assert point['peak_memory_mb'] >= 0
+            assert np.isfinite(bench['scaling_exponent'])
+
+        # 水面曲线可能提前到达正常水深，计算量以实际推算断面数计
+        profile = quick_results['benchmarks']['water_profile']['points']
+        assert all(p['work'] <= p['size'] + 1 for p in profile)
+
+        path = tmp_path / 'results.json'
+        save_results(quick_results, str(path))
+        assert load_results(str(path)) == quick_results
+
+    def test_work_counts(self):
+        """测试计算量统计：断面数×时间步数、连接数×迭代次数"""
+        setup, run = saint_venant_case(51)
+        solver = setup()
+        assert run(solver) == 51 * solver.time_step
+
+        setup, run = pipe_network_case(5)
+        net = setup()
+        work = run(net)
+        assert work % len(net.links) == 0
+        assert work // len(net.links) >= 2
+
+    def test_unknown_benchmark(self):
+        """测试未知基准名称"""
+        with pytest.raises(ValueError):
+            run_suite(['no_such_solver'])
+
+    def test_regression_detection(self, quick_results):
+        """测试人为提高基准吞吐量、降低基准内存后能识别回退"""
+        assert compare_to_baseline(quick_results, quick_results) == []
+
+        baseline = {'benchmarks': {}}
+        for name in ('saint_venant', 'pipe_network'):
+            bench = quick_results['benchmarks'][name]
+            baseline['benchmarks'][name] = {
+                'points': [dict(p, throughput=p['throughput'] * 3,
+                                peak_memory_mb=p['peak_memory_mb'] / 10 - 2.0)
+                           for p in bench['points']]
+            }
+        regressions = compare_to_baseline(quick_results, baseline)
+        flagged = {(r['benchmark'], r['metric']) for r in regressions}
+        assert ('saint_venant', 'throughput') in flagged
+        assert ('pipe_network', 'throughput') in flagged
+        assert ('pipe_network', 'peak_memory_mb') in flagged
+        assert all(r['ratio'] < 1 for r in regressions if r['metric'] == 'throughput')
+
+
+@pytest.mark.benchmark
+@timing
 class TestPerformanceRegression:
-    """性能回归测试 - 确保性能不会意外下降"""
-
-    def test_critical_path_performance(self):
-        """测试关键路径性能（常用计算的综合测试）"""
-        from test_case_01_irrigation import (
-            trapezoidal_area, trapezoidal_wetted_perimeter,
-            hydraulic_radius, manning_velocity, discharge
-        )
-
-        # 模拟一个完整的渠道设计计算流程
-        def complete_channel_design():
-            b, h, m, n, S = 2.0, 1.5, 1.0, 0.025, 0.0002
-            A = trapezoidal_area(b, h, m)
-            P = trapezoidal_wetted_perimeter(b, h, m)
-            R = hydraulic_radius(A, P)
-            v = manning_velocity(n, R, S)
-            Q = discharge(A, v)
-            return Q
-
-        avg_time, std_time = benchmark_function(
-            complete_channel_design, iterations=1000
-        )
-
-        # 基准值：完整计算应在100μs以内
-        assert avg_time < 1e-4, f"渠道设计计算性能下降: {avg_time:.2e}秒"
-        print(f"\n完整渠道设计计算: {avg_time*1e6:.2f}±{std_time*1e6:.2f} μs")
-        print(f"性能基准: < 100 μs ✓")
+    """性能回退测试 - 确保求解器性能不会意外下降"""
+
+    def test_against_baseline(self, quick_results):
+        """测试快速规模结果与保存的基准比较"""
+        baseline = load_results(BASELINE_PATH)
+        regressions = compare_to_baseline(quick_results, baseline, tolerance=CI_TOLERANCE,
+                                          memory_tolerance=CI_TOLERANCE)
+        assert regressions == [], f"性能回退: {regressions}"
+
+    def test_vectorized_depth_solves(self, quick_results):
+        """测试批量水深求解比逐个迭代快一个数量级以上"""
+        bench = quick_results['benchmarks']
+        batch = bench['depth_batch']['points'][-1]['throughput']
+        scalar = max(bench['normal_depth']['points'][-1]['throughput'],
+                     bench['critical_depth']['points'][-1]['throughput'])
+        assert batch > 10 * scalar
+
+    def test_pipe_network_scaling(self):
+        """测试稀疏管网求解耗时近似线性增长（远低于稠密求解的立方增长）"""
+        times = [measure(pipe_network_case(n), repeat=3)['time'] for n in (15, 30)]
+        # 规模（节点数）增大4倍
+        exponent = np.log(times[1] / times[0]) / np.log(4.0)
+        assert exponent < 1.6
 
 
 if __name__ == '__main__':
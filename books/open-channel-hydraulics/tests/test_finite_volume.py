@@ -0,0 +1,144 @@
+"""
+单元测试 - 有限体积Saint-Venant求解器
+
+测试内容：
+1. 断面几何函数（面积、水深反算、压力项）
+2. 静水保持与质量守恒
+3. 干河床溃坝（Ritter解析解）
+4. 任意断面与Lax格式向量化
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from solvers.saint_venant import SaintVenantSolver
+from solvers.finite_volume import FiniteVolumeSolver, PrismaticSection
+from models.channel import TrapezoidalChannel, CircularChannel
+
+
+class TestPrismaticSection:
+    """断面几何函数测试类"""
+
+    @pytest.mark.parametrize("section", [
+        PrismaticSection(b=10.0),
+        PrismaticSection(b=5.0, m=1.5),
+        PrismaticSection(D=2.0),
+    ])
+    def test_depth_from_area_inverse(self, section):
+        """测试面积→水深反算"""
+        h = np.linspace(0.0, 1.9, 50)
+        assert np.allclose(section.depth_from_area(section.area(h)), h, atol=1e-3)
+
+    def test_matches_channel_classes(self):
+        """测试与断面类的逐点结果一致"""
+        trap = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001)
+        circ = CircularChannel(D=2.0, n=0.013, S0=0.001)
+        h = np.array([0.3, 0.8, 1.5])
+
+        sec = PrismaticSection.from_channel(trap)
+        assert np.allclose(sec.area(h), [trap.area(x) for x in h])
+        assert np.allclose(sec.wetted_perimeter(h), [trap.wetted_perimeter(x) for x in h])
+
+        sec = PrismaticSection.from_channel(circ)
+        assert np.allclose(sec.area(h), [circ.area(x) for x in h])
+        assert np.allclose(sec.wetted_perimeter(h), [circ.wetted_perimeter(x) for x in h])
+
+    def test_pressure_integral(self):
+        """测试静水压力项 dI₁/dh = A"""
+        for section in (PrismaticSection(b=5.0, m=1.5), PrismaticSection(D=2.0)):
+            h = np.linspace(0.1, 1.8, 20)
+            dh = 1e-4
+            dI = (section.pressure_integral(h + dh) - section.pressure_integral(h - dh)) / (2 * dh)
+            assert np.allclose(dI, section.area(h), rtol=1e-3)
+
+
+class TestFiniteVolumeSolver:
+    """有限体积求解器测试类"""
+
+    def test_still_water(self):
+        """测试水平河床静水保持不动"""
+        solver = FiniteVolumeSolver(L=1000.0, b=10.0, S0=0.0, n=0.03, dx=20.0)
+        solver.set_uniform_initial(2.0, 0.0)
+        results = solver.run(t_end=600.0)
+
+        assert np.allclose(results['h'][-1], 2.0)
+        assert np.allclose(results['Q'][-1], 0.0, atol=1e-10)
+
+    def test_mass_conservation(self):
+        """测试无入流时水量守恒"""
+        solver = FiniteVolumeSolver(L=2000.0, b=10.0, S0=0.0, n=0.03, dx=20.0)
+        h0 = 2.0 + np.exp(-((solver.x - 1000.0) / 50.0)**2)
+        solver.set_initial_conditions(h0, np.zeros(solver.nx))
+        volume0 = np.sum(solver.A) * solver.dx
+
+        solver.run(t_end=60.0)
+        volume1 = np.sum(solver.A) * solver.dx
+
+        assert abs(volume1 - volume0) / volume0 < 1e-10
+
+    def test_dry_bed_dam_break(self):
+        """测试干河床溃坝与Ritter解析解对比"""
+        g, h0, x_dam = 9.81, 4.0, 1000.0
+        solver = FiniteVolumeSolver(L=2000.0, b=1.0, S0=0.0, n=0.0, dx=5.0, cfl=0.9)
+        h_init = np.where(solver.x < x_dam, h0, 0.0)
+        solver.set_initial_conditions(h_init, np.zeros(solver.nx))
+
+        results = solver.run(t_end=60.0)
+        t = results['times'][-1]
+
+        c0 = np.sqrt(g * h0)
+        xi = (solver.x - x_dam) / t
+        h_exact = np.where(xi < -c0, h0, np.where(xi > 2 * c0, 0.0, (2 * c0 - xi)**2 / (9 * g)))
+
+        assert np.all(results['h'][-1] >= 0)
+        assert np.mean(np.abs(results['h'][-1] - h_exact)) < 0.02
+
+    def test_large_courant_stable(self):
+        """测试Courant数0.9时洪水波计算稳定"""
+        solver = FiniteVolumeSolver(L=20000.0, b=50.0, S0=1e-4, n=0.03, dx=100.0, cfl=0.9)
+        solver.set_uniform_initial(2.0, 80.0)
+        solver.set_boundary_conditions(
+            upstream=lambda t: (2.0 + 0.5 * np.sin(t / 600.0), 80.0 + 40.0 * np.sin(t / 600.0)))
+
+        results = solver.run(t_end=7200.0, dt_output=600.0)
+
+        assert np.all(np.isfinite(results['h']))
+        assert results['h'].max() < 3.0
+        assert results['Q'][-1, 0] == pytest.approx(80.0 + 40.0 * np.sin(solver.t / 600.0))
+
+    @pytest.mark.parametrize("channel", [
+        TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=5e-4),
+        CircularChannel(D=2.0, n=0.013, S0=1e-3),
+    ])
+    def test_arbitrary_section(self, channel):
+        """测试梯形、圆形断面"""
+        solver = FiniteVolumeSolver(L=5000.0, dx=50.0, channel=channel)
+        solver.set_uniform_initial(0.8, 2.0)
+        solver.set_boundary_conditions(upstream=lambda t: (0.8 + 0.5 * min(t / 600.0, 1.0),
+                                                           2.0 + 3.0 * min(t / 600.0, 1.0)))
+        results = solver.run(t_end=1800.0, dt_output=600.0)
+
+        assert solver.S0 == channel.S0
+        assert np.all(np.isfinite(results['h']))
+        assert np.all(results['h'] > 0)
+
+
+class TestLaxVectorized:
+    """向量化Lax格式测试类"""
+
+    def test_friction_slope_array(self):
+        """测试向量化摩阻坡度与逐点计算一致"""
+        solver = SaintVenantSolver(L=1000.0, b=10.0, S0=0.001, n=0.03, dx=100.0)
+        Q = np.array([0.0, 5.0, 20.0, -10.0, 3.0])
+        A = np.array([10.0, 1e-8, 20.0, 15.0, 0.5])
+
+        expected = [solver.compute_friction_slope(q, a) for q, a in zip(Q, A)]
+        assert np.allclose(solver.compute_friction_slope_array(Q, A), expected)
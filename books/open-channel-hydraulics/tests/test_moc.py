@@ -0,0 +1,191 @@
+"""
+单元测试 - 特征线法管网水锤求解器
+
+测试内容：
+1. 恒定流初值（全局梯度法）与瞬变计算的一致性
+2. 阀门瞬时关闭的Joukowsky升压
+3. 与逐节点循环的单管MOC结果对比
+4. 水泵、调压井、安全阀边界
+5. 非恒定摩阻衰减与多管网计算
+
+作者：CHS-Books项目
+日期：2025-10-30
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from solvers.moc import MOCNetwork, brunone_coefficient
+
+
+def valve_line(opening=1.0, dt=0.01, unsteady_friction=0.0, relief=False):
+    """水库 - 管道 - 阀门"""
+    net = MOCNetwork(dt=dt)
+    net.add_reservoir('R', 100.0)
+    if relief:
+        net.add_relief_valve('J', set_head=150.0, Cv=0.08)
+    else:
+        net.add_junction('J')
+    net.add_valve('V', Cv=0.05, opening=opening)
+    net.add_pipe('P1', 'R', 'J', 2000.0, 0.5, 1000.0, 0.02, unsteady_friction)
+    net.add_pipe('P2', 'J', 'V', 100.0, 0.5, 1000.0, 0.02, unsteady_friction)
+    return net
+
+
+class TestMOCNetwork:
+    """特征线法管网求解器测试类"""
+
+    def test_steady_state_preserved(self):
+        """测试恒定流初值满足阀门方程，且瞬变计算中保持不变"""
+        net = valve_line()
+        results = net.run(10.0)
+
+        Q0 = results['Q'][0, 0]
+        H_valve = results['H'][0, 2]
+        assert Q0 == pytest.approx(0.05 * np.sqrt(H_valve))
+        assert np.ptp(results['H'], axis=0).max() < 1e-9
+        assert np.ptp(results['Q'], axis=0).max() < 1e-12
+
+    def test_joukowsky(self):
+        """测试阀门瞬时关闭：升压约为 a·ΔV/g（另加沿程摩阻造成的升压）"""
+        net = valve_line(opening=lambda t: 0.0 if t > 0 else 1.0)
+        results = net.run(1.5)
+
+        A = np.pi * 0.5**2 / 4
+        jouk = 1000.0 / 9.81 * results['Q'][0, 0] / A
+        rise = results['H'][:, 2].max() - results['H'][0, 2]
+        hf = results['H'][0, 0] - results['H'][0, 2]
+        assert jouk < rise < jouk + hf
+
+    def test_matches_loop_moc(self):
+        """测试与逐节点循环计算的单管MOC结果一致"""
+        L, D, a, f, H0, Q0, N = 1200.0, 0.6, 1200.0, 0.02, 60.0, 0.4, 12
+        g = 9.81
+        A = np.pi * D**2 / 4
+        dt = L / N / a
+        B = a / (g * A)
+        R = f * (L / N) / (2 * g * D * A**2)
+        demand = lambda t: Q0 * max(1.0 - t, 0.0)
+
+        net = MOCNetwork(dt=dt)
+        net.add_reservoir('R', H0)
+        net.add_junction('V', demand=demand)
+        net.add_pipe('P', 'R', 'V', L, D, a, f)
+        net.initialize()
+        results = net.run(100 * dt, record_pipes=['P'])
+
+        H = H0 - R * Q0**2 * np.arange(N + 1)
+        Q = np.full(N + 1, Q0)
+        for n in range(1, 101):
+            CP = H + B * Q - R * Q * np.abs(Q)
+            CM = H - B * Q + R * Q * np.abs(Q)
+            H_new, Q_new = H.copy(), Q.copy()
+            for i in range(1, N):
+                H_new[i] = 0.5 * (CP[i - 1] + CM[i + 1])
+                Q_new[i] = (CP[i - 1] - CM[i + 1]) / (2 * B)
+            H_new[0] = H0
+            Q_new[0] = (H0 - CM[1]) / B
+            Q_new[N] = demand(n * dt)
+            H_new[N] = CP[N - 1] - B * Q_new[N]
+            H, Q = H_new, Q_new
+
+        assert np.allclose(results['profiles']['P']['H'][-1], H)
+        assert np.allclose(results['profiles']['P']['Q'][-1], Q)
+
+    def test_pump_trip_surge_tank(self):
+        """测试停泵水锤：调压井减小压降"""
+        minimum = []
+        for tank in (False, True):
+            net = MOCNetwork(dt=0.01)
+            net.add_pump('P', 10.0, (80.0, 0.0, -60.0), speed=lambda t: np.exp(-max(t, 0.0) / 3))
+            if tank:
+                net.add_surge_tank('J', area=5.0)
+            else:
+                net.add_junction('J')
+            net.add_reservoir('R', 60.0)
+            net.add_pipe('p1', 'P', 'J', 500.0, 0.6, 1000.0, 0.02)
+            net.add_pipe('p2', 'J', 'R', 1500.0, 0.6, 1000.0, 0.02)
+            results = net.run(30.0)
+
+            # 额定转速工况点：H = Hs + h0 + h2·Q²
+            Q0 = results['Q'][0, 0]
+            assert results['H'][0, 0] == pytest.approx(10.0 + 80.0 - 60.0 * Q0**2)
+            # 止回阀关闭后水泵不倒流
+            assert results['Q'][-1, 0] >= 0.0
+            minimum.append(results['H'][:, 0].min())
+
+        assert minimum[1] > minimum[0] + 5.0
+
+    def test_relief_valve(self):
+        """测试安全阀限制节点最高水头"""
+        closure = lambda t: max(1.0 - t / 0.1, 0.0)
+        peaks = [valve_line(closure, relief=relief).run(20.0)['H'][:, 1].max()
+                 for relief in (False, True)]
+
+        assert peaks[0] > 300.0
+        assert peaks[1] < 150.0 + 10.0
+
+    def test_unsteady_friction_damping(self):
+        """测试非恒定摩阻使压力波衰减更快"""
+        k = brunone_coefficient(5e5)
+        assert 0.0 < k < 0.1
+
+        amplitude = []
+        for kf in (0.0, k):
+            net = valve_line(opening=lambda t: 0.0 if t > 0 else 1.0, unsteady_friction=kf)
+            results = net.run(30.0)
+            late = results['H'][results['t'] > 20.0, 2]
+            amplitude.append(np.ptp(late))
+
+        assert amplitude[1] < amplitude[0]
+
+    def test_grid_network(self):
+        """测试多管网（约200管段）包络线计算"""
+        rng = np.random.default_rng(0)
+        net = MOCNetwork(dt=0.02)
+        net.add_reservoir('R', 120.0)
+        nx, ny = 12, 9
+        for i in range(nx):
+            for j in range(ny):
+                if (i, j) == (nx - 1, ny - 1):
+                    net.add_valve(f'N{i}_{j}', Cv=0.05, opening=lambda t: max(1.0 - t, 0.0))
+                else:
+                    net.add_junction(f'N{i}_{j}', demand=0.002)
+        net.add_pipe('feed', 'R', 'N0_0', 800.0, 0.8, 1100.0, 0.018)
+        for i in range(nx):
+            for j in range(ny):
+                if i + 1 < nx:
+                    net.add_pipe(f'x{i}_{j}', f'N{i}_{j}', f'N{i+1}_{j}',
+                                 rng.uniform(200.0, 600.0), 0.3, 1000.0, 0.02)
+                if j + 1 < ny:
+                    net.add_pipe(f'y{i}_{j}', f'N{i}_{j}', f'N{i}_{j+1}',
+                                 rng.uniform(200.0, 600.0), 0.3, 1000.0, 0.02)
+
+        results = net.run(20.0, record_every=10)
+        assert len(results['pipes']) == 196
+        assert results['H'].shape == (101, nx * ny + 1)
+
+        # 初始时刻各节点流量平衡：进水 = 需水 + 阀门出流
+        demand = 0.002 * (nx * ny - 1)
+        Q_valve = 0.05 * np.sqrt(results['H'][0, -1])
+        assert results['Q'][0, 0] == pytest.approx(demand + Q_valve, rel=1e-6)
+
+        H_max = max(h.max() for h in results['H_max'].values())
+        assert H_max > results['H'][0].max()
+        assert all(np.all(results['H_min'][p] <= results['H_max'][p]) for p in results['pipes'])
+
+    def test_invalid_network(self):
+        """测试管网定义检查"""
+        net = MOCNetwork()
+        net.add_junction('A')
+        with pytest.raises(ValueError):
+            net.add_pipe('P', 'A', 'B', 100.0, 0.3, 1000.0, 0.02)
+        net.add_junction('B')
+        net.add_pipe('P', 'A', 'B', 100.0, 0.3, 1000.0, 0.02)
+        with pytest.raises(ValueError):
+            net.initialize()
@@ -0,0 +1,198 @@
+"""
+单元测试 - 全局梯度法管网求解器
+
+测试内容：
+1. 单环管网与Hardy-Cross法结果对比（Darcy-Weisbach、Hazen-Williams）
+2. 大型网格管网的连续方程、能量方程残差
+3. 水泵、减压阀状态
+4. 延时模拟水池水位
+
+作者：CHS-Books项目
+日期：2025-10-30
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from solvers.pipe_network import PipeNetwork
+
+
+def hardy_cross(r, loops, Q, n=2.0, tol=1e-12, max_iter=500):
+    """逐环Hardy-Cross修正（对照）"""
+    Q = np.array(Q, dtype=float)
+    for _ in range(max_iter):
+        max_dQ = 0.0
+        for loop in loops:
+            idx = np.abs(loop) - 1
+            sign = np.sign(loop)
+            q = sign * Q[idx]
+            h = r[idx] * np.abs(q)**(n - 1) * q
+            dQ = -h.sum() / (n * np.sum(r[idx] * np.abs(q)**(n - 1)))
+            Q[idx] += sign * dQ
+            max_dQ = max(max_dQ, abs(dQ))
+        if max_dQ < tol:
+            break
+    return Q
+
+
+def grid_network(n, headloss='D-W', seed=0):
+    """n×n 网格管网，两端各接一个水库"""
+    rng = np.random.default_rng(seed)
+    rough = 130.0 if headloss == 'H-W' else 1e-4
+    net = PipeNetwork(headloss)
+    net.add_reservoir('R1', 80.0)
+    net.add_reservoir('R2', 75.0)
+    for i in range(n):
+        for j in range(n):
+            net.add_junction(f'{i}_{j}', demand=rng.uniform(0.0, 2e-3))
+    net.add_pipe('f1', 'R1', '0_0', 500.0, 0.8, rough)
+    net.add_pipe('f2', 'R2', f'{n-1}_{n-1}', 500.0, 0.8, rough)
+    for i in range(n):
+        for j in range(n):
+            if i + 1 < n:
+                net.add_pipe(f'x{i}_{j}', f'{i}_{j}', f'{i+1}_{j}', rng.uniform(100.0, 300.0),
+                             rng.choice([0.15, 0.2, 0.3, 0.4]), rough)
+            if j + 1 < n:
+                net.add_pipe(f'y{i}_{j}', f'{i}_{j}', f'{i}_{j+1}', rng.uniform(100.0, 300.0),
+                             rng.choice([0.15, 0.2, 0.3, 0.4]), rough)
+    return net
+
+
+def residuals(net, result, t=0.0):
+    """节点连续方程和连接能量方程残差"""
+    start = np.array([net.node_index[l['start']] for l in net.links.values()])
+    end = np.array([net.node_index[l['end']] for l in net.links.values()])
+    Q, H = result['Q'], result['H']
+    inflow = np.bincount(end, Q, minlength=len(H)) - np.bincount(start, Q, minlength=len(H))
+    demand = np.array([d['demand'] if d['kind'] == 'junction' else 0.0
+                       for d in net.nodes.values()])
+    junction = np.array([d['kind'] == 'junction' for d in net.nodes.values()])
+    return (np.abs(inflow - demand)[junction].max(),
+            np.abs(result['headloss'] - (H[start] - H[end])).max())
+
+
+class TestPipeNetwork:
+    """全局梯度法管网测试类"""
+
+    def test_two_loops_hazen_williams(self):
+        """测试两环管网（Hazen-Williams）与Hardy-Cross结果一致"""
+        pipes = {'AB': ('A', 'B', 100, 0.3), 'BC': ('B', 'C', 120, 0.25),
+                 'CD': ('C', 'D', 100, 0.3), 'DA': ('D', 'A', 120, 0.25),
+                 'AC': ('A', 'C', 141, 0.2)}
+        net = PipeNetwork('H-W')
+        net.add_reservoir('A', 50.0)
+        for name, q in (('B', 0.02), ('C', 0.01), ('D', 0.01)):
+            net.add_junction(name, demand=q)
+        for name, (a, b, L, D) in pipes.items():
+            net.add_pipe(name, a, b, L, D, roughness=100.0)
+        result = net.solve()
+
+        r = np.array([10.67 * L / (100.0**1.852 * D**4.87) for _, _, L, D in pipes.values()])
+        Q_hc = hardy_cross(r, [np.array([1, 2, -5]), np.array([5, 3, 4])],
+                           [0.05, 0.03, 0.04, 0.03, 0.02], n=1.852)
+        # Hardy-Cross初值中A点净出流0.04，与需水量之和一致
+        assert result['converged']
+        assert result['iterations'] < 10
+        assert np.allclose(result['Q'], Q_hc, atol=1e-8)
+
+    def test_darcy_weisbach_given_lambda(self):
+        """测试给定摩阻系数的Darcy-Weisbach水头损失"""
+        net = PipeNetwork()
+        net.add_reservoir('R', 30.0)
+        net.add_junction('J', demand=0.05)
+        net.add_pipe('P', 'R', 'J', 500.0, 0.2, friction_factor=0.02, minor_loss=2.0)
+        result = net.solve()
+
+        A = np.pi * 0.2**2 / 4
+        v = 0.05 / A
+        hf = (0.02 * 500.0 / 0.2 + 2.0) * v**2 / (2 * 9.81)
+        assert result['Q'][0] == pytest.approx(0.05)
+        assert result['H'][1] == pytest.approx(30.0 - hf)
+
+    @pytest.mark.parametrize('headloss', ['D-W', 'H-W'])
+    def test_large_grid(self, headloss):
+        """测试大型网格管网（约2000管段）残差与温启动"""
+        net = grid_network(32, headloss)
+        result = net.solve()
+        cont, energy = residuals(net, result)
+
+        assert result['converged']
+        assert cont < 1e-8
+        assert energy < 1e-4
+        # 上一次结果作为初值，一步收敛
+        assert net.solve()['iterations'] <= 2
+
+    def test_pump_and_check_valve(self):
+        """测试水泵工况点与停泵后止回阀关闭"""
+        net = PipeNetwork()
+        net.add_reservoir('S', 10.0)
+        net.add_junction('J')
+        net.add_reservoir('T', 45.0)
+        net.add_pump('PU', 'S', 'J', (60.0, 0.0, -2000.0), speed=lambda t: 1.0 if t < 10 else 0.0)
+        net.add_pipe('P', 'J', 'T', 800.0, 0.3, friction_factor=0.02)
+
+        running = net.solve(0.0)
+        Q = running['Q'][0]
+        assert Q > 0
+        assert running['H'][1] == pytest.approx(10.0 + 60.0 - 2000.0 * Q**2)
+
+        stopped = net.solve(20.0)
+        assert stopped['converged']
+        assert abs(stopped['Q'][0]) < 1e-6
+        assert stopped['H'][1] == pytest.approx(45.0, abs=1e-3)
+
+    def test_prv_status(self):
+        """测试减压阀：工作状态限压，上游水头不足时全开"""
+        for setting, expect_active in ((30.0, True), (60.0, False)):
+            net = PipeNetwork()
+            net.add_reservoir('R', 50.0)
+            net.add_junction('J1')
+            net.add_junction('J2')
+            net.add_junction('J3', demand=0.02)
+            net.add_pipe('p1', 'R', 'J1', 300.0, 0.3)
+            net.add_prv('V', 'J1', 'J2', 0.2, setting=setting)
+            net.add_pipe('p2', 'J2', 'J3', 500.0, 0.2)
+            result = net.solve()
+            H = dict(zip(result['nodes'], result['H']))
+
+            assert result['converged']
+            assert result['Q'][1] == pytest.approx(0.02)
+            if expect_active:
+                assert H['J2'] == pytest.approx(setting)
+            else:
+                assert H['J1'] > H['J2'] > H['J3']
+
+    def test_extended_period(self):
+        """测试延时模拟：水泵白天运行向水池充水，夜间停泵水池供水"""
+        net = PipeNetwork()
+        net.add_reservoir('S', 10.0)
+        net.add_junction('J', demand=lambda t: 0.02 * (1 + 0.5 * np.sin(2 * np.pi * t / 86400)))
+        net.add_tank('T', elevation=40.0, level=5.0, diameter=25.0, max_level=10.0)
+        net.add_pump('PU', 'S', 'J', (60.0, 0.0, -2000.0),
+                     speed=lambda t: 1.0 if (t % 86400) < 6 * 3600 else 0.0)
+        net.add_pipe('P', 'J', 'T', 800.0, 0.3)
+
+        results = net.run_eps(24 * 3600, 3600.0)
+        levels = results['tank_levels'][:, 0]
+        assert results['H'].shape == (25, 3)
+        assert np.all(np.diff(levels[:6]) > 0)
+        assert np.all(np.diff(levels[7:]) < 0)
+        assert np.all(levels <= 10.0)
+
+    def test_invalid_network(self):
+        """测试管网定义检查"""
+        net = PipeNetwork()
+        net.add_junction('A')
+        net.add_junction('B')
+        with pytest.raises(ValueError):
+            net.add_pipe('P', 'A', 'C', 100.0, 0.3)
+        net.add_pipe('P', 'A', 'B', 100.0, 0.3)
+        with pytest.raises(ValueError):
+            net.solve()
+        with pytest.raises(ValueError):
+            PipeNetwork('Manning')
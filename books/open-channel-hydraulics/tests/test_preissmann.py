@@ -0,0 +1,132 @@
+"""
+单元测试 - Preissmann隐式求解器
+
+测试内容：
+1. 均匀流保持
+2. 大时间步长与小时间步长结果对比
+3. 闸门、堰内部边界
+4. 长渠道长历时计算
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from solvers.preissmann import PreissmannSolver, Reach, GateStructure, WeirStructure
+from models.channel import RectangularChannel, TrapezoidalChannel
+from models.structures import Gate, Weir
+
+
+def flood_inflow(t):
+    """入流过程：80 m³/s 基流上叠加2小时正弦洪峰"""
+    return 80.0 + 40.0 * np.sin(np.pi * min(t, 7200.0) / 7200.0)
+
+
+class TestPreissmannSolver:
+    """Preissmann求解器测试类"""
+
+    def test_uniform_flow_preserved(self):
+        """测试恒定入流下保持均匀流"""
+        channel = RectangularChannel(b=10.0, n=0.025, S0=0.0005)
+        Q = 20.0
+        hn = channel.compute_normal_depth(Q)
+
+        solver = PreissmannSolver(Reach(5000.0, channel, dx=250.0), dt=1800.0)
+        solver.set_boundary_conditions(lambda t: Q)
+        solver.set_uniform_initial(hn, Q)
+        results = solver.run(t_end=6 * 3600.0)
+
+        assert np.allclose(results['h'][-1], hn, atol=1e-4)
+        assert np.allclose(results['Q'][-1], Q, atol=1e-3)
+
+    def test_large_timestep(self):
+        """测试大时间步长（10分钟）与小时间步长结果一致"""
+        peaks = []
+        for dx, dt in [(100.0, 30.0), (500.0, 600.0)]:
+            solver = PreissmannSolver(Reach(20000.0, b=50.0, S0=1e-4, n=0.03, dx=dx), dt=dt)
+            solver.set_boundary_conditions(flood_inflow)
+            solver.set_steady_state(80.0, 2.0)
+            results = solver.run(t_end=4 * 3600.0, dt_output=600.0)
+            j = np.argmin(np.abs(results['x'] - 10000.0))
+            peaks.append(results['Q'][:, j].max())
+
+        assert peaks[1] == pytest.approx(peaks[0], rel=0.01)
+
+    def test_mass_balance(self):
+        """测试渠道蓄量变化等于进出流量之差"""
+        solver = PreissmannSolver(Reach(10000.0, b=10.0, S0=1e-4, n=0.025, dx=250.0), dt=60.0)
+        solver.set_boundary_conditions(lambda t: 20.0 + 10.0 * min(t / 3600.0, 1.0))
+        solver.set_steady_state(20.0, 2.0)
+        volume0 = np.trapezoid(10.0 * solver.h, solver.x)
+
+        results = solver.run(t_end=3 * 3600.0, dt_output=60.0)
+        volume1 = np.trapezoid(10.0 * solver.h, solver.x)
+        net_inflow = np.trapezoid(results['Q'][:, 0] - results['Q'][:, -1], results['times'])
+
+        assert volume1 - volume0 == pytest.approx(net_inflow, rel=0.01)
+
+    def test_gate_internal_boundary(self):
+        """测试闸门内部边界：减小开度后闸前壅水、过闸流量符合闸孔出流公式"""
+        gate = Gate(b=10.0)
+        structure = GateStructure(gate, opening=lambda t: 1.0 if t < 3600.0 else 0.5)
+        reaches = [Reach(10000.0, b=10.0, S0=1e-4, n=0.025, dx=250.0) for _ in range(2)]
+
+        solver = PreissmannSolver(reaches, [structure], dt=300.0)
+        solver.set_boundary_conditions(lambda t: 20.0)
+        solver.set_steady_state(20.0, 2.0)
+        assert solver.structure_discharges()[0] == pytest.approx(20.0, rel=1e-4)
+        h_before = solver.h[reaches[0].nx - 1]
+
+        results = solver.run(t_end=4 * 3600.0, dt_output=300.0)
+        j = solver.structure_links[0]
+        H1, H2 = solver.h[j], solver.h[j + 1]   # 闸底板与渠底齐平
+
+        assert solver.h[j] > h_before
+        assert solver.Q[j] == pytest.approx(solver.Q[j + 1])
+        expected = (gate.discharge_submerged(0.5, H1, H2) if gate.check_submergence(0.5, H1, H2)
+                    else gate.discharge_free(0.5, H1))
+        assert results['Q_structures'][-1, 0] == pytest.approx(expected, rel=1e-4)
+
+    def test_weir_internal_boundary(self):
+        """测试堰内部边界：恒定流时过堰流量等于入流"""
+        reaches = [Reach(10000.0, b=10.0, S0=1e-4, n=0.025, dx=250.0) for _ in range(2)]
+        structure = WeirStructure(Weir(b=10.0, weir_type='broad'), crest=1.5)
+
+        solver = PreissmannSolver(reaches, [structure], dt=600.0)
+        solver.set_boundary_conditions(lambda t: 20.0)
+        solver.set_steady_state(20.0, 2.0)
+
+        assert solver.structure_discharges()[0] == pytest.approx(20.0, rel=1e-4)
+        assert solver.h[reaches[0].nx - 1] > 1.5
+
+    def test_long_canal(self):
+        """测试100 km 梯形渠道、3座闸门、30分钟步长连续计算7天"""
+        channel = TrapezoidalChannel(b=8.0, m=1.5, n=0.02, S0=5e-5)
+        reaches = [Reach(25000.0, channel, dx=500.0) for _ in range(4)]
+        gates = [GateStructure(Gate(b=8.0), opening=lambda t, k=k: 1.2 + 0.3 * np.sin(2 * np.pi * t / 86400.0 + k))
+                 for k in range(3)]
+
+        solver = PreissmannSolver(reaches, gates, dt=1800.0)
+        solver.set_boundary_conditions(lambda t: 30.0 + 10.0 * np.sin(2 * np.pi * t / (7 * 86400.0)))
+        solver.set_steady_state(30.0, 3.0)
+        results = solver.run(t_end=7 * 86400.0, dt_output=86400.0)
+
+        assert solver.time_step == 7 * 48
+        assert np.all(np.isfinite(results['h']))
+        assert np.all(results['h'] > 1.0)
+        assert results['Q_structures'].shape == (8, 3)
+
+    def test_boundary_type_validation(self):
+        """测试边界条件类型检查"""
+        solver = PreissmannSolver(Reach(1000.0, b=10.0, S0=0.0, n=0.025), dt=60.0)
+        with pytest.raises(ValueError):
+            solver.set_boundary_conditions(lambda t: 10.0, upstream_type='velocity')
+        with pytest.raises(ValueError):
+            solver.set_boundary_conditions(lambda t: 10.0)  # 平坡不能用均匀流边界
@@ -0,0 +1,144 @@
+"""
+单元测试 - 断面水力要素表
+
+测试内容：
+1. 与断面类闭合公式对比（梯形、圆形、复式）
+2. 向量化反查：面积→水深、正常水深、临界水深
+3. 不规则实测断面
+4. 在水面曲线和非恒定流求解器中替代断面对象
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from models.channel import TrapezoidalChannel, CircularChannel, CompoundChannel
+from models.section_table import SectionTable
+from solvers.steady.profile import WaterSurfaceProfile
+from solvers.finite_volume import FiniteVolumeSolver
+from solvers.preissmann import PreissmannSolver, Reach
+
+
+class TestSectionTable:
+    """断面水力要素表测试类"""
+
+    def test_trapezoidal_matches_channel(self):
+        """测试梯形断面几何要素精确、流量误差很小"""
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001)
+        table = SectionTable.from_channel(channel)
+        h = np.linspace(0.05, 9.5, 40)
+
+        assert np.allclose(table.area(h), [channel.area(x) for x in h])
+        assert np.allclose(table.wetted_perimeter(h), [channel.wetted_perimeter(x) for x in h])
+        assert np.allclose(table.top_width(h), [channel.top_width(x) for x in h])
+        assert np.allclose(table.discharge(h), [channel.discharge(x) for x in h], rtol=1e-3)
+
+    def test_circular_matches_channel(self):
+        """测试圆形断面"""
+        channel = CircularChannel(D=2.0, n=0.013, S0=0.001)
+        table = SectionTable.from_channel(channel)
+        h = np.linspace(0.05, 1.95, 30)
+
+        assert np.allclose(table.area(h), [channel.area(x) for x in h], rtol=1e-4)
+        assert np.allclose(table.discharge(h), [channel.discharge(x) for x in h], rtol=1e-3)
+
+    def test_vectorized_inverse(self):
+        """测试向量化反查与逐个牛顿迭代结果一致"""
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001)
+        table = SectionTable.from_channel(channel)
+        Q = np.array([1.0, 5.0, 20.0, 100.0])
+
+        hn = table.compute_normal_depth(Q)
+        hc = table.compute_critical_depth(Q)
+        assert hn.shape == Q.shape
+        assert np.allclose(hn, [channel.compute_normal_depth(q) for q in Q], rtol=1e-3)
+        assert np.allclose(hc, [channel.compute_critical_depth(q) for q in Q], rtol=1e-3)
+
+        h = np.linspace(0.0, 12.0, 61)   # 含表格以上的外延段
+        assert np.allclose(table.depth_from_area(table.area(h)), h)
+
+    def test_pressure_integral(self):
+        """测试静水压力项 dI₁/dh = A"""
+        table = SectionTable.from_channel(TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001))
+        h = np.linspace(0.1, 9.0, 20)
+        dh = 1e-4
+        dI = (table.pressure_integral(h + dh) - table.pressure_integral(h - dh)) / (2 * dh)
+        assert np.allclose(dI, table.area(h), rtol=1e-6)
+
+    def test_compound_channel(self):
+        """测试复式断面：漫滩前与断面类一致，漫滩后分区计算流量模数"""
+        channel = CompoundChannel(bm=20.0, hm=3.0, m1=1.5, bl=50.0, br=40.0, m2=2.0,
+                                  nm=0.03, nf=0.05, S0=5e-4)
+        table = SectionTable.from_channel(channel)
+
+        h = np.array([1.0, 2.5])
+        assert np.allclose(table.discharge(h), [channel.discharge(x)['total'] for x in h])
+        assert table.top_width(4.0) == pytest.approx(channel.total_top_width(4.0))
+
+        Q = np.array([50.0, 500.0, 1000.0])
+        assert np.allclose(table.discharge(table.compute_normal_depth(Q)), Q, rtol=1e-4)
+
+    def test_station_elevation(self):
+        """测试不规则实测断面"""
+        station = [0.0, 5.0, 10.0, 12.0, 18.0, 20.0, 30.0]
+        elevation = [105.0, 103.0, 102.8, 100.0, 100.2, 103.0, 104.5]
+        table = SectionTable.from_station_elevation(station, elevation, 0.035, S0=1e-3)
+
+        assert table.z_bed == 100.0
+        assert table.h_max == pytest.approx(4.5)
+        # 水位 102.0 时：仅主槽 (12~18 m 底部及两侧斜坡) 过水
+        A = (2.0 / 2.8 * 2.0) * 2.0 / 2 + (2.0 + 1.8) / 2 * 6.0 + (1.8 / 2.8 * 2.0) * 1.8 / 2
+        assert table.area(2.0) == pytest.approx(A)
+
+        with pytest.raises(ValueError):
+            SectionTable.from_station_elevation([0.0, 5.0, 3.0], [1.0, 0.0, 1.0], 0.03)
+
+
+class TestSectionTableInSolvers:
+    """水力要素表用于求解器测试类"""
+
+    def test_water_surface_profile(self):
+        """测试水面曲线计算中替代断面对象"""
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=0.001)
+        table = SectionTable.from_channel(channel)
+
+        exact = WaterSurfaceProfile(channel, Q=20.0).compute_profile(3.0, 2000.0)
+        tabled = WaterSurfaceProfile(table, Q=20.0).compute_profile(3.0, 2000.0)
+
+        assert np.allclose(tabled['h'], exact['h'], atol=1e-3)
+
+    def test_finite_volume_solver(self):
+        """测试有限体积求解器使用水力要素表与闭合公式结果一致"""
+        channel = TrapezoidalChannel(b=5.0, m=1.5, n=0.025, S0=5e-4)
+        results = []
+        for section in (channel, SectionTable.from_channel(channel)):
+            solver = FiniteVolumeSolver(L=5000.0, dx=50.0, channel=section)
+            solver.set_uniform_initial(0.8, 2.0)
+            solver.set_boundary_conditions(upstream=lambda t: (0.8 + 0.5 * min(t / 600.0, 1.0),
+                                                               2.0 + 3.0 * min(t / 600.0, 1.0)))
+            results.append(solver.run(t_end=1800.0, dt_output=600.0))
+
+        assert np.allclose(results[1]['h'], results[0]['h'], atol=1e-4)
+
+    def test_preissmann_compound_reach(self):
+        """测试Preissmann求解器使用复式断面水力要素表（漫滩洪水）"""
+        channel = CompoundChannel(bm=20.0, hm=3.0, m1=1.5, bl=50.0, br=40.0, m2=2.0,
+                                  nm=0.03, nf=0.05, S0=5e-4)
+        table = SectionTable.from_channel(channel)
+        h0 = float(table.compute_normal_depth(60.0))
+
+        solver = PreissmannSolver(Reach(20000.0, table, dx=500.0), dt=600.0)
+        solver.set_boundary_conditions(lambda t: 60.0 + 440.0 * np.sin(np.pi * min(t, 14400.0) / 14400.0))
+        solver.set_uniform_initial(h0, 60.0)
+        results = solver.run(t_end=8 * 3600.0, dt_output=600.0)
+
+        assert np.all(np.isfinite(results['h']))
+        assert results['h'].max() > channel.hm
+        assert results['h'][0, -1] == pytest.approx(h0, abs=1e-4)
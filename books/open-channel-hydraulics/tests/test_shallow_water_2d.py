@@ -0,0 +1,99 @@
+"""
+单元测试 - 二维浅水方程有限体积求解器
+
+测试内容：
+1. 静水保持（well-balanced）与质量守恒
+2. 一维溃坝（Ritter解析解）
+3. 上游流量边界与干河床推进
+4. 分块多线程计算与单线程结果一致
+
+作者：CHS-Books项目
+日期：2025-10-29
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+# 添加路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../code'))
+
+from solvers.shallow_water_2d import ShallowWater2DSolver
+
+
+class TestShallowWater2DSolver:
+    """二维浅水求解器测试类"""
+
+    def test_lake_at_rest(self):
+        """测试起伏地形上的静水状态精确保持（含露出水面的小岛）"""
+        solver = ShallowWater2DSolver(100.0, 100.0, 50, 50)
+        z_b = 1.5 * np.exp(-((solver.X - 50.0)**2 + (solver.Y - 50.0)**2) / 200.0)
+        solver.set_topography(z_b, 0.03)
+        solver.set_water_level(1.0)
+
+        V0 = solver.total_volume()
+        solver.run(60.0)
+
+        assert np.allclose(solver.h + z_b, np.maximum(1.0, z_b), atol=1e-12)
+        assert np.abs(solver.u).max() < 1e-12
+        assert solver.total_volume() == pytest.approx(V0, rel=1e-12)
+
+    def test_dam_break_ritter(self):
+        """测试干河床溃坝与Ritter解析解对比"""
+        solver = ShallowWater2DSolver(2000.0, 10.0, 400, 2)
+        solver.set_topography(np.zeros((400, 2)), 0.0)
+        solver.set_initial_conditions(np.where(solver.X < 1000.0, 4.0, 0.0))
+
+        results = solver.run(60.0)
+        g = 9.81
+        c0 = np.sqrt(g * 4.0)
+        xi = (solver.x - 1000.0) / 60.0
+        h_exact = np.where(xi < -c0, 4.0, np.where(xi > 2 * c0, 0.0, (2 * c0 - xi)**2 / (9 * g)))
+
+        assert np.mean(np.abs(solver.h[:, 0] - h_exact)) < 0.03
+        assert solver.total_volume() == pytest.approx(40000.0)
+        assert np.all(results['h_max'] >= solver.h)
+
+    def test_discharge_inflow(self):
+        """测试上游流量边界：主槽来流漫滩"""
+        solver = ShallowWater2DSolver(500.0, 200.0, 50, 20)
+        in_channel = np.abs(solver.Y - 100.0) < 25.0
+        solver.set_topography(np.where(in_channel, 0.0, 2.0), np.where(in_channel, 0.03, 0.05))
+        solver.set_initial_conditions(np.where(in_channel, 3.0, 0.0))
+        solver.set_boundary_conditions(west=('discharge', 500.0), east='open')
+
+        results = solver.run(600.0, dt_output=200.0)
+
+        assert len(results['times']) == 4
+        assert np.all(np.isfinite(results['h']))
+        assert np.all(results['h'] >= 0.0)
+        # 进口断面单宽流量之和等于给定流量
+        assert np.sum(solver.hu[0] * solver.dy) == pytest.approx(500.0, rel=0.1)
+        # 水流漫上滩地
+        assert np.any(results['h'][-1][~in_channel] > 0.01)
+
+    def test_threaded_tiles(self):
+        """测试按x方向分块多线程计算结果与单线程一致"""
+        depths = []
+        for n_threads in (1, 3):
+            solver = ShallowWater2DSolver(200.0, 200.0, 100, 100, n_threads=n_threads)
+            solver.set_topography(np.zeros((100, 100)), 0.02)
+            r2 = (solver.X - 100.0)**2 + (solver.Y - 100.0)**2
+            solver.set_initial_conditions(np.where(r2 < 400.0, 2.0, 0.0))
+            solver.run(20.0)
+            depths.append(solver.h)
+
+        # 线程池只创建一次，各时间步复用
+        pool = solver._pool
+        solver.step()
+        assert pool is not None and solver._pool is pool
+        assert np.array_equal(depths[0], depths[1])
+        # 圆形溃坝保持对称
+        assert np.allclose(depths[0], depths[0].T, atol=1e-12)
+
+    def test_invalid_boundary(self):
+        """测试边界条件参数检查"""
+        solver = ShallowWater2DSolver(10.0, 10.0, 5, 5)
+        with pytest.raises(ValueError):
+            solver.set_boundary_conditions(upstream='wall')
@@ -2,6 +2,13 @@
 核心模型模块
 """
 
+from .transport_operators import (StructuredGrid, diffusion_matrix, advection_matrix,
+                                  reaction_matrix, tvd_advection_rate, ThetaScheme,
+                                  implicit_propagator, march_downstream)
+from .recorders import (Recorder, FullHistory, KeepLast, ProbeRecorder, MemmapRecorder,
+                        RecorderGroup)
+from .kinetics import (KineticNetwork, FirstOrder, Power, Monod, Inhibition, Logistic, Liebig,
+                       ReactiveTransport)
 from .diffusion import Diffusion1D, Diffusion2D
 from .advection_diffusion import AdvectionDiffusion1D
 from .reaction import ReactionKinetics, ReactionTransport1D
@@ -10,12 +17,17 @@ from .nutrients import NitrogenCycle, PhosphorusCycle, EutrophicationIndex, calc
 from .self_purification import (SelfPurificationCapacity, WaterQualityIndex, 
                                 calculate_assimilative_capacity, functional_zone_classification)
 from .multi_source import MultiSourceRiver1D, PointSource, calculate_superposition_factor
+from .wasteload_allocation import (WasteLoadAllocation, sag_curve, critical_point,
+                                   temperature_corrected_rates, saturation_do, run_scenarios)
 from .nonpoint_source import (SCSCurveNumber, EventMeanConcentration, NonPointSourceRiver1D,
-                              calculate_first_flush_factor, calculate_buildup_washoff)
-from .thermal_pollution import (ThermalPlume2D, calculate_surface_heat_exchange,
+                              calculate_first_flush_factor, calculate_buildup_washoff,
+                              amc_curve_numbers)
+from .continuous_nps import ContinuousNPS, scs_runoff
+from .thermal_pollution import (ThermalPlume2D, calculate_surface_heat_exchange, surface_heat_flux,
                                  calculate_thermal_tolerance, calculate_cooling_efficiency)
 from .lateral_mixing import (LateralMixing2D, calculate_mixing_time,
-                              calculate_complete_mixing_distance, calculate_concentration_at_bank)
+                              calculate_complete_mixing_distance, calculate_concentration_at_bank,
+                              locate_sources, pseudo_time_propagator)
 from .river_bend import (RiverBend2D, calculate_bend_mixing_length,
                           calculate_curvature_radius, calculate_secondary_flow_strength)
 from .estuary import (EstuarySaltIntrusion1D, calculate_stratification_parameter,
@@ -24,6 +36,7 @@ from .lake_cmfr import (LakeCMFR, calculate_critical_load, calculate_flushing_ef
 from .lake_nutrient import (VollenweiderModel, calculate_trophic_state, 
                              calculate_vollenweider_loading, calculate_phosphorus_budget,
                              predict_response_time)
+from .reservoir_column import ReservoirColumn
 from .stratified_reservoir import (StratifiedReservoir1D, calculate_buoyancy_frequency,
                                     calculate_richardson_number, estimate_mixing_depth)
 from .density_current import (DensityCurrent2D, calculate_densimetric_froude,
@@ -45,6 +58,28 @@ from .urban_blackwater import (UrbanBlackwaterModel, optimize_treatment_plan)
 from .watershed_platform import (WatershedPlatform, perform_scenario_analysis)
 
 __all__ = [
+    'StructuredGrid',
+    'diffusion_matrix',
+    'advection_matrix',
+    'reaction_matrix',
+    'tvd_advection_rate',
+    'ThetaScheme',
+    'implicit_propagator',
+    'march_downstream',
+    'Recorder',
+    'FullHistory',
+    'KeepLast',
+    'ProbeRecorder',
+    'MemmapRecorder',
+    'RecorderGroup',
+    'KineticNetwork',
+    'FirstOrder',
+    'Power',
+    'Monod',
+    'Inhibition',
+    'Logistic',
+    'Liebig',
+    'ReactiveTransport',
     'Diffusion1D',
     'Diffusion2D',
     'AdvectionDiffusion1D',
@@ -64,19 +99,31 @@ __all__ = [
     'MultiSourceRiver1D',
     'PointSource',
     'calculate_superposition_factor',
+    'WasteLoadAllocation',
+    'sag_curve',
+    'critical_point',
+    'temperature_corrected_rates',
+    'saturation_do',
+    'run_scenarios',
     'SCSCurveNumber',
     'EventMeanConcentration',
     'NonPointSourceRiver1D',
     'calculate_first_flush_factor',
     'calculate_buildup_washoff',
+    'amc_curve_numbers',
+    'ContinuousNPS',
+    'scs_runoff',
     'ThermalPlume2D',
     'calculate_surface_heat_exchange',
+    'surface_heat_flux',
     'calculate_thermal_tolerance',
     'calculate_cooling_efficiency',
     'LateralMixing2D',
     'calculate_mixing_time',
     'calculate_complete_mixing_distance',
     'calculate_concentration_at_bank',
+    'locate_sources',
+    'pseudo_time_propagator',
     'RiverBend2D',
     'calculate_bend_mixing_length',
     'calculate_curvature_radius',
@@ -94,6 +141,7 @@ __all__ = [
     'calculate_vollenweider_loading',
     'calculate_phosphorus_budget',
     'predict_response_time',
+    'ReservoirColumn',
     'StratifiedReservoir1D',
     'calculate_buoyancy_frequency',
     'calculate_richardson_number',
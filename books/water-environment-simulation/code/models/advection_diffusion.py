@@ -7,6 +7,10 @@ Advection-Diffusion Model
 
 import numpy as np
 
+from .transport_operators import (StructuredGrid, advection_matrix, diffusion_matrix,
+                                  tvd_advection_rate, ThetaScheme)
+from .recorders import FullHistory
+
 
 class AdvectionDiffusion1D:
     """
@@ -33,9 +37,10 @@ class AdvectionDiffusion1D:
         nt: 时间步数
         u: 流速 (m/s)
         D: 扩散系数 (m²/s)
+        recorder: 结果记录器（默认 FullHistory，保存全部时间层）
     """
     
-    def __init__(self, L=100.0, T=200.0, nx=200, nt=2000, u=0.5, D=0.1):
+    def __init__(self, L=100.0, T=200.0, nx=200, nt=2000, u=0.5, D=0.1, recorder=None):
         """初始化对流-扩散模型"""
         self.L = L
         self.T = T
@@ -57,17 +62,30 @@ class AdvectionDiffusion1D:
         self.Cr = u * self.dt / self.dx  # Courant数
         self.Fo = D * self.dt / self.dx**2  # Fourier数
         
-        # 浓度场
-        self.C = np.zeros((nt, nx))
+        # 浓度场：求解时只保留当前时间层，历史交给记录器
+        self.C_init = np.zeros(nx)
+        self.C_current = self.C_init.copy()
+        self.recorder = FullHistory() if recorder is None else recorder
+        self.recorder.allocate(self.t, (nx,))
+        
+        # 输运网格
+        self.grid = StructuredGrid((nx,), (self.dx,))
         
         print(f"Pe = {self.Pe:.2f}, Cr = {self.Cr:.3f}, Fo = {self.Fo:.3f}")
         
+    @property
+    def C(self):
+        """记录的浓度场（只读；默认记录器 FullHistory 下为全部时间层 (nt, nx)）"""
+        return self.recorder.read_only()
+    
     def set_initial_condition(self, C0):
         """设置初始条件"""
         if callable(C0):
-            self.C[0, :] = C0(self.x)
+            self.C_init[:] = C0(self.x)
         else:
-            self.C[0, :] = C0
+            self.C_init[:] = C0
+        self.C_current = self.C_init.copy()
+        self.recorder.record(0, self.C_init)
             
     def set_boundary_conditions(self, bc_left=None, bc_right=None):
         """
@@ -80,7 +98,47 @@ class AdvectionDiffusion1D:
         self.bc_left = bc_left
         self.bc_right = bc_right
         
-    def solve_upwind(self):
+    def _solve(self, A, theta=0.0, rate=None):
+        """
+        θ法推进（算子矩阵组装一次）
+        
+        参数:
+            A: 线性算子矩阵
+            theta: 隐式权重（0 显式）
+            rate: 额外的显式非线性项 rate(C)（可选，如TVD对流项）
+        """
+        # 左边界给定值；右边界给定值或出流（零梯度）
+        if self.bc_right is not None:
+            scheme = ThetaScheme(A, self.dt, theta, fixed=[0, self.nx - 1])
+        else:
+            scheme = ThetaScheme(A, self.dt, theta, fixed=[0],
+                                 zero_gradient=[self.grid.boundary(0, -1)])
+        
+        C = self.C_init.copy()
+        self.recorder.record(0, C)
+        for n in range(self.nt - 1):
+            if self.bc_left is None:
+                left = C[0]
+            elif callable(self.bc_left):
+                left = self.bc_left(self.t[n+1])
+            else:
+                left = self.bc_left
+            values = [left] if self.bc_right is None else [left, self.bc_right]
+            
+            source = None if rate is None else rate(C)
+            C = scheme.step(C, source=source, values=values)
+            self.recorder.record(n + 1, C)
+        
+        self.C_current = C
+        self.recorder.finalize()
+        return self.C
+    
+    def _operator(self, scheme):
+        """对流（指定格式）+ 扩散算子"""
+        return (advection_matrix(self.grid, self.u, scheme, dt=self.dt) +
+                diffusion_matrix(self.grid, self.D))
+    
+    def solve_upwind(self, theta=0.0):
         """
         迎风格式（Upwind Scheme）
         
@@ -93,37 +151,19 @@ class AdvectionDiffusion1D:
         优点：稳定性好
         缺点：数值耗散大（一阶精度）
         
-        稳定性条件：
+        稳定性条件（显式）：
             Cr ≤ 1
             2*Fo + Cr ≤ 1
+        
+        参数:
+            theta: 隐式权重（0 显式，0.5 Crank-Nicolson，1 全隐式）
         """
-        if self.Cr > 1:
+        if self.Cr > 1 and theta == 0.0:
             print(f"警告: Courant数 = {self.Cr:.3f} > 1，可能不稳定！")
         
-        for n in range(self.nt - 1):
-            # 内部节点（假设u > 0）
-            self.C[n+1, 1:-1] = self.C[n, 1:-1] - \
-                self.Cr * (self.C[n, 1:-1] - self.C[n, :-2]) + \
-                self.Fo * (self.C[n, 2:] - 2*self.C[n, 1:-1] + self.C[n, :-2])
+        return self._solve(self._operator('upwind'), theta)
             
-            # 边界条件
-            if self.bc_left is not None:
-                if callable(self.bc_left):
-                    self.C[n+1, 0] = self.bc_left(self.t[n+1])
-                else:
-                    self.C[n+1, 0] = self.bc_left
-            else:
-                self.C[n+1, 0] = self.C[n, 0]
-                
-            if self.bc_right is not None:
-                self.C[n+1, -1] = self.bc_right
-            else:
-                # 出流边界（零梯度）
-                self.C[n+1, -1] = self.C[n+1, -2]
-                
-        return self.C
-    
-    def solve_central(self):
+    def solve_central(self, theta=0.0):
         """
         中心差分格式
         
@@ -133,84 +173,35 @@ class AdvectionDiffusion1D:
         优点：二阶精度
         缺点：容易产生非物理振荡（Pe > 2）
         
-        稳定性条件：
+        稳定性条件（显式）：
             Cr ≤ 2*Fo
+        
+        参数:
+            theta: 隐式权重（0 显式，0.5 Crank-Nicolson，1 全隐式）
         """
-        if self.Cr > 2 * self.Fo:
+        if self.Cr > 2 * self.Fo and theta == 0.0:
             print(f"警告: Cr = {self.Cr:.3f} > 2*Fo = {2*self.Fo:.3f}，可能不稳定！")
         
         if self.Pe > 2:
             print(f"警告: Pe = {self.Pe:.2f} > 2，可能产生振荡！")
         
-        for n in range(self.nt - 1):
-            # 内部节点
-            self.C[n+1, 1:-1] = self.C[n, 1:-1] - \
-                0.5 * self.Cr * (self.C[n, 2:] - self.C[n, :-2]) + \
-                self.Fo * (self.C[n, 2:] - 2*self.C[n, 1:-1] + self.C[n, :-2])
+        return self._solve(self._operator('central'), theta)
             
-            # 边界条件
-            if self.bc_left is not None:
-                if callable(self.bc_left):
-                    self.C[n+1, 0] = self.bc_left(self.t[n+1])
-                else:
-                    self.C[n+1, 0] = self.bc_left
-            else:
-                self.C[n+1, 0] = self.C[n, 0]
-                
-            if self.bc_right is not None:
-                self.C[n+1, -1] = self.bc_right
-            else:
-                self.C[n+1, -1] = self.C[n+1, -2]
-                
-        return self.C
-    
-    def solve_quick(self):
+    def solve_quick(self, theta=0.0):
         """
         QUICK格式（Quadratic Upstream Interpolation for Convective Kinematics）
         
         对流项使用三点上游插值：
-            使用三个点（上游两个，下游一个）进行二次插值
+            界面值 C[i+1/2] = (3*C[i+1] + 6*C[i] - C[i-1]) / 8  (u > 0)
+            ∂C/∂x ≈ (C[i+1/2] - C[i-1/2]) / dx
         
         优点：三阶精度，数值耗散小
-        缺点：需要更多边界点处理
+        缺点：需要更多边界点处理（近边界节点使用迎风格式）
+        
+        参数:
+            theta: 隐式权重（0 显式，0.5 Crank-Nicolson，1 全隐式）
         """
-        for n in range(self.nt - 1):
-            # 内部节点（需要至少3个上游点）
-            for i in range(2, self.nx - 1):
-                # 对流项（QUICK格式）
-                if self.u > 0:
-                    # 三点上游插值
-                    C_face = (3*self.C[n, i] + 6*self.C[n, i-1] - self.C[n, i-2]) / 8
-                    adv_term = -self.u * (C_face - self.C[n, i-1]) / self.dx
-                else:
-                    C_face = (3*self.C[n, i] + 6*self.C[n, i+1] - self.C[n, i+2]) / 8
-                    adv_term = -self.u * (self.C[n, i+1] - C_face) / self.dx
-                
-                # 扩散项（中心差分）
-                diff_term = self.D * (self.C[n, i+1] - 2*self.C[n, i] + self.C[n, i-1]) / self.dx**2
-                
-                self.C[n+1, i] = self.C[n, i] + self.dt * (adv_term + diff_term)
-            
-            # 边界和近边界节点使用迎风格式
-            self.C[n+1, 1] = self.C[n, 1] - \
-                self.Cr * (self.C[n, 1] - self.C[n, 0]) + \
-                self.Fo * (self.C[n, 2] - 2*self.C[n, 1] + self.C[n, 0])
-            
-            # 边界条件
-            if self.bc_left is not None:
-                if callable(self.bc_left):
-                    self.C[n+1, 0] = self.bc_left(self.t[n+1])
-                else:
-                    self.C[n+1, 0] = self.bc_left
-            else:
-                self.C[n+1, 0] = self.C[n, 0]
-                
-            if self.bc_right is not None:
-                self.C[n+1, -1] = self.bc_right
-            else:
-                self.C[n+1, -1] = self.C[n+1, -2]
-                
-        return self.C
+        return self._solve(self._operator('quick'), theta)
     
     def solve_lax_wendroff(self):
         """
@@ -221,28 +212,26 @@ class AdvectionDiffusion1D:
         稳定性条件：
             Cr² ≤ 2*Fo
         """
-        for n in range(self.nt - 1):
-            # 内部节点
-            self.C[n+1, 1:-1] = self.C[n, 1:-1] - \
-                0.5 * self.Cr * (self.C[n, 2:] - self.C[n, :-2]) + \
-                0.5 * self.Cr**2 * (self.C[n, 2:] - 2*self.C[n, 1:-1] + self.C[n, :-2]) + \
-                self.Fo * (self.C[n, 2:] - 2*self.C[n, 1:-1] + self.C[n, :-2])
+        return self._solve(self._operator('lax_wendroff'))
             
-            # 边界条件
-            if self.bc_left is not None:
-                if callable(self.bc_left):
-                    self.C[n+1, 0] = self.bc_left(self.t[n+1])
-                else:
-                    self.C[n+1, 0] = self.bc_left
-            else:
-                self.C[n+1, 0] = self.C[n, 0]
+    def solve_tvd(self, limiter='van_leer'):
+        """
+        TVD格式（通量限制器）
                 
-            if self.bc_right is not None:
-                self.C[n+1, -1] = self.bc_right
-            else:
-                self.C[n+1, -1] = self.C[n+1, -2]
+        界面值在一阶迎风基础上加限制后的二阶修正，
+        陡峰处退化为迎风，光滑处保持二阶精度，不产生非物理振荡。
                 
-        return self.C
+        参数:
+            limiter: 限制器 ('minmod', 'van_leer', 'superbee', 'mc')
+        
+        稳定性条件：
+            Cr ≤ 1
+        """
+        if self.Cr > 1:
+            print(f"警告: Courant数 = {self.Cr:.3f} > 1，可能不稳定！")
+        
+        return self._solve(diffusion_matrix(self.grid, self.D),
+                           rate=lambda C: tvd_advection_rate(C, self.grid, self.u, limiter))
     
     def analytical_solution_steady(self, x):
         """
@@ -4,7 +4,8 @@ Lake Algae Growth Dynamics Model
 """
 
 import numpy as np
-from scipy.integrate import odeint
+
+from .kinetics import KineticNetwork, FirstOrder, Monod, Liebig
 
 
 class AlgaeGrowthModel:
@@ -52,16 +53,16 @@ class AlgaeGrowthModel:
         f_N = N / (self.K_N + N)
         f_P = P / (self.K_P + P)
         
-        # 光照限制（Steele）
-        f_I = (I / self.I_opt) * np.exp(1 - I / self.I_opt)
-        
-        # 温度影响（简化）
-        f_T = np.exp(-((T - self.T_opt) / 10)**2)
-        
-        mu = self.mu_max * min(f_N, f_P) * f_I * f_T
+        mu = self.mu_max * np.minimum(f_N, f_P) * self._environment_factor(I, T)
         
         return mu
     
+    def _environment_factor(self, I, T):
+        """光照（Steele）与温度（简化）限制 f_I * f_T"""
+        f_I = (I / self.I_opt) * np.exp(1 - I / self.I_opt)
+        f_T = np.exp(-((T - self.T_opt) / 10)**2)
+        return f_I * f_T
+    
     def dynamics(self, state, t, I, T):
         """系统动力学"""
         Chl, N, P, DO = state
@@ -75,9 +76,35 @@ class AlgaeGrowthModel:
         
         return [dChl, dN, dP, dDO]
     
+    def network(self, I=200, T=25):
+        """
+        反应网络（与 dynamics 相同的动力学）
+        
+        I、T 可以是各单元数组（空间分布的光照、水温），
+        也可以是时间函数 I(t)、T(t)。
+        
+        返回：
+        - net: KineticNetwork，组分 [Chl, N, P, DO]
+        """
+        if callable(I) or callable(T):
+            I_t = I if callable(I) else (lambda t: I)
+            T_t = T if callable(T) else (lambda t: T)
+            k_growth = lambda t: self.mu_max * self._environment_factor(I_t(t), T_t(t))
+        else:
+            k_growth = self.mu_max * self._environment_factor(np.asarray(I), np.asarray(T))
+        
+        net = KineticNetwork(['Chl', 'N', 'P', 'DO'])
+        # 生长：μ = μ_max·min(f_N, f_P)·f_I·f_T，N/Chl约15、P/Chl约1，光合产氧
+        net.add_reaction('growth', {'Chl': 1, 'N': -0.15, 'P': -0.01, 'DO': 0.3}, k_growth,
+                         [FirstOrder('Chl'), Liebig(Monod('N', self.K_N), Monod('P', self.K_P))])
+        net.add_reaction('respiration', {'Chl': -1, 'DO': -0.2}, self.r, [FirstOrder('Chl')])
+        net.add_reaction('mortality', {'Chl': -1}, self.m, [FirstOrder('Chl')])
+        return net
+    
     def solve(self, t_span, I=200, T=25):
         """求解"""
-        result = odeint(self.dynamics, self.state, t_span, args=(I, T))
+        result = self.network(I, T).integrate(self.state, t_span, method='lsoda',
+                                              rtol=1e-8, atol=1e-10)
         
         self.state = result[-1, :]
         
@@ -5,6 +5,9 @@
 
 import numpy as np
 
+from .transport_operators import (StructuredGrid, advection_matrix, diffusion_matrix,
+                                  reaction_matrix, ThetaScheme)
+
 
 class Aquifer2D:
     """
@@ -63,42 +66,18 @@ class Aquifer2D:
         
         C_history = []
         
+        # 对流（upwind）+ 弥散 - 衰减，算子只组装一次
+        grid = StructuredGrid((self.ny, self.nx), (self.dy, self.dx))
+        A = (advection_matrix(grid, (vy, vx)) + diffusion_matrix(grid, (Dy, Dx)) +
+             reaction_matrix(grid, decay))
+        # 边界条件（零梯度，先上下边再左右边）；源点给定浓度
+        walls = [grid.boundary(axis, side) for axis in (0, 1) for side in (0, -1)]
+        fixed = [iy * self.nx + ix] if source_x is not None else []
+        scheme = ThetaScheme(A, dt, 0.0, fixed=fixed, zero_gradient=walls)
+        values = [source_C] * len(fixed)
+        
         for i, t in enumerate(t_span):
-            C_new = self.C.copy()
-            
-            # 内部节点
-            for j in range(1, self.ny-1):
-                for k in range(1, self.nx-1):
-                    # 对流项（upwind）
-                    if vx > 0:
-                        dC_dx = (self.C[j, k] - self.C[j, k-1]) / self.dx
-                    else:
-                        dC_dx = (self.C[j, k+1] - self.C[j, k]) / self.dx
-                    
-                    if vy > 0:
-                        dC_dy = (self.C[j, k] - self.C[j-1, k]) / self.dy
-                    else:
-                        dC_dy = (self.C[j+1, k] - self.C[j, k]) / self.dy
-                    
-                    # 弥散项
-                    d2C_dx2 = (self.C[j, k+1] - 2*self.C[j, k] + self.C[j, k-1]) / (self.dx**2)
-                    d2C_dy2 = (self.C[j+1, k] - 2*self.C[j, k] + self.C[j-1, k]) / (self.dy**2)
-                    
-                    C_new[j, k] = self.C[j, k] + dt * (
-                        -vx * dC_dx - vy * dC_dy + 
-                        Dx * d2C_dx2 + Dy * d2C_dy2 - 
-                        decay * self.C[j, k]
-                    )
-            
-            # 边界条件（零梯度）
-            C_new[0, :] = C_new[1, :]
-            C_new[-1, :] = C_new[-2, :]
-            C_new[:, 0] = C_new[:, 1]
-            C_new[:, -1] = C_new[:, -2]
-            
-            # 源项
-            if source_x is not None:
-                C_new[iy, ix] = source_C
+            C_new = scheme.step(self.C.ravel(), values=values).reshape(self.ny, self.nx)
             
             self.C = np.maximum(C_new, 0)
             
@@ -106,7 +106,7 @@ class DensityCurrent2D:
         
         return x_plunge
     
-    def simulate_underflow(self, C_source, x_source, dt, n_steps):
+    def simulate_underflow(self, C_source, x_source, dt, n_steps, tol=None, verbose=True):
         """
         模拟异重流运动（简化）
         
@@ -115,49 +115,55 @@ class DensityCurrent2D:
         - x_source: 源位置索引
         - dt: 时间步长 (s)
         - n_steps: 步数
+        - tol: 稳态判据（可选），一步内浓度最大变化小于 tol 时提前结束
+        - verbose: 是否打印模拟结果摘要（优化等循环中可关闭）
         
         返回：
         - C: 最终浓度场
         """
         g = 9.81
+        Kz = 0.01  # 垂向扩散
+        r = Kz * dt / self.dz**2
+        bottom = slice(self.nz-5, self.nz)  # 底层几个节点
         
         for step in range(n_steps):
             C_new = self.C.copy()
             
             # 底层异重流前进（简化）
-            for i in range(1, self.nx-1):
-                # 底层几个节点
-                for j in range(self.nz-5, self.nz):
-                    if self.C[j, i] > 0.1:
-                        # 密度流速度
-                        delta_rho = self.calculate_density(self.C[j, i]) - self.rho_ambient
-                        g_prime = g * delta_rho / self.rho_ambient
-                        
-                        if g_prime > 0:
-                            u_density = np.sqrt(g_prime * self.dz)  # 简化速度
-                            
-                            # 对流
-                            if u_density * dt / self.dx < 1:  # CFL条件
-                                C_new[j, i+1] += 0.5 * self.C[j, i] * u_density * dt / self.dx
-                                C_new[j, i] *= 0.8  # 部分留下
+            C = self.C[bottom, 1:self.nx-1]
+            delta_rho = self.calculate_density(C) - self.rho_ambient
+            g_prime = g * delta_rho / self.rho_ambient
+            u_density = np.sqrt(np.maximum(g_prime, 0) * self.dz)  # 简化速度
+            courant = u_density * dt / self.dx
+            active = (C > 0.1) & (g_prime > 0) & (courant < 1)  # CFL条件
+            
+            # 对流：节点 i 先接收上游 i-1 的来流，再部分留下
+            inflow = np.where(active, 0.5 * C * courant, 0.0)
+            C_new[bottom, 2:] += inflow
+            C_new[bottom, 1:self.nx-1] = np.where(active, C_new[bottom, 1:self.nx-1] * 0.8,
+                                                  C_new[bottom, 1:self.nx-1])
             
             # 源注入
             C_new[self.nz-2, x_source] += C_source * 0.1
             
-            # 扩散（简化）
-            for i in range(1, self.nx-1):
-                for j in range(1, self.nz-1):
-                    if C_new[j, i] > 0:
-                        Kz = 0.01  # 垂向扩散
-                        d2C = (C_new[j+1, i] - 2*C_new[j, i] + C_new[j-1, i]) / self.dz**2
-                        C_new[j, i] += Kz * d2C * dt
+            # 扩散（简化）：自上而下逐层更新，各列同时计算
+            for j in range(1, self.nz-1):
+                layer = C_new[j, 1:self.nx-1]
+                d2C = C_new[j+1, 1:self.nx-1] - 2*layer + C_new[j-1, 1:self.nx-1]
+                layer += np.where(layer > 0, r * d2C, 0.0)
             
-            self.C = np.maximum(C_new, 0)  # 非负
-        
-        print(f"\n异重流模拟完成:")
-        print(f"  时间步: {n_steps}")
-        print(f"  最大浓度: {np.max(self.C):.2f} kg/m³")
-        print(f"  底层平均浓度: {np.mean(self.C[-5:, :]):.2f} kg/m³")
+            C_new = np.maximum(C_new, 0)  # 非负
+            converged = tol is not None and np.max(np.abs(C_new - self.C)) < tol
+            self.C = C_new
+            if converged:
+                n_steps = step + 1
+                break
+        
+        if verbose:
+            print(f"\n异重流模拟完成:")
+            print(f"  时间步: {n_steps}")
+            print(f"  最大浓度: {np.max(self.C):.2f} kg/m³")
+            print(f"  底层平均浓度: {np.mean(self.C[-5:, :]):.2f} kg/m³")
         
         return self.C
     
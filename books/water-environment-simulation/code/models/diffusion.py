@@ -7,6 +7,9 @@ Diffusion Models
 
 import numpy as np
 
+from .transport_operators import StructuredGrid, diffusion_matrix, ThetaScheme
+from .recorders import FullHistory
+
 
 class Diffusion1D:
     """
@@ -27,9 +30,10 @@ class Diffusion1D:
         nx: 空间网格数
         nt: 时间步数
         D: 扩散系数 (m²/s)
+        recorder: 结果记录器（默认 FullHistory，保存全部时间层）
     """
     
-    def __init__(self, L=10.0, T=100.0, nx=100, nt=1000, D=0.01):
+    def __init__(self, L=10.0, T=100.0, nx=100, nt=1000, D=0.01, recorder=None):
         """初始化扩散模型"""
         self.L = L
         self.T = T
@@ -48,9 +52,25 @@ class Diffusion1D:
         # Fourier数（稳定性条件）
         self.Fo = D * self.dt / self.dx**2
         
-        # 浓度场
-        self.C = np.zeros((nt, nx))
+        # 浓度场：求解时只保留当前时间层，历史交给记录器
+        self.C_init = np.zeros(nx)
+        self.C_current = self.C_init.copy()
+        self.recorder = FullHistory() if recorder is None else recorder
+        self.recorder.allocate(self.t, (nx,))
+        
+        # 扩散算子（稀疏矩阵，只组装一次）
+        self.grid = StructuredGrid((nx,), (self.dx,))
+        self.A = diffusion_matrix(self.grid, D)
+        self._schemes = {}
         
+        # 默认边界条件
+        self.set_boundary_conditions()
+    
+    @property
+    def C(self):
+        """记录的浓度场（只读；默认记录器 FullHistory 下为全部时间层 (nt, nx)）"""
+        return self.recorder.read_only()
+    
     def set_initial_condition(self, C0):
         """
         设置初始条件
@@ -59,9 +79,11 @@ class Diffusion1D:
             C0: 初始浓度分布 (数组或函数)
         """
         if callable(C0):
-            self.C[0, :] = C0(self.x)
+            self.C_init[:] = C0(self.x)
         else:
-            self.C[0, :] = C0
+            self.C_init[:] = C0
+        self.C_current = self.C_init.copy()
+        self.recorder.record(0, self.C_init)
             
     def set_boundary_conditions(self, bc_type='dirichlet', bc_left=0.0, bc_right=0.0):
         """
@@ -76,6 +98,44 @@ class Diffusion1D:
         self.bc_left = bc_left
         self.bc_right = bc_right
         
+    def _scheme(self, theta):
+        """θ法推进器（按边界条件类型缓存，隐式分解只做一次）"""
+        key = (theta, self.bc_type)
+        if key not in self._schemes:
+            left, right = [self.grid.boundary(0, side) for side in (0, -1)]
+            if self.bc_type == 'dirichlet':
+                scheme = ThetaScheme(self.A, self.dt, theta,
+                                     fixed=np.concatenate([left[0], right[0]]))
+            elif self.bc_type == 'neumann' and theta == 0.0:
+                # 显式格式：内部节点推进后边界复制相邻值（C[0]=C[1]）
+                scheme = ThetaScheme(self.A, self.dt, theta,
+                                     zero_gradient=[left, right])
+            elif self.bc_type == 'neumann':
+                # 隐式/C-N：镜像节点并入边界行，总质量（梯形积分）守恒
+                A = diffusion_matrix(self.grid, self.D, boundary='neumann')
+                scheme = ThetaScheme(A, self.dt, theta)
+            else:
+                raise ValueError(f"未知边界条件类型: {self.bc_type}")
+            self._schemes[key] = scheme
+        return self._schemes[key]
+    
+    def _march(self, theta):
+        """按θ法逐步推进全部时间步"""
+        scheme = self._scheme(theta)
+        values = np.array([self.bc_left, self.bc_right], dtype=float)
+        if self.bc_type != 'dirichlet':
+            values = None
+        
+        C = self.C_init.copy()
+        self.recorder.record(0, C)
+        for n in range(self.nt - 1):
+            C = scheme.step(C, values=values)
+            self.recorder.record(n + 1, C)
+        
+        self.C_current = C
+        self.recorder.finalize()
+        return self.C
+    
     def solve_explicit(self):
         """
         显式有限差分求解（FTCS格式）
@@ -89,22 +149,7 @@ class Diffusion1D:
         if self.Fo > 0.5:
             print(f"警告: Fourier数 = {self.Fo:.3f} > 0.5，可能不稳定！")
             
-        for n in range(self.nt - 1):
-            # 内部节点
-            self.C[n+1, 1:-1] = self.C[n, 1:-1] + self.Fo * (
-                self.C[n, 2:] - 2*self.C[n, 1:-1] + self.C[n, :-2]
-            )
-            
-            # 边界条件
-            if self.bc_type == 'dirichlet':
-                self.C[n+1, 0] = self.bc_left
-                self.C[n+1, -1] = self.bc_right
-            elif self.bc_type == 'neumann':
-                # 零通量边界
-                self.C[n+1, 0] = self.C[n+1, 1]
-                self.C[n+1, -1] = self.C[n+1, -2]
-                
-        return self.C
+        return self._march(0.0)
     
     def solve_implicit(self):
         """
@@ -113,36 +158,9 @@ class Diffusion1D:
         格式：
             -Fo*C[n+1,i-1] + (1+2*Fo)*C[n+1,i] - Fo*C[n+1,i+1] = C[n,i]
         
-        无条件稳定
+        无条件稳定（三对角矩阵只分解一次，各时间步复用）
         """
-        from scipy.sparse import diags
-        from scipy.sparse.linalg import spsolve
-        
-        # 构造系数矩阵（三对角矩阵）
-        main_diag = (1 + 2*self.Fo) * np.ones(self.nx)
-        off_diag = -self.Fo * np.ones(self.nx - 1)
-        
-        # Dirichlet边界条件
-        if self.bc_type == 'dirichlet':
-            main_diag[0] = 1.0
-            main_diag[-1] = 1.0
-            off_diag[0] = 0.0
-            off_diag[-1] = 0.0
-        
-        A = diags([off_diag, main_diag, off_diag], [-1, 0, 1], format='csr')
-        
-        # 时间推进
-        for n in range(self.nt - 1):
-            b = self.C[n, :].copy()
-            
-            # 边界条件
-            if self.bc_type == 'dirichlet':
-                b[0] = self.bc_left
-                b[-1] = self.bc_right
-            
-            self.C[n+1, :] = spsolve(A, b)
-            
-        return self.C
+        return self._march(1.0)
     
     def solve_crank_nicolson(self):
         """
@@ -154,44 +172,7 @@ class Diffusion1D:
         
         无条件稳定，时间和空间都是二阶精度
         """
-        from scipy.sparse import diags
-        from scipy.sparse.linalg import spsolve
-        
-        # 左侧矩阵
-        main_diag_L = (1 + self.Fo) * np.ones(self.nx)
-        off_diag_L = -0.5 * self.Fo * np.ones(self.nx - 1)
-        
-        if self.bc_type == 'dirichlet':
-            main_diag_L[0] = 1.0
-            main_diag_L[-1] = 1.0
-            off_diag_L[0] = 0.0
-            off_diag_L[-1] = 0.0
-        
-        A = diags([off_diag_L, main_diag_L, off_diag_L], [-1, 0, 1], format='csr')
-        
-        # 时间推进
-        for n in range(self.nt - 1):
-            # 右侧向量
-            b = np.zeros(self.nx)
-            b[1:-1] = (1 - self.Fo) * self.C[n, 1:-1] + 0.5 * self.Fo * (
-                self.C[n, 2:] + self.C[n, :-2]
-            )
-            
-            # 边界条件
-            if self.bc_type == 'dirichlet':
-                b[0] = self.bc_left
-                b[-1] = self.bc_right
-            else:
-                b[0] = (1 - self.Fo) * self.C[n, 0] + 0.5 * self.Fo * (
-                    self.C[n, 1] + self.C[n, 1]
-                )
-                b[-1] = (1 - self.Fo) * self.C[n, -1] + 0.5 * self.Fo * (
-                    self.C[n, -2] + self.C[n, -2]
-                )
-            
-            self.C[n+1, :] = spsolve(A, b)
-            
-        return self.C
+        return self._march(0.5)
     
     def analytical_solution(self, x, t, C0_func, num_terms=100):
         """
@@ -237,10 +218,11 @@ class Diffusion2D:
         nx, ny: 空间网格数
         nt: 时间步数
         Dx, Dy: x和y方向扩散系数 (m²/s)
+        recorder: 结果记录器（默认 FullHistory，保存全部时间层）
     """
     
     def __init__(self, Lx=10.0, Ly=10.0, T=100.0, nx=50, ny=50, nt=1000, 
-                 Dx=0.01, Dy=0.01):
+                 Dx=0.01, Dy=0.01, recorder=None):
         """初始化2D扩散模型"""
         self.Lx = Lx
         self.Ly = Ly
@@ -266,9 +248,17 @@ class Diffusion2D:
         self.Fo_x = Dx * self.dt / self.dx**2
         self.Fo_y = Dy * self.dt / self.dy**2
         
-        # 浓度场 (nt, ny, nx)
-        self.C = np.zeros((nt, ny, nx))
+        # 浓度场 (ny, nx)：求解时只保留当前时间层，历史交给记录器
+        self.C_init = np.zeros((ny, nx))
+        self.C_current = self.C_init.copy()
+        self.recorder = FullHistory() if recorder is None else recorder
+        self.recorder.allocate(self.t, (ny, nx))
         
+    @property
+    def C(self):
+        """记录的浓度场（只读；默认记录器 FullHistory 下为全部时间层 (nt, ny, nx)）"""
+        return self.recorder.read_only()
+    
     def set_initial_condition(self, C0):
         """
         设置初始条件
@@ -277,9 +267,11 @@ class Diffusion2D:
             C0: 初始浓度分布 (2D数组或函数)
         """
         if callable(C0):
-            self.C[0, :, :] = C0(self.X, self.Y)
+            self.C_init[:, :] = C0(self.X, self.Y)
         else:
-            self.C[0, :, :] = C0
+            self.C_init[:, :] = C0
+        self.C_current = self.C_init.copy()
+        self.recorder.record(0, self.C_init)
             
     def solve_explicit(self):
         """
@@ -292,20 +284,21 @@ class Diffusion2D:
         if Fo_total > 0.5:
             print(f"警告: Fourier数总和 = {Fo_total:.3f} > 0.5，可能不稳定！")
             
+        # 边界条件（Dirichlet，浓度为0）
+        grid = StructuredGrid((self.ny, self.nx), (self.dy, self.dx))
+        fixed = grid.all_boundaries()
+        scheme = ThetaScheme(diffusion_matrix(grid, (self.Dy, self.Dx)), self.dt, 0.0,
+                             fixed=fixed)
+        zeros = np.zeros(len(fixed))
+        
+        C = self.C_init.ravel().copy()
+        self.recorder.record(0, self.C_init)
         for n in range(self.nt - 1):
-            # 内部节点
-            self.C[n+1, 1:-1, 1:-1] = self.C[n, 1:-1, 1:-1] + \
-                self.Fo_x * (self.C[n, 1:-1, 2:] - 2*self.C[n, 1:-1, 1:-1] + 
-                            self.C[n, 1:-1, :-2]) + \
-                self.Fo_y * (self.C[n, 2:, 1:-1] - 2*self.C[n, 1:-1, 1:-1] + 
-                            self.C[n, :-2, 1:-1])
-            
-            # 边界条件（Dirichlet，浓度为0）
-            self.C[n+1, 0, :] = 0
-            self.C[n+1, -1, :] = 0
-            self.C[n+1, :, 0] = 0
-            self.C[n+1, :, -1] = 0
-            
+            C = scheme.step(C, values=zeros)
+            self.recorder.record(n + 1, C.reshape(self.ny, self.nx))
+        
+        self.C_current = C.reshape(self.ny, self.nx)
+        self.recorder.finalize()
         return self.C
     
     def analytical_solution_2d(self, x, y, t):
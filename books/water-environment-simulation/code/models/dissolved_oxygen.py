@@ -14,6 +14,9 @@ import numpy as np
 from scipy.integrate import odeint
 from scipy.optimize import fsolve
 
+from .transport_operators import (StructuredGrid, advection_matrix, diffusion_matrix,
+                                  reaction_matrix, ThetaScheme)
+
 
 class StreeterPhelps:
     """
@@ -302,34 +305,23 @@ class DOBODCoupled:
     
     def _solve_upwind(self):
         """使用迎风格式求解"""
-        Cr = self.u * self.dt / self.dx
-        Fo = self.D_coef * self.dt / self.dx**2
+        grid = StructuredGrid((self.nx,), (self.dx,))
+        A = advection_matrix(grid, self.u) + diffusion_matrix(grid, self.D_coef)
+        # 左边界给定流入值，右边界出流（零梯度）
+        outflow = [grid.boundary(0, -1)]
+        bod = ThetaScheme(A + reaction_matrix(grid, self.kd), self.dt, 0.0,
+                          fixed=[0], zero_gradient=outflow)
+        do = ThetaScheme(A + reaction_matrix(grid, self.ka), self.dt, 0.0,
+                         fixed=[0], zero_gradient=outflow)
         
         for n in range(self.nt - 1):
-            # BOD方程
-            for i in range(1, self.nx - 1):
-                advection = -self.u * (self.BOD[n, i] - self.BOD[n, i-1]) / self.dx
-                diffusion = self.D_coef * (self.BOD[n, i+1] - 2*self.BOD[n, i] + self.BOD[n, i-1]) / self.dx**2
-                reaction = -self.kd * self.BOD[n, i]
+            # BOD方程：对流 + 扩散 - kd*L
+            self.BOD[n+1, :] = bod.step(self.BOD[n, :], values=[self.BOD_bc])
                 
-                self.BOD[n+1, i] = self.BOD[n, i] + self.dt * (advection + diffusion + reaction)
-            
-            # 边界条件
-            self.BOD[n+1, 0] = self.BOD_bc
-            self.BOD[n+1, -1] = self.BOD[n+1, -2]
-            
-            # DO方程
-            for i in range(1, self.nx - 1):
-                advection = -self.u * (self.DO[n, i] - self.DO[n, i-1]) / self.dx
-                diffusion = self.D_coef * (self.DO[n, i+1] - 2*self.DO[n, i] + self.DO[n, i-1]) / self.dx**2
-                reaeration = self.ka * (self.DOs - self.DO[n, i])
-                consumption = -self.kd * self.BOD[n, i]
-                
-                self.DO[n+1, i] = self.DO[n, i] + self.dt * (advection + diffusion + reaeration + consumption)
-            
-            # 边界条件
-            self.DO[n+1, 0] = self.DO_bc
-            self.DO[n+1, -1] = self.DO[n+1, -2]
+            # DO方程：对流 + 扩散 + ka*(DOs-DO) - kd*L
+            self.DO[n+1, :] = do.step(self.DO[n, :],
+                                      source=self.ka * self.DOs - self.kd * self.BOD[n, :],
+                                      values=[self.DO_bc])
         
         return self.BOD, self.DO
 
@@ -11,6 +11,8 @@ Estuary Saltwater Intrusion and Water Quality Model
 
 import numpy as np
 
+from .transport_operators import StructuredGrid, advection_matrix, diffusion_matrix, ThetaScheme
+
 
 class EstuarySaltIntrusion1D:
     """
@@ -54,6 +56,10 @@ class EstuarySaltIntrusion1D:
         # 水质浓度场
         self.C = np.zeros(nx)
         
+        # 输运网格与扩散算子缓存
+        self.grid = StructuredGrid((nx,), (self.dx,))
+        self._diffusion = {}
+        
         print(f"河口盐水入侵模型初始化:")
         print(f"  河口长度: {L/1000:.1f} km")
         print(f"  节点数: {nx}")
@@ -71,10 +77,8 @@ class EstuarySaltIntrusion1D:
             S_river: 河水盐度 (ppt, 默认0)
         """
         # 线性分布作为初始条件
-        for i in range(self.nx):
-            # 从上游（河水）到下游（海水）
-            ratio = self.x[i] / self.L
-            self.S[i] = S_river + (S_sea - S_river) * ratio
+        # 从上游（河水）到下游（海水）
+        self.S = S_river + (S_sea - S_river) * self.x / self.L
         
         print(f"\n初始盐度设置:")
         print(f"  河水盐度: {S_river} ppt")
@@ -125,17 +129,16 @@ class EstuarySaltIntrusion1D:
         u_density = np.zeros(self.nx)
         
         # 计算盐度梯度
-        for i in range(1, self.nx-1):
-            dS_dx = (S[i+1] - S[i-1]) / (2 * self.dx)
+        dS_dx = (S[2:] - S[:-2]) / (2 * self.dx)
             
-            # 密度流速（简化）
-            # β ≈ 0.0008 (kg/m³)/ppt
-            # g = 9.81 m/s²
-            beta = 0.0008
-            g = 9.81
+        # 密度流速（简化）
+        # β ≈ 0.0008 (kg/m³)/ppt
+        # g = 9.81 m/s²
+        beta = 0.0008
+        g = 9.81
             
-            # 简化公式（忽略摩擦）
-            u_density[i] = -0.01 * beta * g * self.H * dS_dx
+        # 简化公式（忽略摩擦）
+        u_density[1:-1] = -0.01 * beta * g * self.H * dS_dx
         
         # 边界条件
         u_density[0] = u_density[1]
@@ -165,27 +168,14 @@ class EstuarySaltIntrusion1D:
         # 总流速 = 河流流 + 潮汐流 + 密度流
         self.u = u_river + u_tide + u_density
         
-        # 更新盐度（显式格式）
-        S_new = self.S.copy()
-        
-        for i in range(1, self.nx-1):
-            # 对流项（迎风格式）
-            if self.u[i] > 0:
-                dS_dx = (self.S[i] - self.S[i-1]) / self.dx
-            else:
-                dS_dx = (self.S[i+1] - self.S[i]) / self.dx
-            
-            # 扩散项
-            d2S_dx2 = (self.S[i+1] - 2*self.S[i] + self.S[i-1]) / self.dx**2
-            
-            # 更新
-            S_new[i] = self.S[i] - dt * self.u[i] * dS_dx + dt * K_x * d2S_dx2
-        
-        # 边界条件
-        S_new[0] = 0     # 上游：淡水
-        S_new[-1] = 30   # 下游：海水
+        # 对流项（按节点流速方向迎风）+ 扩散项，显式格式
+        if K_x not in self._diffusion:
+            self._diffusion[K_x] = diffusion_matrix(self.grid, K_x)
+        A = advection_matrix(self.grid, self.u) + self._diffusion[K_x]
+        scheme = ThetaScheme(A, dt, 0.0, fixed=[0, self.nx - 1])
         
-        self.S = S_new
+        # 边界条件：上游淡水，下游海水
+        self.S = scheme.step(self.S, values=[0, 30])
     
     def calculate_intrusion_length(self, S_threshold=2.0):
         """
@@ -0,0 +1,464 @@
+"""
+多组分反应动力学引擎
+Multi-species Kinetics Engine
+
+声明一次组分和反应，自动生成对全部网格单元向量化的反应速率和解析雅可比矩阵，
+用刚性求解器同时积分所有单元：
+
+    dC/dt = N · r(C, t)
+    
+    C: 浓度 (组分数, 单元数)
+    N: 化学计量矩阵 (组分数, 反应数)
+    r: 反应速率 (反应数, 单元数)
+
+每个反应速率写成 系数 k × 若干因子之积。因子（一级、幂函数、Monod、
+抑制、Logistic、Liebig最小值）都带解析导数，因此雅可比矩阵按单元
+分块对角，每块只有 组分数×组分数 大小：
+
+    'bdf'    scipy BDF（变阶隐式），稀疏分块对角雅可比，适合长时段批量积分
+    'ros2'   二阶Rosenbrock格式（L稳定，自适应步长），各单元小块批量求解，
+             适合算子分裂中的短时段反应步
+    'lsoda'  odeint + 解析雅可比，适合单个水体
+
+与输运算子（transport_operators）通过Strang算子分裂耦合，见 ReactiveTransport。
+"""
+
+import numpy as np
+from scipy.integrate import solve_ivp, odeint
+from scipy.sparse import csr_matrix
+
+
+class Factor:
+    """
+    速率因子基类
+    
+    参数:
+        species: 因子涉及的组分名
+    """
+    
+    def __init__(self, *species):
+        """初始化因子"""
+        self.species = species
+    
+    def bind(self, index):
+        """把组分名换成组分序号"""
+        for s in self.species:
+            if s not in index:
+                raise ValueError(f"未知组分: {s}")
+        self.idx = [index[s] for s in self.species]
+    
+    def value(self, C):
+        """因子值 (单元数,)"""
+        raise NotImplementedError
+    
+    def gradient(self, C):
+        """对各涉及组分的偏导数，与 species 一一对应"""
+        raise NotImplementedError
+
+
+class FirstOrder(Factor):
+    """一级因子 C"""
+    
+    def value(self, C):
+        return C[self.idx[0]]
+    
+    def gradient(self, C):
+        return [np.ones_like(C[self.idx[0]])]
+
+
+class Power(Factor):
+    """
+    幂函数因子 C^n（C取非负部分）
+    
+    参数:
+        species: 组分名
+        n: 反应级数
+    """
+    
+    def __init__(self, species, n):
+        """初始化因子"""
+        super().__init__(species)
+        self.n = n
+    
+    def value(self, C):
+        return np.maximum(C[self.idx[0]], 0.0)**self.n
+    
+    def gradient(self, C):
+        return [self.n * np.maximum(C[self.idx[0]], 0.0)**(self.n - 1)]
+
+
+class Monod(Factor):
+    """
+    Monod（半饱和）因子 C/(K+C)
+    
+    参数:
+        species: 组分名
+        K: 半饱和常数
+    """
+    
+    def __init__(self, species, K):
+        """初始化因子"""
+        super().__init__(species)
+        self.K = K
+    
+    def value(self, C):
+        c = C[self.idx[0]]
+        return c / (self.K + c)
+    
+    def gradient(self, C):
+        return [self.K / (self.K + C[self.idx[0]])**2]
+
+
+class Inhibition(Factor):
+    """
+    抑制因子 K/(K+C)
+    
+    参数:
+        species: 组分名
+        K: 半抑制常数
+    """
+    
+    def __init__(self, species, K):
+        """初始化因子"""
+        super().__init__(species)
+        self.K = K
+    
+    def value(self, C):
+        return self.K / (self.K + C[self.idx[0]])
+    
+    def gradient(self, C):
+        return [-self.K / (self.K + C[self.idx[0]])**2]
+
+
+class Logistic(Factor):
+    """
+    Logistic（容量限制）因子 1 - C/C_max
+    
+    参数:
+        species: 组分名
+        capacity: 环境容量 C_max
+    """
+    
+    def __init__(self, species, capacity):
+        """初始化因子"""
+        super().__init__(species)
+        self.capacity = capacity
+    
+    def value(self, C):
+        return 1.0 - C[self.idx[0]] / self.capacity
+    
+    def gradient(self, C):
+        return [np.full_like(C[self.idx[0]], -1.0 / self.capacity)]
+
+
+class Liebig(Factor):
+    """
+    Liebig最小因子定律 min(f1, f2, ...)（各子因子只涉及一个组分）
+    
+    参数:
+        factors: 单组分因子，例如 Monod('N', 50), Monod('P', 5)
+    """
+    
+    def __init__(self, *factors):
+        """初始化因子"""
+        if any(len(f.species) != 1 for f in factors):
+            raise ValueError("Liebig因子的子因子只能涉及一个组分")
+        super().__init__(*[f.species[0] for f in factors])
+        self.factors = factors
+    
+    def bind(self, index):
+        super().bind(index)
+        for f in self.factors:
+            f.bind(index)
+    
+    def value(self, C):
+        return np.min([f.value(C) for f in self.factors], axis=0)
+    
+    def gradient(self, C):
+        values = np.array([f.value(C) for f in self.factors])
+        active = np.argmin(values, axis=0)
+        return [np.where(active == k, f.gradient(C)[0], 0.0) for k, f in enumerate(self.factors)]
+
+
+class KineticNetwork:
+    """
+    多组分反应网络
+    
+    参数:
+        species: 组分名列表
+    """
+    
+    def __init__(self, species):
+        """初始化反应网络"""
+        self.species = list(species)
+        if len(set(self.species)) != len(self.species):
+            raise ValueError("组分名重复")
+        self.index = {s: i for i, s in enumerate(self.species)}
+        self.reactions = []
+        self._N = np.zeros((self.n_species, 0))
+        self._h = None
+    
+    @property
+    def n_species(self):
+        return len(self.species)
+    
+    def add_reaction(self, name, stoichiometry, k, factors=()):
+        """
+        添加反应：速率 r = k × Π 因子
+        
+        参数:
+            name: 反应名称
+            stoichiometry: {组分名: 化学计量系数}，消耗为负、生成为正
+            k: 速率系数，标量、各单元数组，或时间函数 k(t)（如光照、水温驱动）
+            factors: 速率因子列表（空则为零级反应）
+        """
+        nu = np.zeros(self.n_species)
+        for s, coef in stoichiometry.items():
+            if s not in self.index:
+                raise ValueError(f"未知组分: {s}")
+            nu[self.index[s]] = coef
+        for f in factors:
+            f.bind(self.index)
+        self.reactions.append({'name': name, 'nu': nu, 'k': k, 'factors': list(factors)})
+        self._N = np.column_stack([r['nu'] for r in self.reactions])
+    
+    @property
+    def stoichiometry(self):
+        """化学计量矩阵 N (组分数, 反应数)"""
+        return self._N
+    
+    def _coefficient(self, reaction, t, n_cells):
+        k = reaction['k'](t) if callable(reaction['k']) else reaction['k']
+        return np.broadcast_to(np.asarray(k, dtype=float), (n_cells,))
+    
+    def rates(self, C, t=0.0):
+        """
+        各反应速率
+        
+        参数:
+            C: 浓度 (组分数, 单元数)
+            t: 时间
+        
+        返回:
+            r: (反应数, 单元数)
+        """
+        C = np.asarray(C, dtype=float)
+        r = np.empty((len(self.reactions), C.shape[1]))
+        for j, reaction in enumerate(self.reactions):
+            rate = self._coefficient(reaction, t, C.shape[1]).copy()
+            for f in reaction['factors']:
+                rate *= f.value(C)
+            r[j] = rate
+        return r
+    
+    def rhs(self, C, t=0.0):
+        """dC/dt = N·r，形状与 C 相同 (组分数, 单元数)"""
+        return self._N @ self.rates(C, t)
+    
+    def jacobian(self, C, t=0.0):
+        """
+        解析雅可比矩阵（各单元一块）
+        
+        返回:
+            J: (单元数, 组分数, 组分数)，J[c, a, b] = ∂(dC_a/dt)/∂C_b
+        """
+        C = np.asarray(C, dtype=float)
+        n_cells = C.shape[1]
+        J = np.zeros((n_cells, self.n_species, self.n_species))
+        for reaction in self.reactions:
+            k = self._coefficient(reaction, t, n_cells)
+            factors = reaction['factors']
+            values = [f.value(C) for f in factors]
+            dr = np.zeros((self.n_species, n_cells))
+            for i, f in enumerate(factors):
+                others = k * np.prod([v for m, v in enumerate(values) if m != i], axis=0)
+                for s, g in zip(f.idx, f.gradient(C)):
+                    dr[s] += others * g
+            # J += ν ⊗ ∂r/∂C
+            J += reaction['nu'][None, :, None] * dr.T[:, None, :]
+        return J
+    
+    def integrate(self, C0, t_eval, method='bdf', rtol=None, atol=None, nonnegative=False):
+        """
+        积分反应方程
+        
+        参数:
+            C0: 初始浓度，(组分数,) 单个水体，或 (组分数, 单元数)
+            t_eval: 输出时刻数组
+            method: 'bdf'、'ros2' 或 'lsoda'
+            rtol, atol: 相对/绝对误差限（默认 ros2 为 1e-3/1e-6，其余为 1e-6/1e-9）
+            nonnegative: 是否把浓度截断为非负
+        
+        返回:
+            C: (输出时刻数, 组分数) 或 (输出时刻数, 组分数, 单元数)
+        """
+        if method not in ('bdf', 'ros2', 'lsoda'):
+            raise ValueError(f"未知积分方法: {method}")
+        loose = method == 'ros2'
+        rtol = (1e-3 if loose else 1e-6) if rtol is None else rtol
+        atol = (1e-6 if loose else 1e-9) if atol is None else atol
+        
+        C0 = np.asarray(C0, dtype=float)
+        single = C0.ndim == 1
+        C = C0.reshape(self.n_species, -1).copy()
+        t_eval = np.asarray(t_eval, dtype=float)
+        
+        if method in ('bdf', 'lsoda'):
+            out = self._integrate_implicit(C, t_eval, method, rtol, atol)
+        else:
+            out = np.empty((len(t_eval),) + C.shape)
+            out[0] = C
+            self._h = None
+            for n in range(1, len(t_eval)):
+                C = self._ros2(C, t_eval[n-1], t_eval[n], rtol, atol, nonnegative)
+                out[n] = C
+        
+        if nonnegative:
+            out = np.maximum(out, 0.0)
+        return out[:, :, 0] if single else out
+    
+    def step(self, C, t, dt, rtol=1e-3, atol=1e-6, nonnegative=False):
+        """
+        把全部单元的反应推进 dt（算子分裂中的反应步）
+        
+        参数:
+            C: 浓度 (组分数, 单元数)
+            t: 起始时间
+            dt: 推进时长
+        
+        返回:
+            C_new: 新浓度
+        """
+        return self._ros2(np.asarray(C, dtype=float), t, t + dt, rtol, atol, nonnegative)
+    
+    def _solve_blocks(self, W, f):
+        """各单元 W·k = f 批量求解"""
+        return np.linalg.solve(W, f.T[:, :, None])[:, :, 0].T
+    
+    def _ros2(self, C, t, t_end, rtol, atol, nonnegative):
+        """
+        ROS2 自适应积分（Verwer等，γ = 1 + 1/√2）
+            
+            W = I - γhJ
+            W·k1 = f(C)
+            W·k2 = f(C + h·k1) - 2·k1
+            C_新 = C + 1.5h·k1 + 0.5h·k2
+        
+        误差估计取与一阶解 C + h·k1 之差，各单元都需满足误差限。
+        """
+        gamma = 1.0 + 1.0 / np.sqrt(2.0)
+        I = np.eye(self.n_species)
+        h = self._h if self._h else 0.01 * (t_end - t)
+        while t < t_end:
+            h = min(h, t_end - t)
+            W = I - gamma * h * self.jacobian(C, t)
+            k1 = self._solve_blocks(W, self.rhs(C, t))
+            k2 = self._solve_blocks(W, self.rhs(C + h * k1, t + h) - 2.0 * k1)
+            C_new = C + 1.5 * h * k1 + 0.5 * h * k2
+            
+            scale = atol + rtol * np.maximum(np.abs(C), np.abs(C_new))
+            err = np.sqrt(np.mean((0.5 * h * (k1 + k2) / scale)**2, axis=0)).max()
+            if err <= 1.0 or h <= 1e-12 * max(1.0, abs(t_end)):
+                t += h
+                C = np.maximum(C_new, 0.0) if nonnegative else C_new
+                if t_end - t > 1e-12 * max(1.0, abs(t_end)):
+                    self._h = h
+            # 按误差调整步长（被拒绝的步缩小后重算）
+            h *= min(5.0, max(0.2, 0.9 / np.sqrt(max(err, 1e-10))))
+        return C
+    
+    def _integrate_implicit(self, C, t_eval, method, rtol, atol):
+        """scipy BDF / odeint(LSODA)，分块对角雅可比"""
+        ns, nc = C.shape
+        # 展平顺序 (组分, 单元)：第 c 个单元的块位于行/列 s*nc + c
+        cells = np.arange(nc)
+        a, b = np.meshgrid(np.arange(ns), np.arange(ns), indexing='ij')
+        rows = (a.ravel()[None, :] * nc + cells[:, None]).ravel()
+        cols = (b.ravel()[None, :] * nc + cells[:, None]).ravel()
+        
+        def fun(t, y):
+            return self.rhs(y.reshape(ns, nc), t).ravel()
+        
+        def jac(t, y):
+            J = self.jacobian(y.reshape(ns, nc), t)
+            return csr_matrix((J.reshape(nc, -1).ravel(), (rows, cols)), shape=(ns * nc, ns * nc))
+        
+        if method == 'lsoda':
+            y = odeint(lambda y, t: fun(t, y), C.ravel(), t_eval,
+                       Dfun=lambda y, t: jac(t, y).toarray(), rtol=rtol, atol=atol)
+            return y.reshape(len(t_eval), ns, nc)
+        
+        sol = solve_ivp(fun, (t_eval[0], t_eval[-1]), C.ravel(), method='BDF', t_eval=t_eval,
+                        jac=jac, rtol=rtol, atol=atol)
+        if not sol.success:
+            raise RuntimeError(f"BDF积分失败: {sol.message}")
+        return sol.y.T.reshape(len(t_eval), ns, nc)
+
+
+class ReactiveTransport:
+    """
+    反应-输运耦合（Strang算子分裂）
+        
+        半步反应（各单元同时，刚性积分）→ 整步输运（各组分，θ法）→ 半步反应
+    
+    参数:
+        network: KineticNetwork
+        transport: ThetaScheme，单个组分的输运推进器（被输运组分共用）
+        transported: 参与输运的组分名（默认全部；如沉水植物不随水流输运）
+        nonnegative: 是否把浓度截断为非负
+    """
+    
+    def __init__(self, network, transport, transported=None, nonnegative=True):
+        """初始化耦合推进器"""
+        self.network = network
+        self.transport = transport
+        names = network.species if transported is None else transported
+        self.transported = [network.index[s] for s in names]
+        self.nonnegative = nonnegative
+    
+    def step(self, C, t, values=None):
+        """
+        推进一个输运时间步
+        
+        参数:
+            C: 浓度 (组分数, 单元数)
+            t: 当前时间
+            values: {组分名: 输运给定值节点的值}（可选）
+        
+        返回:
+            C_new: 新浓度
+        """
+        dt = self.transport.dt
+        values = values or {}
+        C = self.network.step(C, t, 0.5 * dt, nonnegative=self.nonnegative)
+        C = C.copy()
+        for i in self.transported:
+            C[i] = self.transport.step(C[i], values=values.get(self.network.species[i]))
+        return self.network.step(C, t + 0.5 * dt, 0.5 * dt, nonnegative=self.nonnegative)
+    
+    def run(self, C0, nt, t0=0.0, values=None, recorder=None):
+        """
+        连续推进 nt-1 步
+        
+        参数:
+            C0: 初始浓度 (组分数, 单元数)
+            nt: 时间层数（含初始层）
+            t0: 起始时间
+            values: {组分名: 给定值}（可选）
+            recorder: 结果记录器（models.recorders，可选）
+        
+        返回:
+            C: 最终浓度 (组分数, 单元数)
+        """
+        C = np.asarray(C0, dtype=float).copy()
+        t = t0 + self.transport.dt * np.arange(nt)
+        if recorder is not None:
+            recorder.allocate(t, C.shape)
+            recorder.record(0, C)
+        for n in range(nt - 1):
+            C = self.step(C, t[n], values)
+            if recorder is not None:
+                recorder.record(n + 1, C)
+        if recorder is not None:
+            recorder.finalize()
+        return C
@@ -44,7 +44,7 @@ class Lake3DEutrophication:
         print(f"  尺寸: {Lx}m × {Ly}m × {H}m")
         print(f"  网格: {nx} × {ny} × {nz}")
     
-    def simulate_wind_driven_transport(self, wind_speed, wind_dir, dt, n_steps):
+    def simulate_wind_driven_transport(self, wind_speed, wind_dir, dt, n_steps, tol=None):
         """
         模拟风驱动输运（简化）
         
@@ -53,31 +53,39 @@ class Lake3DEutrophication:
         - wind_dir: 风向 (度，0=北，90=东)
         - dt: 时间步 (s)
         - n_steps: 步数
+        - tol: 稳态判据（可选），一步内表层浓度最大变化小于 tol 时提前结束
         """
         # 风驱动流速（简化）
         u_wind = 0.03 * wind_speed * np.cos(np.radians(wind_dir))
         v_wind = 0.03 * wind_speed * np.sin(np.radians(wind_dir))
         
+        # 表层内部节点及其迎风邻点
+        inner = (slice(1, self.ny-1), slice(1, self.nx-1))
+        upwind_x = (inner[0], slice(0, self.nx-2)) if u_wind > 0 else (inner[0], slice(2, self.nx))
+        upwind_y = (slice(0, self.ny-2), inner[1]) if v_wind > 0 else (slice(2, self.ny), inner[1])
+        
         for step in range(n_steps):
             # 表层对流（简化）
-            Chl_new = self.Chl.copy()
+            surface = self.Chl[0]
+            
+            if u_wind > 0:
+                dChl_dx = (surface[inner] - surface[upwind_x]) / self.dx
+            else:
+                dChl_dx = (surface[upwind_x] - surface[inner]) / self.dx
             
-            for i in range(1, self.nx-1):
-                for j in range(1, self.ny-1):
-                    # 表层输运
-                    if u_wind > 0:
-                        dChl_dx = (self.Chl[0, j, i] - self.Chl[0, j, i-1]) / self.dx
-                    else:
-                        dChl_dx = (self.Chl[0, j, i+1] - self.Chl[0, j, i]) / self.dx
-                    
-                    if v_wind > 0:
-                        dChl_dy = (self.Chl[0, j, i] - self.Chl[0, j-1, i]) / self.dy
-                    else:
-                        dChl_dy = (self.Chl[0, j+1, i] - self.Chl[0, j, i]) / self.dy
-                    
-                    Chl_new[0, j, i] -= dt * (u_wind * dChl_dx + v_wind * dChl_dy)
+            if v_wind > 0:
+                dChl_dy = (surface[inner] - surface[upwind_y]) / self.dy
+            else:
+                dChl_dy = (surface[upwind_y] - surface[inner]) / self.dy
+            
+            change = dt * (u_wind * dChl_dx + v_wind * dChl_dy)
+            Chl_new = self.Chl.copy()
+            Chl_new[0][inner] -= change
             
             self.Chl = np.maximum(Chl_new, 0)
+            
+            if tol is not None and np.max(np.abs(change)) < tol:
+                break
         
         print(f"\n风驱动输运模拟完成")
         print(f"  风速: {wind_speed} m/s")
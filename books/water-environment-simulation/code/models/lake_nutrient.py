@@ -6,9 +6,10 @@ Lake Nutrient Input-Response Model (Vollenweider Model)
 """
 
 import numpy as np
-from scipy.integrate import odeint
 from scipy.optimize import fsolve
 
+from .kinetics import KineticNetwork, FirstOrder
+
 
 class VollenweiderModel:
     """
@@ -75,6 +76,19 @@ class VollenweiderModel:
         """
         return self.L / self.V - P * (self.rho + self.sigma * self.A / self.V)
     
+    def network(self):
+        """
+        反应网络：外源负荷（零级）+ 冲刷与沉降（一级）
+        
+        返回：
+        - net: KineticNetwork，组分 [P]
+        """
+        net = KineticNetwork(['P'])
+        net.add_reaction('loading', {'P': 1}, self.L / self.V)
+        net.add_reaction('flushing_settling', {'P': -1}, self.rho + self.sigma * self.A / self.V,
+                         [FirstOrder('P')])
+        return net
+    
     def solve_transient(self, t_span):
         """
         求解瞬态响应
@@ -86,7 +100,7 @@ class VollenweiderModel:
         - t: 时间数组
         - P: 磷浓度数组 (μg/L)
         """
-        P = odeint(self.dP_dt, self.P, t_span)
+        P = self.network().integrate([self.P], t_span, method='lsoda', rtol=1e-8, atol=1e-10)
         
         print(f"\n瞬态求解完成:")
         print(f"  时间范围: {t_span[0]:.1f} - {t_span[-1]:.1f} d")
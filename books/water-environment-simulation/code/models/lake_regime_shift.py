@@ -4,7 +4,8 @@ Simplified Lake Regime Shift Model
 """
 
 import numpy as np
-from scipy.integrate import odeint
+
+from .kinetics import KineticNetwork, FirstOrder, Logistic
 
 
 class LakeRegimeShiftModel:
@@ -31,9 +32,28 @@ class LakeRegimeShiftModel:
         
         return [dM, dA]
     
+    def network(self, P=None):
+        """
+        反应网络（与 dynamics 相同的竞争动力学；P 可为各单元数组）
+        
+        返回：
+        - net: KineticNetwork，组分 [M, A]
+        """
+        P = np.asarray(self.P_load if P is None else P, dtype=float)
+        
+        net = KineticNetwork(['M', 'A'])
+        net.add_reaction('macrophyte_growth', {'M': 1}, 0.1, [FirstOrder('M'), Logistic('M', 100)])
+        net.add_reaction('algal_shading', {'M': -1}, 0.005, [FirstOrder('M'), FirstOrder('A')])
+        net.add_reaction('nutrient_stress', {'M': -1}, 0.01 * P, [FirstOrder('M')])
+        net.add_reaction('algal_growth', {'A': 1}, 0.2 * P / 50, [FirstOrder('A'), Logistic('A', 100)])
+        net.add_reaction('macrophyte_competition', {'A': -1}, 0.002,
+                         [FirstOrder('A'), FirstOrder('M')])
+        return net
+    
     def solve(self, t_span):
         """求解"""
-        result = odeint(self.dynamics, self.state, t_span, args=(self.P_load,))
+        result = self.network().integrate(self.state, t_span, method='lsoda',
+                                          rtol=1e-8, atol=1e-10)
         
         final_M, final_A = result[-1, :]
         regime = "清水态" if final_M > final_A else "浊水态"
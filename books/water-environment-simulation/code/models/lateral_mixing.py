@@ -10,8 +10,9 @@ Lateral Mixing in Rivers
 """
 
 import numpy as np
-from scipy.sparse import diags
-from scipy.sparse.linalg import spsolve
+
+from .transport_operators import (StructuredGrid, diffusion_matrix, implicit_propagator,
+                                  march_downstream)
 
 
 class LateralMixing2D:
@@ -95,113 +96,78 @@ class LateralMixing2D:
         print(f"  排放浓度: {C_discharge} mg/L")
         print(f"  河流流量: {Q_river} m³/s")
     
-    def solve_steady_state(self, method='explicit'):
+    def solve_steady_state(self, method='explicit', verbose=True):
         """
         求解稳态浓度场
         
         参数：
-            method: 求解方法 ('explicit' 或 'implicit')
+            method: 求解方法 ('explicit'、'implicit' 或 'marching'，
+                    后者为沿程隐式推进)
+            verbose: 是否打印求解信息（排放口优化等循环中可关闭）
             
         返回：
             x, y, C: 坐标和浓度场
         """
-        print(f"\n求解稳态浓度场（{method}）...")
+        if verbose:
+            print(f"\n求解稳态浓度场（{method}）...")
         
         if method == 'explicit':
             self._solve_explicit()
         elif method == 'implicit':
             self._solve_implicit()
+        elif method == 'marching':
+            self._solve_marching()
         else:
             raise ValueError(f"未知求解方法: {method}")
         
-        print(f"求解完成！")
-        print(f"  最大浓度: {np.max(self.C):.2f} mg/L")
+        if verbose:
+            print(f"求解完成！")
+            print(f"  最大浓度: {np.max(self.C):.2f} mg/L")
         
         return self.x, self.y, self.C
     
     def _solve_explicit(self):
-        """显式求解稳态浓度场"""
-        # 初始化
-        C = np.zeros((self.ny, self.nx))
-        
-        # 设置排放源
-        for source in self.sources:
-            ix = np.argmin(np.abs(self.x - source['x']))
-            iy = np.argmin(np.abs(self.y - source['y']))
-            
-            # 排放源处初始浓度（考虑瞬时混合）
-            C[iy, ix] = source['C']
+        """
+        显式求解稳态浓度场
         
-        # 从上游向下游逐列求解
-        for i in range(1, self.nx):
-            # 对每个横断面，求解横向扩散方程
-            # ∂C/∂t = Ey*∂²C/∂y²
-            
-            # 使用上一个断面作为初始值
-            C_prev = C[:, i-1].copy()
-            
-            # 伪时间步进（达到稳态）
-            dt = 0.5 * self.dy**2 / self.Ey  # CFL条件
-            n_steps = max(int(self.dx / (self.u * dt)), 1)  # 至少1步
-            
-            C_new = C_prev.copy()
-            for _ in range(n_steps):
-                # 横向扩散（显式格式）
-                C_temp = C_new.copy()
-                for j in range(1, self.ny-1):
-                    d2C_dy2 = (C_new[j+1] - 2*C_new[j] + C_new[j-1]) / self.dy**2
-                    C_temp[j] = C_new[j] + dt * self.Ey * d2C_dy2
-                
-                # 边界条件：零通量
-                C_temp[0] = C_temp[1]
-                C_temp[-1] = C_temp[-2]
-                
-                C_new = C_temp
-            
-            C[:, i] = C_new
+        每个断面间按CFL步长做若干次横向扩散伪时间步（零通量边界），
+        这一组线性步合成为一个传播矩阵，再沿程逐断面相乘。
+        """
+        dt = 0.5 * self.dy**2 / self.Ey  # CFL条件
+        n_steps = max(int(self.dx / (self.u * dt)), 1)  # 至少1步
         
-        self.C = C
+        C0, injections = locate_sources(self.x, self.y, self.sources)
+        P = pseudo_time_propagator(self.ny, dt * self.Ey / self.dy**2, n_steps)
+        self.C = march_downstream(P, C0, self.nx, injections)
     
     def _solve_implicit(self):
-        """隐式求解稳态浓度场"""
-        # 初始化
-        C = np.zeros((self.ny, self.nx))
-        
-        # 设置排放源
-        for source in self.sources:
-            ix = np.argmin(np.abs(self.x - source['x']))
-            iy = np.argmin(np.abs(self.y - source['y']))
-            # 只在排放点设置浓度
-            C[iy, ix] = source['C']
-        
-        # 从上游向下游逐列求解
-        for i in range(1, self.nx):
-            # 使用显式方法进行横向扩散（更稳定）
-            # 相当于伪时间推进到稳态
-            
-            C_prev = C[:, i-1].copy()
-            
-            # 伪时间步进
-            dt = 0.5 * self.dy**2 / self.Ey  # CFL条件
-            travel_time = self.dx / self.u
-            n_steps = max(int(travel_time / dt), 10)  # 至少10步
-            
-            C_new = C_prev.copy()
-            for _ in range(n_steps):
-                C_temp = C_new.copy()
-                for j in range(1, self.ny-1):
-                    d2C_dy2 = (C_new[j+1] - 2*C_new[j] + C_new[j-1]) / self.dy**2
-                    C_temp[j] = C_new[j] + dt * self.Ey * d2C_dy2
-                
-                # 边界条件：零通量
-                C_temp[0] = C_temp[1]
-                C_temp[-1] = C_temp[-2]
-                
-                C_new = C_temp
-            
-            C[:, i] = C_new
+        """
+        隐式求解稳态浓度场
+        
+        与显式相同的伪时间步进，但每个断面间至少推进10步（更稳定）。
+        """
+        dt = 0.5 * self.dy**2 / self.Ey  # CFL条件
+        travel_time = self.dx / self.u
+        n_steps = max(int(travel_time / dt), 10)  # 至少10步
+        
+        C0, injections = locate_sources(self.x, self.y, self.sources)
+        P = pseudo_time_propagator(self.ny, dt * self.Ey / self.dy**2, n_steps)
+        self.C = march_downstream(P, C0, self.nx, injections)
+    
+    def _solve_marching(self):
+        """
+        沿程隐式推进求解稳态浓度场
         
-        self.C = C
+        稳态方程 u*∂C/∂x = Ey*∂²C/∂y² 沿程为抛物型，按 x 隐式推进：
+        (I - Δx/u*Ey*Dyy)*C[:, i] = C[:, i-1]，岸边零通量。
+        横向扩散量与实际流经时间一致（伪时间步进每个断面至少推进
+        固定步数，横向混合偏快），无条件稳定且保持非负。
+        """
+        grid = StructuredGrid((self.ny,), (self.dy,))
+        A = diffusion_matrix(grid, self.Ey, boundary='neumann')
+        
+        C0, injections = locate_sources(self.x, self.y, self.sources)
+        self.C = march_downstream(implicit_propagator(A, self.dx / self.u), C0, self.nx, injections)
     
     def calculate_mixing_length(self, threshold=0.95):
         """
@@ -279,6 +245,68 @@ class LateralMixing2D:
         return Ey
 
 
+def locate_sources(x, y, sources):
+    """
+    把排放源放到最近的网格节点上，供沿程推进使用
+    
+    参数：
+        x, y: 纵向、横向坐标数组 (m)
+        sources: 排放源列表（含 'x', 'y', 'C'）
+    
+    返回：
+        C0: 首断面浓度 (len(y),)
+        injections: {断面序号: (节点列表, 浓度列表)}，推进到该断面后赋值
+    """
+    C0 = np.zeros(len(y))
+    injections = {}
+    for source in sources:
+        ix = np.argmin(np.abs(x - source['x']))
+        iy = np.argmin(np.abs(y - source['y']))
+        
+        # 排放源处初始浓度（考虑瞬时混合）
+        if ix == 0:
+            C0[iy] = source['C']
+        else:
+            nodes, values = injections.setdefault(ix, ([], []))
+            nodes.append(iy)
+            values.append(source['C'])
+    return C0, injections
+
+
+def pseudo_time_propagator(ny, r, n_steps, courant=None):
+    """
+    横向伪时间步进 n_steps 步合成的传播矩阵
+    
+    单步为显式横向扩散（扩散数 r），可叠加横向对流（各节点库朗数
+    courant，正值用前向差分、负值用后向差分），之后两岸取零梯度。
+    n_steps 步的组合用矩阵幂一次得到。
+    
+    参数：
+        ny: 横向节点数
+        r: 扩散数 Ey*dt/dy²
+        n_steps: 伪时间步数
+        courant: 横向对流库朗数 v*dt/dy（可选，长度 ny）
+    
+    返回：
+        P: 传播矩阵 (ny, ny)
+    """
+    M = np.eye(ny)
+    j = np.arange(1, ny - 1)
+    M[j, j] -= 2 * r
+    M[j, j - 1] += r
+    M[j, j + 1] += r
+    if courant is not None:
+        c = np.asarray(courant, dtype=float)[j]
+        forward = c > 0
+        M[j, j] += np.where(forward, c, -c)
+        M[j, j + 1] -= np.where(forward, c, 0.0)
+        M[j, j - 1] += np.where(forward, 0.0, c)
+    # 边界条件：零通量
+    M[0] = M[1]
+    M[-1] = M[-2]
+    return np.linalg.matrix_power(M, n_steps)
+
+
 def calculate_mixing_time(B, Ey):
     """
     计算横向混合时间
@@ -116,9 +116,9 @@ class SCSCurveNumber:
         
         # AMC条件校正
         if AMC == 'I':  # 干燥条件
-            CN = CN_II / (2.281 - 0.01281 * CN_II)
+            CN = float(amc_curve_numbers(CN_II)[0])
         elif AMC == 'III':  # 湿润条件
-            CN = CN_II / (0.427 + 0.00573 * CN_II)
+            CN = float(amc_curve_numbers(CN_II)[2])
         else:  # AMC-II
             CN = CN_II
         
@@ -360,6 +360,26 @@ class NonPointSourceRiver1D:
         return total_load
 
 
+def amc_curve_numbers(CN_II):
+    """
+    前期土壤湿度条件（AMC）曲线数换算
+    
+    CN_I = CN_II / (2.281 - 0.01281*CN_II)     干燥
+    CN_III = CN_II / (0.427 + 0.00573*CN_II)   湿润
+    
+    参数：
+        CN_II: AMC-II 曲线数，可为数组
+        
+    返回：
+        CN_I, CN_II, CN_III: 三种条件下的曲线数
+    """
+    CN_II = np.asarray(CN_II, dtype=float)
+    CN_I = CN_II / (2.281 - 0.01281 * CN_II)
+    CN_III = CN_II / (0.427 + 0.00573 * CN_II)
+    
+    return CN_I, CN_II, CN_III
+
+
 def calculate_first_flush_factor(rainfall_duration, V_initial_fraction=0.3):
     """
     计算初期冲刷系数
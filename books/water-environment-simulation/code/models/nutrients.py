@@ -16,7 +16,8 @@ Nutrient Cycling Model
 """
 
 import numpy as np
-from scipy.integrate import odeint
+
+from .kinetics import KineticNetwork, FirstOrder
 
 
 class NitrogenCycle:
@@ -107,6 +108,25 @@ class NitrogenCycle:
         
         return [dNH4_dt, dNO3_dt, dOrgN_dt]
     
+    def network(self):
+        """
+        反应网络（与 _derivatives 相同的动力学，可用于多单元批量积分）
+        
+        DO 可以是各单元数组，此时硝化/反硝化速率按单元给出。
+        
+        返回：
+            net: KineticNetwork，组分 [NH4, NO3, OrgN]
+        """
+        f_DO_n = np.asarray(self.DO) / (np.asarray(self.DO) + 0.5)
+        f_DO_dn = 0.5 / (np.asarray(self.DO) + 0.5)
+        
+        net = KineticNetwork(['NH4', 'NO3', 'OrgN'])
+        net.add_reaction('ammonification', {'OrgN': -1, 'NH4': 1}, self.k_am, [FirstOrder('OrgN')])
+        net.add_reaction('nitrification', {'NH4': -1, 'NO3': 1}, self.k_n * f_DO_n,
+                         [FirstOrder('NH4')])
+        net.add_reaction('denitrification', {'NO3': -1}, self.k_dn * f_DO_dn, [FirstOrder('NO3')])
+        return net
+    
     def solve(self):
         """
         求解氮循环方程
@@ -118,7 +138,7 @@ class NitrogenCycle:
         y0 = [self.NH4_0, self.NO3_0, self.OrgN_0]
         
         # 求解ODE
-        solution = odeint(self._derivatives, y0, self.t)
+        solution = self.network().integrate(y0, self.t, method='lsoda', rtol=1e-8, atol=1e-10)
         
         self.NH4 = solution[:, 0]
         self.NO3 = solution[:, 1]
@@ -220,6 +240,18 @@ class PhosphorusCycle:
         
         return [dPO4_dt, dOrgP_dt]
     
+    def network(self):
+        """
+        反应网络（与 _derivatives 相同的动力学）
+        
+        返回：
+            net: KineticNetwork，组分 [PO4, OrgP]
+        """
+        net = KineticNetwork(['PO4', 'OrgP'])
+        net.add_reaction('mineralization', {'OrgP': -1, 'PO4': 1}, self.k_mp, [FirstOrder('OrgP')])
+        net.add_reaction('settling', {'OrgP': -1}, self.k_s, [FirstOrder('OrgP')])
+        return net
+    
     def solve(self):
         """
         求解磷循环方程
@@ -231,7 +263,7 @@ class PhosphorusCycle:
         y0 = [self.PO4_0, self.OrgP_0]
         
         # 求解ODE
-        solution = odeint(self._derivatives, y0, self.t)
+        solution = self.network().integrate(y0, self.t, method='lsoda', rtol=1e-8, atol=1e-10)
         
         self.PO4 = solution[:, 0]
         self.OrgP = solution[:, 1]
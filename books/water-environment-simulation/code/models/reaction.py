@@ -8,6 +8,8 @@ Reaction Kinetics Models
 import numpy as np
 from scipy.optimize import curve_fit, minimize
 
+from .transport_operators import StructuredGrid, advection_matrix, diffusion_matrix, ThetaScheme
+
 
 class ReactionKinetics:
     """
@@ -235,20 +237,17 @@ class ReactionTransport1D:
             2. 反应步（反应动力学）
         
         参数:
-            method: 迁移步的数值格式
+            method: 迁移步的对流格式 ('upwind', 'central', 'quick', 'lax_wendroff')
         """
+        # 迁移算子（两端零梯度边界）
+        grid = StructuredGrid((self.nx,), (self.dx,))
+        A = advection_matrix(grid, self.u, method, dt=self.dt) + diffusion_matrix(grid, self.D)
+        transport = ThetaScheme(A, self.dt, 0.0,
+                                zero_gradient=[grid.boundary(0, 0), grid.boundary(0, -1)])
+        
         for n in range(self.nt - 1):
             # Step 1: 迁移步（对流-扩散）
-            C_temp = self.C[n, :].copy()
-            
-            if method == 'upwind':
-                C_temp[1:-1] = C_temp[1:-1] - \
-                    self.Cr * (C_temp[1:-1] - C_temp[:-2]) + \
-                    self.Fo * (C_temp[2:] - 2*C_temp[1:-1] + C_temp[:-2])
-            
-            # 边界条件
-            C_temp[0] = C_temp[1]
-            C_temp[-1] = C_temp[-2]
+            C_temp = transport.step(self.C[n, :])
             
             # Step 2: 反应步
             if self.n == 1:
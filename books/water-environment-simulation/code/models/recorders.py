@@ -0,0 +1,239 @@
+"""
+结果记录器
+Output Recorders
+
+瞬态求解器内部只保留当前时间层，每推进一步把结果交给记录器，
+由记录器决定保存什么：
+
+    FullHistory     全部时间层或每隔若干步一层（内存数组，默认即原有 self.C）
+    KeepLast        只保留最近若干时间层
+    ProbeRecorder   只保存指定测点/断面的时间序列
+    MemmapRecorder  写入磁盘 .npy 文件（内存映射，按页读写）
+    RecorderGroup   同时使用多个记录器
+
+记录器由模型在初始化时调用 allocate(t, shape) 绑定时间轴与场的形状，
+之后每个时间层调用 record(n, C)。
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class Recorder:
+    """
+    记录器基类（按固定步长抽取时间层，最后一个时间层总是保存）
+    
+    参数:
+        every: 保存间隔（步数）
+    """
+    
+    def __init__(self, every=1):
+        """初始化记录器"""
+        if int(every) < 1:
+            raise ValueError("保存间隔 every 必须 ≥ 1")
+        self.every = int(every)
+    
+    def allocate(self, t, shape):
+        """
+        绑定时间轴和场的形状，分配存储
+        
+        参数:
+            t: 模型时间数组（全部时间层）
+            shape: 单个时间层浓度场的形状
+        """
+        nt = len(t)
+        self.steps = np.unique(np.r_[np.arange(0, nt, self.every), nt - 1])
+        self.times = np.asarray(t, dtype=float)[self.steps]
+        self.shape = tuple(shape)
+        self._slot = np.full(nt, -1)
+        self._slot[self.steps] = np.arange(len(self.steps))
+        self._allocate()
+    
+    def _allocate(self):
+        """分配存储（子类实现）"""
+    
+    def record(self, n, C):
+        """
+        记录第 n 个时间层
+        
+        参数:
+            n: 时间层序号
+            C: 该时间层浓度场
+        """
+        k = self._slot[n]
+        if k >= 0:
+            self._store(k, C)
+    
+    def _store(self, k, C):
+        """保存到第 k 个位置（子类实现）"""
+        raise NotImplementedError
+    
+    def finalize(self):
+        """一次求解结束（磁盘记录器在此写出缓存）"""
+    
+    def read_only(self):
+        """
+        记录数据的只读视图（ProbeRecorder 为 {名称: 只读数组}）
+        
+        模型的 C 属性返回此视图：直接写入记录缓存不会影响求解，
+        初始条件应通过 set_initial_condition 设置。
+        """
+        def view(array):
+            array = array.view()
+            array.setflags(write=False)
+            return array
+        
+        if isinstance(self.data, dict):
+            return {name: view(array) for name, array in self.data.items()}
+        return view(self.data)
+
+
+class FullHistory(Recorder):
+    """
+    保存全部（或每隔 every 步）时间层到内存数组
+    
+    参数:
+        every: 保存间隔（步数）
+    """
+    
+    def _allocate(self):
+        self.data = np.zeros((len(self.steps),) + self.shape)
+    
+    def _store(self, k, C):
+        self.data[k] = C
+
+
+class KeepLast(Recorder):
+    """
+    只保留最近 count 个时间层（环形缓冲）
+    
+    参数:
+        count: 保留的时间层数
+    """
+    
+    def __init__(self, count=1):
+        """初始化记录器"""
+        if int(count) < 1:
+            raise ValueError("保留层数 count 必须 ≥ 1")
+        self.count = int(count)
+        self._buffer = deque(maxlen=self.count)
+    
+    def allocate(self, t, shape):
+        """绑定时间轴和场的形状"""
+        self._t = np.asarray(t, dtype=float)
+        self.shape = tuple(shape)
+        self._buffer.clear()
+    
+    def record(self, n, C):
+        """记录第 n 个时间层（覆盖最旧的一层）"""
+        if self._buffer and n <= self._buffer[-1][0]:
+            # 重新求解，从头记录
+            self._buffer.clear()
+        self._buffer.append((n, np.array(C, dtype=float)))
+    
+    @property
+    def times(self):
+        """已保留时间层的时间"""
+        return self._t[[n for n, _ in self._buffer]]
+    
+    @property
+    def data(self):
+        """已保留的时间层 (count, ...)，按时间先后排列"""
+        return np.array([C for _, C in self._buffer])
+
+
+class ProbeRecorder(Recorder):
+    """
+    只记录指定测点/断面的时间序列
+    
+    参数:
+        probes: {名称: 索引}，索引可以是节点序号、元组或切片，
+                例如 {'出口': -1, '断面x=25': (slice(None), 25)}
+        every: 记录间隔（步数）
+    """
+    
+    def __init__(self, probes, every=1):
+        """初始化测点记录器"""
+        super().__init__(every)
+        self.probes = dict(probes)
+    
+    def _allocate(self):
+        template = np.zeros(self.shape)
+        self.data = {name: np.zeros((len(self.steps),) + np.shape(template[index]))
+                     for name, index in self.probes.items()}
+    
+    def _store(self, k, C):
+        C = np.asarray(C).reshape(self.shape)
+        for name, index in self.probes.items():
+            self.data[name][k] = C[index]
+
+
+class MemmapRecorder(Recorder):
+    """
+    把浓度场写入磁盘 .npy 文件（内存映射，不占用整块内存）
+    
+    结果可用 np.load(path, mmap_mode='r') 按需读取。
+    
+    参数:
+        path: 输出文件路径
+        every: 保存间隔（步数）
+        dtype: 存储精度（默认 float32，体积减半）
+    """
+    
+    def __init__(self, path, every=1, dtype=np.float32):
+        """初始化磁盘记录器"""
+        super().__init__(every)
+        self.path = path
+        self.dtype = dtype
+    
+    def _allocate(self):
+        self.data = np.lib.format.open_memmap(self.path, mode='w+', dtype=self.dtype,
+                                              shape=(len(self.steps),) + self.shape)
+    
+    def _store(self, k, C):
+        self.data[k] = np.asarray(C).reshape(self.shape)
+    
+    def finalize(self):
+        """把缓存页写入磁盘"""
+        self.data.flush()
+
+
+class RecorderGroup(Recorder):
+    """
+    同时使用多个记录器
+    
+    参数:
+        recorders: 记录器列表
+    """
+    
+    def __init__(self, *recorders):
+        """初始化记录器组"""
+        self.recorders = list(recorders)
+        if not self.recorders:
+            raise ValueError("记录器组至少需要一个记录器")
+    
+    def allocate(self, t, shape):
+        """为组内每个记录器分配存储"""
+        for recorder in self.recorders:
+            recorder.allocate(t, shape)
+    
+    def record(self, n, C):
+        """交给组内每个记录器"""
+        for recorder in self.recorders:
+            recorder.record(n, C)
+    
+    def finalize(self):
+        """结束组内每个记录器"""
+        for recorder in self.recorders:
+            recorder.finalize()
+    
+    @property
+    def times(self):
+        """组内第一个记录器的时间"""
+        return self.recorders[0].times
+    
+    @property
+    def data(self):
+        """组内第一个记录器的数据"""
+        return self.recorders[0].data
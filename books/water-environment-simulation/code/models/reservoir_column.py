@@ -0,0 +1,299 @@
+"""
+垂向一维水柱求解器（批量）
+Vertical Reservoir Column Solver
+
+把一个或多个水库（或同一水库的多种情景）表示为一批垂向水柱，
+每个时间步对全部水柱一次性求解：
+
+    ∂C/∂t = ∂/∂z(Kz ∂C/∂z) + S
+
+- 垂向扩散：全隐式有限体积格式，各水柱的三对角方程首尾相接成一个
+  三对角系统，一次求解（O(N)，无条件稳定）。直接调用 solve_banded
+  在 (1,1) 带宽下使用的 LAPACK gtsv，省去每步的参数检查开销
+- 水面热交换：surface_heat_flux 给出的净热通量，对水温线性化后隐式处理
+- 太阳辐射：可按 Beer 定律随深度衰减吸收
+- 对流混合：表层水密度大于下层时，自上而下合并为均匀混合层
+
+节点 z=0 为水面、z=H 为库底，首末节点控制体为半个网格。
+时间单位为天，Kz 单位为 m²/d，热通量单位为 W/m²。
+"""
+
+import numpy as np
+from scipy.linalg.lapack import dgtsv
+
+from .thermal_pollution import surface_heat_flux
+from .recorders import FullHistory
+
+
+RHO_CP = 4.18e6  # 水的体积热容 (J/m³/°C)
+T_MAX_DENSITY = 3.84  # 最大密度对应水温 (°C)
+FLUX_TO_TEMPERATURE = 86400 / RHO_CP  # W/m² → °C·m/d
+
+
+class ReservoirColumn:
+    """
+    批量垂向水柱模型
+    
+    参数：
+    - H: 水深 (m)，标量或每个水柱一个值
+    - nz: 垂向节点数
+    - T_init: 初始水温 (°C)，标量、(nz,) 剖面或 (水柱数, nz)
+    - Kz: 垂向扩散系数 (m²/d)，标量、(nz,) 或 (水柱数, nz)
+    - n_columns: 水柱数（默认由 H、T_init 的形状确定）
+    """
+    
+    def __init__(self, H, nz, T_init=20.0, Kz=0.1, n_columns=None):
+        """初始化水柱"""
+        if nz < 2:
+            raise ValueError("垂向节点数 nz 必须 ≥ 2")
+        H = np.atleast_1d(np.asarray(H, dtype=float))
+        T_init = np.asarray(T_init, dtype=float)
+        shapes = [H.shape, T_init.shape[:-1] if T_init.ndim == 2 else (1,)]
+        if n_columns is not None:
+            shapes.append((int(n_columns),))
+        self.n_columns = np.broadcast_shapes(*shapes)[0]
+        self.nz = nz
+        
+        self.H = np.broadcast_to(H, (self.n_columns,)).copy()
+        self.dz = self.H / (nz - 1)
+        self.z = self.dz[:, None] * np.arange(nz)
+        
+        # 控制体厚度（首末节点为半个网格）
+        self.volume = np.repeat(self.dz[:, None], nz, axis=1)
+        self.volume[:, [0, -1]] *= 0.5
+        self._cumulative_volume = np.cumsum(self.volume, axis=1)
+        
+        self.T = np.broadcast_to(T_init, (self.n_columns, nz)).copy()
+        self.bottom_heat_flux = 0.0  # 库底热通量 (W/m²)，进入水体为正
+        self._solar_heating = None
+        self.set_diffusivity(Kz)
+    
+    def set_diffusivity(self, Kz):
+        """
+        设置垂向扩散系数
+        
+        参数：
+        - Kz: 扩散系数 (m²/d)，标量、(nz,) 或 (水柱数, nz)
+        """
+        self.Kz = np.broadcast_to(np.asarray(Kz, dtype=float), (self.n_columns, self.nz)).copy()
+        # 相邻节点之间的传导系数 (m/d)
+        self._conductance = 0.5 * (self.Kz[:, :-1] + self.Kz[:, 1:]) / self.dz[:, None]
+        self._bands = None
+    
+    def set_light_extinction(self, extinction, surface_fraction=0.4):
+        """
+        设置太阳辐射随深度衰减吸收（Beer 定律）
+        
+        参数：
+        - extinction: 消光系数 (1/m)，None 表示太阳辐射全部在表层吸收
+        - surface_fraction: 在表层直接吸收的长波部分比例
+        """
+        if extinction is None:
+            self._solar_heating = None
+            return
+        edges = np.concatenate([np.zeros((self.n_columns, 1)), self._cumulative_volume], axis=1)
+        penetrating = np.exp(-np.asarray(extinction, dtype=float).reshape(-1, 1) * edges)
+        absorption = (1 - surface_fraction) * (penetrating[:, :-1] - penetrating[:, 1:])
+        absorption[:, 0] += surface_fraction
+        # 到达库底的辐射由底层吸收
+        absorption[:, -1] += (1 - surface_fraction) * penetrating[:, -1]
+        # 单位太阳辐射引起的各节点升温速率 (°C/d per W/m²)
+        self._solar_heating = absorption / self.volume * FLUX_TO_TEMPERATURE
+    
+    @staticmethod
+    def density(T):
+        """
+        水的密度 (kg/m³)，Hostetler 公式
+        
+        ρ = 1000 (1 - 1.9549e-5 |T - 3.84|^1.68)
+        
+        密度只取决于水温与 3.84°C 的距离，距离越大越轻，
+        因此对流混合判断直接比较该距离。
+        
+        参数：
+        - T: 水温 (°C)
+        """
+        return 1000 * (1 - 1.9549e-5 * np.abs(T - T_MAX_DENSITY)**1.68)
+    
+    def _matrix(self, dt):
+        """隐式扩散三对角矩阵的次对角线与主对角线（按时间步长缓存）"""
+        if self._bands is None or abs(self._bands[0] - dt) > 1e-9 * dt:
+            off = np.zeros((self.n_columns, self.nz))
+            off[:, :-1] = -self._conductance
+            diagonal = self.volume / dt
+            diagonal[:, :-1] += self._conductance
+            diagonal[:, 1:] += self._conductance
+            self._bands = (dt, off.ravel()[:-1], diagonal.ravel())
+        return self._bands[1:]
+    
+    def diffuse(self, C, dt, source=0.0, surface_flux=0.0, surface_exchange=0.0,
+                bottom_flux=0.0):
+        """
+        隐式推进一个时间步
+        
+        表层控制体受到通量 surface_flux - surface_exchange * C[0]，
+        即对表层浓度线性化的水面交换（如复氧、热交换）。
+        
+        参数：
+        - C: 浓度/水温 (水柱数, nz)
+        - dt: 时间步长 (d)
+        - source: 体积源项（单位/d），可广播到 (水柱数, nz)
+        - surface_flux: 水面通量常数部分（单位·m/d），进入水体为正
+        - surface_exchange: 水面交换速度 (m/d)，≥0
+        - bottom_flux: 库底通量（单位·m/d），进入水体为正
+        
+        返回：
+        - C_new: 新时间层 (水柱数, nz)
+        """
+        off, diagonal = self._matrix(dt)
+        diagonal = diagonal.copy()
+        diagonal[::self.nz] += surface_exchange
+        
+        rhs = self.volume * (np.asarray(C) / dt + source)
+        rhs[:, 0] += surface_flux
+        rhs[:, -1] += bottom_flux
+        
+        C_new, info = dgtsv(off, diagonal, off, rhs.ravel(), overwrite_d=True, overwrite_b=True)[3:]
+        if info != 0:
+            raise np.linalg.LinAlgError("垂向扩散方程组奇异")
+        return C_new.reshape(self.n_columns, self.nz)
+    
+    def _unstable_layer(self, T):
+        """表层不稳定时返回 (混合层节点数, 自表层累计平均水温)，否则返回 None"""
+        lightness = np.abs(T - T_MAX_DENSITY)
+        if (lightness[:, 0] >= lightness[:, 1]).all():
+            return None
+        mean = np.cumsum(self.volume * T, axis=1) / self._cumulative_volume
+        unstable = np.abs(mean[:, :-1] - T_MAX_DENSITY) < lightness[:, 1:]
+        n_mix = np.where(unstable.all(axis=1), self.nz, unstable.argmin(axis=1) + 1)
+        return n_mix, mean
+    
+    def mixed_layer(self, T=None):
+        """
+        对流混合层节点数
+        
+        自表层向下累计体积平均水温，只要混合层密度大于下方节点
+        （水温更接近最大密度水温）就把该节点并入混合层。
+        
+        参数：
+        - T: 水温 (水柱数, nz)，默认当前水温
+        
+        返回：
+        - n_mix: 每个水柱需要均匀化的表层节点数 (水柱数,)，1 表示稳定
+        """
+        layer = self._unstable_layer(self.T if T is None else T)
+        return np.ones(self.n_columns, dtype=int) if layer is None else layer[0]
+    
+    def _fill(self, C, n_mix, mean):
+        """用累计平均值填充表层 n_mix 个节点"""
+        value = mean[np.arange(self.n_columns), n_mix - 1]
+        return np.where(np.arange(self.nz) < n_mix[:, None], value[:, None], C)
+    
+    def mix(self, C, n_mix):
+        """
+        把表层 n_mix 个节点均匀混合（体积加权，质量守恒）
+        
+        用于让溶解氧等随水温一起对流混合。
+        
+        参数：
+        - C: 浓度/水温 (水柱数, nz)
+        - n_mix: 混合层节点数 (水柱数,)，由 mixed_layer 或 convective_mixing 给出
+        
+        返回：
+        - C_mixed: 混合后的场
+        """
+        if (n_mix == 1).all():
+            return C
+        return self._fill(C, n_mix, np.cumsum(self.volume * C, axis=1) / self._cumulative_volume)
+    
+    def convective_mixing(self, T):
+        """
+        对水温做对流混合
+        
+        参数：
+        - T: 水温 (水柱数, nz)
+        
+        返回：
+        - T_mixed: 混合后的水温
+        - n_mix: 混合层节点数 (水柱数,)
+        """
+        layer = self._unstable_layer(T)
+        if layer is None:
+            return T, np.ones(self.n_columns, dtype=int)
+        return self._fill(T, *layer), layer[0]
+    
+    def heat_step(self, dt, T_air, wind_speed, solar_radiation=0.0, convective=True):
+        """
+        推进一个时间步的水温
+        
+        参数：
+        - dt: 时间步长 (d)
+        - T_air: 气温 (°C)，标量或每个水柱一个值
+        - wind_speed: 风速 (m/s)
+        - solar_radiation: 太阳辐射 (W/m²)
+        - convective: 是否进行对流混合
+        
+        返回：
+        - T: 新的水温 (水柱数, nz)
+        """
+        T_surface = self.T[:, 0]
+        if self._solar_heating is None:
+            Q, dQ_dT = surface_heat_flux(T_surface, T_air, wind_speed, solar_radiation)
+            source = 0.0
+        else:
+            Q, dQ_dT = surface_heat_flux(T_surface, T_air, wind_speed)
+            source = np.reshape(solar_radiation, (-1, 1)) * self._solar_heating
+        
+        T = self.diffuse(self.T, dt, source,
+                         surface_flux=(Q - dQ_dT * T_surface) * FLUX_TO_TEMPERATURE,
+                         surface_exchange=-dQ_dT * FLUX_TO_TEMPERATURE,
+                         bottom_flux=self.bottom_heat_flux * FLUX_TO_TEMPERATURE)
+        if convective:
+            T, _ = self.convective_mixing(T)
+        self.T = T
+        return T
+    
+    def _forcing(self, value, t):
+        """把气象驱动整理为 (时间层数, 水柱数) 数组"""
+        if callable(value):
+            value = [value(tk) for tk in t]
+        value = np.asarray(value, dtype=float)
+        if value.ndim == 1 and value.size not in (1, len(t)):
+            raise ValueError("气象驱动序列长度必须与时间数组一致")
+        if value.ndim == 1:
+            value = value[:, None]
+        return np.broadcast_to(value, (len(t), self.n_columns))
+    
+    def simulate(self, t, T_air, wind_speed, solar_radiation=0.0, convective=True, recorder=None):
+        """
+        按气象驱动模拟水温演变
+        
+        驱动可以是常数、与 t 等长的时间序列、(时间层数, 水柱数) 数组
+        （每个水柱/情景各自的驱动），或函数 f(t)。
+        时间步 n 使用 t[n] 时刻的驱动（隐式）。
+        
+        参数：
+        - t: 时间数组 (d)，如逐时一年 np.arange(0, 365, 1/24)
+        - T_air: 气温 (°C)
+        - wind_speed: 风速 (m/s)
+        - solar_radiation: 太阳辐射 (W/m²)
+        - convective: 是否进行对流混合
+        - recorder: 结果记录器（默认 FullHistory 保存全部时间层）
+        
+        返回：
+        - T: 记录的水温 (记录层数, 水柱数, nz)
+        """
+        t = np.asarray(t, dtype=float)
+        T_air = self._forcing(T_air, t)
+        wind_speed = self._forcing(wind_speed, t)
+        solar_radiation = self._forcing(solar_radiation, t)
+        
+        self.recorder = FullHistory() if recorder is None else recorder
+        self.recorder.allocate(t, (self.n_columns, self.nz))
+        self.recorder.record(0, self.T)
+        for n in range(1, len(t)):
+            self.heat_step(t[n] - t[n-1], T_air[n], wind_speed[n], solar_radiation[n], convective)
+            self.recorder.record(n, self.T)
+        self.recorder.finalize()
+        
+        return self.recorder.data
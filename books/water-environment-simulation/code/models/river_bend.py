@@ -10,6 +10,11 @@ River Bend Water Quality Model
 """
 
 import numpy as np
+from scipy.sparse import diags
+
+from .transport_operators import (StructuredGrid, diffusion_matrix, implicit_propagator,
+                                  march_downstream)
+from .lateral_mixing import locate_sources, pseudo_time_propagator
 
 
 class RiverBend2D:
@@ -155,7 +160,30 @@ class RiverBend2D:
         
         return v
     
-    def solve_with_secondary_flow(self):
+    def secondary_flow_matrix(self):
+        """
+        二次流横向对流算子 -∂(v*C)/∂y（守恒迎风格式）
+        
+        通量取在相邻节点间的界面上、按界面流速方向迎风，两岸界面通量为零，
+        因此断面质量（两岸节点取半格宽度）严格守恒，污染物在二次流
+        辐合的凹岸一侧累积。
+        
+        返回：
+            A: 三对角稀疏矩阵 (ny, ny)
+        """
+        v_face = self.calculate_secondary_flow_velocity(0.5 * (self.y[1:] + self.y[:-1]))
+        v_pos = np.maximum(v_face, 0.0)
+        v_neg = np.minimum(v_face, 0.0)
+        
+        width = np.full(self.ny, self.dy)
+        width[[0, -1]] = 0.5 * self.dy
+        
+        main = (np.append(-v_pos, 0.0) + np.insert(v_neg, 0, 0.0)) / width
+        upper = -v_neg / width[:-1]
+        lower = v_pos / width[1:]
+        return diags([lower, main, upper], [-1, 0, 1], format='csr')
+    
+    def solve_with_secondary_flow(self, method='pseudo_time', verbose=True):
         """
         求解考虑二次流的浓度场
         
@@ -163,59 +191,43 @@ class RiverBend2D:
         1. 使用增强的横向扩散系数
         2. 叠加横向对流效应
         3. 浓度偏向凹岸
-        """
-        print(f"\n求解考虑二次流的浓度场...")
         
-        # 初始化
-        C = np.zeros((self.ny, self.nx))
+        参数：
+            method: 'pseudo_time'（每个断面间做若干伪时间步）或
+                    'marching'（沿程隐式推进，见 LateralMixing2D）
+            verbose: 是否打印求解信息（排放口优化等循环中可关闭）
         
-        # 设置排放源
-        for source in self.sources:
-            ix = np.argmin(np.abs(self.x - source['x']))
-            iy = np.argmin(np.abs(self.y - source['y']))
-            C[iy, ix] = source['C']
+        两种方法的横断面传播矩阵都只构造一次，断面浓度不再变化后
+        直接复制到下游。
+        """
+        if verbose:
+            print(f"\n求解考虑二次流的浓度场...")
         
-        # 从上游向下游逐列求解
-        for i in range(1, self.nx):
-            C_prev = C[:, i-1].copy()
-            
-            # 伪时间步进
+        C0, injections = locate_sources(self.x, self.y, self.sources)
+        v_secondary = self.calculate_secondary_flow_velocity(self.y)
+        
+        if method == 'pseudo_time':
             dt = 0.5 * self.dy**2 / self.Ey_effective
             travel_time = self.dx / self.u
             n_steps = max(int(travel_time / dt), 10)
-            
-            C_new = C_prev.copy()
-            for _ in range(n_steps):
-                C_temp = C_new.copy()
-                
-                # 横向扩散（增强）
-                for j in range(1, self.ny-1):
-                    d2C_dy2 = (C_new[j+1] - 2*C_new[j] + C_new[j-1]) / self.dy**2
-                    C_temp[j] = C_new[j] + dt * self.Ey_effective * d2C_dy2
-                    
-                    # 二次流横向对流（可选）
-                    if j > 0 and j < self.ny - 1:
-                        v_secondary = self.calculate_secondary_flow_velocity(self.y[j])
-                        if v_secondary > 0:  # 向外岸
-                            dC_dy = (C_new[j+1] - C_new[j]) / self.dy
-                        else:  # 向内岸
-                            dC_dy = (C_new[j] - C_new[j-1]) / self.dy
-                        
-                        # 二次流对流项
-                        C_temp[j] -= dt * v_secondary * dC_dy
-                
-                # 边界条件：零通量
-                C_temp[0] = C_temp[1]
-                C_temp[-1] = C_temp[-2]
-                
-                C_new = C_temp
-            
-            C[:, i] = C_new
+            P = pseudo_time_propagator(self.ny, dt * self.Ey_effective / self.dy**2, n_steps,
+                                       courant=dt * v_secondary / self.dy)
+        elif method == 'marching':
+            # u*∂C/∂x = Ey_eff*∂²C/∂y² - ∂(v*C)/∂y
+            grid = StructuredGrid((self.ny,), (self.dy,))
+            A = (diffusion_matrix(grid, self.Ey_effective, boundary='neumann')
+                 + self.secondary_flow_matrix())
+            P = implicit_propagator(A, self.dx / self.u)
+        else:
+            raise ValueError(f"未知求解方法: {method}")
+        
+        C = march_downstream(P, C0, self.nx, injections)
         
         self.C = C
         
-        print(f"求解完成！")
-        print(f"  最大浓度: {np.max(C):.2f} mg/L")
+        if verbose:
+            print(f"求解完成！")
+            print(f"  最大浓度: {np.max(C):.2f} mg/L")
         
         return self.x, self.y, self.C
     
@@ -6,7 +6,8 @@ Stratified Reservoir Temperature and Water Quality Model
 """
 
 import numpy as np
-from scipy.integrate import odeint
+
+from .reservoir_column import ReservoirColumn, FLUX_TO_TEMPERATURE
 
 
 class StratifiedReservoir1D:
@@ -24,8 +25,13 @@ class StratifiedReservoir1D:
     - Q_heat: 热源项 (°C/d)
     - Source: DO产生（光合作用）
     - Sink: DO消耗（呼吸、SOD）
+    
+    时间推进使用 ReservoirColumn 的隐式三对角扩散，
+    表层以松弛时间 surface_relaxation 趋向给定的表层值。
     """
     
+    surface_relaxation = 0.1  # 表层松弛时间 (d)
+    
     def __init__(self, H, nz, T_init=None, DO_init=None):
         """
         初始化分层水库模型
@@ -105,46 +111,67 @@ class StratifiedReservoir1D:
         
         return z_thermocline, dT_dz_max
     
-    def solve_temperature_1d(self, t_span, T_surface=None, Q_bottom=0):
+    def _column(self):
+        """当前参数对应的垂向水柱"""
+        return ReservoirColumn(self.H, self.nz, T_init=self.T, Kz=self.Kz)
+    
+    @staticmethod
+    def _march(C0, t_span, advance, max_dt):
+        """
+        按输出时刻推进，每个输出间隔内再细分为不超过 max_dt 的子步
+        
+        参数：
+        - C0: 初始场 (nz,)
+        - t_span: 输出时刻 (d)
+        - advance: 单步推进函数 advance(C, t_new, dt)，C 形状为 (1, nz)
+        - max_dt: 最大子步长 (d)
+        
+        返回：
+        - C: (nt, nz)
+        """
+        result = np.zeros((len(t_span), len(C0)))
+        result[0] = C0
+        C = np.asarray(C0, dtype=float)[None, :]
+        for n in range(1, len(t_span)):
+            n_sub = max(int(np.ceil((t_span[n] - t_span[n-1]) / max_dt - 1e-9)), 1)
+            dt = (t_span[n] - t_span[n-1]) / n_sub
+            for k in range(1, n_sub + 1):
+                C = advance(C, t_span[n-1] + k * dt, dt)
+            result[n] = C[0]
+        return result
+    
+    def solve_temperature_1d(self, t_span, T_surface=None, Q_bottom=0, max_dt=1/24):
         """
         求解1D垂向温度扩散
         
         参数：
         - t_span: 时间数组 (d)
         - T_surface: 表层温度函数 T(t) 或常数
-        - Q_bottom: 底层热通量 (W/m²)
+        - Q_bottom: 底层热通量 (W/m²)，进入水体为正
+        - max_dt: 最大时间子步长 (d)，默认1小时
         
         返回：
         - t: 时间数组
         - T: 温度场 (nz, nt)
         """
         if T_surface is None:
-            T_surface = lambda t: self.T[0]
+            T_surf_const = self.T[0]
+            T_surface = lambda t: T_surf_const
         elif np.isscalar(T_surface):
             T_surf_const = T_surface
             T_surface = lambda t: T_surf_const
         
-        def dT_dt(T, t):
-            dT = np.zeros_like(T)
+        column = self._column()
+        exchange = column.volume[0, 0] / self.surface_relaxation  # m/d
             
-            # 内部节点：扩散
-            for i in range(1, self.nz-1):
-                Kz_up = (self.Kz[i] + self.Kz[i-1]) / 2
-                Kz_down = (self.Kz[i] + self.Kz[i+1]) / 2
+        def advance(T, t, dt):
+            T = column.diffuse(T, dt, surface_flux=exchange * T_surface(t),
+                               surface_exchange=exchange,
+                               bottom_flux=Q_bottom * FLUX_TO_TEMPERATURE)
+            # 表层冷却形成的不稳定分层立即对流混合
+            return column.convective_mixing(T)[0]
                 
-                d2T_dz2 = (Kz_down * (T[i+1] - T[i]) - Kz_up * (T[i] - T[i-1])) / self.dz**2
-                dT[i] = d2T_dz2
-            
-            # 边界：表层固定温度
-            dT[0] = (T_surface(t) - T[0]) / 0.1  # 松弛到表层温度
-            
-            # 边界：底层零通量或固定通量
-            dT[-1] = dT[-2]  # 零梯度
-            
-            return dT
-        
-        # 求解
-        T_result = odeint(dT_dt, self.T, t_span)
+        T_result = self._march(self.T, t_span, advance, max_dt)
         
         self.T = T_result[-1, :]  # 更新为最终状态
         
@@ -155,7 +182,7 @@ class StratifiedReservoir1D:
         
         return t_span, T_result.T
     
-    def solve_do_1d(self, t_span, DO_surface=None, photosynthesis=True):
+    def solve_do_1d(self, t_span, DO_surface=None, photosynthesis=True, max_dt=1/24):
         """
         求解1D垂向DO分布
         
@@ -163,6 +190,7 @@ class StratifiedReservoir1D:
         - t_span: 时间数组 (d)
         - DO_surface: 表层DO (mg/L)，None则为饱和
         - photosynthesis: 是否考虑光合作用
+        - max_dt: 最大时间子步长 (d)，默认1小时
         
         返回：
         - t: 时间数组
@@ -175,43 +203,23 @@ class StratifiedReservoir1D:
         if DO_surface is None:
             DO_surface = calculate_DO_saturation(self.T[0])
         
-        def dDO_dt(DO, t):
-            dDO = np.zeros_like(DO)
+        # 反应项：透光层（10m）光合作用，随深度指数衰减；全水柱呼吸消耗
+        respiration = 0.5  # mg/L/d
+        reaction = -respiration * np.ones(self.nz)
+        if photosynthesis:
+            euphotic = self.z < 10
+            reaction[euphotic] += 2.0 * np.exp(-0.3 * self.z[euphotic])  # mg/L/d
             
-            # 内部节点：扩散 + 反应
-            for i in range(1, self.nz-1):
-                Kz_up = (self.Kz[i] + self.Kz[i-1]) / 2
-                Kz_down = (self.Kz[i] + self.Kz[i+1]) / 2
-                
-                # 扩散项
-                d2DO_dz2 = (Kz_down * (DO[i+1] - DO[i]) - Kz_up * (DO[i] - DO[i-1])) / self.dz**2
-                
-                # 反应项
-                reaction = 0
+        column = self._column()
+        exchange = column.volume[0, 0] / self.surface_relaxation  # m/d
                 
-                # 光合作用（仅表层光照区）
-                if photosynthesis and self.z[i] < 10:  # 透光层10m
-                    light_factor = np.exp(-0.3 * self.z[i])  # 光衰减
-                    photosynthesis_rate = 2.0 * light_factor  # mg/L/d
-                    reaction += photosynthesis_rate
+        def advance(DO, t, dt):
+            DO = column.diffuse(DO, dt, reaction, surface_flux=exchange * DO_surface,
+                                surface_exchange=exchange,
+                                bottom_flux=-self.SOD)  # 底泥耗氧 g/m²/d
+            return np.maximum(DO, 0.0)
                 
-                # 呼吸消耗
-                respiration = 0.5  # mg/L/d
-                reaction -= respiration
-                
-                dDO[i] = d2DO_dz2 + reaction
-            
-            # 边界：表层DO
-            dDO[0] = (DO_surface - DO[0]) / 0.1
-            
-            # 边界：底层SOD
-            SOD_flux = self.SOD / self.dz  # mg/L/d
-            dDO[-1] = dDO[-2] - SOD_flux
-            
-            return dDO
-        
-        # 求解
-        DO_result = odeint(dDO_dt, self.DO, t_span)
+        DO_result = self._march(self.DO, t_span, advance, max_dt)
         
         self.DO = DO_result[-1, :]  # 更新
         
@@ -100,47 +100,46 @@ class ThermalPlume2D:
         print(f"  温升: {T_discharge - self.T_ambient}°C")
         print(f"  热排放量: {self.Q_thermal:.2f} MW")
     
-    def solve_steady_state(self):
+    def solve_steady_state(self, verbose=True):
         """
         求解稳态温度场
         
         使用解析解（简化羽流模型）
+        
+        参数：
+            verbose: 是否打印求解信息（排放口优化等循环中可关闭）
         """
-        print("\n求解稳态温度场...")
+        if verbose:
+            print("\n求解稳态温度场...")
         
         # 初始化温度场
         T = np.ones((self.ny, self.nx)) * self.T_ambient
         
-        # 找到源点位置
-        ix = np.argmin(np.abs(self.x - self.source_x))
-        iy = np.argmin(np.abs(self.y - self.source_y))
-        
-        # 简化解析解（高斯羽流模型）
-        for i in range(self.nx):
-            for j in range(self.ny):
-                x_dist = self.x[i] - self.source_x
-                y_dist = self.y[j] - self.source_y
-                
-                if x_dist > 0:
-                    # 纵向扩散宽度
-                    sigma_y = np.sqrt(2 * self.Ky * x_dist / self.u)
-                    
-                    # 高斯分布
-                    if sigma_y > 0:
-                        gauss_factor = np.exp(-y_dist**2 / (2 * sigma_y**2))
-                        
-                        # 考虑表面热交换的衰减
-                        decay_factor = np.exp(-self.lambda_s * x_dist / self.u)
-                        
-                        # 温升
-                        delta_T = (self.T_discharge - self.T_ambient) * gauss_factor * decay_factor
-                        T[j, i] = self.T_ambient + delta_T
+        # 简化解析解（高斯羽流模型），只计算源点下游的断面
+        x_dist = self.x - self.source_x
+        y_dist = self.y - self.source_y
+        
+        # 纵向扩散宽度
+        sigma_y = np.sqrt(2 * self.Ky * np.maximum(x_dist, 0) / self.u)
+        downstream = (x_dist > 0) & (sigma_y > 0)
+        x_dist, sigma_y = x_dist[downstream], sigma_y[downstream]
+        
+        # 高斯分布
+        gauss_factor = np.exp(-y_dist[:, None]**2 / (2 * sigma_y**2))
+        
+        # 考虑表面热交换的衰减
+        decay_factor = np.exp(-self.lambda_s * x_dist / self.u)
+        
+        # 温升
+        delta_T = (self.T_discharge - self.T_ambient) * gauss_factor * decay_factor
+        T[:, downstream] = self.T_ambient + delta_T
         
         self.T = T
         
-        print(f"求解完成！")
-        print(f"  最高温度: {np.max(T):.2f}°C")
-        print(f"  最大温升: {np.max(T) - self.T_ambient:.2f}°C")
+        if verbose:
+            print(f"求解完成！")
+            print(f"  最高温度: {np.max(T):.2f}°C")
+            print(f"  最大温升: {np.max(T) - self.T_ambient:.2f}°C")
         
         return self.x, self.y, self.T
     
@@ -218,25 +217,13 @@ class ThermalPlume2D:
         return impact_area, max_delta_T
 
 
-def calculate_surface_heat_exchange(T_water, T_air, wind_speed, solar_radiation=0):
+def _surface_heat_loss(T_water, T_air, wind_speed):
     """
-    计算水面热交换系数
+    水面散热各分量（可批量）
     
-    水面热交换包括：
-    1. 蒸发散热
-    2. 对流散热
-    3. 辐射散热
-    4. 太阳辐射加热
-    
-    参数：
-        T_water: 水温 (°C)
-        T_air: 气温 (°C)
-        wind_speed: 风速 (m/s)
-        solar_radiation: 太阳辐射 (W/m²)
-        
     返回：
-        lambda_s: 表面热交换系数 (1/day)
-        Q_net: 净热通量 (W/m²)
+        Q_evap, Q_conv, Q_rad: 蒸发、对流、辐射散热 (W/m²)
+        dQ_dT: 总散热对水温的导数 (W/m²/°C)
     """
     # 蒸发散热系数（经验公式）
     # He = f(u) * (es - ea)
@@ -252,12 +239,62 @@ def calculate_surface_heat_exchange(T_water, T_air, wind_speed, solar_radiation=
     
     # 对流散热（简化）
     # Hc ≈ 4.5 * (1 + 0.2*u) * (Tw - Ta)
-    Q_conv = 4.5 * (1 + 0.2 * wind_speed) * (T_water - T_air)
+    h_conv = 4.5 * (1 + 0.2 * wind_speed)
+    Q_conv = h_conv * (T_water - T_air)
     
     # 辐射散热（简化）
     # Hr ≈ 5.5 * (Tw - Ta)
     Q_rad = 5.5 * (T_water - T_air)
     
+    des_dT = es * 17.27 * 237.3 / (T_water + 237.3)**2
+    dQ_dT = f_u * des_dT / 1000 + h_conv + 5.5
+    
+    return Q_evap, Q_conv, Q_rad, dQ_dT
+
+
+def surface_heat_flux(T_water, T_air, wind_speed, solar_radiation=0):
+    """
+    计算水面净热通量（不输出信息，参数可以是数组）
+    
+    与 calculate_surface_heat_exchange 使用相同的经验公式，
+    供分层水柱等瞬态模型逐时间步批量调用。
+    
+    参数：
+        T_water: 水温 (°C)
+        T_air: 气温 (°C)
+        wind_speed: 风速 (m/s)
+        solar_radiation: 太阳辐射 (W/m²)
+        
+    返回：
+        Q_net: 净热通量 (W/m²)，进入水体为正
+        dQ_dT: 净热通量对水温的导数 (W/m²/°C，≤0)，用于隐式线性化
+    """
+    Q_evap, Q_conv, Q_rad, dQ_dT = _surface_heat_loss(T_water, T_air, wind_speed)
+    return solar_radiation - (Q_evap + Q_conv + Q_rad), -dQ_dT
+
+
+def calculate_surface_heat_exchange(T_water, T_air, wind_speed, solar_radiation=0):
+    """
+    计算水面热交换系数
+    
+    水面热交换包括：
+    1. 蒸发散热
+    2. 对流散热
+    3. 辐射散热
+    4. 太阳辐射加热
+    
+    参数：
+        T_water: 水温 (°C)
+        T_air: 气温 (°C)
+        wind_speed: 风速 (m/s)
+        solar_radiation: 太阳辐射 (W/m²)
+        
+    返回：
+        lambda_s: 表面热交换系数 (1/day)
+        Q_net: 净热通量 (W/m²)
+    """
+    Q_evap, Q_conv, Q_rad, _ = _surface_heat_loss(T_water, T_air, wind_speed)
+    
     # 净热通量
     Q_net = -(Q_evap + Q_conv + Q_rad) + solar_radiation
     
@@ -0,0 +1,172 @@
+"""
+测试流域非点源连续模拟
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.continuous_nps import ContinuousNPS, scs_runoff
+from models.nonpoint_source import SCSCurveNumber, EventMeanConcentration, amc_curve_numbers
+
+
+def random_rain(T, N, seed=0):
+    """间歇性随机降雨序列 (mm/h)"""
+    rng = np.random.default_rng(seed)
+    return np.where(rng.random((T, N)) < 0.1, rng.gamma(0.8, 8.0, (T, N)), 0.0)
+
+
+def reference_runoff(rain, CN, interevent=6, thresholds=(35.6, 53.3)):
+    """逐时段推进的单子流域产流（对照）"""
+    S_amc = 25400.0 / np.array(amc_curve_numbers(CN)) - 254.0
+    q = np.zeros(len(rain))
+    dry, P, S = np.inf, 0.0, S_amc[1]
+    for t, r in enumerate(rain):
+        P5 = rain[max(t - 120, 0):t].sum()
+        if r > 0:
+            if dry >= interevent:
+                P = 0.0
+                S = S_amc[0] if P5 < thresholds[0] else S_amc[2] if P5 > thresholds[1] else S_amc[1]
+            dry = 0
+        else:
+            dry += 1
+        q[t] = scs_runoff(P + r, S) - scs_runoff(P, S)
+        P += r
+    return q
+
+
+class TestRunoff:
+    """测试连续产流"""
+    
+    def test_single_event_matches_scs_emc(self):
+        """测试单场降雨（AMC-II）径流量和EMC负荷与原有模型一致"""
+        model = ContinuousNPS([2.0, 5.0], [75, 85], amc_thresholds=(-1.0, np.inf))
+        model.set_emc('TN', [2.5, 4.0])
+        rain = np.zeros(48)
+        rain[5:10] = [5, 10, 20, 8, 2]
+        rain[13] = 3.0  # 间隔不足6小时，仍属同一场
+        V, loads = model.simulate(rain, routed=False)
+        
+        for c, (CN, area, emc) in enumerate(((75, 2.0, 2.5), (85, 5.0, 4.0))):
+            V_event = SCSCurveNumber(CN, area).calculate_runoff_volume(48.0)
+            assert V[:, c].sum() == pytest.approx(V_event)
+            assert loads['TN'][:, c].sum() == pytest.approx(
+                EventMeanConcentration({'TN': emc}).calculate_load(V_event)['TN'])
+    
+    def test_antecedent_moisture(self):
+        """测试场次划分与前期湿度条件与逐时段推进一致"""
+        rain = random_rain(2000, 4)
+        rain[300:340] = 6.0  # 持续降雨使后续场次进入 AMC-III
+        CN = [60.0, 70.0, 80.0, 90.0]
+        model = ContinuousNPS(np.ones(4), CN)
+        q = model.runoff(rain)
+        
+        for c in range(4):
+            assert np.allclose(q[:, c], reference_runoff(rain[:, c], CN[c]), atol=1e-12)
+        assert np.all(q >= -1e-12)
+        assert np.all(q.sum(axis=0) <= rain.sum(axis=0))
+    
+    def test_continuation(self):
+        """测试分段连续调用与一次计算一致（状态延续）"""
+        rain = random_rain(2000, 5, seed=1)
+        # 汇流时河道中的在途水量和负荷在下一段到达（含短于 lag 的分段）
+        splits = {False: range(0, 2000, 333),
+                  True: [0, 333, 336, 338, 666, 1000, 1500, 1999]}
+        for routed, starts in splits.items():
+            models = []
+            for _ in range(2):
+                model = ContinuousNPS(np.full(5, 3.0), [60, 70, 80, 90, 75],
+                                      downstream=[1, 2, -1, 2, 1], lag=[5, 3, 0, 4, 2],
+                                      decay=0.3)
+                model.set_emc('TN', 2.0)
+                model.set_buildup('TSS', 50.0, 0.4, 0.2, 1.2)
+                models.append(model)
+            V, loads = models[0].simulate(rain, routed=routed)
+            bounds = list(starts) + [2000]
+            parts = [models[1].simulate(rain[s:e], routed=routed)
+                     for s, e in zip(bounds[:-1], bounds[1:])]
+            
+            assert np.allclose(V, np.concatenate([p[0] for p in parts]))
+            for name in ('TN', 'TSS'):
+                assert np.allclose(loads[name], np.concatenate([p[1][name] for p in parts]))
+
+
+class TestBuildupWashoff:
+    """测试累积-冲刷"""
+    
+    def test_mass_balance(self):
+        """测试累积-冲刷与逐时段推进一致，无雨时累积量趋于上限"""
+        model = ContinuousNPS([1.0, 2.0], [80, 90])
+        model.set_buildup('TSS', [40.0, 60.0], 0.5, 0.2, 1.5, B_init=10.0)
+        
+        dry = np.zeros((24 * 30, 2))
+        _, loads = model.simulate(dry, routed=False)
+        B_dry = model.buildup['TSS']['B']
+        assert np.all(loads['TSS'] == 0)
+        expected = np.array([40.0, 60.0]) - (np.array([40.0, 60.0]) - 10.0) * np.exp(-0.5 * 30)
+        assert np.allclose(B_dry, expected)
+        
+        storm = np.zeros((24, 2))
+        storm[:6] = 15.0
+        q = ContinuousNPS([1.0, 2.0], [80, 90]).runoff(np.vstack([dry, storm]))[-24:]
+        _, loads = model.simulate(storm, routed=False)
+        
+        # 逐时段对照
+        B = B_dry.copy()
+        washed = np.zeros(2)
+        for t in range(24):
+            B = np.array([40.0, 60.0]) - (np.array([40.0, 60.0]) - B) * np.exp(-0.5 / 24)
+            W = B * (1 - np.exp(-0.2 * q[t]**1.5))
+            washed += W
+            B -= W
+        assert np.allclose(loads['TSS'].sum(axis=0), washed * np.array([100.0, 200.0]))
+        assert np.allclose(model.buildup['TSS']['B'], B)
+        assert np.all(washed > 0.5 * B_dry)
+
+
+class TestRouting:
+    """测试河网汇流"""
+    
+    def test_chain(self):
+        """测试串联河网的滞后与衰减"""
+        model = ContinuousNPS(np.ones(3), 80, downstream=[-1, 0, 1], lag=[0, 2, 3], decay=0.5)
+        local = np.zeros((20, 3))
+        local[0] = [1.0, 2.0, 4.0]
+        routed = model.route(local)
+        
+        a1, a2 = np.exp(-0.5 * 2 / 24), np.exp(-0.5 * 3 / 24)
+        assert routed[0, 0] == 1.0
+        assert routed[2, 0] == pytest.approx(2.0 * a1)
+        assert routed[3, 1] == pytest.approx(4.0 * a2)
+        assert routed[5, 0] == pytest.approx(4.0 * a2 * a1)
+        assert model.route(local, conservative=True)[:, 0].sum() == pytest.approx(7.0)
+    
+    def test_basin_volume(self):
+        """测试树状河网出口径流量等于全流域产流量"""
+        N = 31
+        downstream = np.array([-1] + [(i - 1) // 2 for i in range(1, N)])
+        rng = np.random.default_rng(2)
+        model = ContinuousNPS(rng.uniform(1, 10, N), rng.uniform(60, 90, N), downstream,
+                              lag=rng.integers(0, 4, N), decay=0.3)
+        model.set_emc('TP', 0.4)
+        rain = random_rain(500, N, seed=3)
+        rain[-50:] = 0.0
+        V_local, _ = ContinuousNPS(model.area, model.CN).simulate(rain, routed=False)
+        V, loads = model.simulate(rain)
+        
+        assert V[:, 0].sum() == pytest.approx(V_local.sum())
+        assert loads['TP'][:, 0].sum() < 0.4e-6 * V_local.sum()
+    
+    def test_invalid(self):
+        """测试无效河网"""
+        with pytest.raises(ValueError):
+            ContinuousNPS(np.ones(3), 80, downstream=[1, 2, 0])
+        with pytest.raises(ValueError):
+            ContinuousNPS(np.ones(3), 80, downstream=[-1, 0, 5])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
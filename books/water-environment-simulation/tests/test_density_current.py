@@ -33,6 +33,12 @@ class TestDensityCurrent2D:
         assert C_field.shape == (25, 100)
         assert np.max(C_field) > 0
     
+    def test_simulate_underflow_quiet(self, capsys):
+        model = DensityCurrent2D(L=1000, H=50, nx=100, nz=25)
+        capsys.readouterr()
+        model.simulate_underflow(C_source=10, x_source=5, dt=10, n_steps=10, verbose=False)
+        assert capsys.readouterr().out == ''
+    
     def test_assess_intake_risk(self):
         model = DensityCurrent2D(L=1000, H=50, nx=100, nz=25)
         model.C[20, 50] = 1.0
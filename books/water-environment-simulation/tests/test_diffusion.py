@@ -92,6 +92,34 @@ class TestDiffusion1D:
         # 质量应该守恒（Neumann边界）
         assert abs(mass_final - mass_initial) / mass_initial < 0.01  # 1%误差
     
+    def test_explicit_neumann_stencil(self):
+        """测试显式Neumann边界与逐点差分格式（边界复制相邻值）一致"""
+        model = Diffusion1D(L=10.0, T=5.0, nx=40, nt=50, D=0.05)
+        model.set_initial_condition(lambda x: np.exp(-((x-1.0)/0.5)**2))
+        model.set_boundary_conditions('neumann')
+        C = model.solve_explicit()
+        
+        expected = C[0].copy()
+        for n in range(model.nt - 1):
+            expected[1:-1] = expected[1:-1] + model.Fo * (
+                expected[2:] - 2*expected[1:-1] + expected[:-2])
+            expected[0] = expected[1]
+            expected[-1] = expected[-2]
+        
+        np.testing.assert_allclose(C[-1], expected, rtol=1e-12, atol=1e-15)
+    
+    def test_mass_conservation_implicit(self):
+        """测试隐式和C-N格式在Neumann边界下质量守恒（梯形积分）"""
+        model = Diffusion1D(L=10.0, T=50.0, nx=100, nt=50, D=0.05)
+        model.set_initial_condition(lambda x: np.exp(-((x-1.0)/0.5)**2))
+        model.set_boundary_conditions('neumann')
+        w = np.full(model.nx, model.dx)
+        w[[0, -1]] *= 0.5
+        
+        for solve in (model.solve_implicit, model.solve_crank_nicolson):
+            C = solve()
+            assert w @ C[-1] == pytest.approx(w @ C[0], rel=1e-10)
+    
     def test_crank_nicolson_accuracy(self):
         """测试Crank-Nicolson格式精度"""
         model = Diffusion1D(L=10.0, T=10.0, nx=100, nt=1000, D=0.01)
@@ -0,0 +1,166 @@
+"""
+测试多组分反应动力学引擎
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.kinetics import (KineticNetwork, FirstOrder, Power, Monod, Inhibition, Logistic,
+                             Liebig, ReactiveTransport)
+from models.transport_operators import (StructuredGrid, advection_matrix, diffusion_matrix,
+                                        reaction_matrix, ThetaScheme)
+from models.recorders import ProbeRecorder
+from models.nutrients import NitrogenCycle
+from models.algae_dynamics import AlgaeGrowthModel
+from models.lake_regime_shift import LakeRegimeShiftModel
+
+
+def finite_difference_jacobian(net, C, eps=1e-6):
+    """差分雅可比（对照）"""
+    J = np.zeros((C.shape[1], net.n_species, net.n_species))
+    for b in range(net.n_species):
+        Cp = C.copy()
+        Cp[b] += eps
+        J[:, :, b] = ((net.rhs(Cp) - net.rhs(C)) / eps).T
+    return J
+
+
+class TestKineticNetwork:
+    """测试反应网络"""
+    
+    def test_analytic_jacobian(self):
+        """测试各类因子的解析雅可比与差分一致"""
+        net = KineticNetwork(['A', 'B', 'C'])
+        net.add_reaction('r1', {'A': -1, 'B': 2}, 0.3, [Power('A', 1.5), Inhibition('C', 2.0)])
+        net.add_reaction('r2', {'B': -1, 'C': 1}, np.linspace(0.1, 1.0, 6),
+                         [Monod('B', 3.0), Logistic('C', 50.0)])
+        net.add_reaction('r3', {'C': -1, 'A': 0.5}, 0.05, [FirstOrder('C'), FirstOrder('A')])
+        net.add_reaction('r4', {'A': -0.2}, 0.7, [Liebig(Monod('B', 1.0), Monod('C', 4.0))])
+        net.add_reaction('source', {'B': 1}, 0.01)
+        C = np.random.default_rng(0).uniform(0.5, 10.0, (3, 6))
+        
+        assert net.stoichiometry.shape == (3, 5)
+        assert np.allclose(net.jacobian(C), finite_difference_jacobian(net, C), atol=1e-5)
+    
+    def test_first_order_chain(self):
+        """测试一级串联反应 A→B→ 的解析解"""
+        net = KineticNetwork(['A', 'B'])
+        net.add_reaction('a', {'A': -1, 'B': 1}, 0.5, [FirstOrder('A')])
+        net.add_reaction('b', {'B': -1}, 0.2, [FirstOrder('B')])
+        t = np.linspace(0, 10, 21)
+        A = np.exp(-0.5 * t)
+        B = 0.5 / (0.2 - 0.5) * (np.exp(-0.5 * t) - np.exp(-0.2 * t))
+        
+        for method, tol in (('bdf', 1e-5), ('lsoda', 1e-5), ('ros2', 1e-2)):
+            C = net.integrate([1.0, 0.0], t, method=method)
+            assert C.shape == (21, 2)
+            assert np.allclose(C[:, 0], A, atol=tol)
+            assert np.allclose(C[:, 1], B, atol=tol)
+    
+    @pytest.mark.parametrize('method', ['bdf', 'ros2'])
+    def test_batch_matches_single(self, method):
+        """测试多单元批量积分与逐个水体求解一致（各单元DO不同）"""
+        DO = np.array([0.5, 2.0, 5.0, 8.0])
+        batch = NitrogenCycle(1.0, 0.5, 0.3, 0.2, 0.1, 0.15, T=30.0, nt=61)
+        batch.set_do(DO)
+        C0 = np.tile([[1.0], [0.5], [0.3]], (1, len(DO)))
+        C = batch.network().integrate(C0, batch.t, method=method, rtol=1e-6, atol=1e-9)
+        
+        for c, do in enumerate(DO):
+            single = NitrogenCycle(1.0, 0.5, 0.3, 0.2, 0.1, 0.15, T=30.0, nt=61)
+            single.set_do(do)
+            NH4, NO3, OrgN, _ = single.solve()
+            assert np.allclose(C[:, 0, c], NH4, atol=1e-4)
+            assert np.allclose(C[:, 1, c], NO3, atol=1e-4)
+    
+    def test_stiff_ros2(self):
+        """测试刚性系统（快慢反应相差10⁶）ROS2大步长稳定"""
+        net = KineticNetwork(['A', 'B'])
+        net.add_reaction('fast', {'A': -1, 'B': 1}, 1e5, [FirstOrder('A')])
+        net.add_reaction('back', {'A': 1, 'B': -1}, 1e5, [FirstOrder('B')])
+        net.add_reaction('decay', {'B': -1}, 0.1, [FirstOrder('B')])
+        C = net.step(np.array([[1.0], [0.0]]), 0.0, 10.0)
+        
+        # 快反应达到平衡后，总量以 0.05 的速率衰减
+        assert C[0, 0] == pytest.approx(C[1, 0], rel=1e-3)
+        assert C.sum() == pytest.approx(np.exp(-0.05 * 10.0), rel=1e-2)
+    
+    def test_model_networks(self):
+        """测试模型给出的反应网络与原动力学方程一致"""
+        algae = AlgaeGrowthModel()
+        net = algae.network(I=150, T=22)
+        state = np.array([20.0, 300.0, 3.0, 7.0])
+        assert np.allclose(net.rhs(state[:, None])[:, 0], algae.dynamics(state, 0.0, 150, 22))
+        
+        lake = LakeRegimeShiftModel(0.8)
+        state = np.array([40.0, 30.0])
+        assert np.allclose(lake.network().rhs(state[:, None])[:, 0],
+                           lake.dynamics(state, 0.0, 0.8))
+    
+    def test_invalid(self):
+        """测试无效定义"""
+        net = KineticNetwork(['A'])
+        with pytest.raises(ValueError):
+            net.add_reaction('r', {'X': 1}, 1.0)
+        with pytest.raises(ValueError):
+            net.add_reaction('r', {'A': -1}, 1.0, [FirstOrder('X')])
+        with pytest.raises(ValueError):
+            net.integrate([1.0], [0.0, 1.0], method='euler')
+        with pytest.raises(ValueError):
+            KineticNetwork(['A', 'A'])
+
+
+class TestReactiveTransport:
+    """测试反应-输运算子分裂"""
+    
+    def test_matches_linear_operator(self):
+        """测试线性反应时分裂解与整体θ法解一致"""
+        nx, dx, dt, u, D = 101, 1.0, 0.5, 0.5, 0.5
+        grid = StructuredGrid((nx,), (dx,))
+        transport = advection_matrix(grid, u) + diffusion_matrix(grid, D)
+        outflow = [grid.boundary(0, -1)]
+        
+        net = KineticNetwork(['BOD', 'DO'])
+        net.add_reaction('decay', {'BOD': -1, 'DO': -1}, 0.05, [FirstOrder('BOD')])
+        split = ReactiveTransport(net, ThetaScheme(transport, dt, 0.5, fixed=[0],
+                                                   zero_gradient=outflow),
+                                  nonnegative=False)
+        x = np.arange(nx) * dx
+        C0 = np.vstack([10 * np.exp(-(x - 20)**2 / 20), np.full(nx, 8.0)])
+        recorder = ProbeRecorder({'BOD_50': (0, 50)})
+        C = split.run(C0, 81, values={'BOD': [0.0], 'DO': [8.0]}, recorder=recorder)
+        
+        bod = ThetaScheme(transport + reaction_matrix(grid, 0.05), dt, 0.5, fixed=[0],
+                          zero_gradient=outflow)
+        B = C0[0].copy()
+        for _ in range(80):
+            B = bod.step(B, values=[0.0])
+        
+        assert np.allclose(C[0], B, atol=2e-3)
+        assert recorder.data['BOD_50'][-1] == pytest.approx(C[0, 50])
+        # 耗氧量等于BOD降解量
+        assert np.all(C[1] <= 8.0 + 1e-9)
+    
+    def test_untransported_species(self):
+        """测试不参与输运的组分（如沉水植物）保持原位"""
+        grid = StructuredGrid((10, 10), (10.0, 10.0))
+        walls = [grid.boundary(a, s) for a in (0, 1) for s in (0, -1)]
+        scheme = ThetaScheme(diffusion_matrix(grid, 5.0), 1.0, 1.0, zero_gradient=walls)
+        net = AlgaeGrowthModel().network()
+        C0 = np.tile([[5.0], [500.0], [50.0], [8.0]], (1, grid.size))
+        C0[0, :50] = 0.0
+        split = ReactiveTransport(net, scheme, transported=['N', 'P', 'DO'])
+        C = split.run(C0, 11)
+        
+        assert np.all(C[0, :50] == 0.0)
+        assert np.all(C[0, 50:] > 5.0)
+        # 藻类生长消耗营养盐，无藻的上半区氮浓度更高
+        assert C[1, :50].mean() > C[1, 50:].mean()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -292,6 +292,43 @@ class TestPhysicalBehavior:
         # 允许较大误差（由于数值扩散和边界效应）
         assert abs(C_avg - C_theory) < C_theory * 0.5
     
+    def test_marching_gaussian(self):
+        """测试沿程隐式推进与无界高斯解一致，断面质量守恒"""
+        model = LateralMixing2D(L=5000, B=200, nx=200, ny=81, u=0.5, Ex=0.01, Ey=0.5)
+        model.add_source(x=0, y=100, Q_discharge=1.0, C_discharge=100.0, Q_river=100.0)
+        x, y, C = model.solve_steady_state(method='marching')
+        
+        w = np.full(81, model.dy)
+        w[[0, -1]] *= 0.5
+        mass = w @ C
+        assert np.allclose(mass, mass[0])
+        
+        ix = 20
+        sigma = np.sqrt(2 * model.Ey * x[ix] / model.u)
+        C_theory = mass[0] / (np.sqrt(2 * np.pi) * sigma) * np.exp(-(y - 100)**2 / (2 * sigma**2))
+        assert np.max(np.abs(C[:, ix] - C_theory)) < 0.05 * C_theory.max()
+    
+    def test_downstream_source(self):
+        """测试下游排放口在其断面注入"""
+        model = LateralMixing2D(L=1000, B=100, nx=51, ny=21, u=0.5, Ex=0.01, Ey=0.2)
+        model.add_source(x=500, y=0, Q_discharge=2.0, C_discharge=100.0, Q_river=100.0)
+        
+        for method in ('explicit', 'marching'):
+            x, y, C = model.solve_steady_state(method=method)
+            assert np.all(C[:, :25] == 0)
+            assert C[0, 25] > 0
+            assert np.all(C[:, -1] > 0)
+    
+    def test_solve_steady_state_quiet(self, capsys):
+        """测试 verbose=False 时不打印求解信息"""
+        model = LateralMixing2D(L=1000, B=100, nx=51, ny=21, u=0.5, Ex=0.01, Ey=0.2)
+        model.add_source(x=0, y=50, Q_discharge=2.0, C_discharge=100.0, Q_river=100.0)
+        capsys.readouterr()
+        
+        for method in ('explicit', 'implicit', 'marching'):
+            model.solve_steady_state(method=method, verbose=False)
+        assert capsys.readouterr().out == ''
+    
     def test_higher_Ey_faster_mixing(self):
         """测试更大的Ey导致更快混合"""
         # 低Ey
@@ -0,0 +1,139 @@
+"""
+测试结果记录器
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.recorders import FullHistory, KeepLast, ProbeRecorder, MemmapRecorder, RecorderGroup
+from models.diffusion import Diffusion1D, Diffusion2D
+from models.advection_diffusion import AdvectionDiffusion1D
+
+
+def gaussian(x):
+    """高斯初始分布"""
+    return np.exp(-(x - 5.0)**2)
+
+
+class TestRecorders:
+    """测试各记录器与默认全历史结果一致"""
+    
+    def setup_method(self):
+        """参考解（默认 FullHistory）"""
+        model = Diffusion1D(L=10.0, T=20.0, nx=51, nt=201, D=0.05)
+        model.set_initial_condition(gaussian)
+        self.reference = model.solve_implicit().copy()
+    
+    def run(self, recorder):
+        """用指定记录器求解"""
+        model = Diffusion1D(L=10.0, T=20.0, nx=51, nt=201, D=0.05, recorder=recorder)
+        model.set_initial_condition(gaussian)
+        model.solve_implicit()
+        return model
+    
+    def test_full_history_stride(self):
+        """测试按步长抽稀保存（最后一层总是保存）"""
+        model = self.run(FullHistory(every=30))
+        steps = np.r_[0:201:30, 200]
+        
+        assert model.C.shape == (len(steps), 51)
+        assert np.allclose(model.recorder.times, model.t[steps])
+        assert np.allclose(model.C, self.reference[steps])
+    
+    def test_keep_last(self):
+        """测试只保留最近时间层"""
+        model = self.run(KeepLast(3))
+        
+        assert model.C.shape == (3, 51)
+        assert np.allclose(model.C, self.reference[-3:])
+        assert np.allclose(model.recorder.times, model.t[-3:])
+        assert np.allclose(model.C_current, self.reference[-1])
+    
+    def test_probes(self):
+        """测试测点时间序列"""
+        model = self.run(ProbeRecorder({'center': 25, 'right': slice(40, 45)}, every=10))
+        
+        assert np.allclose(model.C['center'], self.reference[::10, 25])
+        assert model.C['right'].shape == (21, 5)
+        assert np.allclose(model.C['right'], self.reference[::10, 40:45])
+    
+    def test_memmap(self, tmp_path):
+        """测试写入磁盘文件"""
+        path = str(tmp_path / 'history.npy')
+        self.run(MemmapRecorder(path, every=50, dtype=np.float64))
+        stored = np.load(path, mmap_mode='r')
+        
+        assert stored.shape == (5, 51)
+        assert np.allclose(stored, self.reference[::50])
+    
+    def test_group_and_resolve(self):
+        """测试记录器组，以及同一模型重复求解时重新记录"""
+        model = self.run(RecorderGroup(KeepLast(), ProbeRecorder({'c': 25})))
+        model.solve_implicit()
+        last, probe = model.recorder.recorders
+        
+        assert len(last.data) == 1
+        assert np.allclose(probe.data['c'], self.reference[:, 25])
+    
+    def test_invalid(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError):
+            FullHistory(every=0)
+        with pytest.raises(ValueError):
+            KeepLast(0)
+        with pytest.raises(ValueError):
+            RecorderGroup()
+
+
+class TestModelRecording:
+    """测试模型使用记录器"""
+    
+    def test_diffusion2d_keep_last(self):
+        """测试2D模型只保留最终场"""
+        kwargs = dict(Lx=1.0, Ly=1.0, T=1.0, nx=21, ny=21, nt=101, Dx=0.01, Dy=0.01)
+        init = lambda X, Y: np.exp(-((X - 0.5)**2 + (Y - 0.5)**2) / 0.01)
+        full = Diffusion2D(**kwargs)
+        full.set_initial_condition(init)
+        full.solve_explicit()
+        light = Diffusion2D(recorder=KeepLast(), **kwargs)
+        light.set_initial_condition(init)
+        light.solve_explicit()
+        
+        assert light.C.shape == (1, 21, 21)
+        assert np.allclose(light.C_current, full.C[-1])
+    
+    def test_advection_diffusion_probe(self):
+        """测试对流-扩散模型出口浓度过程线"""
+        model = AdvectionDiffusion1D(L=10.0, T=10.0, nx=101, nt=501, u=0.5, D=0.01,
+                                     recorder=ProbeRecorder({'outlet': -1}))
+        model.set_boundary_conditions(bc_left=1.0)
+        model.solve_upwind()
+        outlet = model.C['outlet']
+        
+        assert outlet.shape == (501,)
+        assert outlet[0] == 0.0
+        assert np.all(np.diff(outlet) >= -1e-12)
+    
+    def test_recorded_field_read_only(self):
+        """测试 C 为只读视图，初始条件需通过 set_initial_condition 设置"""
+        model = Diffusion1D(L=10.0, T=20.0, nx=51, nt=201, D=0.05)
+        with pytest.raises(ValueError):
+            model.C[0, :] = 1.0
+        
+        probe = AdvectionDiffusion1D(L=10.0, T=1.0, nx=11, nt=11, u=0.5, D=0.01,
+                                     recorder=ProbeRecorder({'outlet': -1}))
+        with pytest.raises(ValueError):
+            probe.C['outlet'][0] = 1.0
+        
+        model.set_initial_condition(gaussian)
+        C = model.solve_implicit()
+        assert C[0] == pytest.approx(gaussian(model.x))
+        assert model.recorder.data.flags.writeable
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
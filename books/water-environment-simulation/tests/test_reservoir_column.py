@@ -0,0 +1,147 @@
+"""
+测试批量垂向水柱求解器
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.reservoir_column import ReservoirColumn
+from models.thermal_pollution import surface_heat_flux
+from models.recorders import ProbeRecorder
+
+
+def heat_content(column):
+    """水柱热含量 (°C·m)"""
+    return (column.volume * column.T).sum(axis=1)
+
+
+class TestDiffusion:
+    """测试隐式扩散"""
+    
+    def test_matches_dense_solve(self):
+        """测试三对角求解与稠密矩阵求解一致（变扩散系数）"""
+        column = ReservoirColumn(20.0, 11, Kz=np.linspace(0.5, 0.05, 11))
+        C = np.random.default_rng(0).uniform(5, 25, (1, 11))
+        dt = 0.5
+        new = column.diffuse(C, dt, source=0.1, surface_flux=2.0, surface_exchange=0.3,
+                             bottom_flux=-0.5)
+        
+        g = column._conductance[0]
+        A = np.diag(column.volume[0] / dt)
+        A[0, 0] += 0.3
+        for i in range(10):
+            A[i, i] += g[i]
+            A[i + 1, i + 1] += g[i]
+            A[i, i + 1] = A[i + 1, i] = -g[i]
+        b = column.volume[0] * (C[0] / dt + 0.1)
+        b[0] += 2.0
+        b[-1] -= 0.5
+        
+        assert np.allclose(new[0], np.linalg.solve(A, b))
+    
+    def test_conserves_heat(self):
+        """测试热量收支：热含量变化等于进出通量"""
+        column = ReservoirColumn([10.0, 30.0], 21, T_init=np.linspace(25, 8, 21), Kz=1.0)
+        H0 = heat_content(column)
+        for _ in range(100):
+            column.T = column.diffuse(column.T, 0.1, surface_flux=3.0, bottom_flux=-1.0)
+        
+        assert np.allclose(heat_content(column) - H0, 100 * 0.1 * (3.0 - 1.0))
+
+
+class TestConvectiveMixing:
+    """测试对流混合"""
+    
+    def test_unstable_surface_mixes(self):
+        """测试表层冷水下沉形成均匀混合层，热量守恒"""
+        column = ReservoirColumn(10.0, 11, T_init=[12, 20, 19, 18.5, 15, 10, 8, 8, 8, 8, 8])
+        H0 = heat_content(column)
+        T, n_mix = column.convective_mixing(column.T)
+        
+        assert n_mix[0] == 4
+        assert np.allclose(T[0, :4], T[0, 0])
+        assert np.array_equal(T[0, 4:], column.T[0, 4:])
+        assert np.allclose((column.volume * T).sum(), H0)
+        # 混合后不再不稳定
+        assert column.mixed_layer(T)[0] == 1
+    
+    def test_winter_inverse_stratification_stable(self):
+        """测试冬季逆分层（0°C 冰下水在 4°C 水之上）是稳定的"""
+        column = ReservoirColumn(10.0, 6, T_init=[0.5, 1.5, 2.5, 3.5, 4.0, 4.0])
+        T, n_mix = column.convective_mixing(column.T)
+        
+        assert n_mix[0] == 1
+        assert np.array_equal(T, column.T)
+        assert column.density(4.0) > column.density(0.5)
+    
+    def test_mix_scalar(self):
+        """测试溶解氧随水温同一混合层混合"""
+        column = ReservoirColumn(10.0, 6, T_init=[[10, 15, 14, 6, 5, 5], [20, 18, 16, 14, 12, 10]])
+        DO = np.tile(np.linspace(9, 4, 6), (2, 1))
+        n_mix = column.mixed_layer()
+        mixed = column.mix(DO, n_mix)
+        
+        assert list(n_mix) == [3, 1]
+        assert np.allclose(mixed[0, :3], mixed[0, 0])
+        assert np.array_equal(mixed[1], DO[1])
+
+
+class TestHeatBudget:
+    """测试水面热交换驱动"""
+    
+    def test_batch_matches_single(self):
+        """测试批量水柱（不同水深、不同气象）与逐个求解一致"""
+        t = np.arange(0, 20, 1 / 24)
+        T_air = np.column_stack([15 + 8 * np.sin(2 * np.pi * t), 25 + 0 * t])
+        solar = np.maximum(0, 700 * np.sin(2 * np.pi * (t - 0.25)))
+        batch = ReservoirColumn([15.0, 40.0], 31, T_init=12.0, Kz=0.2)
+        batch.set_light_extinction([0.3, 0.8])
+        T = batch.simulate(t, T_air, 3.0, solar)
+        
+        for c, (H, eta) in enumerate(((15.0, 0.3), (40.0, 0.8))):
+            single = ReservoirColumn(H, 31, T_init=12.0, Kz=0.2)
+            single.set_light_extinction(eta)
+            T_single = single.simulate(t, T_air[:, c], 3.0, solar)
+            assert np.allclose(T[:, c], T_single[:, 0])
+    
+    def test_relaxes_to_equilibrium(self):
+        """测试恒定气象下水温趋于水面净热通量为零的平衡温度"""
+        column = ReservoirColumn(5.0, 11, T_init=20.0, Kz=50.0)
+        column.simulate(np.linspace(0, 200, 801), 15.0, 2.0, 250.0)
+        Q, dQ_dT = surface_heat_flux(column.T[:, 0], 15.0, 2.0, 250.0)
+        
+        assert abs(Q[0]) < 0.5
+        assert dQ_dT[0] < 0
+        assert np.ptp(column.T) < 1e-3
+    
+    def test_summer_stratification(self):
+        """测试春夏加热形成温跃层，秋季冷却对流混合使分层消失"""
+        t = np.arange(0, 365, 1 / 24)
+        season = np.sin(2 * np.pi * (t - 105) / 365)
+        T_air = 14 + 12 * season
+        solar = 200 + 120 * season
+        recorder = ProbeRecorder({'surface': (0, 0), 'bottom': (0, -1)}, every=24)
+        column = ReservoirColumn(30.0, 31, T_init=5.0, Kz=np.linspace(5.0, 0.05, 31))
+        column.set_light_extinction(0.5)
+        column.simulate(t, T_air, 2.0, solar, recorder=recorder)
+        surface, bottom = recorder.data['surface'], recorder.data['bottom']
+        
+        summer = 200
+        assert surface[summer] - bottom[summer] > 5.0
+        assert abs(surface[-1] - bottom[-1]) < 1.0
+    
+    def test_invalid(self):
+        """测试无效参数"""
+        with pytest.raises(ValueError):
+            ReservoirColumn(10.0, 1)
+        column = ReservoirColumn(10.0, 5)
+        with pytest.raises(ValueError):
+            column.simulate(np.arange(10.0), np.arange(5.0), 2.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -13,6 +13,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
 
 from models.river_bend import (RiverBend2D, calculate_bend_mixing_length,
                                 calculate_curvature_radius, calculate_secondary_flow_strength)
+from models.lateral_mixing import LateralMixing2D
 
 
 class TestRiverBend2D:
@@ -206,6 +207,27 @@ class TestPhysicalBehavior:
         assert model_bend_sharp.K_bend > model_bend_gentle.K_bend
         assert model_bend_sharp.Ey_effective > model_bend_gentle.Ey_effective
     
+    def test_marching_secondary_flow_shift(self, capsys):
+        """测试沿程推进时二次流使污染带偏向凹岸且断面质量守恒"""
+        model = RiverBend2D(L=2000, B=80, nx=100, ny=20, u=0.6, Ey_straight=0.05, R=200,
+                            bend_angle=90)
+        model.add_source(x=0, y=10, Q_discharge=1.5, C_discharge=80.0, Q_river=120.0)
+        capsys.readouterr()
+        x, y, C = model.solve_with_secondary_flow(method='marching', verbose=False)
+        assert capsys.readouterr().out == ''
+        
+        straight = LateralMixing2D(L=2000, B=80, nx=100, ny=20, u=0.6, Ex=0.01,
+                                   Ey=model.Ey_effective)
+        straight.add_source(x=0, y=10, Q_discharge=1.5, C_discharge=80.0, Q_river=120.0)
+        _, _, C_straight = straight.solve_steady_state(method='marching')
+        
+        w = np.ones(model.ny)
+        w[[0, -1]] = 0.5
+        assert np.allclose(w @ C, w @ C[:, 0])
+        centroid = (w * y) @ C[:, 50] / (w @ C[:, 50])
+        centroid_straight = (w * y) @ C_straight[:, 50] / (w @ C_straight[:, 50])
+        assert centroid > centroid_straight + 10
+    
     def test_bend_mixing_length_reduction(self):
         """测试弯道混合长度缩短"""
         B = 100
@@ -86,6 +86,17 @@ class TestThermalPlume2D:
         assert T_max > 20.0
         assert T_max <= 30.0
     
+    def test_solve_steady_state_quiet(self, capsys):
+        """测试 verbose=False 时不打印求解信息"""
+        model = ThermalPlume2D(Lx=1000, Ly=100, nx=50, ny=20, u=1.0, Kx=10.0, Ky=2.0,
+                               lambda_surface=0.1, T_ambient=20.0)
+        model.set_discharge(x=0, y=0, Q_discharge=10.0, T_discharge=30.0, Q_river=100.0)
+        capsys.readouterr()
+        
+        x, y, T = model.solve_steady_state(verbose=False)
+        assert capsys.readouterr().out == ''
+        assert np.max(T) > model.T_ambient
+    
     def test_temperature_decay(self):
         """测试温度衰减"""
         model = ThermalPlume2D(
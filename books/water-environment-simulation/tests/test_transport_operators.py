@@ -0,0 +1,206 @@
+"""
+测试输运算子库
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.transport_operators import (StructuredGrid, diffusion_matrix, advection_matrix,
+                                        reaction_matrix, tvd_advection_rate, ThetaScheme,
+                                        implicit_propagator, march_downstream)
+from models.advection_diffusion import AdvectionDiffusion1D
+
+
+class TestOperators:
+    """测试算子矩阵"""
+    
+    def test_grid_boundary(self):
+        """测试网格边界节点"""
+        grid = StructuredGrid((3, 4), (1.0, 1.0))
+        nodes, inner = grid.boundary(1, -1)
+        
+        assert grid.size == 12
+        assert np.array_equal(nodes, [3, 7, 11])
+        assert np.array_equal(inner, [2, 6, 10])
+        assert len(grid.all_boundaries()) == 10
+    
+    def test_diffusion_3d_quadratic(self):
+        """测试3D扩散算子对二次函数给出精确拉普拉斯值"""
+        grid = StructuredGrid((6, 7, 8), (0.5, 0.4, 0.3))
+        z, y, x = [grid.coords[a] * grid.spacing[a] for a in range(3)]
+        C = x**2 + 2 * y**2 + 3 * z**2
+        rate = diffusion_matrix(grid, (0.1, 0.2, 0.3)) @ C
+        
+        interior = np.setdiff1d(np.arange(grid.size), grid.all_boundaries())
+        expected = 2 * 0.3 + 4 * 0.2 + 6 * 0.1
+        assert np.allclose(rate[interior], expected)
+        assert np.allclose(rate[grid.all_boundaries()], 0.0)
+    
+    def test_neumann_conserves_mass(self):
+        """测试零通量扩散算子守恒（梯形积分权重）"""
+        grid = StructuredGrid((20, 30), (1.0, 1.0))
+        A = diffusion_matrix(grid, 0.5, boundary='neumann')
+        C = np.random.default_rng(0).random(grid.size)
+        wy, wx = np.ones(20), np.ones(30)
+        wy[[0, -1]] = wx[[0, -1]] = 0.5
+        
+        assert abs(np.outer(wy, wx).ravel() @ (A @ C)) < 1e-12
+    
+    @pytest.mark.parametrize('scheme', ['upwind', 'central', 'quick', 'lax_wendroff'])
+    @pytest.mark.parametrize('u', [0.7, -0.7])
+    def test_advection_linear_profile(self, scheme, u):
+        """测试各格式对线性分布给出精确对流项"""
+        grid = StructuredGrid((20,), (0.5,))
+        x = np.arange(20) * 0.5
+        rate = advection_matrix(grid, u, scheme, dt=0.1) @ (2.0 * x + 1.0)
+        
+        assert np.allclose(rate[1:-1], -2.0 * u)
+        assert rate[0] == 0 and rate[-1] == 0
+    
+    def test_quick_quadratic(self):
+        """测试QUICK格式对二次分布精确（远离边界）"""
+        grid = StructuredGrid((20,), (0.5,))
+        x = np.arange(20) * 0.5
+        for u in (0.7, -0.7):
+            rate = advection_matrix(grid, u, 'quick') @ x**2
+            assert np.allclose(rate[2:-2], -u * 2 * x[2:-2])
+    
+    def test_reaction(self):
+        """测试线性反应算子"""
+        grid = StructuredGrid((5,), (1.0,))
+        assert np.allclose(reaction_matrix(grid, 0.2) @ np.full(5, 3.0), -0.6)
+    
+    def test_invalid_options(self):
+        """测试无效参数"""
+        grid = StructuredGrid((10,), (1.0,))
+        with pytest.raises(ValueError):
+            advection_matrix(grid, 1.0, 'donor')
+        with pytest.raises(ValueError):
+            advection_matrix(grid, 1.0, 'lax_wendroff')
+        with pytest.raises(ValueError):
+            tvd_advection_rate(np.zeros(10), grid, 1.0, limiter='none')
+        with pytest.raises(ValueError):
+            diffusion_matrix(grid, (1.0, 1.0))
+        with pytest.raises(ValueError):
+            ThetaScheme(diffusion_matrix(grid, 1.0), 0.1, theta=2.0)
+
+
+class TestThetaScheme:
+    """测试θ法推进"""
+    
+    def test_crank_nicolson_gaussian(self):
+        """测试Crank-Nicolson解与高斯解析解一致"""
+        grid = StructuredGrid((201,), (0.05,))
+        x = np.arange(201) * 0.05
+        D, t0, T = 0.01, 10.0, 20.0
+        gauss = lambda t: np.exp(-(x - 5)**2 / (4 * D * t)) / np.sqrt(4 * np.pi * D * t)
+        
+        scheme = ThetaScheme(diffusion_matrix(grid, D), 0.5, theta=0.5, fixed=[0, 200])
+        C = gauss(t0)
+        for _ in range(int(T / 0.5)):
+            C = scheme.step(C)
+        
+        assert np.abs(C - gauss(t0 + T)).max() < 1e-3 * gauss(t0 + T).max()
+    
+    def test_factorization_reused(self):
+        """测试隐式分解只做一次"""
+        grid = StructuredGrid((10, 10), (1.0, 1.0))
+        walls = [grid.boundary(a, s) for a in (0, 1) for s in (0, -1)]
+        scheme = ThetaScheme(diffusion_matrix(grid, 1.0), 1.0, theta=1.0, zero_gradient=walls)
+        C = np.random.default_rng(1).random(grid.size)
+        
+        C = scheme.step(C)
+        lu = scheme._lu
+        C = scheme.step(C)
+        
+        assert scheme._lu is lu
+        field = C.reshape(10, 10)
+        assert np.allclose(field[0, :], field[1, :])
+        assert np.allclose(field[:, -1], field[:, -2])
+    
+    def test_explicit_matches_implicit_limit(self):
+        """测试小步长下显式与隐式结果接近"""
+        grid = StructuredGrid((41,), (0.25,))
+        A = advection_matrix(grid, 0.3) + diffusion_matrix(grid, 0.05) + reaction_matrix(grid, 0.1)
+        C0 = np.exp(-(np.arange(41) * 0.25 - 3)**2)
+        results = []
+        for theta in (0.0, 1.0):
+            scheme = ThetaScheme(A, 0.001, theta, fixed=[0], zero_gradient=[grid.boundary(0, -1)])
+            C = C0.copy()
+            for _ in range(1000):
+                C = scheme.step(C, source=0.01, values=[0.0])
+            results.append(C)
+        
+        assert np.allclose(results[0], results[1], atol=1e-3)
+
+
+class TestTVD:
+    """测试TVD对流"""
+    
+    @pytest.mark.parametrize('limiter', ['minmod', 'van_leer', 'superbee', 'mc'])
+    def test_square_wave(self, limiter):
+        """测试方波输运无振荡、质量守恒"""
+        model = AdvectionDiffusion1D(L=10.0, T=5.0, nx=101, nt=250, u=0.5, D=0.0)
+        model.set_initial_condition(lambda x: ((x > 2) & (x < 4)).astype(float))
+        model.set_boundary_conditions(bc_left=0.0)
+        C = model.solve_tvd(limiter)
+        
+        assert C.min() >= -1e-12
+        assert C.max() <= 1.0 + 1e-12
+        assert np.sum(C[-1]) == pytest.approx(np.sum(C[0]))
+        # 方波中心从3 m移动到5.5 m
+        center = np.sum(model.x * C[-1]) / np.sum(C[-1])
+        assert center == pytest.approx(5.5, abs=0.05)
+    
+    def test_sharper_than_upwind(self):
+        """测试TVD格式数值耗散小于迎风格式"""
+        model = AdvectionDiffusion1D(L=10.0, T=5.0, nx=101, nt=250, u=0.5, D=0.0)
+        model.set_initial_condition(lambda x: ((x > 2) & (x < 4)).astype(float))
+        model.set_boundary_conditions(bc_left=0.0)
+        peak_tvd = model.solve_tvd('superbee')[-1].max()
+        peak_upwind = model.solve_upwind()[-1].max()
+        
+        assert peak_tvd > peak_upwind
+
+
+class TestSpaceMarching:
+    """测试沿程隐式推进"""
+    
+    def test_propagator_matches_dense(self):
+        """测试带状求解的传播矩阵与稠密求逆一致"""
+        grid = StructuredGrid((15,), (2.0,))
+        v = np.random.default_rng(0).uniform(-0.05, 0.05, 15)
+        A = diffusion_matrix(grid, 0.3, boundary='neumann') + advection_matrix(grid, v)
+        P = implicit_propagator(A, 40.0)
+        
+        assert np.allclose(P, np.linalg.inv(np.eye(15) - 40.0 * A.toarray()))
+        with pytest.raises(ValueError):
+            implicit_propagator(diffusion_matrix(StructuredGrid((4, 4), (1.0, 1.0)), 1.0), 1.0)
+    
+    def test_march_steady_detection(self):
+        """测试稳态检测后的复制与逐断面推进一致，下游注入断面继续推进"""
+        grid = StructuredGrid((11,), (1.0,))
+        P = implicit_propagator(diffusion_matrix(grid, 1.0, boundary='neumann'), 5.0)
+        C0 = np.zeros(11)
+        C0[0] = 10.0
+        injections = {150: ([10], [4.0])}
+        C = march_downstream(P, C0, 200, injections)
+        
+        expected = np.empty((11, 200))
+        expected[:, 0] = C0
+        for i in range(1, 200):
+            expected[:, i] = P @ expected[:, i - 1]
+            if i == 150:
+                expected[10, i] = 4.0
+        
+        assert np.allclose(C, expected, rtol=1e-8)
+        assert C[10, 150] == 4.0
+        assert np.ptp(C[:, 149]) < 1e-8 and np.ptp(C[:, 151]) > 0.1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
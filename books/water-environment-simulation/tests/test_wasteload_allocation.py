@@ -0,0 +1,195 @@
+"""
+测试排污负荷分配批量情景分析
+"""
+
+import pytest
+import numpy as np
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'code'))
+
+from models.wasteload_allocation import (WasteLoadAllocation, sag_curve, critical_point,
+                                         temperature_corrected_rates, saturation_do,
+                                         run_scenarios)
+from models.dissolved_oxygen import StreeterPhelps
+
+
+def min_do(params):
+    """单个情景的最低DO（多进程测试用）"""
+    kd, ka = params
+    model = StreeterPhelps(L0=20.0, D0=1.0, kd=kd, ka=ka, T=20.0, nt=2001)
+    _, _, DO = model.solve()
+    return DO.min()
+
+
+def reference_profile(x, L, sources, Q, u, kd, ka, DOs, loads):
+    """逐段用 StreeterPhelps 求解的单情景参考解"""
+    BOD, D = np.zeros_like(x), np.zeros_like(x)
+    L0, D0, x0 = 0.0, 0.0, 0.0
+    for (xs, Qw, DOw), load in list(zip(sources, loads)) + [((L, 0.0, 0.0), 0.0)]:
+        nodes = (x >= x0) & ((x < xs) if xs < L else (x <= xs))
+        model = StreeterPhelps(L0, D0, kd, ka)
+        BOD[nodes], D[nodes], _ = model.analytical_solution((x[nodes] - x0) / (u * 86400))
+        Lx, Dx, _ = model.analytical_solution(np.array([(xs - x0) / (u * 86400)]))
+        L0 = (Q * Lx[0] + Qw * load) / (Q + Qw)
+        D0 = (Q * Dx[0] + Qw * (DOs - DOw)) / (Q + Qw)
+        Q, x0 = Q + Qw, xs
+    return BOD, DOs - D
+
+
+class TestSagCurve:
+    """测试氧垂曲线"""
+    
+    def test_matches_streeter_phelps(self):
+        """测试广播计算与逐个 StreeterPhelps 模型一致"""
+        kd = np.array([0.2, 0.3, 0.2])
+        ka = np.array([0.4, 0.15, 0.8])
+        D0 = np.array([3.0, 2.0, 5.0])
+        t = np.linspace(0, 20, 201)
+        L, D = sag_curve(30.0, D0[:, None], kd[:, None], ka[:, None], t)
+        tc, Dc = critical_point(30.0, D0, kd, ka)
+        
+        for i in range(3):
+            model = StreeterPhelps(L0=30.0, D0=D0[i], kd=kd[i], ka=ka[i], T=20.0, nt=201)
+            L_ref, D_ref, _ = model.solve()
+            tc_ref, Dc_ref, _ = model.calculate_critical_point()
+            assert np.allclose(L[i], L_ref)
+            assert np.allclose(D[i], D_ref)
+            assert tc[i] == pytest.approx(tc_ref)
+            assert Dc[i] == pytest.approx(Dc_ref)
+    
+    def test_critical_point_cases(self):
+        """测试 ka≈kd、无临界点与截断区间的临界点"""
+        t = np.linspace(0, 10, 100001)
+        
+        _, D = sag_curve(30.0, 1.0, 0.5, 0.5, t)
+        tc, Dc = critical_point(30.0, 1.0, 0.5, 0.5)
+        assert tc == pytest.approx(t[np.argmax(D)], abs=1e-3)
+        assert Dc == pytest.approx(D.max())
+        
+        # 初始亏损大，DO单调恢复
+        tc, Dc = critical_point(1.0, 8.0, 0.2, 0.8)
+        assert tc == 0.0 and Dc == pytest.approx(8.0)
+        
+        # 区间内亏损单调增加
+        tc, Dc = critical_point(30.0, 0.0, 0.2, 0.4, t_max=1.0)
+        assert tc == 1.0
+    
+    def test_temperature(self):
+        """测试温度校正与饱和DO"""
+        kd, ka = temperature_corrected_rates(0.3, 0.6, np.array([10.0, 20.0, 30.0]))
+        
+        assert kd[1] == pytest.approx(0.3) and ka[1] == pytest.approx(0.6)
+        assert np.all(np.diff(kd) > 0) and np.all(np.diff(ka) > 0)
+        DOs = saturation_do(np.array([5.0, 20.0]))
+        assert DOs[1] == pytest.approx(StreeterPhelps(1, 0, 0.1, 0.2).calculate_saturation_do(20.0))
+        assert DOs[0] > DOs[1]
+
+
+class TestWasteLoadAllocation:
+    """测试多点源负荷分配"""
+    
+    def make_model(self):
+        """两个排放口，流量 × 水温 共 3 × 2 个情景"""
+        model = WasteLoadAllocation(50000, Q_river=np.array([5.0, 10.0, 20.0]), u=0.3,
+                                    kd_20=0.3, ka_20=0.6, T_water=np.array([[15.0], [25.0]]),
+                                    nx=501)
+        model.add_source(20000, 1.0, DO_waste=2.0)
+        model.add_source(0, 0.5)
+        return model
+    
+    def test_batch_matches_reference(self):
+        """测试批量情景与逐段逐情景求解一致（排放口按位置排序）"""
+        model = self.make_model()
+        loads = np.array([50.0, 30.0])
+        L, DO = model.solve(loads)
+        
+        assert L.shape == (2, 3, 501)
+        for i, T in enumerate((15.0, 25.0)):
+            for j, Q in enumerate((5.0, 10.0, 20.0)):
+                kd, ka = temperature_corrected_rates(0.3, 0.6, T)
+                sources = [(0, 0.5, 0.0), (20000, 1.0, 2.0)]
+                L_ref, DO_ref = reference_profile(model.x, 50000, sources, Q, 0.3, kd, ka,
+                                                  saturation_do(T), [30.0, 50.0])
+                assert np.allclose(L[i, j], L_ref)
+                assert np.allclose(DO[i, j], DO_ref)
+    
+    def test_critical_points(self):
+        """测试解析临界点不高于沿程节点的最低DO且与之接近"""
+        model = self.make_model()
+        loads = np.array([[50.0, 30.0], [5.0, 80.0]])[:, None, None, :]
+        x_c, DO_c = model.critical_points(loads)
+        _, DO = model.solve(loads)
+        
+        assert DO_c.shape == (2, 2, 3)
+        assert np.all(DO_c <= DO.min(axis=-1) + 1e-12)
+        assert np.allclose(DO_c, DO.min(axis=-1), atol=1e-3)
+        assert np.all((x_c >= 0) & (x_c <= 50000))
+    
+    def test_max_allowable_load(self):
+        """测试最大允许负荷处最低DO恰为标准，流量越大、水温越低容量越大"""
+        model = self.make_model()
+        L_max, W_max = model.max_allowable_load(0, 5.0, loads=[0.0, 30.0])
+        
+        loads = np.stack([L_max, np.full_like(L_max, 30.0)], axis=-1)
+        _, DO_c = model.critical_points(loads)
+        assert np.allclose(DO_c, 5.0, atol=1e-4)
+        assert np.all(DO_c >= 5.0)
+        assert np.allclose(W_max, 1.0 * L_max * 86.4)
+        assert np.all(np.diff(L_max, axis=1) > 0)
+        assert np.all(L_max[0] > L_max[1])
+    
+    def test_infeasible_scenarios_stop_early(self):
+        """测试零负荷即超标的情景直接返回 nan，不拖慢其余情景的二分"""
+        model = self.make_model()
+        calls = []
+        feasible = model.feasible
+        model.feasible = lambda *args: calls.append(1) or feasible(*args)
+        L_max, W_max = model.max_allowable_load(0, 5.0, loads=[0.0, 200.0])
+        
+        assert np.isnan(L_max[1, 0]) and np.isnan(W_max[1, 0])
+        assert np.all(np.isfinite(L_max[0]))
+        assert len(calls) < 60
+    
+    def test_feasible_region(self):
+        """测试可行域与最大允许负荷边界一致"""
+        model = self.make_model()
+        candidates_0 = np.linspace(0, 400, 41)
+        candidates_1 = np.linspace(0, 200, 21)
+        ok = model.feasible_region(5.0, [candidates_0, candidates_1])
+        
+        assert ok.shape == (41, 21, 2, 3)
+        # 可行域向低负荷方向封闭
+        assert np.all(ok[:-1] >= ok[1:]) and np.all(ok[:, :-1] >= ok[:, 1:])
+        
+        # 上游负荷过高时任何负荷都不可行（nan）
+        assert not ok[:, -1, 1, 0].any()
+        for k, load in enumerate(candidates_1):
+            L_max, _ = model.max_allowable_load(0, 5.0, loads=[0.0, load])
+            assert np.array_equal(ok[:, k], candidates_0[:, None, None] <= L_max)
+    
+    def test_invalid(self):
+        """测试无效参数"""
+        model = self.make_model()
+        with pytest.raises(ValueError):
+            model.add_source(60000, 1.0)
+        with pytest.raises(ValueError):
+            model.solve([10.0])
+
+
+class TestRunScenarios:
+    """测试多进程情景计算"""
+    
+    def test_parallel_matches_serial(self):
+        """测试多进程结果与串行一致且保持顺序"""
+        scenarios = [(kd, ka) for kd in (0.2, 0.3, 0.4) for ka in (0.5, 0.9)]
+        serial = run_scenarios(min_do, scenarios)
+        parallel = run_scenarios(min_do, scenarios, n_workers=2)
+        
+        assert parallel == serial
+        assert serial[0] > serial[2] > serial[4]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])